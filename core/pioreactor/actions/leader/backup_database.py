@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import os
+import shutil
 import subprocess
+import tempfile
 from pathlib import Path
 
 import click
@@ -14,10 +16,18 @@ from pioreactor.utils import local_persistent_storage
 from pioreactor.utils import long_running_managed_lifecycle
 from pioreactor.utils.networking import resolve_to_address
 from pioreactor.utils.networking import rsync
+from pioreactor.utils.sqlite_snapshots import backup_incrementally
+from pioreactor.utils.sqlite_snapshots import deltas_directory
+from pioreactor.utils.sqlite_snapshots import manifest_path
+from pioreactor.utils.sqlite_snapshots import replay_deltas
 from pioreactor.utils.timing import current_utc_timestamp
 from pioreactor.whoami import get_unit_name
 from pioreactor.whoami import UNIVERSAL_EXPERIMENT
 
+# deltas kept for workers to catch up with, about two months of weekly backups. A worker further behind, or with more
+# deltas than this to replay, gets a full copy instead.
+MAX_CHAINED_DELTAS = 8
+
 
 def _remote_available_space(address: str, path: str) -> int | None:
     """Return available bytes on remote machine or ``None`` on failure."""
@@ -53,7 +63,54 @@ def count_writes_occurring() -> int:
         return int(c.get("inserts_in_last_60s", 0))  # type: ignore[call-overload]
 
 
-def backup_database(output_file: str, force: bool = False, backup_to_workers: int = 0) -> None:
+def _clear_remote_deltas(address: str, output_file: str) -> None:
+    # rsync an empty directory over the worker's deltas, so it has none to replay onto the copy sent next
+    with tempfile.TemporaryDirectory() as empty:
+        rsync("-r", "--delete", f"{empty}/", f"{address}:{deltas_directory(output_file)}/")
+
+
+def _backup_to_worker(backup_unit: str, output_file: str, chain: str | None, sequence: int) -> None:
+    """
+    Send the worker the deltas since the last ones it got, if it has a copy from the same chain of incremental
+    backups, else a full copy. chain is None for a backup that wasn't incremental.
+    """
+    address = resolve_to_address(backup_unit)
+    with local_persistent_storage("database_backups") as cache:
+        # "<chain id>:<sequence of its full copy>:<sequence of its latest delta>"
+        worker_state = cache.get(f"latest_backup_in_{backup_unit}_sequence")
+
+    if chain is not None and worker_state is not None:
+        worker_chain, base, latest = str(worker_state).split(":")
+        if worker_chain == chain and sequence - int(base) <= MAX_CHAINED_DELTAS:
+            deltas = [
+                str(deltas_directory(output_file) / f"{s:010d}.delta")
+                for s in range(int(latest) + 1, sequence + 1)
+            ]
+            if deltas:
+                rsync("-hz", "--partial", *deltas, f"{address}:{deltas_directory(output_file)}/")
+            with local_persistent_storage("database_backups") as cache:
+                cache[f"latest_backup_in_{backup_unit}_sequence"] = f"{chain}:{base}:{sequence}"
+            return
+
+    if chain is not None or worker_state is not None:
+        _clear_remote_deltas(address, output_file)
+    rsync(
+        "-hz",
+        "--partial",
+        "--inplace",
+        output_file,
+        f"{address}:{output_file}",
+    )
+    with local_persistent_storage("database_backups") as cache:
+        if chain is not None:
+            cache[f"latest_backup_in_{backup_unit}_sequence"] = f"{chain}:{sequence}:{sequence}"
+        else:
+            cache.pop(f"latest_backup_in_{backup_unit}_sequence")
+
+
+def backup_database(
+    output_file: str, force: bool = False, backup_to_workers: int = 0, incremental: bool = False
+) -> None:
     """
     This action will create a backup of the SQLite3 database into specified output. It then
     will try to copy the backup to any available worker Pioreactors as a further backup.
@@ -63,6 +120,11 @@ def backup_database(output_file: str, force: bool = False, backup_to_workers: in
 
     To avoid database corruption, and to dodge when activities are happening, we will skip the backup if there are too many writes occurring
 
+    With incremental, only the pages that changed since the last incremental backup are written, into a delta in
+    <output>.deltas that's applied to the output, and workers are sent only the deltas. This reads the database
+    without blocking writers, so isn't skipped when writes are occurring. Replay a worker's deltas onto its copy
+    with `pio run backup_database --replay --output <copy>`.
+
     Elsewhere, a cronjob is set up as well to run this action every N days.
 
     """
@@ -77,7 +139,7 @@ def backup_database(output_file: str, force: bool = False, backup_to_workers: in
             mj.job_key, experiment=experiment, unit=unit, to_mqtt=False
         )  # the backup would take so long that the mqtt client would disconnect. We also don't want to write to the db.
 
-        logger.debug(f"Starting backup of database to {output_file}")
+        logger.debug(f"Starting {'incremental ' if incremental else ''}backup of database to {output_file}")
 
         db_path = config.get("storage", "database")
         db_size = Path(db_path).stat().st_size
@@ -89,25 +151,40 @@ def backup_database(output_file: str, force: bool = False, backup_to_workers: in
             logger.warning("Unable to backup database locally. Not enough disk space.")
             return
 
-        if not force and count_writes_occurring() >= 10:
+        if not incremental and not force and count_writes_occurring() >= 10:
             logger.debug("Too many writes to proceed with backup. Exiting. Use --force to force backing up.")
             return
 
         current_time = current_utc_timestamp()
         page_size = 50
 
-        con = sqlite3.connect(f"file:{config.get('storage', 'database')}?mode=ro", uri=True)
-        bck = sqlite3.connect(output_file)
-
-        with bck:
-            # why 50? A larger sqlite3 database we used had 164510 pages.
-            # pages=5 took 4m
-            # pages=50 took 2m
-            # we don't want it too big though, else it locks up the database for too long. We had problems with pages=-1
-            con.backup(bck, pages=page_size)
-
-        bck.close()
-        con.close()
+        chain: str | None = None
+        sequence = 0
+        if incremental:
+            manifest, delta = backup_incrementally(db_path, output_file)
+            chain, sequence = manifest.chain_id.hex(), manifest.sequence
+            if delta is not None:
+                logger.debug(f"Wrote {delta.stat().st_size} byte delta {sequence} of database backup.")
+
+            for old_delta in sorted(deltas_directory(output_file).glob("*.delta"))[:-MAX_CHAINED_DELTAS]:
+                old_delta.unlink()
+        else:
+            # the full copy below replaces the output that any deltas were applied to
+            manifest_path(output_file).unlink(missing_ok=True)
+            shutil.rmtree(deltas_directory(output_file), ignore_errors=True)
+
+            con = sqlite3.connect(f"file:{config.get('storage', 'database')}?mode=ro", uri=True)
+            bck = sqlite3.connect(output_file)
+
+            with bck:
+                # why 50? A larger sqlite3 database we used had 164510 pages.
+                # pages=5 took 4m
+                # pages=50 took 2m
+                # we don't want it too big though, else it locks up the database for too long. We had problems with pages=-1
+                con.backup(bck, pages=page_size)
+
+            bck.close()
+            con.close()
 
         with local_persistent_storage("database_backups") as cache:
             cache["latest_backup_timestamp"] = current_time
@@ -136,13 +213,7 @@ def backup_database(output_file: str, force: bool = False, backup_to_workers: in
                 logger.warning(f"Unable to backup database to {backup_unit}. Not enough disk space.")
                 continue
             try:
-                rsync(
-                    "-hz",
-                    "--partial",
-                    "--inplace",
-                    output_file,
-                    f"{resolve_to_address(backup_unit)}:{output_file}",
-                )
+                _backup_to_worker(backup_unit, output_file, chain, sequence)
             except RsyncError:
                 logger.debug(
                     f"Unable to backup database to {backup_unit}.",
@@ -163,14 +234,30 @@ def backup_database(output_file: str, force: bool = False, backup_to_workers: in
 @click.option("--output", default="/home/pioreactor/.pioreactor/storage/pioreactor.sqlite.backup")
 @click.option("--force", is_flag=True, help="force backing up")
 @click.option("--backup-to-workers", help="back up db to N workers", type=int)
-def click_backup_database(output: str, force: bool, backup_to_workers: int | None) -> None:
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="write only the pages changed since the last incremental backup. Every page is still read and hashed, so "
+    "each run reads the whole database",
+)
+@click.option(
+    "--replay", is_flag=True, help="replay the deltas in <output>.deltas onto the backup at output, and exit"
+)
+def click_backup_database(
+    output: str, force: bool, backup_to_workers: int | None, incremental: bool, replay: bool
+) -> None:
     """
     (leader only) Backup db to workers.
     """
+    if replay:
+        n_deltas = replay_deltas(output, deltas_directory(output).glob("*.delta"))
+        click.echo(f"Replayed {n_deltas} deltas onto {output}.")
+        return
+
     number_of_backup_replicates_to_workers = (
         backup_to_workers
         if backup_to_workers is not None
         else config.getint("storage", "number_of_backup_replicates_to_workers", fallback=0)
     )
 
-    return backup_database(output, force, number_of_backup_replicates_to_workers)
+    return backup_database(output, force, number_of_backup_replicates_to_workers, incremental)
@@ -1,21 +1,28 @@
 # -*- coding: utf-8 -*-
 import random
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
 from sched import scheduler
 from time import perf_counter
 from typing import Any
 from typing import Callable
+from typing import TYPE_CHECKING
 
 import click
 from msgspec.yaml import decode
 from pioreactor import cluster_management
 from pioreactor import types as pt
 from pioreactor.cluster_management import get_active_workers_in_experiment
+from pioreactor.config import config
 from pioreactor.exc import MQTTValueError
 from pioreactor.exc import NotAssignedAnExperimentError
 from pioreactor.experiment_profiles import profile_struct as struct
 from pioreactor.experiment_profiles.plugin_versions import parse_plugin_version_constraint
+from pioreactor.experiment_profiles.state_mirror import get_active_mirror
+from pioreactor.experiment_profiles.state_mirror import JobSettingsMirror
+from pioreactor.experiment_profiles.state_mirror import mirror_job_settings
 from pioreactor.experiment_profiles.validate import (
     check_syntax_of_bool_expression as validate_check_syntax_of_bool_expression,
 )
@@ -39,9 +46,15 @@ from pioreactor.whoami import get_assigned_experiment_name
 from pioreactor.whoami import get_unit_name
 from pioreactor.whoami import is_testing_env
 
+if TYPE_CHECKING:
+    from pioreactor.experiment_profiles.parser import CompiledExpression
+
 BoolExpression = str | bool
 Env = dict[str, Any]
 
+# how long a `when` waiting on job setting changes goes before checking its condition anyway
+WHEN_RECHECK_SECONDS = 300.0
+
 STRICT_EXPRESSION_PATTERN = r"^\${{(.*?)}}$"
 FLEXIBLE_EXPRESSION_PATTERN = r"\${{(.*?)}}"
 START_JOB_SUBMIT_MAX_ATTEMPTS = 3
@@ -116,30 +129,46 @@ def evaluate_options(options: dict[str, Any], env: Env) -> dict[str, Any]:
     return options_expressed
 
 
-def evaluate_log_message(message: str, env: Env) -> str:
+@lru_cache(maxsize=256)
+def _compile_log_message(message: str) -> tuple[list[str], list["CompiledExpression"]]:
     import re
-    from pioreactor.experiment_profiles.parser import parse_profile_expression
+    from pioreactor.experiment_profiles.parser import compile_profile_expression
 
-    matches = re.findall(FLEXIBLE_EXPRESSION_PATTERN, message)
+    # alternating literal text and the insides of ${{...}}
+    parts = re.split(FLEXIBLE_EXPRESSION_PATTERN, message)
+    return parts[::2], [compile_profile_expression(expression) for expression in parts[1::2]]
 
-    modified_matches = [parse_profile_expression(match, env) for match in matches]
 
-    # Replace each ${{...}} in the original string with the modified match
-    result_string = re.sub(FLEXIBLE_EXPRESSION_PATTERN, lambda m: str(modified_matches.pop(0)), message)
-    return result_string
+def evaluate_log_message(message: str, env: Env) -> str:
+    literals, expressions = _compile_log_message(message)
 
+    values = [expression(env) for expression in expressions]
 
-def evaluate_bool_expression(bool_expression: BoolExpression, env: Env) -> bool:
-    from pioreactor.experiment_profiles.parser import parse_profile_expression_to_bool
+    # Replace each ${{...}} in the original string with the modified match
+    return "".join(literal + str(value) for literal, value in zip(literals, values)) + literals[-1]
 
-    if isinstance(bool_expression, bool):
-        return bool_expression
+
+@lru_cache(maxsize=256)
+def _compile_bool_expression(bool_expression: str) -> "CompiledExpression":
+    from pioreactor.experiment_profiles.parser import compile_profile_expression
 
     if is_bracketed_expression(bool_expression):
         bool_expression = strip_expression_brackets(bool_expression)
 
+    return compile_profile_expression(bool_expression)
+
+
+def evaluate_bool_expression(bool_expression: BoolExpression, env: Env) -> bool:
+    if isinstance(bool_expression, bool):
+        return bool_expression
+
     # bool_expression is a str
-    return parse_profile_expression_to_bool(bool_expression, env=env)
+    compiled_expression = _compile_bool_expression(bool_expression)
+    result = compiled_expression(env)
+    if result is None:
+        # syntax error or something funky.
+        raise SyntaxError(compiled_expression.expression)
+    return bool(result)
 
 
 def _get_worker_env_for_start(
@@ -506,6 +535,76 @@ def _should_execute_action(if_: BoolExpression, env: Env, logger: CustomLogger)
     return False
 
 
+def _when_trigger_topics(env: Env, *expressions: BoolExpression) -> list[str] | None:
+    """
+    The MQTT topics of the job settings that a `when`'s expressions read, or None if their values can change
+    without a job setting changing, ex: they use `hours_elapsed()`, and so need polling.
+    """
+    from pioreactor.experiment_profiles.parser import job_setting_topic
+
+    topics: list[str] = []
+    for expression in expressions:
+        if isinstance(expression, bool):
+            continue
+
+        compiled_expression = _compile_bool_expression(expression)
+        if compiled_expression.volatile:
+            return None
+
+        try:
+            topics.extend(
+                job_setting_topic(data_string, env) for data_string in compiled_expression.dependencies
+            )
+        except NotAssignedAnExperimentError:
+            return None
+
+    return topics or None
+
+
+def _recheck_on_change(
+    mirror: JobSettingsMirror,
+    topics: list[str],
+    schedule: scheduler,
+    priority: int,
+    recheck: Callable[[], None],
+) -> None:
+    """
+    Schedule `recheck` for `when_debounce_seconds` after one of `topics` changes, so a burst of changes is checked
+    once, or after WHEN_RECHECK_SECONDS, whichever is first.
+    """
+    debounce = config.getfloat("experiment_profile.config", "when_debounce_seconds", fallback=0.5)
+    lock = threading.Lock()
+    woken = False
+    # None until add_listener returns: a change can wake us before then
+    remove_listener: Callable[[], None] | None = None
+
+    def wake(topic: str | None = None) -> None:
+        nonlocal woken
+        with lock:
+            if woken:
+                return
+            woken = True
+            remove = remove_listener
+
+        if remove is not None:
+            remove()
+        try:
+            schedule.cancel(fallback)
+        except ValueError:
+            # the fallback is what woke us
+            pass
+        schedule.enter(delay=debounce, priority=priority, action=recheck)
+
+    # the fallback also keeps the schedule non-empty, which is how the profile knows it's still running.
+    fallback = schedule.enter(delay=WHEN_RECHECK_SECONDS, priority=priority, action=wake)
+    remove = mirror.add_listener(topics, wake)
+    with lock:
+        remove_listener = remove
+        already_woken = woken
+    if already_woken:
+        remove()
+
+
 def when(
     unit: pt.Unit,
     experiment: pt.Experiment,
@@ -563,23 +662,29 @@ def when(
                     )
 
             else:
-                schedule.enter(
-                    # adding a random element eventually smooth out these checks, so that there's not a thundering herd to check, and allows other actions to execute inbetween.
-                    delay=15 + 10 * random.random(),
-                    priority=get_simple_priority(when_action),
-                    action=wrapped_execute_action(
-                        unit,
-                        experiment,
-                        env,
-                        job_name,
-                        logger,
-                        schedule,
-                        action_metrics,
-                        parent_job,
-                        when_action,
-                        dry_run,
-                    ),
+                recheck = wrapped_execute_action(
+                    unit,
+                    experiment,
+                    env,
+                    job_name,
+                    logger,
+                    schedule,
+                    action_metrics,
+                    parent_job,
+                    when_action,
+                    dry_run,
                 )
+                topics = _when_trigger_topics(env, if_, condition_)
+                mirror = get_active_mirror()
+                if mirror is not None and topics:
+                    _recheck_on_change(mirror, topics, schedule, get_simple_priority(when_action), recheck)
+                else:
+                    schedule.enter(
+                        # adding a random element eventually smooth out these checks, so that there's not a thundering herd to check, and allows other actions to execute inbetween.
+                        delay=15 + 10 * random.random(),
+                        priority=get_simple_priority(when_action),
+                        action=recheck,
+                    )
 
         else:
             logger.debug(f"Action's `if` condition, `{if_}`, evaluated False. Skipping action.")
@@ -1141,13 +1246,16 @@ def execute_experiment_profile(
         try:
             # try / finally to handle keyboard interrupts
 
-            # the below is so the schedule can be canceled by setting the event.
-            while not mananged_job.exit_event.wait(timeout=0):
-                next_event_in = sched.run(blocking=False)
-                if next_event_in is not None:
-                    time.sleep(min(0.25, next_event_in))
-                else:
-                    break
+            # one long-lived subscriber serves the job settings that expressions read, instead of a new MQTT
+            # connection per lookup.
+            with mirror_job_settings(client_id=f"{action_name}-mirror-{unit}-{experiment}"):
+                # the below is so the schedule can be canceled by setting the event.
+                while not mananged_job.exit_event.wait(timeout=0):
+                    next_event_in = sched.run(blocking=False)
+                    if next_event_in is not None:
+                        time.sleep(min(0.25, next_event_in))
+                    else:
+                        break
         finally:
             if mananged_job.exit_event.is_set():
                 # ended early
@@ -4,19 +4,30 @@
 import csv
 import io
 import json
+import multiprocessing
 import os
 import shutil
 import sqlite3
 import sys
+import tempfile
 import zipfile
 from base64 import b64decode
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import closing
 from datetime import datetime
 from datetime import timezone
+from itertools import groupby
 from pathlib import Path
+from time import localtime
 from time import monotonic
 from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import NamedTuple
 from typing import Sequence
+from typing import TYPE_CHECKING
 
 import click
 from msgspec import DecodeError
@@ -29,62 +40,33 @@ from pioreactor.utils.timing import to_iso_format
 from pioreactor.version import __version__
 from pioreactor.whoami import is_testing_env
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 MINIMUM_EXPORT_FREE_BYTES = 64 * 1024 * 1024
 MINIMUM_EXPORT_AVAILABLE_MEMORY_BYTES = 120 * 1024 * 1024
 MAX_EXPORT_WAL_BYTES = 512 * 1024 * 1024
-EXPORT_RESOURCE_CHECK_INTERVAL_ROWS = 5_000
 EXPORT_RESOURCE_CHECK_INTERVAL_SECONDS = 2.0
 EXPORT_METADATA_SCHEMA_VERSION = 1
+EXPORT_FORMATS = ("csv", "npz")
+EXPORT_BATCH_ROWS = 10_000
+# a dataset exported in a process pool is split into time ranges of at least this many rows, so they're read and
+# encoded in parallel. Datasets partitioned by unit are split by unit instead.
+MIN_EXPORT_CHUNK_ROWS = 100_000
+# selected alongside a dataset's rows, to compute hours_since_experiment_created from
+EXPERIMENT_CREATED_AT_COLUMN = "_experiment_created_at"
 
 
 class ExportResourceLimitError(RuntimeError):
     pass
 
 
-def rounded_row_factory(cursor: sqlite3.Cursor, row: tuple[Any, ...]) -> tuple[Any, ...]:
-    """
-    For each value in row, if it's a Python float, round it to N decimals.
-    Otherwise, leave it alone.
-    Returns a tuple (you could also return a namedtuple or dict if you prefer).
-    """
-    rounded = []
-    for value in row:
-        if isinstance(value, float):
-            # round(..., N) returns a float with N decimals
-            rounded.append(round(value, 12))
-        else:
-            rounded.append(value)
-    return tuple(rounded)
-
-
 def source_exists(cursor: sqlite3.Cursor, table_name_to_check: str) -> bool:
     query = "SELECT 1 FROM sqlite_master WHERE (type='table' or type='view') and name = ?"
     return cursor.execute(query, (table_name_to_check,)).fetchone() is not None
 
 
-def generate_timestamp_to_localtimestamp_clause(timestamp_columns: list[str]) -> str:
-    if not timestamp_columns:
-        return ""
-
-    clause = ",".join(
-        [f"strftime('%Y-%m-%d %H:%M:%f', T.{c}, 'localtime') as {c}_localtime" for c in timestamp_columns]
-    )
-
-    return clause
-
-
-def generate_timestamp_to_relative_time_clause(default_order_by: str) -> str:
-    if not default_order_by:
-        return ""
-
-    START_TIME = "created_at"
-
-    clause = f"(unixepoch(T.{default_order_by}) - unixepoch(E.{START_TIME}))/3600.0 as hours_since_experiment_created"
-
-    return clause
-
-
 def load_exportable_datasets() -> dict[str, Dataset]:
     if is_testing_env():
         builtins = sorted(Path(".pioreactor/exportable_datasets").glob("*.y*ml"))
@@ -194,11 +176,13 @@ def build_export_manifest(
     partition_by_unit: bool,
     partition_by_experiment: bool,
     datasets: list[dict[str, Any]],
+    output_format: str = "csv",
 ) -> dict[str, Any]:
     return {
         "schema_version": EXPORT_METADATA_SCHEMA_VERSION,
         "pioreactor_version": __version__,
         "export_created_at": export_created_at,
+        "format": output_format,
         "filters": {
             "experiment": experiment,
             "start_time": start_time,
@@ -377,6 +361,661 @@ def create_sql_query(
     return query, existing_placeholders
 
 
+def _connect_read_only(database_path: Path | str) -> sqlite3.Connection:
+    con = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+    con.create_function(
+        "BASE64", 1, decode_base64
+    )  # SQLite bundles base64() with its CLI, but not with the library used by Python.
+    con.executescript(
+        """
+        PRAGMA busy_timeout = 15000;
+        PRAGMA synchronous = 1; -- aka NORMAL, recommended when using WAL
+        PRAGMA temp_store = 1;  -- large export sorts should spill to disk, not RAM
+        PRAGMA foreign_keys = ON;
+        PRAGMA cache_size = -4000;
+    """
+    )
+    return con
+
+
+class _ResourceWatch:
+    """
+    Checks the export's resources at most every EXPORT_RESOURCE_CHECK_INTERVAL_SECONDS: between batches, with check,
+    and during long queries, as a SQLite progress handler, which interrupts the query and keeps the error.
+    """
+
+    def __init__(self, output_path: Path, database_path: Path) -> None:
+        self.output_path = output_path
+        self.database_path = database_path
+        self.error: ExportResourceLimitError | None = None
+        self._last_check = 0.0
+
+    def check(self) -> None:
+        now = monotonic()
+        if now - self._last_check < EXPORT_RESOURCE_CHECK_INTERVAL_SECONDS:
+            return
+        _check_export_resources(self.output_path, self.database_path)
+        self._last_check = now
+
+    def __call__(self) -> int:
+        try:
+            self.check()
+        except ExportResourceLimitError as exc:
+            self.error = exc
+            return 1
+        return 0
+
+
+class _ExportChunk(NamedTuple):
+    # some of a dataset's rows, read and encoded together: all of them, one unit's, or one time range's.
+    database: str
+    query: str
+    placeholders: dict[str, Any]
+    output_format: str
+    tmp_output: str
+    spool_prefix: str  # pieces encoded in a pool's worker are written to {spool_prefix}.{n}.tmp
+    headers: tuple[str, ...]
+    n_columns: int  # the dataset's own columns, the first n of each row
+    timestamp_columns: tuple[int, ...]
+    hours_column: int | None  # default_order_by, if hours_since_experiment_created is exported
+    iloc_experiment: int | None
+    iloc_unit: int | None
+
+
+class _ExportPiece(NamedTuple):
+    partition: tuple[Any, Any]
+    row_count: int
+    path: str
+
+
+def _to_timestamps(con: sqlite3.Connection, values: list[Any]) -> "np.ndarray":
+    """
+    The UTC times of values as datetime64[ms], as SQLite reads them, and NaT where SQLite's date functions
+    return NULL.
+    """
+    import numpy as np
+
+    if not values:
+        return np.array([], dtype="datetime64[ms]")
+
+    # SQLite's date functions work in milliseconds, so julianday is exact here.
+    rows = con.execute(
+        "SELECT CAST(round((julianday(value) - 2440587.5) * 86400000) AS INTEGER) FROM json_each(?) ORDER BY key",
+        (json.dumps(values, default=str),),
+    )
+    # NaT is the smallest int64
+    nat = np.iinfo(np.int64).min
+    return np.array([nat if ms is None else ms for (ms,) in rows], dtype=np.int64).astype("datetime64[ms]")
+
+
+def _to_local_timestamps(timestamps: "np.ndarray") -> "np.ndarray":
+    # as SQLite's 'localtime' modifier. UTC offsets only change on the minute, so they're looked up once per minute.
+    import numpy as np
+
+    valid = ~np.isnat(timestamps)
+    milliseconds = timestamps[valid].astype(np.int64)
+    minutes, inverse = np.unique(milliseconds // 60_000, return_inverse=True)
+    offsets = np.array([localtime(minute * 60).tm_gmtoff for minute in minutes.tolist()], dtype=np.int64)
+
+    local_timestamps = timestamps.copy()
+    local_timestamps[valid] = (milliseconds + 1000 * offsets[inverse]).astype("datetime64[ms]")
+    return local_timestamps
+
+
+def _to_unix_seconds(timestamps: "np.ndarray") -> "np.ndarray":
+    # as SQLite's unixepoch, which truncates to the second, as floats, with NaN for NaT
+    import numpy as np
+
+    return np.where(np.isnat(timestamps), np.nan, timestamps.astype(np.int64) // 1000)
+
+
+def _format_local_timestamps(timestamps: "np.ndarray") -> list[str]:
+    # as strftime('%Y-%m-%d %H:%M:%f', ...), and "" for NaT, SQLite's NULL
+    import numpy as np
+
+    strings = np.datetime_as_string(timestamps, unit="ms")
+    valid = timestamps[~np.isnat(timestamps)].astype(np.int64)
+    if ((valid >= -62135596800000) & (valid <= 253402300799999)).all():
+        # years 1 to 9999, all 23 characters wide
+        strings = strings.astype("<U23")
+        strings.view(np.uint32).reshape(len(strings), 23)[:, 10] = ord(" ")
+    else:
+        strings = np.char.replace(strings, "T", " ")
+    strings[np.isnat(timestamps)] = ""
+    return strings.tolist()
+
+
+def _csv_field(value: Any) -> str:
+    if value is None:
+        return ""
+    elif type(value) is float:
+        return repr(round(value, 12))
+    return str(value)
+
+
+def _csv_fields(values: list[Any]) -> list[str]:
+    """
+    The CSV fields of a column of values, as csv.writer writes them: floats rounded to 12 decimals, and None as an
+    empty field.
+    """
+    types = set(map(type, values))
+
+    if types == {float}:
+        return [repr(round(value, 12)) for value in values]
+    elif types == {float, type(None)}:
+        return ["" if value is None else repr(round(value, 12)) for value in values]
+    elif types <= {int, type(None)}:
+        return ["" if value is None else str(value) for value in values]
+    elif types == {str}:
+        fields = values
+    else:
+        fields = list(map(_csv_field, values))
+    joined = "\0".join(fields)
+    if any(character in joined for character in ',"\r\n'):
+        fields = [
+            (
+                '"' + field.replace('"', '""') + '"'
+                if any(character in field for character in ',"\r\n')
+                else field
+            )
+            for field in fields
+        ]
+    return fields
+
+
+def _npz_column(values: list[Any]) -> "np.ndarray | None":
+    # integers, floats (NaN for None), or strings ("" for None). None if every value is None.
+    import numpy as np
+
+    types = set(map(type, values))
+    if types == {type(None)}:
+        return None
+    elif types <= {int}:
+        return np.array(values, dtype=np.int64)
+    elif types <= {int, float, type(None)}:
+        return np.array(values, dtype=np.float64)
+    return np.array(["" if value is None else str(value) for value in values], dtype=np.str_)
+
+
+class _ChunkEncoder:
+    """
+    Encodes a chunk's rows a batch at a time, column by column: the dataset's columns, then the generated
+    {timestamp}_localtime and hours_since_experiment_created columns, which are computed here rather than in SQL.
+    """
+
+    def __init__(self, con: sqlite3.Connection, chunk: _ExportChunk) -> None:
+        self.con = con
+        self.chunk = chunk
+        self._created_at_seconds: dict[Any, float] = {}
+
+    def _generated_columns(
+        self, columns: list[list[Any]]
+    ) -> "tuple[dict[int, np.ndarray], list[np.ndarray], np.ndarray | None]":
+        # the timestamp columns and their local timestamps, as datetime64[ms], and the hours since the experiment was
+        # created, NaN where SQLite's (unixepoch(T.x) - unixepoch(E.created_at)) / 3600.0 is NULL.
+        import numpy as np
+
+        timestamps = {i: _to_timestamps(self.con, columns[i]) for i in self.chunk.timestamp_columns}
+        local_timestamps = [_to_local_timestamps(timestamps[i]) for i in self.chunk.timestamp_columns]
+
+        if self.chunk.hours_column is None:
+            return timestamps, local_timestamps, None
+
+        if self.chunk.hours_column in timestamps:
+            hours_timestamps = timestamps[self.chunk.hours_column]
+        else:
+            hours_timestamps = _to_timestamps(self.con, columns[self.chunk.hours_column])
+
+        created_at = columns[self.chunk.n_columns]
+        new_created_at = [value for value in set(created_at) if value not in self._created_at_seconds]
+        if new_created_at:
+            self._created_at_seconds.update(
+                zip(new_created_at, _to_unix_seconds(_to_timestamps(self.con, new_created_at)).tolist())
+            )
+        created_at_seconds = np.array([self._created_at_seconds[value] for value in created_at])
+
+        return (
+            timestamps,
+            local_timestamps,
+            (_to_unix_seconds(hours_timestamps) - created_at_seconds) / 3600.0,
+        )
+
+    def csv(self, rows: list[tuple[Any, ...]]) -> bytes:
+        columns = [list(column) for column in zip(*rows)]
+        _, local_timestamps, hours = self._generated_columns(columns)
+
+        fields = [_csv_fields(column) for column in columns[: self.chunk.n_columns]]
+        fields.extend(_format_local_timestamps(timestamps) for timestamps in local_timestamps)
+        if hours is not None:
+            fields.append(_csv_fields([None if h != h else h for h in hours.tolist()]))
+        if len(fields) == 1:
+            # csv.writer quotes a row's only field if it's empty, so the row isn't blank
+            fields[0] = [field or '""' for field in fields[0]]
+
+        return ("\r\n".join(map(",".join, zip(*fields))) + "\r\n").encode("utf-8")
+
+    def npz(self, rows: list[tuple[Any, ...]]) -> "list[np.ndarray | None]":
+        # the timestamp columns are datetime64[ms], in UTC, and floats aren't rounded.
+        columns = [list(column) for column in zip(*rows)]
+        timestamps, local_timestamps, hours = self._generated_columns(columns)
+
+        arrays = [
+            timestamps[i] if i in timestamps else _npz_column(column)
+            for i, column in enumerate(columns[: self.chunk.n_columns])
+        ]
+        arrays.extend(local_timestamps)
+        if hours is not None:
+            arrays.append(hours)
+        return arrays
+
+
+def _partition_of(row: tuple[Any, ...], chunk: _ExportChunk) -> tuple[Any, Any]:
+    return (
+        row[chunk.iloc_experiment] if chunk.iloc_experiment is not None else "all_experiments",
+        row[chunk.iloc_unit] if chunk.iloc_unit is not None else "all_units",
+    )
+
+
+def _encode_chunk(
+    con: sqlite3.Connection, chunk: _ExportChunk, check_resources: Callable[[], None]
+) -> Iterator[tuple[tuple[Any, Any], int, Any]]:
+    """
+    Reads a chunk's rows a batch at a time, and yields each batch's partition, number of rows, and rows encoded in
+    the chunk's format. Rows are ordered by partition, so a batch whose first and last rows share a partition is all
+    that partition's.
+    """
+    encoder = _ChunkEncoder(con, chunk)
+    encode = encoder.csv if chunk.output_format == "csv" else encoder.npz
+
+    cursor = con.execute(chunk.query, chunk.placeholders)
+    while rows := cursor.fetchmany(EXPORT_BATCH_ROWS):
+        if _partition_of(rows[0], chunk) == _partition_of(rows[-1], chunk):
+            yield _partition_of(rows[0], chunk), len(rows), encode(rows)
+        else:
+            for partition, partition_rows in groupby(rows, key=lambda row: _partition_of(row, chunk)):
+                batch = list(partition_rows)
+                yield partition, len(batch), encode(batch)
+        check_resources()
+
+
+class _NpzWriter:
+    """
+    Writes a partition's columns to an .npz, like numpy.savez_compressed, one batch at a time: batches are kept in
+    temporary files until close, when each column's dtype is known.
+    """
+
+    def __init__(self, path: Path, headers: Sequence[str]) -> None:
+        self.path = path
+        self.headers = headers
+        self.row_count = 0
+        self._batches: list[Any] = [tempfile.TemporaryFile(dir=path.parent) for _ in headers]
+        self._dtypes: list[list[Any]] = [[] for _ in headers]
+
+    def write(self, arrays: "list[np.ndarray | None]") -> None:
+        import numpy as np
+
+        n_rows = next((len(array) for array in arrays if array is not None), 0)
+        for batches, dtypes, array in zip(self._batches, self._dtypes, arrays):
+            if array is None:
+                dtypes.append(n_rows)  # all None
+            else:
+                np.save(batches, array, allow_pickle=False)
+                dtypes.append(array.dtype)
+        self.row_count += n_rows
+
+    @staticmethod
+    def _column_dtype(dtypes: list[Any]) -> "np.dtype":
+        import numpy as np
+
+        # an int in dtypes is a batch of all None
+        known = [dtype for dtype in dtypes if not isinstance(dtype, int)]
+        kinds = {dtype.kind for dtype in known}
+        if "M" in kinds:
+            return np.dtype("datetime64[ms]")
+        elif "U" in kinds:
+            # numbers in a column that also has strings are written as strings, of at most 32 characters
+            return np.dtype(f"<U{max(dtype.itemsize // 4 if dtype.kind == 'U' else 32 for dtype in known)}")
+        elif kinds == {"i"} and len(known) == len(dtypes):
+            return np.dtype(np.int64)
+        return np.dtype(np.float64)
+
+    def close(self) -> None:
+        import numpy as np
+
+        with zipfile.ZipFile(self.path, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as npz:
+            for header, batches, dtypes in zip(self.headers, self._batches, self._dtypes):
+                dtype = self._column_dtype(dtypes)
+                batches.seek(0)
+                with npz.open(f"{header}.npy", mode="w", force_zip64=True) as f:
+                    np.lib.format.write_array_header_1_0(
+                        f,
+                        {
+                            "descr": np.lib.format.dtype_to_descr(dtype),
+                            "fortran_order": False,
+                            "shape": (self.row_count,),
+                        },
+                    )
+                    for batch_dtype in dtypes:
+                        if isinstance(batch_dtype, int):
+                            batch = np.full(
+                                batch_dtype,
+                                "" if dtype.kind == "U" else "NaT" if dtype.kind == "M" else np.nan,
+                            ).astype(dtype)
+                        else:
+                            batch = np.load(batches, allow_pickle=False).astype(dtype)
+                        f.write(batch.tobytes())
+                batches.close()
+
+
+def _spool_chunk(
+    batches: Iterator[tuple[tuple[Any, Any], int, Any]], chunk: _ExportChunk
+) -> list[_ExportPiece]:
+    """
+    Writes a chunk's encoded batches to a file per partition, {spool_prefix}.{n}.tmp: CSV rows without headers, or an
+    .npz.
+    """
+    pieces: list[_ExportPiece] = []
+    writer: Any = None
+    try:
+        for partition, n_rows, encoded in batches:
+            if not pieces or pieces[-1].partition != partition:
+                if writer is not None:
+                    writer.close()
+                path = f"{chunk.spool_prefix}.{len(pieces)}.tmp"
+                pieces.append(_ExportPiece(partition, 0, path))
+                if chunk.output_format == "csv":
+                    writer = open(path, "wb")
+                else:
+                    writer = _NpzWriter(Path(path), chunk.headers)
+            writer.write(encoded)
+            pieces[-1] = pieces[-1]._replace(row_count=pieces[-1].row_count + n_rows)
+        if writer is not None:
+            writer.close()
+    except BaseException:
+        for piece in pieces:
+            Path(piece.path).unlink(missing_ok=True)
+        raise
+    return pieces
+
+
+def _export_chunk(chunk: _ExportChunk) -> list[_ExportPiece]:
+    # run in a worker of the export's process pool, with its own read connection.
+    watch = _ResourceWatch(Path(chunk.tmp_output), Path(chunk.database))
+    with closing(_connect_read_only(chunk.database)) as con:
+        con.set_progress_handler(watch, 50_000)
+        try:
+            return _spool_chunk(_encode_chunk(con, chunk, watch.check), chunk)
+        except sqlite3.OperationalError as exc:
+            if watch.error is not None:
+                raise watch.error from exc
+            raise
+
+
+def _export_chunks_in_order(
+    executor: ProcessPoolExecutor, chunks: Sequence[_ExportChunk], window: int
+) -> Iterator[list[_ExportPiece]]:
+    # at most `window` chunks are spooled ahead of the one being copied into the export
+    pending: deque[Future[list[_ExportPiece]]] = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(_export_chunk, chunk))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _time_range_boundaries(first: Any, last: Any, n_ranges: int) -> list[str]:
+    # evenly spaced times between first and last, as to_iso_format strings. Empty if they aren't offset-aware times,
+    # or if there's a single range.
+    if n_ranges < 2:
+        return []
+    try:
+        start, end = datetime.fromisoformat(first), datetime.fromisoformat(last)
+    except (TypeError, ValueError):
+        return []
+    if start.tzinfo is None or end.tzinfo is None or start >= end:
+        return []
+    step = (end - start) / n_ranges
+    return sorted({to_iso_format((start + step * i).astimezone(timezone.utc)) for i in range(1, n_ranges)})
+
+
+class _DatasetArchive:
+    """
+    Copies a dataset's encoded rows into the export: one CSV per partition, or, for npz, an .npz per piece of a
+    partition.
+    """
+
+    def __init__(
+        self, zf: zipfile.ZipFile, dataset_name: str, headers: Sequence[str], output_format: str, time: str
+    ) -> None:
+        self.zf = zf
+        self.dataset_name = dataset_name
+        self.headers = headers
+        self.output_format = output_format
+        self.time = time
+        self.row_count = 0
+        self.entries: list[dict[str, Any]] = []
+        self._csv_file: Any | None = None
+        self._partition: tuple[Any, Any] | None = None
+
+    def _open_member(self, zip_member: str, compress_type: int, partition: tuple[Any, Any]) -> Any:
+        zip_info = zipfile.ZipInfo(zip_member)
+        zip_info.date_time = datetime.now().timetuple()[:6]
+        zip_info.compress_type = compress_type
+        if compress_type == zipfile.ZIP_DEFLATED:
+            zip_info.compress_level = 1
+        zip_info.external_attr = 0o644 << 16
+        self.entries.append(
+            {
+                "path": zip_member,
+                "row_count": 0,
+                "partition": {
+                    "experiment": partition[0],
+                    "pioreactor_unit": partition[1],
+                },
+            }
+        )
+        return self.zf.open(zip_info, mode="w")
+
+    def _member_name(self, partition: tuple[Any, Any], suffix: str) -> str:
+        filename = (
+            f"{self.dataset_name}-" + "-".join(str(value) for value in partition) + f"-{self.time}{suffix}"
+        )
+        return f"{self.dataset_name}/{filename.replace(' ', '_')}"
+
+    def write(self, partition: tuple[Any, Any], row_count: int, encoded: bytes | Path) -> None:
+        """
+        Add a partition's rows, CSV text or a spooled piece. CSV rows are appended to the partition's CSV while the
+        partition is unchanged.
+        """
+        if self.output_format == "csv":
+            if partition != self._partition:
+                self.close()
+                self._csv_file = self._open_member(
+                    self._member_name(partition, ".csv"), zipfile.ZIP_DEFLATED, partition
+                )
+                header = io.StringIO()
+                csv.writer(header).writerow(self.headers)
+                self._csv_file.write(header.getvalue().encode("utf-8"))
+                self._partition = partition
+            assert self._csv_file is not None
+            if isinstance(encoded, Path):
+                with encoded.open("rb") as piece:
+                    shutil.copyfileobj(piece, self._csv_file, 1024 * 1024)
+                encoded.unlink()
+            else:
+                self._csv_file.write(encoded)
+        else:
+            assert isinstance(encoded, Path)
+            part = sum(1 for entry in self.entries if tuple(entry["partition"].values()) == partition)
+            # the .npz's members are already compressed
+            with self._open_member(
+                self._member_name(partition, f"-part{part}.npz"), zipfile.ZIP_STORED, partition
+            ) as member, encoded.open("rb") as piece:
+                shutil.copyfileobj(piece, member, 1024 * 1024)
+            encoded.unlink()
+
+        self.entries[-1]["row_count"] += row_count
+        self.row_count += row_count
+
+    def close(self) -> None:
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._partition = None
+
+
+def _plan_dataset_export(
+    con: sqlite3.Connection,
+    dataset: Dataset,
+    chunk: _ExportChunk,
+    experiment: str,
+    start_time: str | None,
+    end_time: str | None,
+    partition_by_unit: bool,
+    partition_by_experiment: bool,
+    processes: int,
+) -> list[_ExportChunk]:
+    """
+    The chunks a dataset is read in, each a query of some of its rows; read in order, they're all its rows, in
+    order. Chunks are filled in from `chunk`. In a process pool, tables are split by unit, when partitioned by unit,
+    or else into time ranges, so they're read and encoded in parallel.
+    """
+    cursor = con.cursor()
+    validate_dataset_information(dataset, cursor)
+
+    _partition_by_unit = dataset.has_unit and (partition_by_unit or dataset.always_partition_by_unit)
+    _partition_by_experiment = dataset.has_experiment and partition_by_experiment
+    placeholders: dict[str, Any] = {}
+
+    order_by_col = dataset.default_order_by
+    table_or_subquery = dataset.table or dataset.query
+    assert table_or_subquery is not None
+
+    where_clauses: list[str] = []
+    selects = ["T.*"]
+    computes_hours = bool(dataset.has_experiment and dataset.default_order_by)
+
+    if dataset.has_experiment:
+        placeholders["experiment"] = experiment
+        where_clauses.append("T.experiment = :experiment")
+
+    if computes_hours:
+        selects.append(f"E.created_at AS {EXPERIMENT_CREATED_AT_COLUMN}")
+
+    if dataset.timestamp_columns and (start_time or end_time):
+        assert dataset.default_order_by is not None
+        timespan_clause, placeholders = create_timespan_clause(
+            start_time, end_time, dataset.default_order_by, placeholders
+        )
+        where_clauses.append(timespan_clause)
+
+    query, placeholders = create_sql_query(
+        selects,
+        table_or_subquery,
+        placeholders,
+        where_clauses,
+        order_by_col=None,
+        has_experiment=dataset.has_experiment,
+    )
+    cursor.execute(query, placeholders)
+    columns = [_[0] for _ in cursor.description][: -1 if computes_hours else None]
+    cursor.close()
+
+    for column in [*dataset.timestamp_columns, *([order_by_col] if computes_hours else [])]:
+        if column not in columns:
+            raise ValueError(f"Column {column} is not in {dataset.dataset_name}.")
+
+    order_by_cols: list[str] = []
+    if _partition_by_experiment:
+        try:
+            iloc_experiment = columns.index("experiment")
+        except ValueError:
+            iloc_experiment = None
+    else:
+        iloc_experiment = None
+
+    if _partition_by_unit:
+        try:
+            iloc_unit = columns.index("pioreactor_unit")
+            order_by_cols.append("pioreactor_unit")
+        except ValueError:
+            iloc_unit = None
+    else:
+        iloc_unit = None
+
+    if order_by_col and order_by_col not in order_by_cols:
+        order_by_cols.append(order_by_col)
+
+    chunk = chunk._replace(
+        headers=(
+            *columns,
+            *(f"{column}_localtime" for column in dataset.timestamp_columns),
+            *(["hours_since_experiment_created"] if computes_hours else []),
+        ),
+        n_columns=len(columns),
+        timestamp_columns=tuple(columns.index(column) for column in dataset.timestamp_columns),
+        hours_column=columns.index(order_by_col) if computes_hours else None,
+        iloc_experiment=iloc_experiment,
+        iloc_unit=iloc_unit,
+    )
+
+    def chunk_of(where_clause: str | None, chunk_placeholders: dict[str, Any]) -> _ExportChunk:
+        query, _ = create_sql_query(
+            selects,
+            table_or_subquery,
+            placeholders,
+            where_clauses + ([where_clause] if where_clause else []),
+            order_by_cols=order_by_cols,
+            has_experiment=dataset.has_experiment,
+        )
+        return chunk._replace(query=query, placeholders={**placeholders, **chunk_placeholders})
+
+    if processes == 0 or not dataset.table:
+        return [chunk_of(None, {})]
+
+    if iloc_unit is not None:
+        units_query, _ = create_sql_query(
+            ["DISTINCT T.pioreactor_unit"],
+            dataset.table,
+            placeholders,
+            where_clauses,
+            order_by_col="pioreactor_unit",
+        )
+        return [
+            chunk_of("T.pioreactor_unit IS :export_unit", {"export_unit": unit})
+            for (unit,) in con.execute(units_query, placeholders)
+        ]
+
+    if order_by_col in dataset.timestamp_columns:
+        range_query, _ = create_sql_query(
+            ["COUNT(1)", f"MIN(T.{order_by_col})", f"MAX(T.{order_by_col})"],
+            dataset.table,
+            placeholders,
+            where_clauses,
+        )
+        count, first, last = con.execute(range_query, placeholders).fetchone()
+        boundaries = _time_range_boundaries(first, last, min(4 * processes, count // MIN_EXPORT_CHUNK_ROWS))
+        if boundaries:
+            # NULLs sort first, and numbers before text, so the first range starts with those
+            return [
+                chunk_of(
+                    f"(T.{order_by_col} < :export_before OR T.{order_by_col} IS NULL)",
+                    {"export_before": boundaries[0]},
+                ),
+                *(
+                    chunk_of(
+                        f"T.{order_by_col} >= :export_after AND T.{order_by_col} < :export_before",
+                        {"export_after": after, "export_before": before},
+                    )
+                    for after, before in zip(boundaries, boundaries[1:])
+                ),
+                chunk_of(f"T.{order_by_col} >= :export_after", {"export_after": boundaries[-1]}),
+            ]
+
+    return [chunk_of(None, {})]
+
+
 def export_experiment_data(
     experiment: str,
     dataset_names: Sequence[str],
@@ -385,9 +1024,18 @@ def export_experiment_data(
     end_time: str | None = None,
     partition_by_unit: bool = False,
     partition_by_experiment: bool = True,
+    output_format: str = "csv",
+    processes: int | None = None,
 ) -> None:
     """
     Export datasets for exactly one experiment.
+
+    Each dataset's rows are read and encoded a batch at a time, column by column. With output_format="npz", each
+    partition is an .npz of its columns (as numpy.load reads), with timestamps as datetime64[ms], instead of a CSV.
+
+    With processes > 0 (default: [export_experiment_data.config] processes, or 0), datasets are split into chunks
+    that are read, each on its own connection, and encoded across that many processes, then copied into the export
+    in order. processes=0 reads and encodes in this process.
     """
     if not isinstance(experiment, str) or not experiment:
         raise ValueError("Exactly one experiment must be provided.")
@@ -400,6 +1048,12 @@ def export_experiment_data(
         click.echo("At least one dataset name must be provided.")
         sys.exit(1)
 
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"output_format must be one of {', '.join(EXPORT_FORMATS)}")
+
+    if processes is None:
+        processes = config.getint("export_experiment_data.config", "processes", fallback=0)
+
     start_time_as_datetime = datetime.fromisoformat(start_time) if start_time is not None else None
     end_time_as_datetime = datetime.fromisoformat(end_time) if end_time is not None else None
     if start_time_as_datetime is not None and start_time_as_datetime.tzinfo is None:
@@ -437,51 +1091,20 @@ def export_experiment_data(
     tmp_output_path.unlink(missing_ok=True)
     database_path = Path(config.get("storage", "database"))
     _check_export_resources(tmp_output_path, database_path)
-    resource_limit_error: ExportResourceLimitError | None = None
-    last_sqlite_progress_resource_check = 0.0
+    watch = _ResourceWatch(tmp_output_path, database_path)
     export_created_at = datetime.now().astimezone().isoformat()
     manifest_datasets: list[dict[str, Any]] = []
-
-    def check_resources_from_sqlite_progress() -> int:
-        nonlocal last_sqlite_progress_resource_check
-        nonlocal resource_limit_error
-
-        now = monotonic()
-        if now - last_sqlite_progress_resource_check < EXPORT_RESOURCE_CHECK_INTERVAL_SECONDS:
-            return 0
-
-        try:
-            _check_export_resources(tmp_output_path, database_path)
-        except ExportResourceLimitError as exc:
-            resource_limit_error = exc
-            return 1
-
-        last_sqlite_progress_resource_check = now
-        return 0
+    executor: ProcessPoolExecutor | None = None
+    exported_chunks: Iterator[list[_ExportPiece]] = iter(())
 
     try:
         with zipfile.ZipFile(tmp_output_path, mode="w", compression=zipfile.ZIP_DEFLATED) as zf, closing(
-            sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+            _connect_read_only(database_path)
         ) as con:
-            con.create_function(
-                "BASE64", 1, decode_base64
-            )  # SQLite bundles base64() with its CLI, but not with the library used by Python.
-
-            con.row_factory = rounded_row_factory
-
-            cursor = con.cursor()
-            cursor.executescript(
-                """
-                PRAGMA busy_timeout = 15000;
-                PRAGMA synchronous = 1; -- aka NORMAL, recommended when using WAL
-                PRAGMA temp_store = 1;  -- large export sorts should spill to disk, not RAM
-                PRAGMA foreign_keys = ON;
-                PRAGMA cache_size = -4000;
-            """
-            )
             con.set_trace_callback(logger.debug)
-            con.set_progress_handler(check_resources_from_sqlite_progress, 50_000)
+            con.set_progress_handler(watch, 50_000)
 
+            plans: list[tuple[Dataset, list[_ExportChunk]]] = []
             for dataset_name in dataset_names:
                 _check_export_resources(tmp_output_path, database_path)
 
@@ -493,153 +1116,80 @@ def export_experiment_data(
                     )
                     continue
 
-                validate_dataset_information(dataset, cursor)
-
-                _partition_by_unit = dataset.has_unit and (
-                    partition_by_unit or dataset.always_partition_by_unit
+                chunk = _ExportChunk(
+                    database=str(database_path),
+                    query="",
+                    placeholders={},
+                    output_format=output_format,
+                    tmp_output=str(tmp_output_path),
+                    spool_prefix=f"{tmp_output_path}.{len(plans)}",
+                    headers=(),
+                    n_columns=0,
+                    timestamp_columns=(),
+                    hours_column=None,
+                    iloc_experiment=None,
+                    iloc_unit=None,
                 )
-                _partition_by_experiment = dataset.has_experiment and partition_by_experiment
-                placeholders: dict[str, str] = {}
-
-                order_by_col = dataset.default_order_by
-                table_or_subquery = dataset.table or dataset.query
-                assert table_or_subquery is not None
-
-                where_clauses: list[str] = []
-                selects = ["T.*"]
-
-                if dataset.timestamp_columns:
-                    selects.append(generate_timestamp_to_localtimestamp_clause(dataset.timestamp_columns))
-
-                if dataset.has_experiment:
-                    placeholders["experiment"] = experiment
-                    where_clauses.append("T.experiment = :experiment")
-
-                if dataset.has_experiment and dataset.default_order_by:
-                    selects.append(generate_timestamp_to_relative_time_clause(dataset.default_order_by))
-
-                if dataset.timestamp_columns and (start_time or end_time):
-                    assert dataset.default_order_by is not None
-                    timespan_clause, placeholders = create_timespan_clause(
-                        start_time, end_time, dataset.default_order_by, placeholders
+                chunks = _plan_dataset_export(
+                    con,
+                    dataset,
+                    chunk,
+                    experiment,
+                    start_time,
+                    end_time,
+                    partition_by_unit,
+                    partition_by_experiment,
+                    processes,
+                )
+                plans.append(
+                    (
+                        dataset,
+                        [
+                            chunk._replace(spool_prefix=f"{chunk.spool_prefix}.{i}")
+                            for i, chunk in enumerate(chunks)
+                        ],
                     )
-                    where_clauses.append(timespan_clause)
-
-                query, placeholders = create_sql_query(
-                    selects,
-                    table_or_subquery,
-                    placeholders,
-                    where_clauses,
-                    order_by_col=None,
-                    has_experiment=dataset.has_experiment,
                 )
-                cursor.execute(query, placeholders)
 
-                headers = [_[0] for _ in cursor.description]
-                schema_path = f"{dataset_name}/schema.json"
-                dataset_schema = build_dataset_schema(dataset, headers)
-
-                order_by_cols: list[str] = []
-                if _partition_by_experiment:
-                    try:
-                        iloc_experiment = headers.index("experiment")
-                    except ValueError:
-                        iloc_experiment = None
-                else:
-                    iloc_experiment = None
-
-                if _partition_by_unit:
-                    try:
-                        iloc_unit = headers.index("pioreactor_unit")
-                        order_by_cols.append("pioreactor_unit")
-                    except ValueError:
-                        iloc_unit = None
-                else:
-                    iloc_unit = None
-
-                if order_by_col and order_by_col not in order_by_cols:
-                    order_by_cols.append(order_by_col)
-
-                query, placeholders = create_sql_query(
-                    selects,
-                    table_or_subquery,
-                    placeholders,
-                    where_clauses,
-                    order_by_cols=order_by_cols,
-                    has_experiment=dataset.has_experiment,
+            if processes > 0:
+                logger.debug(f"Exporting in {processes} processes.")
+                executor = ProcessPoolExecutor(
+                    max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+                )
+                exported_chunks = _export_chunks_in_order(
+                    executor, [chunk for _, chunks in plans for chunk in chunks], 2 * processes
                 )
-                cursor.execute(query, placeholders)
 
-                count = 0
-                current_partition: tuple[Any, Any] | None = None
-                current_csv_file: Any | None = None
-                current_csv_writer: Any | None = None
-                current_csv_manifest_entry: dict[str, Any] | None = None
-                csv_manifest_entries: list[dict[str, Any]] = []
-                last_resource_check = monotonic()
+            for dataset, chunks in plans:
+                dataset_name = dataset.dataset_name
+                headers = chunks[0].headers if chunks else ()
+                schema_path = f"{dataset_name}/schema.json"
+                archive = _DatasetArchive(zf, dataset_name, headers, output_format, time)
 
                 add_directory_to_zip_with_current_timestamp(zf, dataset_name)
-                write_json_to_zip_with_current_timestamp(zf, schema_path, dataset_schema)
+                write_json_to_zip_with_current_timestamp(
+                    zf, schema_path, build_dataset_schema(dataset, headers)
+                )
 
                 try:
-                    for row in cursor:
-                        count += 1
-                        rows_partition = (
-                            row[iloc_experiment] if iloc_experiment is not None else "all_experiments",
-                            row[iloc_unit] if iloc_unit is not None else "all_units",
-                        )
-
-                        if rows_partition != current_partition:
-                            if current_csv_file is not None:
-                                current_csv_file.close()
-
-                            filename = (
-                                f"{dataset_name}-"
-                                + "-".join(str(partition) for partition in rows_partition)
-                                + f"-{time}.csv"
-                            )
-                            filename = filename.replace(" ", "_")
-                            zip_member = f"{dataset_name}/{filename}"
-                            zip_info = zipfile.ZipInfo(zip_member)
-                            zip_info.date_time = datetime.now().timetuple()[:6]
-                            zip_info.compress_type = zipfile.ZIP_DEFLATED
-                            zip_info.compress_level = 1
-                            zip_info.external_attr = 0o644 << 16
-                            current_csv_file = io.TextIOWrapper(
-                                zf.open(zip_info, mode="w"),
-                                encoding="utf-8",
-                                newline="",
-                            )
-                            current_csv_writer = csv.writer(current_csv_file, delimiter=",")
-                            current_csv_writer.writerow(headers)
-                            current_partition = rows_partition
-                            current_csv_manifest_entry = {
-                                "path": zip_member,
-                                "row_count": 0,
-                                "partition": {
-                                    "experiment": rows_partition[0],
-                                    "pioreactor_unit": rows_partition[1],
-                                },
-                            }
-                            csv_manifest_entries.append(current_csv_manifest_entry)
-
-                        assert current_csv_writer is not None
-                        assert current_csv_manifest_entry is not None
-                        current_csv_writer.writerow(row)
-                        current_csv_manifest_entry["row_count"] += 1
-
-                        if count % 10_000 == 0:
-                            logger.debug(f"Exported {count} rows...")
-
-                        if count % EXPORT_RESOURCE_CHECK_INTERVAL_ROWS == 0:
-                            now = monotonic()
-                            if now - last_resource_check >= EXPORT_RESOURCE_CHECK_INTERVAL_SECONDS:
-                                _check_export_resources(tmp_output_path, database_path)
-                                last_resource_check = now
+                    for chunk in chunks:
+                        if executor is not None:
+                            pieces = next(exported_chunks)
+                        elif output_format == "npz":
+                            pieces = _spool_chunk(_encode_chunk(con, chunk, watch.check), chunk)
+                        else:
+                            for partition, row_count, text in _encode_chunk(con, chunk, watch.check):
+                                archive.write(partition, row_count, text)
+                                logger.debug(f"Exported {archive.row_count} rows...")
+                            continue
+
+                        for piece in pieces:
+                            archive.write(piece.partition, piece.row_count, Path(piece.path))
+                            logger.debug(f"Exported {archive.row_count} rows...")
                 finally:
-                    if current_csv_file is not None:
-                        current_csv_file.close()
+                    archive.close()
 
+                count = archive.row_count
                 logger.debug(f"Exported {count} rows from {dataset_name}.")
                 if count == 0:
                     logger.warning(f"No data present in {dataset_name} with applied filters.")
@@ -647,14 +1197,14 @@ def export_experiment_data(
                 partition_experiments = sorted(
                     {
                         entry["partition"]["experiment"]
-                        for entry in csv_manifest_entries
+                        for entry in archive.entries
                         if entry["partition"]["experiment"] != "all_experiments"
                     }
                 )
                 partition_units = sorted(
                     {
                         entry["partition"]["pioreactor_unit"]
-                        for entry in csv_manifest_entries
+                        for entry in archive.entries
                         if entry["partition"]["pioreactor_unit"] != "all_units"
                     }
                 )
@@ -663,8 +1213,8 @@ def export_experiment_data(
                         "dataset_name": dataset_name,
                         "display_name": dataset.display_name,
                         "schema_path": schema_path,
-                        "csv_paths": [entry["path"] for entry in csv_manifest_entries],
-                        "csv_files": csv_manifest_entries,
+                        f"{output_format}_paths": [entry["path"] for entry in archive.entries],
+                        f"{output_format}_files": archive.entries,
                         "row_count": count,
                         "partition_values": {
                             "experiments": partition_experiments,
@@ -684,6 +1234,7 @@ def export_experiment_data(
                     end_time=end_time,
                     partition_by_unit=partition_by_unit,
                     partition_by_experiment=partition_by_experiment,
+                    output_format=output_format,
                     datasets=manifest_datasets,
                 ),
             )
@@ -692,9 +1243,14 @@ def export_experiment_data(
         logger.info(f"Finished export to {output}.")
     except Exception as exc:
         tmp_output_path.unlink(missing_ok=True)
-        if resource_limit_error is not None:
-            raise resource_limit_error from exc
+        if watch.error is not None:
+            raise watch.error from exc
         raise
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        for spooled in tmp_output_path.parent.glob(f"{tmp_output_path.name}.*.tmp"):
+            spooled.unlink(missing_ok=True)
 
     return
 
@@ -707,6 +1263,19 @@ def export_experiment_data(
 @click.option("--dataset-name", multiple=True, default=[])
 @click.option("--start-time", help="Offset-aware ISO-8601 timestamp.")
 @click.option("--end-time", help="Offset-aware ISO-8601 timestamp.")
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(EXPORT_FORMATS),
+    default="csv",
+    show_default=True,
+    help="CSVs, or an .npz of columns, per partition.",
+)
+@click.option(
+    "--processes",
+    type=click.IntRange(min=0),
+    help="Read and encode in this many processes. 0 exports in this process. Default from config.",
+)
 def click_export_experiment_data(
     experiment: str,
     output: str,
@@ -715,10 +1284,20 @@ def click_export_experiment_data(
     dataset_name: tuple[str, ...],
     start_time: str | None,
     end_time: str | None,
+    output_format: str,
+    processes: int | None,
 ) -> None:
     """
     (leader only) Export datasets from db.
     """
     export_experiment_data(
-        experiment, dataset_name, output, start_time, end_time, partition_by_unit, partition_by_experiment
+        experiment,
+        dataset_name,
+        output,
+        start_time,
+        end_time,
+        partition_by_unit,
+        partition_by_experiment,
+        output_format=output_format,
+        processes=processes,
     )
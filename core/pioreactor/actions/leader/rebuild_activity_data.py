@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import click
+from pioreactor.background_jobs.leader.mqtt_to_db_streaming import ACTIVITY_DATA_ROLLUPS
+from pioreactor.background_jobs.leader.mqtt_to_db_streaming import activity_data_upsert_from_table
+from pioreactor.config import config
+from pioreactor.logging import create_logger
+from pioreactor.utils import long_running_managed_lifecycle
+from pioreactor.whoami import get_unit_name
+from pioreactor.whoami import UNIVERSAL_EXPERIMENT
+
+
+def rebuild_activity_data(experiment: str | None = None, since: str | None = None) -> int:
+    """
+    Recompute pioreactor_unit_activity_data from its source tables (od_readings, growth_rates, dosing_events, ...).
+
+    mqtt_to_db_streaming maintains this table as rows arrive, so this is only needed to backfill data that was
+    inserted some other way, or to repair the table. Restricting by experiment and/or since (an ISO8601 timestamp)
+    keeps the rebuild small. Existing activity rows in the range are deleted first, and the whole rebuild is a
+    single transaction, so readers never see a partially rebuilt table.
+
+    Returns the number of rows in the rebuilt range.
+    """
+    import sqlite3
+
+    unit = get_unit_name()
+
+    filters = []
+    params: dict[str, str] = {}
+    if experiment is not None:
+        filters.append("experiment = :experiment")
+        params["experiment"] = experiment
+    if since is not None:
+        filters.append("timestamp >= :since")
+        params["since"] = since
+    where = " AND ".join(filters) or "true"
+
+    with long_running_managed_lifecycle(unit, UNIVERSAL_EXPERIMENT, "rebuild_activity_data") as mj:
+        logger = create_logger(mj.job_key, experiment=UNIVERSAL_EXPERIMENT, unit=unit, to_mqtt=False)
+        logger.debug(f"Rebuilding pioreactor_unit_activity_data where {where}, {params}.")
+
+        con = sqlite3.connect(config.get("storage", "database"), isolation_level=None)
+        try:
+            con.execute("PRAGMA busy_timeout = 15000;")
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                con.execute(f"DELETE FROM pioreactor_unit_activity_data WHERE {where}", params)
+                for table in ACTIVITY_DATA_ROLLUPS:
+                    con.execute(activity_data_upsert_from_table(table, where), params)
+                (n_rows,) = con.execute(
+                    f"SELECT COUNT(1) FROM pioreactor_unit_activity_data WHERE {where}", params
+                ).fetchone()
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
+        finally:
+            con.close()
+
+        logger.info(f"Rebuilt {n_rows} rows of pioreactor_unit_activity_data.")
+        return n_rows
+
+
+@click.command(name="rebuild_activity_data")
+@click.option("--experiment", help="only rebuild rows of this experiment")
+@click.option("--since", help="only rebuild rows at or after this ISO8601 timestamp")
+def click_rebuild_activity_data(experiment: str | None, since: str | None) -> None:
+    """
+    (leader only) Recompute pioreactor_unit_activity_data from the source tables.
+    """
+    rebuild_activity_data(experiment, since)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import click
+from pioreactor.config import config
+from pioreactor.logging import create_logger
+from pioreactor.utils import long_running_managed_lifecycle
+from pioreactor.utils.time_series_rollups import bucket_start
+from pioreactor.utils.time_series_rollups import ROLLUP_BUCKETS_S
+from pioreactor.utils.time_series_rollups import ROLLUP_SOURCES
+from pioreactor.utils.time_series_rollups import rollup_upsert_from_table
+from pioreactor.whoami import get_unit_name
+from pioreactor.whoami import UNIVERSAL_EXPERIMENT
+
+
+def rebuild_time_series_rollups(experiment: str | None = None, since: str | None = None) -> int:
+    """
+    Recompute the time_series_rollups buckets from their source tables (od_readings, growth_rates, ...).
+
+    mqtt_to_db_streaming maintains the buckets as rows arrive, so this is only needed to backfill data that was
+    inserted some other way, or to repair the table. `since` is rounded down to the start of each tier's bucket,
+    so partially covered buckets are recomputed in full. Each source and tier is rebuilt in its own transaction,
+    so a large backfill doesn't hold up mqtt_to_db_streaming's writes for long. Once all of an experiment's rows are
+    rebuilt (no `since`), it's removed from time_series_rollups_pending, and its charts are read from the rollups.
+
+    Returns the number of buckets in the rebuilt range.
+    """
+    import sqlite3
+
+    unit = get_unit_name()
+
+    with long_running_managed_lifecycle(unit, UNIVERSAL_EXPERIMENT, "rebuild_time_series_rollups") as mj:
+        logger = create_logger(mj.job_key, experiment=UNIVERSAL_EXPERIMENT, unit=unit, to_mqtt=False)
+        logger.debug(f"Rebuilding time_series_rollups for {experiment=}, {since=}.")
+
+        con = sqlite3.connect(config.get("storage", "database"), isolation_level=None)
+        n_buckets = 0
+        try:
+            con.execute("PRAGMA busy_timeout = 15000;")
+            for bucket_seconds in ROLLUP_BUCKETS_S:
+                params: dict[str, str] = {}
+                bucket_filters = [f"bucket_seconds = {bucket_seconds}"]
+                source_filters = []
+                if experiment is not None:
+                    params["experiment"] = experiment
+                    bucket_filters.append("experiment = :experiment")
+                    source_filters.append("experiment = :experiment")
+                if since is not None:
+                    (params["since"],) = con.execute(
+                        f"SELECT {bucket_start(':since', str(bucket_seconds))}", {"since": since}
+                    ).fetchone()
+                    bucket_filters.append("bucket_start >= :since")
+                    source_filters.append("timestamp >= :since")
+
+                for data_source in ROLLUP_SOURCES:
+                    con.execute("BEGIN IMMEDIATE")
+                    try:
+                        con.execute(
+                            f"DELETE FROM time_series_rollups WHERE data_source = '{data_source}' AND "
+                            + " AND ".join(bucket_filters),
+                            params,
+                        )
+                        con.execute(
+                            rollup_upsert_from_table(
+                                data_source, bucket_seconds, " AND ".join(source_filters) or "true"
+                            ),
+                            params,
+                        )
+                        n_buckets += con.execute("SELECT changes()").fetchone()[0]
+                    except Exception:
+                        con.execute("ROLLBACK")
+                        raise
+                    con.execute("COMMIT")
+
+            if since is None:
+                con.execute(
+                    "DELETE FROM time_series_rollups_pending"
+                    + (" WHERE experiment = :experiment" if experiment is not None else ""),
+                    {"experiment": experiment},
+                )
+        finally:
+            con.close()
+
+        logger.info(f"Rebuilt {n_buckets} buckets of time_series_rollups.")
+        return n_buckets
+
+
+@click.command(name="rebuild_time_series_rollups")
+@click.option("--experiment", help="only rebuild buckets of this experiment")
+@click.option("--since", help="only rebuild buckets at or after this ISO8601 timestamp")
+def click_rebuild_time_series_rollups(experiment: str | None, since: str | None) -> None:
+    """
+    (leader only) Recompute the downsampled chart data from the source tables.
+    """
+    rebuild_time_series_rollups(experiment, since)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# recompute od_readings_fused for past data, with another estimator
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from math import isfinite
+from pathlib import Path
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+
+import click
+from msgspec.yaml import decode as yaml_decode
+from pioreactor import structs
+from pioreactor import types as pt
+from pioreactor.actions.leader.rebuild_activity_data import rebuild_activity_data
+from pioreactor.actions.leader.rebuild_time_series_rollups import rebuild_time_series_rollups
+from pioreactor.config import config
+from pioreactor.estimators import load_estimator
+from pioreactor.logging import create_logger
+from pioreactor.utils import long_running_managed_lifecycle
+from pioreactor.utils.od_fusion import FusionEvaluator
+from pioreactor.utils.timing import current_utc_timestamp
+from pioreactor.whoami import get_unit_name
+from pioreactor.whoami import UNIVERSAL_EXPERIMENT
+
+# the inputs the live fusion saw: raw_od_readings only has rows when a calibration was active, otherwise the
+# readings in od_readings are the raw readings. raw_od_readings has no angle, so it's joined on channel.
+READINGS_QUERY = """
+    SELECT o.timestamp, o.angle, COALESCE(r.od_reading, o.od_reading)
+    FROM od_readings o
+    LEFT JOIN raw_od_readings r
+        ON r.experiment = o.experiment
+        AND r.pioreactor_unit = o.pioreactor_unit
+        AND r.channel = o.channel
+        AND r.timestamp = o.timestamp
+    WHERE o.experiment = ? AND o.pioreactor_unit = ?
+    ORDER BY o.timestamp, o.channel
+"""
+
+_evaluator: FusionEvaluator | None = None
+
+
+def _init_worker(estimator: structs.ODFusionEstimator) -> None:
+    global _evaluator
+    _evaluator = FusionEvaluator(estimator)
+
+
+def _fuse_batch(readings: Any) -> list[float]:
+    assert _evaluator is not None
+    return _evaluator.fuse_many(readings).tolist()
+
+
+def _load_estimator(estimator_name_or_path: str) -> structs.ODFusionEstimator:
+    path = Path(estimator_name_or_path).expanduser()
+    if path.suffix in (".yaml", ".yml") and path.is_file():
+        return yaml_decode(path.read_bytes(), type=structs.ODFusionEstimator)
+    return load_estimator(pt.OD_FUSED_DEVICE, estimator_name_or_path)
+
+
+def _readings_by_timestamp(
+    rows: Iterable[tuple[str, int, float]], angles: list[pt.PdAngle]
+) -> Iterator[tuple[str, list[float] | None]]:
+    # one row per timestamp, in the estimator's angle order, or None if an angle is missing at that timestamp
+    for timestamp, group in groupby(rows, key=lambda row: row[0]):
+        readings = {str(angle): od for _, angle, od in group}
+        if all(angle in readings for angle in angles):
+            yield timestamp, [readings[angle] for angle in angles]
+        else:
+            yield timestamp, None
+
+
+def _batches(
+    readings: Iterator[tuple[str, list[float] | None]], batch_size: int
+) -> Iterator[tuple[list[str], list[list[float]], int]]:
+    timestamps: list[str] = []
+    rows: list[list[float]] = []
+    skipped = 0
+    for timestamp, row in readings:
+        if row is None:
+            skipped += 1
+            continue
+        timestamps.append(timestamp)
+        rows.append(row)
+        if len(rows) >= batch_size:
+            yield timestamps, rows, skipped
+            timestamps, rows, skipped = [], [], 0
+    if rows or skipped:
+        yield timestamps, rows, skipped
+
+
+def refuse_od(
+    experiment: str,
+    estimator_name_or_path: str,
+    units: Iterable[str] | None = None,
+    replace: bool = False,
+    processes: int | None = None,
+    batch_size: int = 5000,
+) -> str:
+    """
+    Recompute the fused OD of an experiment's past readings with an estimator, ex: after recalibrating it.
+
+    Readings are streamed from the database one unit at a time, grouped by timestamp, and fused in batches across
+    a process pool (processes=0 fuses in this process), so memory stays constant however long the experiment is.
+    The results are written to od_readings_fused_versions under a new version, "<estimator name>@<timestamp>".
+    With replace, the experiment's od_readings_fused is then swapped for the new version in one transaction, and
+    the activity data and chart rollups are rebuilt from it.
+
+    Returns the version.
+    """
+    import numpy as np
+    import sqlite3
+
+    unit = get_unit_name()
+    estimator = _load_estimator(estimator_name_or_path)
+    version = f"{estimator.estimator_name}@{current_utc_timestamp()}"
+    if processes is None:
+        processes = max(1, (os.cpu_count() or 2) - 1)
+
+    with long_running_managed_lifecycle(unit, UNIVERSAL_EXPERIMENT, "refuse_od") as mj:
+        logger = create_logger(mj.job_key, experiment=UNIVERSAL_EXPERIMENT, unit=unit, to_mqtt=False)
+
+        # separate connections, so batches can be committed while the readings are still being streamed
+        reader = sqlite3.connect(config.get("storage", "database"), isolation_level=None)
+        writer = sqlite3.connect(config.get("storage", "database"), isolation_level=None)
+        executor: ProcessPoolExecutor | None = None
+        try:
+            reader.execute("PRAGMA busy_timeout = 15000;")
+            writer.execute("PRAGMA busy_timeout = 15000;")
+
+            if units is None:
+                units = [
+                    row[0]
+                    for row in reader.execute(
+                        "SELECT DISTINCT pioreactor_unit FROM od_readings WHERE experiment = ?", (experiment,)
+                    )
+                ]
+            units = sorted(set(units))
+
+            if processes > 0:
+                executor = ProcessPoolExecutor(
+                    max_workers=processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(estimator,),
+                )
+            else:
+                _init_worker(estimator)
+
+            logger.info(
+                f"Re-fusing OD of {experiment} ({', '.join(units) or 'no units'}) with {estimator.estimator_name}, as {version}."
+            )
+
+            def write(pioreactor_unit: str, timestamps: list[str], fused: list[float]) -> int:
+                values = [
+                    (experiment, pioreactor_unit, timestamp, od, version)
+                    for timestamp, od in zip(timestamps, fused)
+                    if isfinite(od)
+                ]
+                writer.execute("BEGIN IMMEDIATE")
+                try:
+                    writer.executemany(
+                        "INSERT INTO od_readings_fused_versions (experiment, pioreactor_unit, timestamp, od_reading, version) VALUES (?, ?, ?, ?, ?)",
+                        values,
+                    )
+                except Exception:
+                    writer.execute("ROLLBACK")
+                    raise
+                writer.execute("COMMIT")
+                return len(values)
+
+            n_written = n_skipped = n_failed = 0
+            for pioreactor_unit in units:
+                rows = reader.execute(READINGS_QUERY, (experiment, pioreactor_unit))
+                in_flight: deque[tuple[list[str], Future[list[float]]]] = deque()
+
+                for timestamps, batch, skipped in _batches(
+                    _readings_by_timestamp(rows, estimator.angles), batch_size
+                ):
+                    n_skipped += skipped
+                    if not batch:
+                        continue
+
+                    readings = np.asarray(batch, dtype=float)
+                    if executor is None:
+                        n = write(pioreactor_unit, timestamps, _fuse_batch(readings))
+                        n_failed += len(timestamps) - n
+                        n_written += n
+                        continue
+
+                    # keep a bounded number of batches in flight, so memory doesn't grow with the experiment
+                    in_flight.append((timestamps, executor.submit(_fuse_batch, readings)))
+                    if len(in_flight) >= 2 * processes:
+                        done_timestamps, future = in_flight.popleft()
+                        n = write(pioreactor_unit, done_timestamps, future.result())
+                        n_failed += len(done_timestamps) - n
+                        n_written += n
+
+                while in_flight:
+                    done_timestamps, future = in_flight.popleft()
+                    n = write(pioreactor_unit, done_timestamps, future.result())
+                    n_failed += len(done_timestamps) - n
+                    n_written += n
+
+            logger.info(
+                f"Wrote {n_written} fused readings as {version}. Skipped {n_skipped} timestamps missing an angle, {n_failed} that couldn't be fused."
+            )
+
+            if replace and units:
+                placeholders = ", ".join("?" for _ in units)
+                writer.execute("BEGIN IMMEDIATE")
+                try:
+                    writer.execute(
+                        f"DELETE FROM od_readings_fused WHERE experiment = ? AND pioreactor_unit IN ({placeholders})",
+                        (experiment, *units),
+                    )
+                    writer.execute(
+                        """
+                        INSERT INTO od_readings_fused (experiment, pioreactor_unit, timestamp, od_reading)
+                        SELECT experiment, pioreactor_unit, timestamp, od_reading
+                        FROM od_readings_fused_versions
+                        WHERE experiment = ? AND version = ?
+                        """,
+                        (experiment, version),
+                    )
+                except Exception:
+                    writer.execute("ROLLBACK")
+                    raise
+                writer.execute("COMMIT")
+                logger.info(f"Replaced od_readings_fused of {experiment} with {version}.")
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            reader.close()
+            writer.close()
+
+        if replace and units:
+            rebuild_activity_data(experiment)
+            rebuild_time_series_rollups(experiment)
+
+        return version
+
+
+@click.command(name="refuse_od")
+@click.option("--experiment", required=True, help="experiment to re-fuse")
+@click.option("--estimator", required=True, help="name of an od_fused estimator, or the path to its YAML")
+@click.option("--unit", "units", multiple=True, help="only re-fuse these units (default: all)")
+@click.option("--replace", is_flag=True, help="also replace od_readings_fused with the new version")
+@click.option("--processes", type=click.IntRange(min=0), help="worker processes (0 fuses in this process)")
+def click_refuse_od(
+    experiment: str, estimator: str, units: tuple[str, ...], replace: bool, processes: int | None
+) -> None:
+    """
+    (leader only) Recompute the fused OD of past readings with an estimator.
+    """
+    version = refuse_od(experiment, estimator, units or None, replace=replace, processes=processes)
+    click.echo(version)
@@ -3,9 +3,11 @@ import atexit
 import signal
 import threading
 import typing as t
+from collections import deque
 from copy import copy
 from os import environ
 from os import getpid
+from time import monotonic
 from time import sleep
 from time import time
 from types import FunctionType
@@ -24,12 +26,14 @@ from pioreactor.logging import create_logger
 from pioreactor.logging import CustomLogger
 from pioreactor.pubsub import Client
 from pioreactor.pubsub import create_client
+from pioreactor.pubsub import get_shared_client
 from pioreactor.pubsub import QOS
 from pioreactor.states import JobState
 from pioreactor.utils import append_signal_handlers
 from pioreactor.utils import get_running_pio_job_id
 from pioreactor.utils import is_pio_job_running
 from pioreactor.utils.job_manager import JobManager
+from pioreactor.utils.job_manager import settings_writer
 from pioreactor.utils.timing import catchtime
 from pioreactor.utils.timing import RepeatedTimer
 from pioreactor.whoami import is_active
@@ -316,6 +320,11 @@ class _BackgroundJob(metaclass=PostInitCaller):
         # The order we add them to the list is important too, as disconnects occur async,
         # we want to give the sub_client (has the will msg) as much time as possible to disconnect.
         self.pub_client = self._create_pub_client()
+        # (setting, message) of published settings not yet acknowledged. The oldest are dropped if the broker is away
+        # for a long time, and are still sent when it's back.
+        self._unacknowledged_publishes: deque[tuple[str, MQTTMessageInfo]] = deque(maxlen=1000)
+        # settings are published from several threads (ex: MQTT callbacks, timers), and waited on from others.
+        self._unacknowledged_publishes_lock = threading.Lock()
 
         self.logger = create_logger(
             self.job_name,
@@ -665,12 +674,8 @@ class _BackgroundJob(metaclass=PostInitCaller):
 
     def _create_pub_client(self) -> Client:
         # see note above as to why we split pub and sub.
-        client = create_client(
-            client_id=f"{self.job_name}-pub-{self.unit}-{self.experiment}",
-            keepalive=15 * 60,
-        )
-
-        return client
+        # publishing doesn't need a last will, so it goes over the process's shared connection.
+        return get_shared_client()
 
     def _create_sub_client(self) -> Client:
         # see note above as to why we split pub and sub.
@@ -750,16 +755,72 @@ class _BackgroundJob(metaclass=PostInitCaller):
             setting_name = setting
         value = getattr(self, setting)
 
-        msg = self.publish(
-            f"pioreactor/{self.unit}/{self.experiment}/{self.job_name}/{setting_name}",
-            value,
-            retain=True,
-            qos=QOS.EXACTLY_ONCE,
-        )
-        with JobManager() as jm:
-            jm.upsert_setting(self.job_id, setting_name, value)
+        # neither is waited on: the publish is acknowledged in the background, see _wait_for_publishes,
+        # and the settings_writer batches the upserts.
+        self._publish_retained_setting(setting_name, value)
+        settings_writer.upsert_setting(self.job_id, setting_name, value)
+
+    def _publish_retained_setting(self, setting_name: str, value: t.Any, retries: int = 3) -> None:
+        from paho.mqtt.enums import MQTTErrorCode
 
-        msg.wait_for_publish(timeout=5)
+        with self._unacknowledged_publishes_lock:
+            while self._unacknowledged_publishes and self._unacknowledged_publishes[0][1].is_published():
+                self._unacknowledged_publishes.popleft()
+
+        for attempt in range(retries):
+            msg = self.publish(
+                f"pioreactor/{self.unit}/{self.experiment}/{self.job_name}/{setting_name}",
+                value,
+                retain=True,
+                qos=QOS.EXACTLY_ONCE,
+            )
+            if msg.rc == MQTTErrorCode.MQTT_ERR_SUCCESS:
+                with self._unacknowledged_publishes_lock:
+                    self._unacknowledged_publishes.append((setting_name, msg))
+                return
+            elif msg.rc != MQTTErrorCode.MQTT_ERR_QUEUE_SIZE:
+                # ex: not connected. The message is queued, and sent when the client reconnects.
+                return
+
+            self.logger.debug(f"MQTT client's queue is full, retrying the publish of {setting_name}.")
+            # make room: the oldest publishes are acknowledged first
+            self._wait_for_publishes(timeout=0.5 * (attempt + 1))
+
+        self.logger.warning(f"Unable to publish {setting_name}={value}: the MQTT client's queue is full.")
+
+    def _wait_for_publishes(self, timeout: float = 5.0) -> None:
+        """
+        Wait for the settings published so far to be acknowledged by the broker. Ones that fail, or aren't
+        acknowledged in time, are logged.
+        """
+        deadline = monotonic() + timeout
+        while True:
+            # the lock isn't held while waiting, so other threads can keep publishing.
+            with self._unacknowledged_publishes_lock:
+                if not self._unacknowledged_publishes:
+                    return
+                setting_name, msg = self._unacknowledged_publishes[0]
+
+            try:
+                msg.wait_for_publish(timeout=max(0.0, deadline - monotonic()))
+            except RuntimeError as e:
+                # ex: the connection was lost. It's sent again when the client reconnects.
+                self.logger.debug(f"The publish of {setting_name} wasn't acknowledged: {e}")
+            else:
+                if not msg.is_published():
+                    with self._unacknowledged_publishes_lock:
+                        unacknowledged = list(self._unacknowledged_publishes)
+                    names = dict.fromkeys(name for name, _ in unacknowledged)
+                    self.logger.warning(
+                        f"{len(unacknowledged)} published settings weren't acknowledged in "
+                        f"{timeout}s: {', '.join(names)}"
+                    )
+                    return
+
+            with self._unacknowledged_publishes_lock:
+                # another thread may have removed it already
+                if self._unacknowledged_publishes and self._unacknowledged_publishes[0][1] is msg:
+                    self._unacknowledged_publishes.popleft()
 
     def _set_up_exit_protocol(self) -> None:
         # here, we set up how jobs should disconnect and exit.
@@ -875,6 +936,7 @@ class _BackgroundJob(metaclass=PostInitCaller):
 
     def _remove_from_job_manager(self) -> None:
         if hasattr(self, "job_id"):
+            settings_writer.flush()
             with JobManager() as jm:
                 jm.set_not_running(self.job_id)
 
@@ -907,7 +969,8 @@ class _BackgroundJob(metaclass=PostInitCaller):
 
         # this HAS to happen last, because this contains our publishing client
         if hasattr(self, "pub_client"):
-            self.pub_client.shutdown()
+            self._wait_for_publishes()
+            # the shared connection outlives the job
 
     def _clean_up_resources(self) -> None:
         try:
@@ -1036,7 +1099,6 @@ class _BackgroundJob(metaclass=PostInitCaller):
         Use "persist" to keep it from clearing.
         """
 
-        # iterate twice since publish and upsert_setting are slow, and I don't want to block the db.
         for setting, metadata_on_attr in self.published_settings.items():
             if (
                 not metadata_on_attr.get("persist", False)
@@ -1044,15 +1106,7 @@ class _BackgroundJob(metaclass=PostInitCaller):
                 and (getattr(self, setting) is not None)
             ):
                 self._unpublish_setting(setting)
-
-        with JobManager() as jm:
-            for setting, metadata_on_attr in self.published_settings.items():
-                if (
-                    not metadata_on_attr.get("persist", False)
-                    and hasattr(self, setting)
-                    and (getattr(self, setting) is not None)
-                ):
-                    jm.upsert_setting(self.job_id, setting, None)
+                settings_writer.upsert_setting(self.job_id, setting, None)
 
     def _check_for_duplicate_activity(self) -> None:
         maybe_job_id = get_running_pio_job_id(self.job_name)
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
 import datetime
+import multiprocessing
+import pickle
 import sqlite3
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
 from json import dumps
+from time import monotonic
 from typing import Callable
 from typing import cast
 
@@ -17,7 +23,11 @@ from pioreactor.config import config
 from pioreactor.hardware import get_pwm_to_pin_map
 from pioreactor.pubsub import QOS
 from pioreactor.utils import local_intermittent_storage
+from pioreactor.utils.logs_search import has_logs_index
+from pioreactor.utils.logs_search import INDEX_NEW_LOGS
 from pioreactor.utils.sqlite_worker import Sqlite3Worker
+from pioreactor.utils.time_series_rollups import ROLLUP_SOURCES
+from pioreactor.utils.time_series_rollups import rollup_upsert_for_rows
 from pioreactor.utils.timing import current_utc_datetime
 from pioreactor.utils.timing import RepeatedTimer
 from pioreactor.utils.timing import to_iso_format
@@ -29,6 +39,7 @@ sqlite3.register_adapter(datetime.datetime, to_iso_format)
 
 
 type ParsedSqliteRow = dict[str, pt.Sqlite3CompatibleTypes]
+type Parser = Callable[[str, pt.MQTTMessagePayload], ParsedSqliteRow | list[ParsedSqliteRow] | None]
 
 
 class MetaData(Struct):
@@ -59,40 +70,162 @@ class TopicToCallback(Struct):
     callback: Callable[[pt.MQTTMessage], None]
 
 
+# source table -> [(pioreactor_unit_activity_data column, expression over the source row's columns)].
+# Columns in expressions are written as {column}, so the same spec renders as named parameters for ingest,
+# and as plain column names for rebuilding from the source tables.
+# Only rows written by mqtt_to_db_streaming are rolled up as they arrive. Rows inserted another way are missing from
+# pioreactor_unit_activity_data until `pio run rebuild_activity_data` is run for them.
+ACTIVITY_DATA_ROLLUPS: dict[str, list[tuple[str, str]]] = {
+    "od_readings": [("od_reading", "{od_reading}")],
+    "od_readings_fused": [("od_fused", "{od_reading}")],
+    "od_readings_filtered": [("normalized_od_reading", "{normalized_od_reading}")],
+    "growth_rates": [("growth_rate", "{rate}")],
+    "temperature_readings": [("temperature_c", "{temperature_c}")],
+    "stirring_rates": [("measured_rpm", "{measured_rpm}")],
+    "led_change_events": [
+        (f"led_{channel}_intensity_update", f"CASE WHEN {{channel}} = '{channel}' THEN {{intensity}} END")
+        for channel in ("A", "B", "C", "D")
+    ],
+    "dosing_events": [
+        (f"{event}_ml", f"CASE WHEN {{event}} = '{event}' THEN {{volume_change_ml}} END")
+        for event in ("add_media", "remove_waste", "add_alt_media")
+    ],
+}
+
+
+def _activity_data_upsert(table: str, values_clause: str) -> str:
+    rollup = ACTIVITY_DATA_ROLLUPS[table]
+    columns = ", ".join(column for column, _ in rollup)
+    if len(rollup) == 1:
+        # a single measurement, the latest one wins
+        updates = ", ".join(f"{column}=excluded.{column}" for column, _ in rollup)
+    else:
+        # many sparse columns (ex: one per LED channel), don't clobber the other columns
+        updates = ", ".join(
+            f"{column}=COALESCE(excluded.{column}, pioreactor_unit_activity_data.{column})"
+            for column, _ in rollup
+        )
+    return (
+        f"INSERT INTO pioreactor_unit_activity_data (pioreactor_unit, experiment, timestamp, {columns}) "
+        f"{values_clause} "
+        f"ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET {updates}"
+    )
+
+
+def activity_data_upsert_for_rows(table: str) -> str:
+    """
+    UPSERT into pioreactor_unit_activity_data that binds named parameters from one row of `table`.
+    """
+    expressions = [
+        expression.format_map(_NamedParameters()) for _, expression in ACTIVITY_DATA_ROLLUPS[table]
+    ]
+    return _activity_data_upsert(
+        table, f"VALUES (:pioreactor_unit, :experiment, :timestamp, {', '.join(expressions)})"
+    )
+
+
+def activity_data_upsert_from_table(table: str, where: str = "true") -> str:
+    """
+    UPSERT into pioreactor_unit_activity_data from all rows of `table` matching `where`, in insertion order.
+    """
+    expressions = [expression.format_map(_ColumnNames()) for _, expression in ACTIVITY_DATA_ROLLUPS[table]]
+    # the WHERE is required: it disambiguates SELECT ... ON CONFLICT for the sqlite parser.
+    return _activity_data_upsert(
+        table,
+        f"SELECT pioreactor_unit, experiment, timestamp, {', '.join(expressions)} FROM {table} "
+        f"WHERE {where} ORDER BY rowid",
+    )
+
+
+class _NamedParameters(dict[str, str]):
+    def __missing__(self, key: str) -> str:
+        return f":{key}"
+
+
+class _ColumnNames(dict[str, str]):
+    def __missing__(self, key: str) -> str:
+        return key
+
+
 class MqttToDBStreamer(LongRunningBackgroundJob):
+    """
+    Rows produced by the parsers are grouped by (table, columns) into a cached INSERT statement, and the
+    Sqlite3Worker writes each group with one executemany per batch window (max_batch_delay_s).
+
+    Rows of tables in ACTIVITY_DATA_ROLLUPS are also upserted into pioreactor_unit_activity_data, and rows of tables in
+    ROLLUP_SOURCES into the time_series_rollups buckets, grouped the same way, so each rollup costs one executemany
+    per table per batch. The upserts are dependents of the row's INSERT: a row that fails to insert isn't rolled up.
+    New rows of logs are added to its full-text index (logs_fts) once per batch.
+
+    With parser_processes > 0, decoding and row building move off the MQTT network thread into that many
+    single-process pools. Each topic family (a TopicToParserToTable) is pinned to one pool, so rows of a family keep
+    their order, and all pools feed the same Sqlite3Worker. Parsers that can't be pickled (ex: lambdas) stay in-thread.
+    """
+
     job_name = "mqtt_to_db_streaming"
     _inserts_in_last_60s = 0
     _database_write_errors_in_last_60s = 0
     _latest_database_write_error: str | None = None
+    _rows_committed_since_stats = 0
+    _commits_since_stats = 0
+    _commit_latency_s_since_stats = 0.0
+    _max_commit_latency_s_since_stats = 0.0
+    _stats_window_started_at = 0.0
 
     def __init__(
         self,
         unit: pt.Unit,
         experiment: pt.Experiment,
         topics_to_tables: list[TopicToParserToTable],
+        parser_processes: int = 0,
     ) -> None:
         super().__init__(unit, experiment)
         self.logger.debug(f'Streaming MQTT data to {config["storage"]["database"]}.')
+        # the stats are counted from the paho thread, parser pools' callback threads and the Sqlite3Worker thread.
+        self._stats_lock = threading.Lock()
         self._inserts_in_last_60s = 0
         self._database_write_errors_in_last_60s = 0
         self._latest_database_write_error = None
+        self._reset_commit_stats()
+        # (table, columns) -> INSERT statement, so each distinct row shape is built (and prepared by sqlite3) once.
+        self._insert_statements: dict[tuple[str, tuple[str, ...]], str] = {}
+        # table -> UPSERTs into pioreactor_unit_activity_data and time_series_rollups
+        self._rollup_upserts: dict[str, tuple[str, ...]] = {}
+        index_logs = any(
+            topic_to_table.table == "logs" for topic_to_table in topics_to_tables
+        ) and has_logs_index(config["storage"]["database"])
         self.sqliteworker = Sqlite3Worker(
             config["storage"]["database"],
             max_queue_size=250,
             max_batch_delay_s=0.1,
             raise_on_error=False,
             on_error=self.on_database_write_error,
+            on_commit=self.on_database_commit,
+            batch_statements=INDEX_NEW_LOGS if index_logs else (),
         )
 
+        # one single-process pool per shard, so each topic family is parsed in order.
+        self.parser_pools: list[ProcessPoolExecutor] = []
+        if parser_processes > 0:
+            self.logger.debug(f"Parsing MQTT payloads in {parser_processes} processes.")
+            self.parser_pools = [
+                ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+                for _ in range(parser_processes)
+            ]
+
         self.logger.debug(f"Listening to {topics_to_tables}")
         # MQTT subscriptions are declarations, not one-time constructor work.
         # start_passive_listeners registers them after initialization and after every reconnect.
         self.topics_and_callbacks = [
             TopicToCallback(
                 topic_to_table.topic,
-                self.create_on_message_callback(topic_to_table.parser, topic_to_table.table),
+                self.create_on_message_callback(
+                    topic_to_table.parser,
+                    topic_to_table.table,
+                    parser_pool=self.get_parser_pool(topic_to_table.parser, shard=i),
+                ),
             )
-            for topic_to_table in topics_to_tables
+            for i, topic_to_table in enumerate(topics_to_tables)
         ]
 
         self.timer = RepeatedTimer(
@@ -101,38 +234,161 @@ class MqttToDBStreamer(LongRunningBackgroundJob):
             job_name=self.job_name,
         ).start()
 
+    def _reset_commit_stats(self) -> None:
+        self._rows_committed_since_stats = 0
+        self._commits_since_stats = 0
+        self._commit_latency_s_since_stats = 0.0
+        self._max_commit_latency_s_since_stats = 0.0
+        self._stats_window_started_at = monotonic()
+
     def write_stats(self) -> None:
+        with self._stats_lock:
+            elapsed_s = max(monotonic() - self._stats_window_started_at, 1e-6)
+            inserts = self._inserts_in_last_60s
+            write_errors = self._database_write_errors_in_last_60s
+            latest_write_error = self._latest_database_write_error
+            rows_committed = self._rows_committed_since_stats
+            commits = self._commits_since_stats
+            commit_latency_s = self._commit_latency_s_since_stats
+            max_commit_latency_s = self._max_commit_latency_s_since_stats
+
+            self._inserts_in_last_60s = 0
+            self._database_write_errors_in_last_60s = 0
+            self._latest_database_write_error = None
+            self._reset_commit_stats()
+
         with local_intermittent_storage(self.job_name) as c:
-            c["inserts_in_last_60s"] = self._inserts_in_last_60s
-            c["database_write_errors_in_last_60s"] = self._database_write_errors_in_last_60s
-            if self._latest_database_write_error is not None:
-                c["latest_database_write_error"] = self._latest_database_write_error
+            c["inserts_in_last_60s"] = inserts
+            c["database_write_errors_in_last_60s"] = write_errors
+            if latest_write_error is not None:
+                c["latest_database_write_error"] = latest_write_error
             elif "latest_database_write_error" in c:
                 del c["latest_database_write_error"]
 
-        self._inserts_in_last_60s = 0
-        self._database_write_errors_in_last_60s = 0
-        self._latest_database_write_error = None
+            c["rows_per_second"] = round(rows_committed / elapsed_s, 2)
+            c["commits_in_last_60s"] = commits
+            if commits:
+                c["mean_commit_latency_ms"] = round(1000 * commit_latency_s / commits, 3)
+                c["max_commit_latency_ms"] = round(1000 * max_commit_latency_s, 3)
+            else:
+                c["mean_commit_latency_ms"] = 0.0
+                c["max_commit_latency_ms"] = 0.0
+
+    def on_database_commit(self, rows: int, latency_s: float) -> None:
+        # called from the Sqlite3Worker thread.
+        with self._stats_lock:
+            self._rows_committed_since_stats += rows
+            self._commits_since_stats += 1
+            self._commit_latency_s_since_stats += latency_s
+            self._max_commit_latency_s_since_stats = max(self._max_commit_latency_s_since_stats, latency_s)
+
+    def get_insert_statement(self, table: str, columns: tuple[str, ...]) -> str:
+        try:
+            return self._insert_statements[(table, columns)]
+        except KeyError:
+            cols_placeholder = ", ".join(columns)
+            values_placeholder = ", ".join(":" + c for c in columns)
+            SQL = f"""INSERT INTO {table} ({cols_placeholder}) VALUES ({values_placeholder})"""
+            self._insert_statements[(table, columns)] = SQL
+            return SQL
 
     def on_database_write_error(
         self, error: Exception, query: str, values: tuple[object, ...] | dict[str, object]
     ) -> None:
-        self._database_write_errors_in_last_60s += 1
-        self._latest_database_write_error = str(error)
+        with self._stats_lock:
+            self._database_write_errors_in_last_60s += 1
+            self._latest_database_write_error = str(error)
+            first_error = self._database_write_errors_in_last_60s == 1
 
-        if self._database_write_errors_in_last_60s == 1:
+        if first_error:
             self.logger.error(f"Unable to persist MQTT data to SQLite: {error}. Data may not be saved.")
             self.logger.debug(f"SQL that failed: `{query}` with values `{values}`")
 
     def on_disconnected(self) -> None:
         self.timer.cancel()
+        for pool in self.parser_pools:
+            # let in-flight payloads reach the Sqlite3Worker before it closes.
+            pool.shutdown(wait=True, cancel_futures=False)
         self.sqliteworker.close()  # close the db safely
 
+    def get_rollup_upserts(self, table: str) -> tuple[str, ...]:
+        try:
+            return self._rollup_upserts[table]
+        except KeyError:
+            SQLs = []
+            if table in ACTIVITY_DATA_ROLLUPS:
+                SQLs.append(activity_data_upsert_for_rows(table))
+            if table in ROLLUP_SOURCES:
+                SQLs.append(rollup_upsert_for_rows(table))
+            self._rollup_upserts[table] = tuple(SQLs)
+            return self._rollup_upserts[table]
+
+    def get_parser_pool(self, parser: Parser, shard: int) -> ProcessPoolExecutor | None:
+        if not self.parser_pools:
+            return None
+
+        try:
+            pickle.dumps(parser)
+        except Exception:
+            self.logger.debug(
+                f"Parser {getattr(parser, '__name__', parser)} can't be sent to a process, parsing in-thread."
+            )
+            return None
+
+        return self.parser_pools[shard % len(self.parser_pools)]
+
+    def on_parser_error(self, parser: Parser, message: pt.MQTTMessage, error: BaseException) -> None:
+        self.logger.warning(f"Encountered error in saving to DB: {error}.")
+        self.logger.debug(
+            f"Error in {getattr(parser, '__name__', parser)}. Payload: `{message.payload.decode()}`. Topic: `{message.topic}`",
+            exc_info=error,
+        )
+
+    def write_rows(self, table: str, new_rows: ParsedSqliteRow | list[ParsedSqliteRow] | None) -> None:
+        if new_rows is None:
+            # parsers can return None to exit out.
+            return
+
+        if not isinstance(new_rows, list):
+            new_rows = [new_rows]
+
+        rollup_SQLs = self.get_rollup_upserts(table)
+        inserts = 0
+
+        for new_row in new_rows:
+            SQL = self.get_insert_statement(table, tuple(new_row.keys()))
+            try:
+                self.sqliteworker.execute_grouped(
+                    SQL, cast(object, new_row), dependents=rollup_SQLs  # type: ignore[arg-type]
+                )
+            except Exception as e:
+                self.logger.warning(e)
+                self.logger.debug(f"SQL that caused error: `{SQL}`")
+                break
+            inserts += 1
+
+        # called from the paho thread, and the parser pools' callback threads.
+        with self._stats_lock:
+            self._inserts_in_last_60s += inserts
+
     def create_on_message_callback(
         self,
-        parser: Callable[[str, pt.MQTTMessagePayload], ParsedSqliteRow | list[ParsedSqliteRow] | None],
+        parser: Parser,
         table: str,
+        parser_pool: ProcessPoolExecutor | None = None,
     ) -> Callable[[pt.MQTTMessage], None]:
+        def on_parsed(
+            message: pt.MQTTMessage, future: Future[ParsedSqliteRow | list[ParsedSqliteRow] | None]
+        ) -> None:
+            # runs in the pool's result thread.
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                self.on_parser_error(parser, message, error)
+                return
+            self.write_rows(table, future.result())
+
         def callback(message: pt.MQTTMessage) -> None:
             if "/_testing_" in message.topic:
                 # filter out testing data from DB
@@ -142,34 +398,22 @@ class MqttToDBStreamer(LongRunningBackgroundJob):
                 # filter out empty payloads
                 return
 
+            if parser_pool is not None:
+                try:
+                    future = parser_pool.submit(parser, message.topic, bytes(message.payload))
+                except RuntimeError:
+                    # pool is shutting down
+                    return
+                future.add_done_callback(lambda f: on_parsed(message, f))
+                return
+
             try:
                 new_rows = parser(message.topic, message.payload)
             except Exception as e:
-                self.logger.warning(f"Encountered error in saving to DB: {e}.")
-                self.logger.debug(
-                    f"Error in {parser.__name__}. Payload: `{message.payload.decode()}`. Topic: `{message.topic}`",
-                    exc_info=True,
-                )
-                return
-
-            if new_rows is None:
-                # parsers can return None to exit out.
+                self.on_parser_error(parser, message, e)
                 return
 
-            if not isinstance(new_rows, list):
-                new_rows = [new_rows]
-
-            for new_row in new_rows:
-                cols_placeholder = ", ".join(new_row.keys())
-                values_placeholder = ", ".join(":" + c for c in new_row.keys())
-                SQL = f"""INSERT INTO {table} ({cols_placeholder}) VALUES ({values_placeholder})"""
-                try:
-                    self.sqliteworker.execute(SQL, cast(object, new_row))  # type: ignore[arg-type]
-                except Exception as e:
-                    self.logger.warning(e)
-                    self.logger.debug(f"SQL that caused error: `{SQL}`")
-                    return
-                self._inserts_in_last_60s += 1
+            self.write_rows(table, new_rows)
 
         return callback
 
@@ -561,9 +805,13 @@ def register_source_to_sink(
     return source_to_sinks
 
 
-def start_mqtt_to_db_streaming() -> MqttToDBStreamer:
+def start_mqtt_to_db_streaming(parser_processes: int | None = None) -> MqttToDBStreamer:
     source_to_sinks = add_default_source_to_sinks()
-    return MqttToDBStreamer(get_unit_name(), UNIVERSAL_EXPERIMENT, source_to_sinks)
+    if parser_processes is None:
+        parser_processes = config.getint("mqtt_to_db_streaming.config", "parser_processes", fallback=0)
+    return MqttToDBStreamer(
+        get_unit_name(), UNIVERSAL_EXPERIMENT, source_to_sinks, parser_processes=parser_processes
+    )
 
 
 @click.command(name="mqtt_to_db_streaming")
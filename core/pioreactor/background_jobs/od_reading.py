@@ -71,6 +71,11 @@ In the ODReader class, we publish the `first_od_obs_time` to MQTT so other jobs
 make decisions. For example, if a bubbler/visible light LED is active, it should time itself
 s.t. it is _not_ running when an turbidity measurement is about to occur. See BackgroundJobWithDodging class.
 
+ADCReader keeps the raw samples of the last few reads in a ring buffer, `adc_reader.raw_samples`. To look at them
+(ex: to diagnose aliasing or bubbles), publish N to `pioreactor/<unit>/<experiment>/od_reading/raw_samples/dump` and the
+last N reads are published to `pioreactor/<unit>/<experiment>/od_reading/raw_samples`. Setting `publish_raw_samples`
+to true streams every read there instead.
+
 """
 from __future__ import annotations
 
@@ -80,6 +85,7 @@ import random
 import threading
 import types
 from collections.abc import Mapping
+from datetime import datetime
 from time import sleep
 from time import time
 from typing import Callable
@@ -89,6 +95,7 @@ from typing import TYPE_CHECKING
 
 import click
 import pioreactor.actions.led_intensity as led_utils
+from msgspec.json import encode as dumps
 from pioreactor import error_codes
 from pioreactor import exc
 from pioreactor import hardware
@@ -107,12 +114,16 @@ from pioreactor.utils import get_running_pio_job_id
 from pioreactor.utils import local_intermittent_storage
 from pioreactor.utils import local_persistent_storage
 from pioreactor.utils import timing
+from pioreactor.utils.calibration_inverses import CalibrationInverse
 from pioreactor.utils.math_helpers import mean
-from pioreactor.utils.od_fusion import compute_fused_od
+from pioreactor.utils.od_fusion import FusionEvaluator
 from pioreactor.utils.streaming_calculations import ExponentialMovingAverage
 from pioreactor.utils.timing import catchtime
 
 if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
     from pioreactor.utils import adcs as madcs
 
 
@@ -171,6 +182,118 @@ def average_over_od_readings(*multiple_od_readings: structs.ODReadings) -> struc
     )
 
 
+class RawSampleRingBuffer:
+    """
+    Fixed-size ring buffer of the raw ADC samples of the last ``capacity`` reads, for all channels.
+
+    Storage is allocated once, as (capacity, channels, max_samples_per_read) NumPy arrays. A reader asks for the next
+    slot, writes samples straight into it, and commits it, so nothing is allocated per read.
+
+    Example
+    --------
+
+    > buffer = RawSampleRingBuffer(["1", "2"], capacity=10, max_samples_per_read=40)
+    > sample_times, samples = buffer.next_slot(40)
+    > # fill sample_times[i, j], samples[i, j] for channel i, sample j
+    > buffer.commit()
+    > buffer.last(5)  # list of structs.RawPDSamples, oldest first
+
+    """
+
+    def __init__(self, channels: list[pt.PdChannel], capacity: int, max_samples_per_read: int) -> None:
+        import numpy as np
+
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+
+        self.channels = list(channels)
+        self.capacity = capacity
+        self.max_samples_per_read = max_samples_per_read
+
+        shape = (capacity, len(self.channels), max_samples_per_read)
+        self.sample_times = np.zeros(shape)
+        self.samples = np.zeros(shape)
+        self.read_at: list[datetime | None] = [None] * capacity
+        self.samples_per_read = np.zeros(capacity, dtype=np.int64)
+
+        self._next_index = 0
+        self._pending_samples = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def next_slot(self, n_samples: int) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """
+        Views of shape (channels, n_samples) into the next slot: (sample_times, samples). Not visible in last() until
+        commit() is called.
+        """
+        if n_samples > self.max_samples_per_read:
+            raise ValueError(f"At most {self.max_samples_per_read} samples per read, got {n_samples}.")
+
+        with self._lock:
+            # the slot is being overwritten, so the read that was in it is no longer available
+            self._count = min(self._count, self.capacity - 1)
+            self._pending_samples = n_samples
+            i = self._next_index
+        return self.sample_times[i, :, :n_samples], self.samples[i, :, :n_samples]
+
+    def commit(self) -> None:
+        with self._lock:
+            i = self._next_index
+            self.read_at[i] = timing.current_utc_datetime()
+            self.samples_per_read[i] = self._pending_samples
+            self._next_index = (i + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._next_index = 0
+            self._count = 0
+
+    def _last_indices(self, n: int | None) -> list[int]:
+        n = self._count if n is None else max(0, min(n, self._count))
+        return [(self._next_index - n + k) % self.capacity for k in range(n)]
+
+    def last_for_channel(
+        self, channel: pt.PdChannel, n: int | None = None
+    ) -> list[tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]]:
+        """(sample_times, samples) of one channel for the last n reads, oldest first. These are copies."""
+        c = self.channels.index(channel)
+        with self._lock:
+            return [
+                (
+                    self.sample_times[i, c, : self.samples_per_read[i]].copy(),
+                    self.samples[i, c, : self.samples_per_read[i]].copy(),
+                )
+                for i in self._last_indices(n)
+            ]
+
+    def last(self, n: int | None = None) -> list[structs.RawPDSamples]:
+        """The last n reads (all buffered reads if None), oldest first."""
+        with self._lock:
+            reads = []
+            for i in self._last_indices(n):
+                n_samples = self.samples_per_read[i]
+                read_at = self.read_at[i]
+                assert read_at is not None
+                reads.append(
+                    structs.RawPDSamples(
+                        timestamp=read_at,
+                        sample_times={
+                            channel: self.sample_times[i, c, :n_samples].tolist()
+                            for c, channel in enumerate(self.channels)
+                        },
+                        samples={
+                            channel: self.samples[i, c, :n_samples].tolist()
+                            for c, channel in enumerate(self.channels)
+                        },
+                    )
+                )
+            return reads
+
+
 class ADCReader(LoggerMixin):
     """
 
@@ -190,6 +313,7 @@ class ADCReader(LoggerMixin):
     """
 
     _logger_name = "adc_reader"
+    TUNE_SAMPLES = 10
 
     def __init__(
         self,
@@ -200,6 +324,7 @@ class ADCReader(LoggerMixin):
         oversampling_count: int = 40,
         unit: pt.Unit | None = None,
         experiment: pt.Experiment | None = None,
+        raw_samples_buffer_size: int = 10,
     ) -> None:
         super().__init__()
         self.fake_data = fake_data
@@ -212,6 +337,12 @@ class ADCReader(LoggerMixin):
         self.oversampling_count = oversampling_count
         self.batched_readings: RawPDReadings = {}
         self.max_signal_moving_average = {c: ExponentialMovingAverage(alpha=0.05) for c in self.channels}
+        # raw samples of the last reads, written in place by take_reading and tune_adc_with_ir_on
+        self.raw_samples = RawSampleRingBuffer(
+            self.channels,
+            capacity=raw_samples_buffer_size,
+            max_samples_per_read=max(oversampling_count, self.TUNE_SAMPLES),
+        )
 
         self.adcs = self._get_ADCs()
 
@@ -265,22 +396,19 @@ class ADCReader(LoggerMixin):
         for adc in self.adcs.values():
             adc.set_ads_gain(1.0)
 
-        SAMPLES = 10
+        SAMPLES = self.TUNE_SAMPLES
 
         batched_readings = {}
 
-        # we pre-allocate these arrays to make the for loop faster => more accurate
-        aggregated_signals: dict[pt.PdChannel, list[pt.AnalogValue]] = {
-            channel: [0.0] * SAMPLES for channel in self.channels
-        }
-        timestamps: dict[pt.PdChannel, list[float]] = {channel: [0.0] * SAMPLES for channel in self.channels}
+        # samples are written straight into the ring buffer, so the AC frequency can be inferred from them below
+        timestamps, aggregated_signals = self.raw_samples.next_slot(SAMPLES)
 
         with catchtime() as time_since_start:
             for counter in range(SAMPLES):
                 with catchtime() as time_sampling_took_to_run:
-                    for pd_channel in self.channels:
-                        timestamps[pd_channel][counter] = time_since_start()
-                        aggregated_signals[pd_channel][counter] = self.adcs[pd_channel].read_from_channel()
+                    for i, pd_channel in enumerate(self.channels):
+                        timestamps[i, counter] = time_since_start()
+                        aggregated_signals[i, counter] = self.adcs[pd_channel].read_from_channel()
 
                 sleep(
                     max(
@@ -294,17 +422,20 @@ class ADCReader(LoggerMixin):
                     )
                 )
 
+        self.raw_samples.commit()
+
         if os.environ.get("DEBUG") is not None:
-            self.logger.debug(f"TUNE STEP: {timestamps=}")
-            self.logger.debug(f"TUNE STEP: {aggregated_signals=}")
+            self.logger.debug(f"TUNE STEP: timestamps={timestamps.tolist()}")
+            self.logger.debug(f"TUNE STEP: aggregated_signals={aggregated_signals.tolist()}")
 
-        for channel in self.channels:
-            if self.most_appropriate_AC_hz is None and not self._is_ads1114_channel(channel):
-                self.most_appropriate_AC_hz = self.determine_most_appropriate_AC_hz(
-                    timestamps, aggregated_signals
-                )
+        if self.most_appropriate_AC_hz is None and not all(
+            self._is_ads1114_channel(c) for c in self.channels
+        ):
+            # only this read: the reads before it (ex: the dark offset's) may have been taken with the IR LED off.
+            self.most_appropriate_AC_hz = self.determine_most_appropriate_AC_hz(n_reads=1)
 
-            avg_reading_voltage = self.adcs[channel].from_raw_to_voltage(mean(aggregated_signals[channel]))
+        for i, channel in enumerate(self.channels):
+            avg_reading_voltage = self.adcs[channel].from_raw_to_voltage(float(aggregated_signals[i].mean()))
 
             self._check_if_over_max(avg_reading_voltage)
 
@@ -430,69 +561,120 @@ class ADCReader(LoggerMixin):
 
         assert len(x) == len(y), "shape mismatch"
 
-        y, removed_indices = self._trim_extrema(y)
-        x = [v for i, v in enumerate(x) if i not in removed_indices]
+        (result,) = self._sin_regression_with_known_freq_batched(
+            np.asarray([x], dtype=float),
+            np.asarray([y], dtype=float),
+            freq,
+            prior_C=None if prior_C is None else np.asarray([prior_C], dtype=float),
+            penalizer_C=penalizer_C,
+        )
+        return result
 
-        x_ = np.asarray(x)
-        y_ = np.asarray(y)
-        n = x_.shape[0]
+    def _sin_regression_with_known_freq_batched(
+        self,
+        x: npt.NDArray[np.float64],
+        y: npt.NDArray[np.float64],
+        freq: float,
+        prior_C: npt.NDArray[np.float64] | None = None,
+        penalizer_C: pt.Voltage | None = 0,
+    ) -> list[tuple[tuple[pt.Voltage, float | None, float | None], float]]:
+        """
+        Same model as _sin_regression_with_known_freq, fit to k channels at once: x and y are (k, n) arrays, one row per
+        channel, and prior_C is a (k,) array (nan for no prior). The max and min of each row are trimmed with a mask,
+        and all k 3x3 systems are solved in one call.
+        """
+        import numpy as np
 
-        tau = 2 * np.pi
-        sin_x = np.sin(freq * tau * x_)
-        cos_x = np.cos(freq * tau * x_)
+        assert x.shape == y.shape, "shape mismatch"
+        k = y.shape[0]
 
-        sum_sin = sin_x.sum()
-        sum_cos = cos_x.sum()
-        sum_sin2 = (sin_x**2).sum()
-        sum_cos2 = (cos_x**2).sum()
-        sum_cossin = (cos_x * sin_x).sum()
+        keep = self._trim_extrema_mask(y)
+        angle = (2 * np.pi * freq) * x
+        sin_x, cos_x = np.sin(angle), np.cos(angle)
+        kept_sin_x = keep * sin_x
+        kept_cos_x = keep * cos_x
 
-        sum_y = y_.sum()
-        sum_ysin = (y_ * sin_x).sum()
-        sum_ycos = (y_ * cos_x).sum()
+        n = keep.sum(axis=1)
+        sum_sin = kept_sin_x.sum(axis=1)
+        sum_cos = kept_cos_x.sum(axis=1)
+        sum_sin2 = (kept_sin_x * sin_x).sum(axis=1)
+        sum_cos2 = (kept_cos_x * cos_x).sum(axis=1)
+        sum_cossin = (kept_cos_x * sin_x).sum(axis=1)
 
-        rhs_penalty_term = 0.0
-        lhs_penalty_term = 0.0
+        sum_y = (keep * y).sum(axis=1)
+        sum_ysin = (kept_sin_x * y).sum(axis=1)
+        sum_ycos = (kept_cos_x * y).sum(axis=1)
 
-        if prior_C and penalizer_C:
-            rhs_penalty_term = penalizer_C * prior_C
-            lhs_penalty_term = penalizer_C
+        lhs_penalty_term = np.zeros(k)
+        rhs_penalty_term = np.zeros(k)
+        if prior_C is not None and penalizer_C:
+            has_prior = np.nan_to_num(prior_C) != 0
+            lhs_penalty_term = np.where(has_prior, penalizer_C, 0.0)
+            rhs_penalty_term = np.where(has_prior, penalizer_C * np.nan_to_num(prior_C), 0.0)
 
-        M = np.array(
+        M = np.stack(
             [
-                [n + lhs_penalty_term, sum_sin, sum_cos],
-                [sum_sin, sum_sin2, sum_cossin],
-                [sum_cos, sum_cossin, sum_cos2],
-            ]
+                np.stack([n + lhs_penalty_term, sum_sin, sum_cos], axis=-1),
+                np.stack([sum_sin, sum_sin2, sum_cossin], axis=-1),
+                np.stack([sum_cos, sum_cossin, sum_cos2], axis=-1),
+            ],
+            axis=-2,
         )
-        Y = np.array([sum_y + rhs_penalty_term, sum_ysin, sum_ycos])
+        Y = np.stack([sum_y + rhs_penalty_term, sum_ysin, sum_ycos], axis=-1)
 
         try:
-            C, b, c = np.linalg.solve(M, Y)
-        except np.linalg.LinAlgError as e:
-            self.logger.error(f"Error in regression. {e}")
-            self.logger.debug(f"{x=}")
-            self.logger.debug(f"{y=}")
-            return (float(y_.mean()) if y_.size else 0.0, None, None), 1e10
-
-        y_model = C + b * np.sin(freq * tau * x_) + c * np.cos(freq * tau * x_)
-        SSE = np.sum((y_ - y_model) ** 2)
-
-        if SSE > 1e-20:
-            AIC = n * np.log(SSE / n) + 2 * 3
-        else:
-            # Perfect (or numerically-perfect) fits should rank best when selecting
-            # between candidate AC frequencies.
-            AIC = -math.inf
+            solutions = np.linalg.solve(M, Y[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            # at least one row is singular, solve them one at a time so only those rows fail.
+            solutions = np.full((k, 3), np.nan)
+            for i in range(k):
+                try:
+                    solutions[i] = np.linalg.solve(M[i], Y[i])
+                except np.linalg.LinAlgError as e:
+                    self.logger.error(f"Error in regression. {e}")
+                    self.logger.debug(f"x={x[i].tolist()}")
+                    self.logger.debug(f"y={y[i][keep[i] > 0].tolist()}")
+
+        C, b, c = solutions.T
+        SSE = (keep * (y - (C[:, None] + b[:, None] * sin_x + c[:, None] * cos_x)) ** 2).sum(axis=1)
+        amplitude = np.sqrt(b**2 + c**2)
+
+        results: list[tuple[tuple[pt.Voltage, float | None, float | None], float]] = []
+        for i in range(k):
+            if np.isnan(solutions[i]).any():
+                kept_y = y[i][keep[i] > 0]
+                results.append(((float(kept_y.mean()) if kept_y.size else 0.0, None, None), 1e10))
+                continue
+
+            if SSE[i] > 1e-20:
+                AIC = float(n[i] * np.log(SSE[i] / n[i]) + 2 * 3)
+            else:
+                # Perfect (or numerically-perfect) fits should rank best when selecting
+                # between candidate AC frequencies.
+                AIC = -math.inf
 
-        if np.sqrt(b**2 + c**2) <= 1e-20:
-            A = 0
-            phi = 0
-        else:
-            A = np.sqrt(b**2 + c**2)
-            phi = np.arctan2(c, b)
+            if amplitude[i] <= 1e-20:
+                A, phi = 0.0, 0.0
+            else:
+                A, phi = float(amplitude[i]), float(np.arctan2(c[i], b[i]))
+
+            results.append(((float(C[i]), A, phi), AIC))
+
+        return results
+
+    @staticmethod
+    def _trim_extrema_mask(y: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """1.0 for values to keep, 0.0 for the (first) min and max of each row. Same as _trim_extrema, per row."""
+        import numpy as np
+
+        keep = np.ones_like(y)
+        if y.shape[1] <= 2:
+            return keep
 
-        return (float(C), float(A), float(phi)), AIC
+        rows = np.arange(y.shape[0])
+        keep[rows, y.argmin(axis=1)] = 0.0
+        keep[rows, y.argmax(axis=1)] = 0.0
+        return keep
 
     def _is_ads1114_channel(self, channel: pt.PdChannel) -> bool:
         from pioreactor.utils import adcs as madcs
@@ -531,34 +713,22 @@ class ADCReader(LoggerMixin):
         """
         self.batched_readings = {}
 
-    @staticmethod
-    def _remove_offset_from_signal(
-        signals: list[pt.AnalogValue], offset: pt.AnalogValue
-    ) -> list[pt.AnalogValue]:
-        return [max(x - offset, 0) for x in signals]
-
     def take_reading(self) -> RawPDReadings:
         """
         Sample from the ADS - likely this has been optimized for use for optical density in the Pioreactor system.
         """
+        import numpy as np
 
-        # we pre-allocate these arrays to make the for loop faster => more accurate
-        aggregated_signals: dict[pt.PdChannel, list[pt.AnalogValue]] = {
-            channel: [0.0] * self.oversampling_count for channel in self.channels
-        }
-        timestamps: dict[pt.PdChannel, list[float]] = {
-            channel: [0.0] * self.oversampling_count for channel in self.channels
-        }
+        # samples are written in place into the next slot of the preallocated ring buffer => faster loop => more accurate
+        timestamps, aggregated_signals = self.raw_samples.next_slot(self.oversampling_count)
 
         try:
             with catchtime() as time_since_start:
                 for counter in range(self.oversampling_count):
                     with catchtime() as time_sampling_took_to_run:
-                        for pd_channel in self.channels:
-                            timestamps[pd_channel][counter] = time_since_start()
-                            aggregated_signals[pd_channel][counter] = self.adcs[
-                                pd_channel
-                            ].read_from_channel()
+                        for i, pd_channel in enumerate(self.channels):
+                            timestamps[i, counter] = time_since_start()
+                            aggregated_signals[i, counter] = self.adcs[pd_channel].read_from_channel()
 
                     sleep(
                         max(
@@ -572,49 +742,59 @@ class ADCReader(LoggerMixin):
                         )
                     )
 
+            self.raw_samples.commit()
+
             batched_estimates_: PdChannelToVoltage = {}
 
             if os.environ.get("DEBUG") is not None:
-                self.logger.debug(f"{timestamps=}")
-                self.logger.debug(f"{aggregated_signals=}")
-
-            for channel in self.channels:
-                shifted_signals = self._remove_offset_from_signal(
-                    aggregated_signals[channel], self.adc_offsets.get(channel, 0.0)
-                )
-
-                prior_C = (
+                self.logger.debug(f"timestamps={timestamps.tolist()}")
+                self.logger.debug(f"aggregated_signals={aggregated_signals.tolist()}")
+
+            penalizer_C = self.penalizer * self.oversampling_count
+            offsets = np.asarray([self.adc_offsets.get(channel, 0.0) for channel in self.channels])
+            shifted_signals = np.maximum(aggregated_signals - offsets[:, None], 0)
+            prior_Cs: dict[pt.PdChannel, pt.AnalogValue | None] = {}
+            sin_regression_channels: list[int] = []
+            best_estimates_of_signal: dict[pt.PdChannel, pt.AnalogValue] = {}
+
+            for i, channel in enumerate(self.channels):
+                prior_Cs[channel] = (
                     self.adcs[channel].from_voltage_to_raw_precise(self.batched_readings[channel].reading)
                     if (channel in self.batched_readings)
                     else None
                 )
-                penalizer_C = self.penalizer * self.oversampling_count
-
-                if self._is_ads1114_channel(channel):
-                    best_estimate_of_signal_ = self._simple_trimmed_mean_with_prior(
-                        shifted_signals,
-                        prior_C=prior_C,
-                        penalizer_C=penalizer_C,
-                    )
-                elif self.most_appropriate_AC_hz is not None:
-                    (
-                        best_estimate_of_signal_,
-                        *_other_param_estimates,
-                    ), _ = self._sin_regression_with_known_freq(
-                        timestamps[channel],
-                        shifted_signals,
-                        self.most_appropriate_AC_hz,
-                        prior_C=prior_C,
-                        penalizer_C=penalizer_C,
-                    )
 
+                if self.most_appropriate_AC_hz is not None and not self._is_ads1114_channel(channel):
+                    sin_regression_channels.append(i)
                 else:
-                    best_estimate_of_signal_ = self._simple_trimmed_mean_with_prior(
-                        shifted_signals,
-                        prior_C=prior_C,
+                    best_estimates_of_signal[channel] = self._simple_trimmed_mean_with_prior(
+                        shifted_signals[i].tolist(),
+                        prior_C=prior_Cs[channel],
                         penalizer_C=penalizer_C,
                     )
 
+            if sin_regression_channels:
+                # fit all the channels in one vectorized pass
+                assert self.most_appropriate_AC_hz is not None
+                fits = self._sin_regression_with_known_freq_batched(
+                    timestamps[sin_regression_channels],
+                    shifted_signals[sin_regression_channels],
+                    self.most_appropriate_AC_hz,
+                    prior_C=np.asarray(
+                        [
+                            np.nan if prior_Cs[self.channels[i]] is None else prior_Cs[self.channels[i]]
+                            for i in sin_regression_channels
+                        ],
+                        dtype=float,
+                    ),
+                    penalizer_C=penalizer_C,
+                )
+                for i, ((C, *_other_param_estimates), _) in zip(sin_regression_channels, fits):
+                    best_estimates_of_signal[self.channels[i]] = C
+
+            for channel in self.channels:
+                best_estimate_of_signal_ = best_estimates_of_signal[channel]
+
                 # convert to voltage
                 best_estimate_of_signal_v = round(
                     self.adcs[channel].from_raw_to_voltage(best_estimate_of_signal_), 10
@@ -651,27 +831,40 @@ class ADCReader(LoggerMixin):
 
     def determine_most_appropriate_AC_hz(
         self,
-        timestamps: dict[pt.PdChannel, list[float]],
-        aggregated_signals: dict[pt.PdChannel, list[pt.AnalogValue]],
+        timestamps: dict[pt.PdChannel, list[float]] | None = None,
+        aggregated_signals: dict[pt.PdChannel, list[pt.AnalogValue]] | None = None,
+        n_reads: int | None = None,
     ) -> float:
-        def _compute_best_freq(timestamps: list[float], aggregated_signals: list[float]) -> float:
-            FREQS_TO_TRY = [60.0, 50.0]
-            argmin_freq = FREQS_TO_TRY[0]
-            min_AIC = float("inf")
+        """
+        Choose the AC frequency whose sinusoid fits the samples best (lowest AIC). If no samples are given, the last
+        n_reads reads (all if None) already in the raw sample buffer are used, with their AICs summed, so no new
+        acquisition is needed.
+        """
+        FREQS_TO_TRY = [60.0, 50.0]
 
-            for freq in FREQS_TO_TRY:
-                _, AIC = self._sin_regression_with_known_freq(timestamps, aggregated_signals, freq=freq)
-                if AIC < min_AIC:
-                    min_AIC = AIC
-                    argmin_freq = freq
+        reads: list[tuple[list[float], list[pt.AnalogValue]]]
+        if timestamps is None or aggregated_signals is None:
+            channel = next((c for c in self.channels if not self._is_ads1114_channel(c)), self.channels[0])
+            reads = [(x.tolist(), y.tolist()) for x, y in self.raw_samples.last_for_channel(channel, n_reads)]
+        else:
+            channel = self.channels[0]
+            reads = [(timestamps[channel], aggregated_signals[channel])]
 
-            return argmin_freq
+        AICs = {freq: 0.0 for freq in FREQS_TO_TRY}
+        for x, y in reads:
+            read_AICs = {
+                freq: self._sin_regression_with_known_freq(x, y, freq=freq)[1] for freq in FREQS_TO_TRY
+            }
+            if len(reads) > 1 and not all(math.isfinite(AIC) for AIC in read_AICs.values()):
+                # a perfectly fit read (ex: a flat signal) can't tell the frequencies apart, and would swamp the sum.
+                continue
+            for freq, AIC in read_AICs.items():
+                AICs[freq] += AIC
 
-        channel = self.channels[0]
-        argmin_freq1 = _compute_best_freq(timestamps[channel], aggregated_signals[channel])
+        argmin_freq = min(FREQS_TO_TRY, key=lambda freq: AICs[freq])
 
-        self.logger.debug(f"AC hz estimate: {argmin_freq1}")
-        return argmin_freq1
+        self.logger.debug(f"AC hz estimate: {argmin_freq}")
+        return argmin_freq
 
 
 class IrLedReferenceTracker(LoggerMixin):
@@ -1014,56 +1207,63 @@ class CachedCalibrationTransformer(LoggerMixin, CalibrationTransformerProtocol):
                 )
             return True
 
-        def _calibrate_signal(observed_voltage: pt.Voltage) -> pt.OD:
-            try:
-                recorded_ods = calibration_data.recorded_data["x"]
-                recorded_voltages = calibration_data.recorded_data["y"]
-                min_OD, max_OD = min(recorded_ods), max(recorded_ods)
-                voltage_od_pairs = list(zip(recorded_voltages, recorded_ods))
-                min_voltage, od_at_min_voltage = min(voltage_od_pairs, key=lambda pair: pair[0])
-                max_voltage, od_at_max_voltage = max(voltage_od_pairs, key=lambda pair: pair[0])
-            except ValueError:
-                # can only really occur if data is missing
-                min_OD, max_OD = 0.0, 100_000.0
-                min_voltage, max_voltage = 0.0, 100_000.0
-                od_at_min_voltage, od_at_max_voltage = min_OD, max_OD
-
-            def clamp_to_recorded_extrema() -> pt.OD:
-                if observed_voltage <= min_voltage:
-                    return od_at_min_voltage
-                elif observed_voltage >= max_voltage:
-                    return od_at_max_voltage
-                # if the observed voltage lies between the smallest and largest recorded voltages but the polynomial solver still says “out of
-                # domain” (e.g., non‑monotonic curve giving no valid root in-bounds), we can’t map it normally. In that unlikely situation we snap the
-                # result to whichever recorded voltage end (min or max) is nearest to the observed voltage, rather than picking an arbitrary side
-                return (
-                    od_at_min_voltage
-                    if abs(observed_voltage - min_voltage) < abs(observed_voltage - max_voltage)
-                    else od_at_max_voltage
-                )
+        # computed once, not per reading
+        try:
+            recorded_ods = calibration_data.recorded_data["x"]
+            recorded_voltages = calibration_data.recorded_data["y"]
+            min_OD, max_OD = min(recorded_ods), max(recorded_ods)
+            voltage_od_pairs = list(zip(recorded_voltages, recorded_ods))
+            min_voltage, od_at_min_voltage = min(voltage_od_pairs, key=lambda pair: pair[0])
+            max_voltage, od_at_max_voltage = max(voltage_od_pairs, key=lambda pair: pair[0])
+        except ValueError:
+            # can only really occur if data is missing
+            min_OD, max_OD = 0.0, 100_000.0
+            min_voltage, max_voltage = 0.0, 100_000.0
+            od_at_min_voltage, od_at_max_voltage = min_OD, max_OD
 
+        inverse = CalibrationInverse(calibration_data)
+        if not inverse.is_tabulated:
+            self.logger.debug(
+                f"Calibration {calibration_data.calibration_name} isn't monotone over its recorded ODs, or has none, so each reading is root-solved."
+            )
+
+        def clamp_to_recorded_extrema(observed_voltage: pt.Voltage) -> pt.OD:
+            if observed_voltage <= min_voltage:
+                return od_at_min_voltage
+            elif observed_voltage >= max_voltage:
+                return od_at_max_voltage
+            # if the observed voltage lies between the smallest and largest recorded voltages but the polynomial solver still says “out of
+            # domain” (e.g., non‑monotonic curve giving no valid root in-bounds), we can’t map it normally. In that unlikely situation we snap the
+            # result to whichever recorded voltage end (min or max) is nearest to the observed voltage, rather than picking an arbitrary side
+            return (
+                od_at_min_voltage
+                if abs(observed_voltage - min_voltage) < abs(observed_voltage - max_voltage)
+                else od_at_max_voltage
+            )
+
+        def _calibrate_signal(observed_voltage: pt.Voltage) -> pt.OD:
             try:
-                return calibration_data.y_to_x(observed_voltage, enforce_bounds=True)
+                return inverse.y_to_x(observed_voltage, enforce_bounds=True)
             except exc.NoSolutionsFoundError:
                 if self._should_warn_about_bounds():
                     self.logger.warning(
                         f"No solution found for calibrated signal. Trimming signal. Calibrated for OD=[{min_OD:0.3g}, {max_OD:0.3g}], V=[{min_voltage:0.3g}, {max_voltage:0.3g}]. Observed {observed_voltage:0.3f}V, which would map outside the allowed values."
                     )
-                return clamp_to_recorded_extrema()
+                return clamp_to_recorded_extrema(observed_voltage)
             except exc.SolutionBelowDomainError:
                 if self._should_warn_about_bounds():
                     below_or_above = "below" if observed_voltage <= min_voltage else "outside of"
                     self.logger.warning(
                         f"Signal {below_or_above} suggested calibration range. Trimming signal. Calibrated for OD=[{min_OD:0.3g}, {max_OD:0.3g}], V=[{min_voltage:0.3g}, {max_voltage:0.3g}]. Observed {observed_voltage:0.3f}V, which would map outside the allowed values."
                     )
-                return clamp_to_recorded_extrema()
+                return clamp_to_recorded_extrema(observed_voltage)
             except exc.SolutionAboveDomainError:
                 if self._should_warn_about_bounds():
                     above_or_outside = "above" if observed_voltage >= max_voltage else "outside of"
                     self.logger.warning(
                         f"Signal {above_or_outside} suggested calibration range. Trimming signal. Calibrated for OD=[{min_OD:0.3g}, {max_OD:0.3g}], V=[{min_voltage:0.3g}, {max_voltage:0.3g}]. Observed {observed_voltage:0.3f}V, which would map outside the allowed values."
                     )
-                return clamp_to_recorded_extrema()
+                return clamp_to_recorded_extrema(observed_voltage)
 
         return HydratedCalibrationModel(
             calibration_name=calibration_data.calibration_name,
@@ -1121,6 +1321,7 @@ class CachedEstimatorTransformer(LoggerMixin, EstimatorTransformerProtocol):
     def __init__(self) -> None:
         super().__init__()
         self.estimator: structs.ODFusionEstimator | None = None
+        self.fusion_evaluator: FusionEvaluator | None = None
         self._last_bound_warning_at: float | None = None
 
     def hydrate_estimator(self, estimator: structs.ODFusionEstimator | None) -> None:
@@ -1128,6 +1329,11 @@ class CachedEstimatorTransformer(LoggerMixin, EstimatorTransformerProtocol):
             self.logger.debug("No estimator available for OD fusion, skipping.")
             return
         self.estimator = estimator
+        # parse the curves and tabulate the likelihood once, rather than per reading
+        try:
+            self.fusion_evaluator = FusionEvaluator(estimator)
+        except ValueError as e:
+            self.logger.error(f"Unable to use estimator {estimator.estimator_name} for OD fusion: {e}")
 
     def _verify(self, raw_od_readings: structs.ODReadings) -> None:
         if self.estimator is None:
@@ -1140,7 +1346,7 @@ class CachedEstimatorTransformer(LoggerMixin, EstimatorTransformerProtocol):
                 )
 
     def __call__(self, raw_od_readings: structs.ODReadings) -> structs.ODFused | None:
-        if self.estimator is None:
+        if self.estimator is None or self.fusion_evaluator is None:
             return None
 
         self._verify(raw_od_readings)
@@ -1149,7 +1355,7 @@ class CachedEstimatorTransformer(LoggerMixin, EstimatorTransformerProtocol):
             reading.angle: reading.od for reading in raw_od_readings.ods.values()
         }
         try:
-            od_fused_value = compute_fused_od(self.estimator, fused_inputs)
+            od_fused_value = self.fusion_evaluator(fused_inputs)
             if self._should_warn_about_bounds(od_fused_value):
                 self.logger.warning(
                     "Fused OD estimate hit estimator bounds: estimator=%s min_logc=%s max_logc=%s od_fused=%s",
@@ -1236,6 +1442,8 @@ class ODReader(BackgroundJob):
         "calibrated_od4": {"datatype": "CalibratedODReading", "settable": False},
         # below are used if a sensor fusion is used
         "od_fused": {"datatype": "ODFused", "settable": False},
+        # stream each read's raw ADC samples to .../od_reading/raw_samples
+        "publish_raw_samples": {"datatype": "boolean", "settable": True},
     }
 
     _pre_read: list[Callable] = []
@@ -1246,6 +1454,7 @@ class ODReader(BackgroundJob):
     od4: structs.ODReading | None = None
     ods: structs.ODReadings | None = None
     od_fused: structs.ODFused | None = None
+    publish_raw_samples: bool = False
     raw_od1: structs.RawODReading | None = None
     raw_od2: structs.RawODReading | None = None
     raw_od3: structs.RawODReading | None = None
@@ -1339,6 +1548,9 @@ class ODReader(BackgroundJob):
 
         self.first_od_obs_time: float | None = None
         self._set_for_iterating = threading.Event()
+        self.publish_raw_samples = config.getboolean(
+            "od_reading.config", "publish_raw_samples", fallback=False
+        )
 
         self.ir_channel: pt.LedChannel = self._get_ir_led_channel_from_configuration()
 
@@ -1694,6 +1906,9 @@ class ODReader(BackgroundJob):
         """
         raw_pd_readings = self.adc_reader.take_reading()
 
+        if self.publish_raw_samples:
+            self._publish_raw_samples(1)
+
         ref_reading, raw_pd_readings = self.ir_led_reference_transformer.pop_reference_reading(
             raw_pd_readings
         )
@@ -1722,6 +1937,32 @@ class ODReader(BackgroundJob):
 
         return raw_od_readings
 
+    def _publish_raw_samples(self, n: int | None) -> None:
+        self.publish(
+            f"pioreactor/{self.unit}/{self.experiment}/{self.job_name}/raw_samples",
+            dumps(self.adc_reader.raw_samples.last(n)),
+            qos=QOS.AT_MOST_ONCE,
+        )
+
+    def _dump_raw_samples(self, message: pt.MQTTMessage) -> None:
+        """
+        Publish the buffered raw samples of the last N reads (N is the payload, all buffered reads if empty) to
+        .../od_reading/raw_samples, as one list.
+        """
+        try:
+            n = int(message.payload) if message.payload else None
+        except ValueError:
+            self.logger.debug(f"Unable to parse number of reads from {message.payload!r}.")
+            return
+        self._publish_raw_samples(n)
+
+    def start_passive_listeners(self) -> None:
+        self.subscribe_and_callback(
+            self._dump_raw_samples,
+            f"pioreactor/{self.unit}/{self.experiment}/{self.job_name}/raw_samples/dump",
+            allow_retained=False,
+        )
+
     def _log_relative_intensity_of_ir_led(self) -> None:
         if random.random() < 0.2:
             self.relative_intensity_of_ir_led = {
@@ -1917,6 +2158,9 @@ def start_od_reading(
             penalizer=penalizer,
             unit=unit,
             experiment=experiment,
+            raw_samples_buffer_size=config.getint(
+                "od_reading.config", "raw_samples_buffer_size", fallback=10
+            ),
         ),
         ir_led_reference_tracker=ir_led_reference_tracker,
         blank_transformer=blank_transformer,
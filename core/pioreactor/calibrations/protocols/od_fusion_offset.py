@@ -30,8 +30,8 @@ from pioreactor.estimators import list_of_estimators_by_device
 from pioreactor.estimators import load_estimator
 from pioreactor.logging import create_logger
 from pioreactor.pubsub import get_from
-from pioreactor.utils.od_fusion import compute_fused_od
 from pioreactor.utils.od_fusion import FUSION_ANGLES
+from pioreactor.utils.od_fusion import FusionEvaluator
 from pioreactor.utils.timing import current_utc_datestamp
 from pioreactor.utils.timing import current_utc_datetime
 from pioreactor.whoami import get_unit_name
@@ -429,7 +429,8 @@ class RecordObservation(SessionStep):
                 if angle not in sample:
                     raise ValueError(f"Missing fusion reading for angle {angle}.")
 
-        estimated_ods = [compute_fused_od(base_estimator, sample) for sample in samples]
+        fuse = FusionEvaluator(base_estimator)
+        estimated_ods = [fuse(sample) for sample in samples]
         estimated_od = fmean(estimated_ods)
         if estimated_od <= 0 or standard_od <= 0:
             raise ValueError("OD values must be positive to compute offset.")
@@ -905,7 +905,7 @@ if am_I_leader() or is_testing_env():
           pios jobs set stirring target_rpm 500 --units worker1
           pios jobs set stirring interval 10 --experiments testing2
         """
-        from pioreactor.pubsub import create_client
+        from pioreactor.pubsub import get_shared_client
         from pioreactor.pubsub import QOS
 
         setting = setting.replace("-", "_")
@@ -916,16 +916,16 @@ if am_I_leader() or is_testing_env():
             if confirm != "Y":
                 raise click.Abort()
 
-        with create_client() as client:
-            for unit in units:
-                experiment = get_assigned_experiment_name(unit)
-                # This CLI path is short-lived, so wait before teardown after sending a settings command.
-                msg = client.publish(
-                    f"pioreactor/{unit}/{experiment}/{job}/{setting}/set",
-                    value,
-                    qos=QOS.AT_LEAST_ONCE,
-                )
-                msg.wait_for_publish(timeout=2.0)
+        client = get_shared_client()
+        for unit in units:
+            experiment = get_assigned_experiment_name(unit)
+            # This CLI path is short-lived, so wait before teardown after sending a settings command.
+            msg = client.publish(
+                f"pioreactor/{unit}/{experiment}/{job}/{setting}/set",
+                value,
+                qos=QOS.AT_LEAST_ONCE,
+            )
+            msg.wait_for_publish(timeout=2.0)
 
     @pios.command("kill", short_help="kill a job(s) on workers")
     @click.option("--all-jobs", is_flag=True, help="kill all worker jobs")
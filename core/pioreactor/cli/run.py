@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import importlib
 from contextlib import ExitStack
 from typing import Any
 
@@ -7,6 +8,8 @@ from pioreactor import plugin_management
 from pioreactor.cli.lazy_group import LazyGroup
 from pioreactor.config import config
 from pioreactor.config import temporary_config_changes
+from pioreactor.plugin_management.plugin_index import LOADS_ALL_PLUGINS
+from pioreactor.plugin_management.plugin_index import PluginIndex
 from pioreactor.whoami import am_I_leader
 
 lazy_subcommands: dict[str, str] = {
@@ -33,36 +36,102 @@ if am_I_leader():
         "mqtt_to_db_streaming": "pioreactor.background_jobs.leader.mqtt_to_db_streaming.click_mqtt_to_db_streaming",
         "export_experiment_data": "pioreactor.actions.leader.export_experiment_data.click_export_experiment_data",
         "backup_database": "pioreactor.actions.leader.backup_database.click_backup_database",
+        "rebuild_activity_data": "pioreactor.actions.leader.rebuild_activity_data.click_rebuild_activity_data",
+        "rebuild_time_series_rollups": "pioreactor.actions.leader.rebuild_time_series_rollups.click_rebuild_time_series_rollups",
+        "refuse_od": "pioreactor.actions.leader.refuse_od.click_refuse_od",
         "experiment_profile": "pioreactor.actions.leader.experiment_profile.click_experiment_profile",
     }
 
 
 class RunLazyGroup(LazyGroup):
+    """
+    Plugins' commands are found in the plugin index, so running one imports only its plugin, and `pio run --help`
+    imports none. Built-in commands import the plugins that register things they use, and the plugins that define
+    structs they decode (ex: calibrations), or every plugin for those in LOADS_ALL_PLUGINS. See
+    plugin_management.plugin_index.
+    """
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
+        self._plugin_index: PluginIndex | None = None
         self._plugins_loaded = False
 
+    @property
+    def plugin_index(self) -> PluginIndex:
+        if self._plugin_index is None:
+            self._plugin_index = plugin_management.get_plugin_index()
+        return self._plugin_index
+
+    def _load_plugin_command(self, cmd_name: str) -> click.Command | None:
+        target = self.plugin_index.commands[cmd_name].target
+        module_name, attributes = target.split(":")
+        try:
+            command = importlib.import_module(module_name)
+            for attribute in attributes.split("."):
+                command = getattr(command, attribute)
+        except Exception as e:
+            click.secho(f"{module_name} plugin load error: {type(e).__name__}: {e}", fg="red")
+            return None
+
+        self.add_command(command, cmd_name)  # type: ignore[arg-type]
+        return command  # type: ignore[return-value]
+
+    def _load_plugin_registrations(self, cmd_name: str) -> None:
+        if cmd_name in LOADS_ALL_PLUGINS:
+            # skips, and prints, the plugins that fail to load
+            plugin_management.get_plugins()
+            return
+        # ex: plugins' dosing automations, for `pio run dosing_automation`, and plugins' calibration types
+        module_names = [*self.plugin_index.registrations.get(cmd_name, []), *self.plugin_index.struct_modules]
+        for module_name in dict.fromkeys(module_names):
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                click.secho(f"{module_name} plugin load error: {type(e).__name__}: {e}", fg="red")
+
     def _load_plugins(self) -> None:
         if self._plugins_loaded:
             return
-        for plugin in plugin_management.get_plugins().values():
-            for possible_entry_point in dir(plugin.module):
-                if possible_entry_point.startswith("click_"):
-                    self.add_command(getattr(plugin.module, possible_entry_point))
+        for cmd_name in self.plugin_index.commands:
+            if cmd_name not in self.commands:
+                self._load_plugin_command(cmd_name)
         self._plugins_loaded = True
 
     def list_commands(self, ctx: click.Context) -> list[str]:
-        self._load_plugins()
-        return super().list_commands(ctx)
+        return list(dict.fromkeys([*self.plugin_index.commands, *super().list_commands(ctx)]))
 
     def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
-        self._load_plugins()
         # Prefer plugin-registered commands over lazy defaults so plugins can
         # intentionally replace built-in command entrypoints.
         if cmd_name in self.commands:
             return self.commands[cmd_name]
+        if cmd_name in self.plugin_index.commands:
+            return self._load_plugin_command(cmd_name)
+
+        self._load_plugin_registrations(cmd_name)
         return super().get_command(ctx, cmd_name)
 
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        # like click.Group.format_commands, but plugins' commands' help is read from the index, without importing them
+        cmd_names = self.list_commands(ctx)
+        if not cmd_names:
+            return
+        limit = formatter.width - 6 - max(len(cmd_name) for cmd_name in cmd_names)
+
+        rows = []
+        for cmd_name in cmd_names:
+            if cmd_name in self.plugin_index.commands and cmd_name not in self.commands:
+                rows.append((cmd_name, self.plugin_index.commands[cmd_name].short_help))
+                continue
+            # skips importing plugins' registrations, which the help doesn't need
+            command = self.commands.get(cmd_name) or super().get_command(ctx, cmd_name)
+            if command is not None and not command.hidden:
+                rows.append((cmd_name, command.get_short_help_str(limit)))
+
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
 
 @click.group(
     short_help="run a job",
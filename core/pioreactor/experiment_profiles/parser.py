@@ -2,11 +2,14 @@
 # mypy: ignore-errors
 # flake8: noqa
 import math
+from functools import lru_cache
 from random import random
 
 from msgspec import DecodeError
 from msgspec.json import decode
 from pioreactor.exc import MQTTValueError
+from pioreactor.exc import NotActiveWorkerError
+from pioreactor.experiment_profiles.state_mirror import get_active_mirror
 from pioreactor.pubsub import subscribe
 from pioreactor.whoami import get_assigned_experiment_name
 from pioreactor.whoami import is_active
@@ -15,6 +18,16 @@ from .sly import Lexer
 from .sly import Parser
 
 
+def get_retained_payload(topic: str) -> bytes | None:
+    # inside a mirror_job_settings block (ex: experiment profiles), read from the mirror instead of connecting
+    mirror = get_active_mirror()
+    if mirror is not None:
+        return mirror.get(topic)
+
+    result = subscribe(topic, timeout=2.0)
+    return result.payload if result else None
+
+
 def convert_string(input_value: object) -> object:
     if not isinstance(input_value, str):
         return input_value
@@ -94,22 +107,24 @@ class ProfileLexer(Lexer):
 
 class ProfileParser(Parser):
     """
-    you can pass in an variable env that can dynamically populate data, ex:
+    Compiles an expression into a function of the env, ex:
 
     `unit()`
 
-    will be replaced by env['unit']
+    compiles to a function that returns env['unit']. The dependencies attribute lists the job settings
+    (ex: `worker1:stirring:target_rpm`, `::od_reading:od1.od`) that the expression reads, and volatile is set if
+    its value can change without any of them changing, ex: it calls `random()` or `hours_elapsed()`.
 
     """
 
     _SYNTAX_VALUE = object()
+    # env values that change over a profile run
+    _VOLATILE_NAMES = frozenset({"hours_elapsed", "action_count"})
 
-    def __init__(self, env=None, *, syntax_only: bool = False) -> None:
-        if env:
-            self.ENV = env
-        else:
-            self.ENV = dict()
+    def __init__(self, *, syntax_only: bool = False) -> None:
         self.syntax_only = syntax_only
+        self.dependencies: list[str] = []
+        self.volatile = False
 
     tokens = ProfileLexer.tokens
 
@@ -124,49 +139,70 @@ class ProfileParser(Parser):
         ("right", EXPONENT),
     )
 
+    # both operands are always evaluated, left to right, as when expressions were evaluated while parsing.
+
     @_("expr AND expr", "expr OR expr")
     def expr(self, p):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
+        left, right = p.expr0, p.expr1
         if p[1] == "and":
-            return p.expr0 and p.expr1
+
+            def and_(env):
+                left_value, right_value = left(env), right(env)
+                return left_value and right_value
+
+            return and_
         elif p[1] == "or":
-            return p.expr0 or p.expr1
+
+            def or_(env):
+                left_value, right_value = left(env), right(env)
+                return left_value or right_value
+
+            return or_
 
     @_("PLUS expr %prec UMINUS", "MINUS expr %prec UMINUS")
     def expr(self, p):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
+        operand = p.expr
         if p[0] == "+":
-            return p.expr
+            return operand
         elif p[0] == "-":
-            return -p.expr
+            return lambda env: -operand(env)
 
     @_("expr EXPONENT expr")  # Add rule for exponentiation
     def expr(self, p):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
-        return p.expr0**p.expr1
+        left, right = p.expr0, p.expr1
+        return lambda env: left(env) ** right(env)
 
     @_("expr PLUS expr", "expr MINUS expr", "expr TIMES expr", "expr DIVIDE expr")
     def expr(self, p):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
+        left, right = p.expr0, p.expr1
         if p[1] == "+":
-            return p.expr0 + p.expr1
+            return lambda env: left(env) + right(env)
         elif p[1] == "-":
-            return p.expr0 - p.expr1
+            return lambda env: left(env) - right(env)
         elif p[1] == "*":
-            return p.expr0 * p.expr1
+            return lambda env: left(env) * right(env)
         elif p[1] == "/":
-            # Handle division by zero
-            if p.expr1 == 0:
-                raise ZeroDivisionError("Division by zero is not allowed.")
-            return p.expr0 / p.expr1
+
+            def divide(env):
+                numerator, denominator = left(env), right(env)
+                # Handle division by zero
+                if denominator == 0:
+                    raise ZeroDivisionError("Division by zero is not allowed.")
+                return numerator / denominator
+
+            return divide
 
     @_(
         "expr LESS_THAN expr",
@@ -179,23 +215,25 @@ class ProfileParser(Parser):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
+        left, right = p.expr0, p.expr1
         if p[1] == "<":
-            return p.expr0 < p.expr1
+            return lambda env: left(env) < right(env)
         elif p[1] == "==":
-            return p.expr0 == p.expr1
+            return lambda env: left(env) == right(env)
         elif p[1] == ">":
-            return p.expr0 > p.expr1
+            return lambda env: left(env) > right(env)
         elif p[1] == ">=":
-            return p.expr0 >= p.expr1
+            return lambda env: left(env) >= right(env)
         elif p[1] == "<=":
-            return p.expr0 <= p.expr1
+            return lambda env: left(env) <= right(env)
 
     @_("NOT expr")
     def expr(self, p):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
-        return not p.expr
+        operand = p.expr
+        return lambda env: not operand(env)
 
     @_("FUNCTION")
     def expr(self, p):
@@ -203,31 +241,39 @@ class ProfileParser(Parser):
             return self._SYNTAX_VALUE
 
         if p.FUNCTION == "random()":
-            return random()
+            self.volatile = True
+            return lambda env: random()
         elif p.FUNCTION == "unit()":
-            return self.ENV["unit"]
+            return lambda env: env["unit"]
         elif p.FUNCTION == "hours_elapsed()":
-            return self.ENV["hours_elapsed"]
+            self.volatile = True
+            return lambda env: env["hours_elapsed"]
         elif p.FUNCTION == "experiment()":
-            return self.ENV["experiment"]
+            return lambda env: env["experiment"]
         elif p.FUNCTION == "job_name()":
-            return self.ENV["job_name"]
+            return lambda env: env["job_name"]
         else:
-            raise ValueError(f"{p.FUNCTION} is not a valid function in profile expressions.")
+            function = p.FUNCTION
+
+            def invalid_function(env):
+                raise ValueError(f"{function} is not a valid function in profile expressions.")
+
+            return invalid_function
 
     @_("NAME")
     def expr(self, p):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
-        if p.NAME.lower() == "true":
-            return True
-        elif p.NAME.lower() == "false":
-            return False
-        elif p.NAME in self.ENV:
-            return self.ENV[p.NAME]
+        name = p.NAME
+        if name.lower() == "true":
+            return lambda env: True
+        elif name.lower() == "false":
+            return lambda env: False
         else:
-            return p.NAME
+            if name in self._VOLATILE_NAMES:
+                self.volatile = True
+            return lambda env: env[name] if name in env else name
 
     @_('"(" expr ")"')
     def expr(self, p):
@@ -241,75 +287,138 @@ class ProfileParser(Parser):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
-        return float(p.NUMBER)
+        number = float(p.NUMBER)
+        return lambda env: number
 
     @_("UNIT_JOB_SETTING", "COMMON_JOB_SETTING")
-    def expr(self, p) -> bool | float | str:
+    def expr(self, p):
         if self.syntax_only:
             return self._SYNTAX_VALUE
 
         if hasattr(p, "COMMON_JOB_SETTING"):
-            data_string = p.COMMON_JOB_SETTING.replace("::", self.ENV["unit"] + ":")
+            data_string = p.COMMON_JOB_SETTING
         else:
             data_string = p.UNIT_JOB_SETTING
 
-        unit, job, setting_keys = data_string.split(":")
-        setting, *keys = setting_keys.split(".")
+        if data_string not in self.dependencies:
+            self.dependencies.append(data_string)
 
-        # HACK
-        if unit == "unit()":
-            # technically, common mqtt expressions can use ::job:attr, or unit():job:attr - they are equivalent.
-            unit = self.ENV["unit"]
-        if job == "job_name()":
-            job = self.ENV["job_name"]
+        return lambda env: get_job_setting(data_string, env)
 
-        experiment = get_assigned_experiment_name(unit)
+    def error(self, token) -> None:
+        if self.syntax_only:
+            raise SyntaxError("Invalid profile expression.")
 
-        if not is_active(unit):
-            raise NotActiveWorkerError(f"Worker {unit} is not active.")
+        return super().error(token)
 
-        result = subscribe(f"pioreactor/{unit}/{experiment}/{job}/{setting}", timeout=2.0)
 
-        if result:
-            # error handling here
-            try:
-                data_blob = decode(result.payload)
-            except DecodeError:
-                # just a string?
-                return convert_string(result.payload.decode())
+def _resolve_job_setting(data_string: str, env) -> tuple[str, str, str, list[str]]:
+    if data_string.startswith("::"):
+        data_string = data_string.replace("::", env["unit"] + ":", 1)
 
-            value = data_blob
+    unit, job, setting_keys = data_string.split(":")
+    setting, *keys = setting_keys.split(".")
 
-            if len(keys) > 0:
-                # its a nested json object, iteratively nest into it.
-                for key in keys:
-                    if not isinstance(value, dict):
-                        raise TypeError(
-                            f"Expression lookup `{data_string}` attempted nested key access `{key}` "
-                            f"on a non-mapping value of type `{type(value).__name__}`."
-                        )
+    # HACK
+    if unit == "unit()":
+        # technically, common mqtt expressions can use ::job:attr, or unit():job:attr - they are equivalent.
+        unit = env["unit"]
+    if job == "job_name()":
+        job = env["job_name"]
 
-                    if key not in value:
-                        available_keys = ", ".join(str(k) for k in value.keys())
-                        raise KeyError(
-                            f"Expression lookup `{data_string}` referenced missing nested key `{key}`. "
-                            f"Available keys: [{available_keys}]"
-                        )
+    return unit, job, setting, keys
 
-                    value = value[key]
 
-            return convert_string(value)
+def job_setting_topic(data_string: str, env) -> str:
+    """
+    The MQTT topic a job setting, ex: `::od_reading:od1.od`, is read from.
+    """
+    unit, job, setting, _ = _resolve_job_setting(data_string, env)
+    return f"pioreactor/{unit}/{get_assigned_experiment_name(unit)}/{job}/{setting}"
 
-        else:
-            raise MQTTValueError(
-                f"{':'.join([unit, job, setting_keys])} does not exist for experiment `{experiment}`"
-            )
 
-    def error(self, token) -> None:
-        if self.syntax_only:
-            raise SyntaxError("Invalid profile expression.")
+def get_job_setting(data_string: str, env) -> bool | float | str:
+    """
+    Read a job setting, ex: `worker1:stirring:target_rpm`, `::od_reading:od1.od` or `unit():job_name():state`,
+    from its retained MQTT message.
+    """
+    unit, job, setting, keys = _resolve_job_setting(data_string, env)
+    setting_keys = ".".join([setting, *keys])
 
-        return super().error(token)
+    experiment = get_assigned_experiment_name(unit)
+
+    if not is_active(unit):
+        raise NotActiveWorkerError(f"Worker {unit} is not active.")
+
+    payload = get_retained_payload(f"pioreactor/{unit}/{experiment}/{job}/{setting}")
+
+    if payload is not None:
+        # error handling here
+        try:
+            data_blob = decode(payload)
+        except DecodeError:
+            # just a string?
+            return convert_string(payload.decode())
+
+        value = data_blob
+
+        if len(keys) > 0:
+            # its a nested json object, iteratively nest into it.
+            for key in keys:
+                if not isinstance(value, dict):
+                    raise TypeError(
+                        f"Expression lookup `{data_string}` attempted nested key access `{key}` "
+                        f"on a non-mapping value of type `{type(value).__name__}`."
+                    )
+
+                if key not in value:
+                    available_keys = ", ".join(str(k) for k in value.keys())
+                    raise KeyError(
+                        f"Expression lookup `{data_string}` referenced missing nested key `{key}`. "
+                        f"Available keys: [{available_keys}]"
+                    )
+
+                value = value[key]
+
+        return convert_string(value)
+
+    else:
+        raise MQTTValueError(
+            f"{':'.join([unit, job, setting_keys])} does not exist for experiment `{experiment}`"
+        )
+
+
+class CompiledExpression:
+    """
+    An expression, lexed and parsed once. Call it with an env to evaluate it.
+    """
+
+    __slots__ = ("expression", "dependencies", "volatile", "_evaluate")
+
+    def __init__(
+        self, expression: str, evaluate, dependencies: tuple[str, ...], volatile: bool = False
+    ) -> None:
+        self.expression = expression
+        self._evaluate = evaluate
+        self.dependencies = dependencies
+        self.volatile = volatile
+
+    def __call__(self, env=None):
+        if self._evaluate is None:
+            # syntax error or something funky.
+            return None
+        return self._evaluate(env if env else dict())
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.expression!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_profile_expression(profile_string: str) -> CompiledExpression:
+    lexer = ProfileLexer()
+    parser = ProfileParser()
+    evaluate = parser.parse(lexer.tokenize(profile_string))
+    return CompiledExpression(profile_string, evaluate, tuple(parser.dependencies), parser.volatile)
 
 
 def parse_profile_expression_to_bool(profile_string: str, env=None) -> bool:
@@ -322,10 +431,7 @@ def parse_profile_expression_to_bool(profile_string: str, env=None) -> bool:
 
 
 def parse_profile_expression(profile_string: str, env=None):
-    lexer = ProfileLexer()
-    parser = ProfileParser(env)
-    r = parser.parse(lexer.tokenize(profile_string))
-    return r
+    return compile_profile_expression(profile_string)(env)
 
 
 def check_syntax(profile_string: str) -> bool:
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+A long-lived MQTT subscriber that mirrors retained job settings, pioreactor/<unit>/<experiment>/<job>/<setting>,
+into memory, so profile expressions don't connect to the broker for every lookup.
+
+> with mirror_job_settings() as mirror:
+>     parse_profile_expression("worker1:stirring:target_rpm > 400")  # subscribes, waits for the retained value
+>     parse_profile_expression("worker1:stirring:target_rpm > 400")  # served from memory
+"""
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any
+
+from pioreactor import types as pt
+from pioreactor.exc import MQTTValueError
+from pioreactor.pubsub import Client
+from pioreactor.pubsub import create_client
+from pioreactor.pubsub import QOS
+
+
+class _MirroredSetting:
+    __slots__ = ("payload", "updated_at", "settled", "listeners")
+
+    def __init__(self) -> None:
+        self.payload: bytes | None = None
+        self.updated_at: float | None = None
+        # set once the retained value (or its absence) is known, and cleared while disconnected
+        self.settled = threading.Event()
+        self.listeners: list[Callable[[str], None]] = []
+
+
+class JobSettingsMirror:
+    """
+    Topics are subscribed to the first time they are read. That read waits up to `timeout` seconds for the
+    retained message; later reads are served from memory, which the subscription keeps current. A topic with no
+    retained message reads as None, without waiting again.
+
+    While the connection to the broker is down, the mirror can miss changes: reads wait up to `timeout` for the
+    reconnect to deliver the retained messages again, and raise MQTTValueError if it doesn't.
+    """
+
+    def __init__(self, timeout: float = 2.0, client_id: str = "") -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._settings: dict[str, _MirroredSetting] = {}
+        self._connected = False
+        self._client: Client = create_client(
+            client_id=client_id,
+            on_connect=self._on_connect,
+            on_disconnect=self._on_disconnect,
+            on_message=self._on_message,
+        )
+
+    def _setting(self, topic: str) -> _MirroredSetting:
+        with self._lock:
+            setting = self._settings.get(topic)
+            is_new = setting is None
+            if setting is None:
+                setting = self._settings[topic] = _MirroredSetting()
+
+        if is_new:
+            self._client.subscribe(topic, qos=QOS.EXACTLY_ONCE)
+        return setting
+
+    def get(self, topic: str) -> bytes | None:
+        setting = self._setting(topic)
+
+        if not setting.settled.wait(self.timeout):
+            with self._lock:
+                if not self._connected:
+                    if setting.updated_at is None:
+                        raise MQTTValueError(f"Not connected to MQTT, unable to read {topic}.")
+                    age = monotonic() - setting.updated_at
+                    raise MQTTValueError(f"Not connected to MQTT, last value of {topic} is {age:.0f}s old.")
+                # no retained message
+                setting.settled.set()
+
+        return setting.payload
+
+    def age(self, topic: str) -> float | None:
+        """
+        Seconds since the mirrored value of `topic` last changed, or None if it has no value.
+        """
+        with self._lock:
+            setting = self._settings.get(topic)
+            if setting is None or setting.updated_at is None:
+                return None
+            return monotonic() - setting.updated_at
+
+    def add_listener(self, topics: Iterable[str], callback: Callable[[str], None]) -> Callable[[], None]:
+        """
+        Call `callback(topic)` whenever the value of one of `topics` changes. It's called from the MQTT client's
+        thread, so it should return quickly. Returns a function that removes the listener.
+        """
+        settings = [self._setting(topic) for topic in set(topics)]
+        with self._lock:
+            for setting in settings:
+                setting.listeners.append(callback)
+
+        def remove_listener() -> None:
+            with self._lock:
+                for setting in settings:
+                    if callback in setting.listeners:
+                        setting.listeners.remove(callback)
+
+        return remove_listener
+
+    def close(self) -> None:
+        self._client.shutdown()
+
+    def _on_connect(
+        self, client: Client, userdata: Any, flags: Any, reason_code: Any, properties: Any = None
+    ) -> None:
+        with self._lock:
+            self._connected = True
+            topics = list(self._settings)
+
+        # resubscribing (re)delivers the retained messages, which settles the settings again
+        if topics:
+            client.subscribe([(topic, QOS.EXACTLY_ONCE) for topic in topics])
+
+    def _on_disconnect(self, *args: object) -> None:
+        with self._lock:
+            self._connected = False
+            for setting in self._settings.values():
+                setting.settled.clear()
+
+    def _on_message(self, client: Client, userdata: Any, message: pt.MQTTMessage) -> None:
+        with self._lock:
+            setting = self._settings.get(message.topic)
+            if setting is None:
+                return
+
+            # an empty payload clears a retained message
+            payload = message.payload or None
+            # a reconnect redelivers retained messages, which aren't changes
+            changed = payload != setting.payload
+            setting.payload = payload
+            setting.updated_at = monotonic()
+            setting.settled.set()
+            listeners = list(setting.listeners) if changed else []
+
+        for listener in listeners:
+            try:
+                listener(message.topic)
+            except Exception as e:
+                # don't stop the client's network loop, or the other listeners
+                from pioreactor.logging import create_logger
+
+                create_logger("job_settings_mirror", to_mqtt=False).error(e, exc_info=True)
+
+
+_active_mirror: JobSettingsMirror | None = None
+
+
+def get_active_mirror() -> JobSettingsMirror | None:
+    return _active_mirror
+
+
+@contextmanager
+def mirror_job_settings(timeout: float = 2.0, client_id: str = "") -> Iterator[JobSettingsMirror]:
+    """
+    Serve profile expressions' job setting lookups from a JobSettingsMirror for the duration of the block.
+    """
+    global _active_mirror
+
+    mirror = JobSettingsMirror(timeout=timeout, client_id=client_id)
+    previous, _active_mirror = _active_mirror, mirror
+    try:
+        yield mirror
+    finally:
+        _active_mirror = previous
+        mirror.close()
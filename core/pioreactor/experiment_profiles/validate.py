@@ -6,6 +6,7 @@ from msgspec import Struct
 from pioreactor.experiment_profiles import profile_struct as struct
 from pioreactor.experiment_profiles.diagnostics import Diagnostic
 from pioreactor.experiment_profiles.parser import check_syntax
+from pioreactor.experiment_profiles.parser import compile_profile_expression
 from pioreactor.experiment_profiles.plugin_versions import parse_plugin_version_constraint
 
 from packaging.specifiers import InvalidSpecifier
@@ -19,6 +20,8 @@ class ValidationResult(Struct, forbid_unknown_fields=True):
     ok: bool
     diagnostics: list[Diagnostic]
     normalized_profile: struct.Profile | None = None
+    # path of each expression -> the job settings it reads, ex: {"common.jobs.stirring.actions[0].if": ["::od_reading:od1.od"]}
+    dependencies: dict[str, list[str]] = {}
 
 
 def is_bracketed_expression(value: Any) -> bool:
@@ -51,6 +54,19 @@ def check_syntax_of_bool_expression(bool_expression: str | bool) -> str | None:
     return "Syntax error in expression."
 
 
+def expression_dependencies(expression: str | bool) -> tuple[str, ...]:
+    """
+    The job settings an expression reads, ex: `worker1:stirring:target_rpm` or `::od_reading:od1.od`.
+    """
+    if isinstance(expression, bool):
+        return ()
+
+    if is_bracketed_expression(expression):
+        expression = strip_expression_brackets(expression)
+
+    return compile_profile_expression(expression).dependencies
+
+
 def time_to_seconds(value: float | int | str) -> float:
     if isinstance(value, (float, int)):
         return hours_to_seconds(value)
@@ -175,53 +191,47 @@ def _validate_time_field(
     return seconds
 
 
-def _validate_expression_field(
-    diagnostics: list[Diagnostic], *, path: str, expression: str | bool, field_name: str | None = None
-) -> None:
+def _validate_expression_field(diagnostics: list[Diagnostic], *, path: str, expression: str | bool) -> bool:
     error = check_syntax_of_bool_expression(expression)
     if error is None:
-        return
+        return True
 
-    target_path = f"{path}.{field_name}" if field_name is not None else path
     _append_error(
         diagnostics,
         "expression.syntax",
         error,
-        target_path,
+        path,
     )
+    return False
 
 
-def _validate_options_expressions(
-    diagnostics: list[Diagnostic], *, path: str, options: dict[str, Any]
-) -> None:
-    for key, value in options.items():
-        if is_bracketed_expression(value):
-            _validate_expression_field(
-                diagnostics,
-                path=f"{path}.options.{key}",
-                expression=value,
-            )
+def _iter_action_expressions(path: str, action: struct.Action) -> list[tuple[str, str | bool]]:
+    expressions: list[tuple[str, str | bool]] = [(f"{path}.if", action.if_)]
 
+    if isinstance(action, struct.When):
+        if action.condition_:
+            expressions.append((f"{path}.condition", action.condition_))
+        if action.wait_until:
+            expressions.append((f"{path}.wait_until", action.wait_until))
 
-def _validate_config_override_expressions(
-    diagnostics: list[Diagnostic], *, path: str, config_overrides: dict[str, Any]
-) -> None:
-    for key, value in config_overrides.items():
-        if is_bracketed_expression(value):
-            _validate_expression_field(
-                diagnostics,
-                path=f"{path}.config_overrides.{key}",
-                expression=value,
-            )
+    if isinstance(action, struct.Repeat):
+        expressions.append((f"{path}.while", action.while_))
 
+    if isinstance(action, (struct.Start, struct.Update)):
+        for key, value in action.options.items():
+            if is_bracketed_expression(value):
+                expressions.append((f"{path}.options.{key}", value))
 
-def _validate_log_message_expressions(diagnostics: list[Diagnostic], *, path: str, message: str) -> None:
-    for match in re.findall(FLEXIBLE_EXPRESSION_PATTERN, message):
-        _validate_expression_field(
-            diagnostics,
-            path=f"{path}.options.message",
-            expression=match,
-        )
+    if isinstance(action, struct.Start):
+        for key, value in action.config_overrides.items():
+            if is_bracketed_expression(value):
+                expressions.append((f"{path}.config_overrides.{key}", value))
+
+    if isinstance(action, struct.Log):
+        for match in re.findall(FLEXIBLE_EXPRESSION_PATTERN, action.options.message):
+            expressions.append((f"{path}.options.message", match))
+
+    return expressions
 
 
 def _validate_action_structure(diagnostics: list[Diagnostic], *, path: str, action: struct.Action) -> None:
@@ -351,43 +361,14 @@ def _validate_action_time_semantics(
                     )
 
 
-def _validate_action_expressions(diagnostics: list[Diagnostic], *, path: str, action: struct.Action) -> None:
-    _validate_expression_field(diagnostics, path=path, expression=action.if_, field_name="if")
-
-    if isinstance(action, struct.When):
-        if action.condition_:
-            _validate_expression_field(
-                diagnostics,
-                path=path,
-                expression=action.condition_,
-                field_name="condition",
-            )
-        if action.wait_until:
-            _validate_expression_field(
-                diagnostics,
-                path=path,
-                expression=action.wait_until,
-                field_name="wait_until",
-            )
-
-    if isinstance(action, struct.Repeat):
-        _validate_expression_field(
-            diagnostics,
-            path=path,
-            expression=action.while_,
-            field_name="while",
-        )
-
-    if isinstance(action, (struct.Start, struct.Update)):
-        _validate_options_expressions(diagnostics, path=path, options=action.options)
-
-    if isinstance(action, struct.Start):
-        _validate_config_override_expressions(
-            diagnostics, path=path, config_overrides=action.config_overrides
-        )
-
-    if isinstance(action, struct.Log):
-        _validate_log_message_expressions(diagnostics, path=path, message=action.options.message)
+def _validate_action_expressions(
+    diagnostics: list[Diagnostic], dependencies: dict[str, list[str]], *, path: str, action: struct.Action
+) -> None:
+    for expression_path, expression in _iter_action_expressions(path, action):
+        if _validate_expression_field(diagnostics, path=expression_path, expression=expression):
+            for dependency in expression_dependencies(expression):
+                if dependency not in dependencies.setdefault(expression_path, []):
+                    dependencies[expression_path].append(dependency)
 
 
 def _validate_execution_order_for_job(
@@ -430,13 +411,15 @@ def _validate_plugin_versions(diagnostics: list[Diagnostic], plugins: list[struc
 
 def validate_profile(profile: struct.Profile) -> ValidationResult:
     diagnostics: list[Diagnostic] = []
+    dependencies: dict[str, list[str]] = {}
 
     _validate_plugin_versions(diagnostics, profile.plugins)
 
     for path, action in _iter_profile_actions(profile):
         _validate_action_structure(diagnostics, path=path, action=action)
         _validate_action_time_semantics(diagnostics, path=path, action=action)
-        _validate_action_expressions(diagnostics, path=path, action=action)
+        # this also compiles each expression, so evaluating it during a run doesn't parse it again
+        _validate_action_expressions(diagnostics, dependencies, path=path, action=action)
 
     for job_name, job in profile.common.jobs.items():
         _validate_execution_order_for_job(
@@ -457,4 +440,5 @@ def validate_profile(profile: struct.Profile) -> ValidationResult:
         ok=not any(diagnostic.severity == "error" for diagnostic in diagnostics),
         diagnostics=diagnostics,
         normalized_profile=profile,
+        dependencies={path: settings for path, settings in dependencies.items() if settings},
     )
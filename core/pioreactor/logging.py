@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
 from logging import handlers
 from time import sleep
 from typing import Any
@@ -150,8 +151,10 @@ class MQTTHandler(logging.Handler):
             retain=self.retain,
             **self.mqtt_kwargs,
         )
-        # if Python exits too quickly, the last msg might never make it to the broker.
-        mqtt_msg.wait_for_publish(timeout=2)
+        # if Python exits too quickly, the last msg might never make it to the broker. From a callback on the client,
+        # the msg is only sent after the callback returns, so it can't be waited on.
+        if threading.current_thread() is not self.client._thread:
+            mqtt_msg.wait_for_publish(timeout=2)
 
     def close(self) -> None:
         if self.owns_client:
@@ -183,7 +186,7 @@ def create_logger(
         connect and log to MQTT
     """
     import colorlog
-    from pioreactor.pubsub import create_client
+    from pioreactor.pubsub import get_shared_client
 
     logger = logging.getLogger(name)
     extra = {"source": source, "task": task or name}
@@ -233,20 +236,14 @@ def create_logger(
     logger.addHandler(console_handler)
 
     if to_mqtt:
-        mqtt_handler_owns_client = pub_client is None
         if pub_client is None:
-            pub_client = create_client(
-                client_id=f"{name}-logging-{unit}-{experiment}",
-                max_connection_attempts=2,
-                keepalive=15 * 60,
-            )
-        assert pub_client is not None
+            pub_client = get_shared_client()
 
         # create MQTT handlers for logs table
         topic_prefix = (
             f"pioreactor/{unit}/{experiment}/logs/{source}"  # NOTE: we later append the log-level, ex: /debug
         )
-        mqtt_to_db_handler = MQTTHandler(topic_prefix, pub_client, owns_client=mqtt_handler_owns_client)
+        mqtt_to_db_handler = MQTTHandler(topic_prefix, pub_client, owns_client=False)
         mqtt_to_db_handler.setLevel(logging.DEBUG)
         mqtt_to_db_handler.setFormatter(CustomisedJSONFormatter())
 
@@ -11,12 +11,15 @@ import contextlib
 import io
 import os.path
 import ssl
+import threading
 import urllib.parse
 from http.client import HTTPConnection
 from http.client import HTTPException
 from http.client import HTTPMessage
 from http.client import HTTPResponse
 from http.client import HTTPSConnection
+from http.client import RemoteDisconnected
+from time import monotonic
 from typing import Any
 from typing import Generator
 from typing import Iterable
@@ -47,6 +50,12 @@ __all__ = [
 
 DEFAULT_TIMEOUT = 10.0
 DEFAULT_UA = "Python/Pioreactor"
+# keep-alive connections, see _ConnectionPool
+POOL_MAX_IDLE_PER_HOST = 4
+# below servers' keep-alive timeouts (lighttpd's is 5 s), so a pooled connection is rarely closed under a request
+POOL_IDLE_TIMEOUT = 4.0
+# requests that can be sent again if a pooled connection drops after sending them, RFC 9110 9.2.2
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"})
 
 
 def basic_auth(username: str, password: str) -> str:
@@ -148,6 +157,7 @@ def yield_response(
     source_address: str | Tuple[str, int] | None = None,
     max_redirects: int | None = None,
     ssl_context: ssl.SSLContext | None = None,
+    keep_alive: bool = True,
 ) -> Generator[HTTPResponse, None, None]:
     """yield_response is a low-level API that exposes the actual
     http.client.HTTPResponse via a contextmanager.
@@ -177,6 +187,8 @@ def yield_response(
     :type max_redirects: int or None
     :param ssl_context: TLS config to control certificate validation, or None for default behavior
     :type ssl_context: ssl.SSLContext or None
+    :param bool keep_alive: whether to reuse a pooled connection to the host, and return it to the pool if the
+        response was read to the end (default: True). Requests with a source_address or ssl_context aren't pooled.
     :return: http.client.HTTPResponse, yielded as context manager
     :rtype: http.client.HTTPResponse
     :raises: HTTPException
@@ -189,7 +201,7 @@ def yield_response(
     visited_urls: list[str] = []
 
     while max_redirects is None or len(visited_urls) <= max_redirects:
-        url, conn, path = _prepare_request(
+        url, conn, path, pool_key, reused = _prepare_request(
             method,
             url,
             enc_params=enc_params,
@@ -198,13 +210,27 @@ def yield_response(
             verify=verify,
             source_address=source_address,
             ssl_context=ssl_context,
+            keep_alive=keep_alive,
         )
         enc_params = ""  # don't reappend enc_params if we get redirected
         visited_urls.append(url)
+        response: HTTPResponse | None = None
         try:
             try:
-                conn.request(method, path, headers=dict(headers), body=prepared_body)
-                response = conn.getresponse()
+                sent = False
+                try:
+                    conn.request(method, path, headers=dict(headers), body=prepared_body)
+                    sent = True
+                    response = conn.getresponse()
+                except (RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # a POST or PATCH the server received may have been acted on, and mustn't be sent twice
+                    if not reused or pool_key is None or (sent and method not in IDEMPOTENT_METHODS):
+                        raise
+                    # the server closed this pooled connection while it sat idle: retry once on a new one
+                    conn.close()
+                    conn = _new_connection(pool_key, timeout)
+                    conn.request(method, path, headers=dict(headers), body=prepared_body)
+                    response = conn.getresponse()
             except HTTPException:
                 raise
             except IOError as e:
@@ -222,7 +248,16 @@ def yield_response(
                     # 303 See Other: https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/303
                     method = "GET"
         finally:
-            conn.close()
+            # only a connection whose response was read to the end can carry another request
+            if (
+                pool_key is not None
+                and response is not None
+                and response.isclosed()
+                and not response.will_close
+            ):
+                _pool.release(pool_key, conn)
+            else:
+                conn.close()
 
     raise TooManyRedirects(visited_urls)
 
@@ -442,10 +477,12 @@ def _prepare_request(
     unix_socket: str | None = None,
     verify: bool = True,
     ssl_context: ssl.SSLContext | None = None,
-) -> tuple[str, HTTPConnection | HTTPSConnection, str]:
-    import ssl
-
-    """Parses the URL, returns the path and the right HTTPConnection subclass."""
+    keep_alive: bool = False,
+) -> tuple[str, HTTPConnection | HTTPSConnection, str, "_PoolKey | None", bool]:
+    """
+    Parses the URL, returns the path and the right HTTPConnection subclass, with the pool key of the connection
+    (None if it isn't pooled) and whether it was reused from the pool.
+    """
     parsed_url = urllib.parse.urlparse(url)
     is_unix = unix_socket is not None
     scheme = parsed_url.scheme.lower()
@@ -485,15 +522,17 @@ def _prepare_request(
     if isinstance(source_address, str):
         source_address = (source_address, 0)
 
-    conn: HTTPMessage | HTTPConnection
+    conn: HTTPConnection | HTTPSConnection
+    pool_key: _PoolKey | None = None
+    reused = False
     if is_unix:
         raise NotImplementedError("Need this? Get it from https://github.com/slingamn/mureq")
+    elif keep_alive and source_address is None and ssl_context is None:
+        pool_key = (scheme, host, port, verify)
+        conn, reused = _pool.acquire(pool_key, timeout)
     elif is_https:
         if ssl_context is None:
-            ssl_context = ssl.create_default_context()
-            if not verify:
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
+            ssl_context = _default_ssl_context(verify)
         conn = HTTPSConnection(
             host,
             port,
@@ -514,4 +553,107 @@ def _prepare_request(
             parsed_url.fragment,
         )
     )
-    return munged_url, conn, path
+    return munged_url, conn, path, pool_key, reused
+
+
+# (scheme, host, port, verify)
+_PoolKey = tuple[str, str, int, bool]
+
+
+def _default_ssl_context(verify: bool) -> ssl.SSLContext:
+    ssl_context = ssl.create_default_context()
+    if not verify:
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
+def _new_connection(pool_key: _PoolKey, timeout: float | None) -> HTTPConnection | HTTPSConnection:
+    scheme, host, port, verify = pool_key
+    if scheme == "https":
+        return HTTPSConnection(host, port, timeout=timeout, context=_default_ssl_context(verify))
+    return HTTPConnection(host, port, timeout=timeout)
+
+
+def _is_dropped(conn: HTTPConnection) -> bool:
+    # an idle keep-alive socket has nothing to read, unless the server closed it (EOF) or broke protocol
+    import select
+
+    if conn.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class _ConnectionPool:
+    """
+    Process-wide keep-alive connections, keyed by (scheme, host, port, verify). A connection is checked out for one
+    request at a time, and returned only if its response was read to the end. At most max_idle_per_host idle
+    connections are kept per key, and ones idle longer than idle_timeout, or that the server closed, are dropped.
+    """
+
+    def __init__(self, max_idle_per_host: int, idle_timeout: float) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        # most recently used last
+        self._idle: dict[_PoolKey, list[tuple[HTTPConnection | HTTPSConnection, float]]] = {}
+
+    def acquire(
+        self, pool_key: _PoolKey, timeout: float | None
+    ) -> tuple[HTTPConnection | HTTPSConnection, bool]:
+        stale = []
+        conn = None
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked: the sockets are shared with the parent, so don't use (or close) them
+                self._idle = {}
+                self._pid = os.getpid()
+
+            idle = self._idle.get(pool_key, [])
+            now = monotonic()
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used > self.idle_timeout:
+                    stale.append(candidate)
+                    stale.extend(c for c, _ in idle)  # older still
+                    idle.clear()
+                else:
+                    conn = candidate
+                    break
+
+        for c in stale:
+            c.close()
+
+        if conn is not None and not _is_dropped(conn):
+            conn.timeout = timeout
+            assert conn.sock is not None
+            conn.sock.settimeout(timeout)
+            return conn, True
+        elif conn is not None:
+            conn.close()
+
+        return _new_connection(pool_key, timeout), False
+
+    def release(self, pool_key: _PoolKey, conn: HTTPConnection | HTTPSConnection) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                idle = self._idle.setdefault(pool_key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append((conn, monotonic()))
+                    return
+        conn.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+
+_pool = _ConnectionPool(POOL_MAX_IDLE_PER_HOST, POOL_IDLE_TIMEOUT)
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import importlib
-import importlib.metadata as entry_point
 import os
 from typing import Any
 
@@ -55,8 +54,10 @@ __all__ = [
     "click_list_plugins",
     "click_uninstall_plugin",
     "get_plugin_api_url",
+    "get_plugin_index",
     "get_plugins",
     "load_plugins",
+    "rebuild_plugin_index",
 ]
 
 
@@ -73,6 +74,14 @@ def __getattr__(attr: str) -> Any:
         from pioreactor.plugin_management.uninstall_plugin import click_uninstall_plugin
 
         return click_uninstall_plugin
+    elif attr == "get_plugin_index":
+        from pioreactor.plugin_management.plugin_index import get_plugin_index
+
+        return get_plugin_index
+    elif attr == "rebuild_plugin_index":
+        from pioreactor.plugin_management.plugin_index import rebuild_plugin_index
+
+        return rebuild_plugin_index
     raise AttributeError(attr)
 
 
@@ -89,8 +98,9 @@ def get_plugin_api_url(py_file: str) -> str:
 
 def get_plugins() -> dict[str, Plugin]:
     """
-    This function is really time consuming...
+    This function is really time consuming... `pio run` uses the plugin index instead, see get_plugin_index.
     """
+    import importlib.metadata as entry_point
 
     plugins: dict[str, Plugin] = {}
 
@@ -3,6 +3,7 @@ import click
 from pioreactor.exc import BashScriptError
 from pioreactor.plugin_management.package_operations import install_plugin_assets
 from pioreactor.plugin_management.package_operations import install_plugin_package
+from pioreactor.plugin_management.plugin_index import update_plugin_index
 from pioreactor.whoami import UNIVERSAL_EXPERIMENT
 
 
@@ -25,6 +26,8 @@ def install_plugin(name_of_plugin: str, source: str | None = None) -> None:
         logger.debug(str(exc))
         raise BashScriptError(f"Failed to install plugin {name_of_plugin}.") from exc
 
+    update_plugin_index(logger)
+
 
 @click.command(name="install", short_help="install a plugin")
 @click.argument("name-of-plugin")
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+A persisted index of what plugins add to `pio run`, so that running a command imports only the plugin it comes
+from, instead of every plugin (see get_plugins).
+
+> index = get_plugin_index()
+> index.commands["my_job"].target  # "my_plugin:click_my_job"
+
+The index is checked against the plugin files' mtimes and the site-packages folders' mtimes, which change when a
+package is installed, upgraded or removed, and then against the versions of the entry-point plugins' packages. If
+something changed, or a plugin failed to load last time, it is rebuilt, which imports every plugin.
+`pio plugins install` and `pio plugins uninstall` rebuild it.
+"""
+import os
+import sys
+from types import ModuleType
+from typing import Iterable
+from typing import Iterator
+from typing import TYPE_CHECKING
+
+from msgspec import DecodeError
+from msgspec import Struct
+from msgspec.json import decode as loads
+from msgspec.json import encode as dumps
+from pioreactor.plugin_management.utils import discover_plugins_in_local_folder
+
+if TYPE_CHECKING:
+    from pioreactor.logging import CustomLogger
+
+# `pio run` commands that look up classes that plugins register when imported, and where
+REGISTRIES = {
+    "dosing_automation": ("pioreactor.background_jobs.dosing_automation", "available_dosing_automations"),
+    "led_automation": ("pioreactor.background_jobs.led_automation", "available_led_automations"),
+    "temperature_automation": (
+        "pioreactor.background_jobs.temperature_automation",
+        "available_temperature_automations",
+    ),
+}
+# Struct base classes in pioreactor.structs whose subclasses are decoded with subclass_union, ex: calibrations read by
+# od_reading, stirring and the pumps. Every built-in `pio run` command imports the plugins that define subclasses.
+SUBCLASSED_STRUCTS = ("CalibrationBase", "EstimatorBase", "AutomationEvent")
+# `pio run` commands that read what plugins register in ways the index can't attribute to a plugin, ex: parsers
+# added with register_source_to_sink. Running one imports every plugin, as get_plugins does.
+LOADS_ALL_PLUGINS = frozenset({"mqtt_to_db_streaming"})
+
+
+class IndexedCommand(Struct):
+    target: str  # "module:attribute", the attribute possibly dotted
+    short_help: str  # as `pio run --help` shows it
+
+
+class PluginIndex(Struct):
+    commands: dict[str, IndexedCommand]
+    # `pio run` command -> plugin modules to import before running it, see REGISTRIES
+    registrations: dict[str, list[str]]
+    # plugin modules to import before running any built-in command, see SUBCLASSED_STRUCTS
+    struct_modules: list[str]
+    files: dict[str, int]  # plugin file -> mtime, ns
+    site_dirs: dict[str, int]  # site-packages folder -> mtime, ns
+    dists: dict[str, str]  # entry-point plugin package -> version
+    complete: bool = True  # False if a plugin failed to load
+
+
+def _plugin_files() -> dict[str, int]:
+    return {str(py_file): py_file.stat().st_mtime_ns for py_file in discover_plugins_in_local_folder()}
+
+
+def _site_dirs() -> dict[str, int]:
+    mtimes = {}
+    for path in sys.path:
+        if os.path.basename(path) in ("site-packages", "dist-packages") and os.path.isdir(path):
+            mtimes[path] = os.stat(path).st_mtime_ns
+    return mtimes
+
+
+def _entry_point_dists() -> dict[str, str]:
+    from pioreactor.plugin_management.utils import discover_plugins_in_entry_points
+
+    return {
+        plugin.dist.name: plugin.dist.version
+        for plugin in discover_plugins_in_entry_points()
+        if plugin.dist is not None
+    }
+
+
+def _module_name(obj: object) -> str:
+    return obj.__name__ if isinstance(obj, ModuleType) else obj.__module__  # type: ignore[attr-defined]
+
+
+def _defined_in(classes: Iterable[type], plugin_modules: list[str]) -> set[str]:
+    # the plugin modules (or packages) that the classes are defined in
+    return {
+        module_name
+        for klass in classes
+        for module_name in plugin_modules
+        if klass.__module__ == module_name or klass.__module__.startswith(module_name + ".")
+    }
+
+
+def _subclasses(cls: type) -> Iterator[type]:
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def build_plugin_index() -> PluginIndex:
+    """
+    Import every plugin, and index its `pio run` commands and registrations. This is slow.
+    """
+    import importlib
+
+    import click
+    from pioreactor import structs
+    from pioreactor.plugin_management import get_plugins
+    from pioreactor.plugin_management.utils import discover_plugins_in_entry_points
+
+    plugins = get_plugins()
+    # get_plugins skips, and prints, the plugins that fail to load
+    discovered = len(discover_plugins_in_entry_points()) + len(discover_plugins_in_local_folder())
+
+    commands: dict[str, IndexedCommand] = {}
+    plugin_modules: list[str] = []
+    for plugin in plugins.values():
+        module_name = _module_name(plugin.module)
+        plugin_modules.append(module_name)
+        # non-module entry points (module:attr) are indexed by their path from the module
+        prefix = "" if isinstance(plugin.module, ModuleType) else f"{plugin.module.__qualname__}."
+        for attribute in dir(plugin.module):
+            if not attribute.startswith("click_"):
+                continue
+            command = getattr(plugin.module, attribute)
+            if isinstance(command, click.Command) and command.name is not None and not command.hidden:
+                commands[command.name] = IndexedCommand(
+                    f"{module_name}:{prefix}{attribute}", command.get_short_help_str()
+                )
+
+    registrations: dict[str, list[str]] = {}
+    for command_name, (registry_module, registry_name) in REGISTRIES.items():
+        registry = getattr(importlib.import_module(registry_module), registry_name)
+        registrants = _defined_in(registry.values(), plugin_modules)
+        if registrants:
+            registrations[command_name] = sorted(registrants)
+
+    struct_modules = set()
+    for struct_name in SUBCLASSED_STRUCTS:
+        struct_modules |= _defined_in(_subclasses(getattr(structs, struct_name)), plugin_modules)
+
+    return PluginIndex(
+        commands=commands,
+        registrations=registrations,
+        struct_modules=sorted(struct_modules),
+        files=_plugin_files(),
+        site_dirs=_site_dirs(),
+        dists=_entry_point_dists(),
+        complete=len(plugins) >= discovered,
+    )
+
+
+def save_plugin_index(index: PluginIndex) -> None:
+    from pioreactor.utils.sqlite_cache import local_persistent_storage
+
+    with local_persistent_storage("plugin_index") as cache:
+        cache["index"] = dumps(index)
+
+
+def rebuild_plugin_index() -> PluginIndex:
+    index = build_plugin_index()
+    save_plugin_index(index)
+    return index
+
+
+def update_plugin_index(logger: "CustomLogger") -> None:
+    """
+    Rebuild the index after installing or uninstalling a plugin. A failure is logged, and the index is rebuilt on
+    the next `pio run` instead.
+    """
+    import importlib
+
+    # the package was (un)installed by pip, after this process cached the contents of sys.path's folders
+    importlib.invalidate_caches()
+    try:
+        rebuild_plugin_index()
+    except Exception as e:
+        logger.debug(f"Unable to rebuild the plugin index: {e}", exc_info=True)
+
+
+def get_plugin_index() -> PluginIndex:
+    """
+    The persisted plugin index, rebuilt first if it's out of date.
+    """
+    if os.environ.get("SKIP_PLUGINS"):
+        return PluginIndex(commands={}, registrations={}, struct_modules=[], files={}, site_dirs={}, dists={})
+
+    from pioreactor.utils.sqlite_cache import local_persistent_storage
+
+    with local_persistent_storage("plugin_index") as cache:
+        stored = cache.get("index")
+
+    try:
+        index = loads(stored, type=PluginIndex) if isinstance(stored, bytes) else None
+    except DecodeError:
+        # an older format, ex: without struct_modules
+        index = None
+
+    if index is None or not index.complete or index.files != _plugin_files():
+        return rebuild_plugin_index()
+
+    site_dirs = _site_dirs()
+    if index.site_dirs != site_dirs:
+        # something was installed, upgraded or removed: were any plugins?
+        if index.dists != _entry_point_dists():
+            return rebuild_plugin_index()
+        index.site_dirs = site_dirs
+        save_plugin_index(index)
+
+    return index
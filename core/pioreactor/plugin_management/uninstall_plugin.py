@@ -3,6 +3,7 @@ import click
 from pioreactor.exc import BashScriptError
 from pioreactor.plugin_management.package_operations import uninstall_plugin_assets
 from pioreactor.plugin_management.package_operations import uninstall_plugin_package
+from pioreactor.plugin_management.plugin_index import update_plugin_index
 from pioreactor.plugin_management.utils import discover_plugins_in_local_folder
 from pioreactor.whoami import UNIVERSAL_EXPERIMENT
 
@@ -18,6 +19,7 @@ def uninstall_plugin(name_of_plugin: str) -> None:
         if py_file.stem == name_of_plugin:
             py_file.unlink()
             logger.notice(f"Successfully uninstalled plugin {name_of_plugin} from local plugins folder.")
+            update_plugin_index(logger)
             return
 
     try:
@@ -32,6 +34,7 @@ def uninstall_plugin(name_of_plugin: str) -> None:
         logger.warning(f"Unable to uninstall: plugin {name_of_plugin} is not installed.")
     elif result.returncode == 0:
         logger.notice(f"Successfully uninstalled plugin {name_of_plugin}.")
+        update_plugin_index(logger)
     else:
         logger.error(f"Failed to uninstall plugin {name_of_plugin}.")
         logger.debug(result.stdout)
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
-import importlib.metadata as entry_point
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from pioreactor.whoami import is_testing_env
 
+if TYPE_CHECKING:
+    from importlib.metadata import EntryPoint
+
 
 def discover_plugins_in_local_folder() -> list[Path]:
     if is_testing_env():
@@ -32,5 +35,8 @@ def discover_plugins_in_local_folder() -> list[Path]:
     return sorted(MODULE_DIR.glob("*.py"))
 
 
-def discover_plugins_in_entry_points() -> list[entry_point.EntryPoint]:
+def discover_plugins_in_entry_points() -> list["EntryPoint"]:
+    # imported here, since importlib.metadata is slow to import, and `pio run` only needs it to rebuild the plugin index
+    import importlib.metadata as entry_point
+
     return list(entry_point.entry_points(group="pioreactor.plugins"))
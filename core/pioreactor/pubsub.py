@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
+import atexit
 import random
 import socket
 import string
 import sys
 import threading
+from collections import deque
 from contextlib import suppress
 from os import environ
+from os import getpid
+from time import monotonic
 from time import sleep
 from typing import Any
 from typing import Callable
@@ -14,6 +18,7 @@ from typing import TYPE_CHECKING
 from msgspec import Struct
 from msgspec.json import decode as loads
 from paho.mqtt.client import Client as PahoClient
+from paho.mqtt.client import MQTTMessageInfo
 from paho.mqtt.enums import CallbackAPIVersion
 from paho.mqtt.enums import MQTTErrorCode
 from pioreactor import types as pt
@@ -75,6 +80,11 @@ class QOS:
     EXACTLY_ONCE = 2
 
 
+# the shared connection carries the QoS>0 publishes of every job and logger in the process, so it queues more than a
+# job's own connection. Publishes beyond this are dropped by paho, and logged.
+SHARED_CLIENT_MAX_QUEUED_MESSAGES = 1000
+
+
 def create_client(
     hostname: str = mqtt_address,
     last_will: dict[str, Any] | None = None,
@@ -90,6 +100,7 @@ def create_client(
     port: int = config.getint("mqtt", "broker_port", fallback=1883),
     tls: bool = config.getboolean("mqtt", "use_tls", fallback="0"),
     skip_loop: bool = False,
+    max_queued_messages: int = 100,
 ) -> Client:
     """
     Create a MQTT client and connect to a host.
@@ -118,7 +129,7 @@ def create_client(
     )
     # set a finite queue for QOS>0 messages, so that if we lose connection, we don't store an unlimited number of messages. When the network comes back on, we don't want
     # a storm of messages (it also causes problems when multiple triggers are sent to execute methods.)
-    client.max_queued_messages_set(100)
+    client.max_queued_messages_set(max_queued_messages)
 
     if tls:
         import ssl
@@ -157,21 +168,260 @@ def create_client(
     return client
 
 
+class _Route:
+    __slots__ = ("callback", "allow_retained", "seen")
+
+    def __init__(self, callback: Callable[[pt.MQTTMessage], Any], allow_retained: bool) -> None:
+        self.callback = callback
+        self.allow_retained = allow_retained
+        # topic -> hash of the last payload delivered, to drop retained messages redelivered for another callback
+        self.seen: dict[str, int] = {}
+
+    def deliver(self, message: pt.MQTTMessage) -> None:
+        payload_hash = hash(message.payload)
+        if message.retain and (not self.allow_retained or self.seen.get(message.topic) == payload_hash):
+            return
+        self.seen[message.topic] = payload_hash
+
+        try:
+            self.callback(message)
+        except Exception as e:
+            from pioreactor.logging import create_logger
+
+            create_logger("pubsub", to_mqtt=False).error(e, exc_info=True)
+
+
+class ConnectionMultiplexer:
+    """
+    One MQTT connection per process, shared by `publish`, `subscribe`, loggers, and background jobs' publishing,
+    instead of a connection (and TCP handshake) each. The connection is made on first use, and paho reconnects it
+    in the background if it drops.
+
+    Subscriptions are reference-counted per topic filter: the broker subscription is made for the first callback,
+    and removed after the last one is. Each message is routed to the callbacks of the filters it matches. A new
+    callback on a filter already subscribed to still gets its retained messages, without the other callbacks on
+    that filter getting them twice.
+
+    Last wills aren't multiplexed: the broker keeps one will per connection, so a job that needs one keeps its own
+    connection for it. See _BackgroundJob._create_sub_client.
+
+    Callbacks run on the connection's network thread, which is also the thread that sends publishes. A callback
+    can publish, but can't wait for its publish to be sent: `publish` doesn't wait when called from a callback.
+
+    Loggers and jobs don't shut the connection down, so at exit it's flushed: publishes not yet sent or acknowledged
+    are waited on for a few seconds.
+    """
+
+    def __init__(self, hostname: str = mqtt_address) -> None:
+        self.hostname = hostname
+        self._lock = threading.RLock()
+        self._reset()
+        atexit.register(self.shutdown)
+
+    def _reset(self) -> None:
+        self._pid = getpid()
+        self._client: Client | None = None
+        # topic filter -> callbacks, and the highest qos asked for
+        self._routes: dict[str, list[_Route]] = {}
+        self._qos: dict[str, int] = {}
+        # publishes not yet sent (QoS 0) or acknowledged (QoS 1, 2), oldest first
+        self._unpublished: deque[MQTTMessageInfo] = deque(maxlen=SHARED_CLIENT_MAX_QUEUED_MESSAGES)
+        self._dropped_publishes = 0
+
+    def client(self) -> Client:
+        with self._lock:
+            if self._pid != getpid():
+                # forked: the connection belongs to the parent
+                self._reset()
+
+            if self._client is None:
+                client = create_client(
+                    hostname=self.hostname,
+                    client_id=f"{socket.gethostname()}-shared",
+                    on_connect=self._on_connect,
+                    on_disconnect=self._on_disconnect,
+                    max_connection_attempts=1,
+                    skip_loop=True,
+                    max_queued_messages=SHARED_CLIENT_MAX_QUEUED_MESSAGES,
+                )
+                # a callback's error is logged by its route, and must not stop the network loop.
+                client.suppress_exceptions = True
+                if client.socket() is None:
+                    # the broker isn't reachable (yet): keep trying in the background, like a reconnect
+                    client.connect_async(
+                        self.hostname, config.getint("mqtt", "broker_port", fallback=1883), keepalive=60
+                    )
+                client.loop_start()
+                self._client = client
+
+            return self._client
+
+    def on_network_thread(self) -> bool:
+        """
+        True if called from a callback on the shared connection.
+        """
+        return threading.current_thread() is self.client()._thread
+
+    def publish(
+        self,
+        topic: str,
+        payload: str | bytes | bytearray | int | float | None,
+        qos: int = QOS.AT_MOST_ONCE,
+        retain: bool = False,
+    ) -> MQTTMessageInfo:
+        msg = self.client().publish(topic, payload, qos=qos, retain=retain)
+
+        with self._lock:
+            if msg.rc == MQTTErrorCode.MQTT_ERR_QUEUE_SIZE:
+                self._dropped_publishes += 1
+                dropped_publishes = self._dropped_publishes
+            else:
+                while self._unpublished and self._unpublished[0].is_published():
+                    self._unpublished.popleft()
+                self._unpublished.append(msg)
+                return msg
+
+        if dropped_publishes % 100 == 1:
+            from pioreactor.logging import create_logger
+
+            create_logger("pubsub", to_mqtt=False).warning(
+                f"The MQTT client's queue is full, and dropped a publish to {topic}. {dropped_publishes} dropped so far."
+            )
+        return msg
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """
+        Wait, up to `timeout` seconds, for the publishes made so far to be sent (QoS 0) or acknowledged (QoS 1, 2).
+        """
+        with self._lock:
+            if self._pid != getpid() or self._client is None:
+                return
+            unpublished = list(self._unpublished)
+
+        deadline = monotonic() + timeout
+        for msg in unpublished:
+            try:
+                msg.wait_for_publish(timeout=max(0.0, deadline - monotonic()))
+            except (ValueError, RuntimeError):
+                # not connected, or the connection was lost: it won't be sent.
+                pass
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        Flush, then disconnect, the shared connection. Registered to run at exit.
+        """
+        self.flush(timeout)
+        with self._lock:
+            if self._pid != getpid() or self._client is None:
+                return
+            client, self._client = self._client, None
+        client.shutdown()
+
+    def subscribe(
+        self,
+        topics: str | list[str],
+        callback: Callable[[pt.MQTTMessage], Any],
+        qos: int = QOS.EXACTLY_ONCE,
+        allow_retained: bool = True,
+    ) -> Callable[[], None]:
+        """
+        Call `callback(message)`, from the connection's network thread, for messages on `topics`. Returns a
+        function that removes the callback.
+        """
+        topics = [topics] if isinstance(topics, str) else list(topics)
+        route = _Route(callback, allow_retained)
+        to_subscribe = []
+
+        with self._lock:
+            client = self.client()
+            for topic in topics:
+                routes = self._routes.get(topic)
+                if routes is None:
+                    routes = self._routes[topic] = []
+                    client.message_callback_add(topic, self._dispatcher(topic))
+                    to_subscribe.append(topic)
+                elif allow_retained:
+                    # subscribing again has the broker send the filter's retained messages, for the new callback
+                    to_subscribe.append(topic)
+                routes.append(route)
+                self._qos[topic] = max(qos, self._qos.get(topic, qos))
+
+            if to_subscribe:
+                client.subscribe([(topic, self._qos[topic]) for topic in to_subscribe])
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if self._pid != getpid() or self._client is None:
+                    return
+
+                for topic in topics:
+                    routes = self._routes.get(topic)
+                    if routes is None or route not in routes:
+                        continue
+                    routes.remove(route)
+                    if not routes:
+                        del self._routes[topic], self._qos[topic]
+                        self._client.message_callback_remove(topic)
+                        self._client.unsubscribe(topic)
+
+        return unsubscribe
+
+    def _dispatcher(self, topic: str) -> Callable[[Client, Any, pt.MQTTMessage], None]:
+        def dispatch(client: Client, userdata: Any, message: pt.MQTTMessage) -> None:
+            with self._lock:
+                routes = list(self._routes.get(topic, ()))
+            for route in routes:
+                route.deliver(message)
+
+        return dispatch
+
+    def _on_connect(
+        self, client: Client, userdata: Any, flags: Any, reason_code: Any, properties: Any = None
+    ) -> None:
+        with self._lock:
+            subscriptions = list(self._qos.items())
+        if subscriptions:
+            client.subscribe(subscriptions)
+
+    def _on_disconnect(self, *args: Any) -> None:
+        # the reconnect redelivers retained messages, and callbacks get them again, like they would on a new connection.
+        with self._lock:
+            for routes in self._routes.values():
+                for route in routes:
+                    route.seen.clear()
+
+
+connection_multiplexer = ConnectionMultiplexer()
+
+
+def get_shared_client() -> Client:
+    """
+    The process's shared MQTT connection. Don't shut it down, or set its callbacks.
+    """
+    return connection_multiplexer.client()
+
+
 def publish(
     topic: str, message: str | bytes | bytearray | int | float | None, retries: int = 3, **mqtt_kwargs: Any
 ) -> None:
+    """
+    Publish on the process's shared connection, and wait for the message to be sent (QoS 0) or acknowledged
+    (QoS 1, 2). Raises ConnectionRefusedError if it isn't, after `retries` attempts.
+
+    Called from a callback on the shared connection, this doesn't wait: the message is only sent by the connection's
+    network thread, after the callback returns.
+    """
+    if connection_multiplexer.on_network_thread():
+        connection_multiplexer.publish(topic, message, **mqtt_kwargs)
+        return
+
     for retry_count in range(retries):
         try:
-            with create_client() as client:
-                msg = client.publish(
-                    topic,
-                    message,
-                    **mqtt_kwargs,
-                )
-                msg.wait_for_publish(timeout=10)
+            msg = connection_multiplexer.publish(topic, message, **mqtt_kwargs)
+            msg.wait_for_publish(timeout=10)
 
-                if not msg.is_published():
-                    raise RuntimeError()
+            if not msg.is_published():
+                raise RuntimeError()
 
             return
         except RuntimeError:
@@ -200,7 +450,9 @@ def subscribe(
 ) -> pt.MQTTMessage | None:
     """
     Modeled closely after the paho version, this also includes some try/excepts and
-    a timeout. Note that this _does_ disconnect after receiving a single message.
+    a timeout. Note that this _does_ unsubscribe after receiving a single message.
+
+    This subscribes on the process's shared connection, see ConnectionMultiplexer.
 
     A failure case occurs if this is called in a thread (eg: a callback) and is waiting
     indefinitely for a message. The parent job may not exit properly.
@@ -211,7 +463,32 @@ def subscribe(
     name:
         Optional: provide a name, and logging will include it.
     """
+    qos = mqtt_kwargs.pop("qos", QOS.EXACTLY_ONCE)
+
+    if connection_multiplexer.on_network_thread():
+        # called from a callback on the shared connection, whose network thread can't deliver the message we wait for.
+        return _subscribe_on_new_client(topics, timeout, allow_retained, qos)
+
+    messages: list[pt.MQTTMessage] = []
+    received = threading.Event()
 
+    def on_message(message: pt.MQTTMessage) -> None:
+        if not received.is_set():
+            messages.append(message)
+            received.set()
+
+    unsubscribe = connection_multiplexer.subscribe(topics, on_message, qos=qos, allow_retained=allow_retained)
+    try:
+        received.wait(timeout)
+    finally:
+        unsubscribe()
+
+    return messages[0] if messages else None
+
+
+def _subscribe_on_new_client(
+    topics: str | list[str], timeout: float | None, allow_retained: bool, qos: int
+) -> pt.MQTTMessage | None:
     lock: threading.Lock | None
 
     def on_connect(
@@ -239,7 +516,7 @@ def subscribe(
 
     topics = [topics] if isinstance(topics, str) else topics
     userdata: dict[str, Any] = {
-        "topics": [(topic, mqtt_kwargs.pop("qos", QOS.EXACTLY_ONCE)) for topic in topics],
+        "topics": [(topic, qos) for topic in topics],
         "messages": None,
         "lock": lock,
     }
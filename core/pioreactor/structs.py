@@ -19,6 +19,9 @@ from pioreactor import types as pt
 from pioreactor.logging import create_logger
 from pioreactor.utils.files import is_valid_unix_filename
 
+if t.TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
 
 T = t.TypeVar("T")
 
@@ -172,6 +175,16 @@ class RawPDReading(JSONPrintedStruct):
     channel: pt.PdChannel
 
 
+class RawPDSamples(JSONPrintedStruct):
+    """
+    The raw ADC samples behind one read: per channel, the seconds since the read started and the sampled value.
+    """
+
+    timestamp: t.Annotated[datetime, Meta(tz=True)]
+    sample_times: dict[pt.PdChannel, list[float]]
+    samples: dict[pt.PdChannel, list[pt.AnalogValue]]
+
+
 class CalibratedODReading(JSONPrintedStruct, tag=1, tag_field="calibrated"):
     timestamp: t.Annotated[datetime, Meta(tz=True)]
     angle: pt.PdAngle
@@ -397,6 +410,15 @@ class CalibrationBase(Struct, tag_field="calibration_type", kw_only=True):
         else:
             raise exc.SolutionAboveDomainError("Solution below domain")
 
+    def y_to_x_many(self, ys: t.Sequence[Y], enforce_bounds: bool = False) -> "npt.NDArray[np.float64]":
+        """
+        predict x given many y, with nan where y_to_x would raise. Much faster than calling y_to_x for each, see
+        CalibrationInverse, which can be kept to convert more y's later.
+        """
+        from pioreactor.utils.calibration_inverses import CalibrationInverse
+
+        return CalibrationInverse(self).y_to_x_many(ys, enforce_bounds=enforce_bounds)
+
     def is_active(self, device: str) -> bool:
         from pioreactor.utils import local_persistent_storage
 
@@ -699,6 +721,7 @@ class ExportDatasetsRequest(Struct, forbid_unknown_fields=True):
     partition_by_experiment: bool
     start_time: t.Annotated[datetime, Meta(tz=True)] | None = None
     end_time: t.Annotated[datetime, Meta(tz=True)] | None = None
+    output_format: t.Literal["csv", "npz"] = "csv"
 
     def __post_init__(self) -> None:
         if not self.experiment:
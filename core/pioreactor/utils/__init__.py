@@ -313,13 +313,9 @@ def is_pio_job_running(target_jobs: str | list[str]) -> bool | list[bool]:
     else:
         jobs_to_check = target_jobs  # type: ignore[assignment]
 
-    results = []
+    from pioreactor.utils.job_manager import running_jobs
 
-    from pioreactor.utils.job_manager import JobManager
-
-    with JobManager() as jm:
-        for job in jobs_to_check:
-            results.append(jm.is_job_running(job))
+    results = [running_jobs.is_job_running(job) for job in jobs_to_check]
 
     if is_single_job_name:
         return results[0]
@@ -330,10 +326,9 @@ def get_running_pio_job_id(job_name: str) -> int | None:
     """
     Return the running job_id for `job_name`, or None if not running.
     """
-    from pioreactor.utils.job_manager import JobManager
+    from pioreactor.utils.job_manager import running_jobs
 
-    with JobManager() as jm:
-        return jm.get_running_job_id(job_name)
+    return running_jobs.get_job_id(job_name)
 
 
 def get_cpu_temperature() -> float:
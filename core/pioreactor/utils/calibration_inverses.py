@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from bisect import bisect_left
+from bisect import bisect_right
+from math import isfinite
+from typing import Sequence
+from typing import TYPE_CHECKING
+
+from pioreactor import exc
+from pioreactor import structs
+from pioreactor.utils.piecewise_cubics import parse_piecewise_cubic_data
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
+# y_to_x's results are rounded to 10 decimals, so refining further than this changes nothing
+REFINE_TOLERANCE = 1e-14
+MAX_REFINE_ITERATIONS = 60
+
+
+class _Curve:
+    # A calibration's curve_data_ parsed once: Python lists for fast scalar evaluation, and NumPy arrays for
+    # evaluating many points at once. Same formulas as poly_eval, spline_eval and akima_eval.
+    def __init__(self, curve_data: structs.CalibrationCurveData) -> None:
+        import numpy as np
+
+        self.is_poly = isinstance(curve_data, structs.PolyFitCoefficients)
+        if self.is_poly:
+            self.coefficients_array = np.asarray(curve_data.coefficients, dtype=float)
+            self.derivative_array = np.polyder(self.coefficients_array)
+            self.coefficients: list[float] = self.coefficients_array.tolist()
+            self.derivative: list[float] = self.derivative_array.tolist()
+            self.knots_array = np.asarray([], dtype=float)
+        else:
+            knots, coefficients = parse_piecewise_cubic_data(curve_data, type(curve_data), "curve_data_")
+            self.knots_array = knots
+            self.coefficients_array = coefficients
+            self.knots: list[float] = knots.tolist()
+            self.piecewise_coefficients: list[tuple[float, float, float, float]] = [
+                (a, b, c, d) for a, b, c, d in coefficients.tolist()
+            ]
+            self._last_interval = len(self.knots) - 2
+
+    def eval(self, x: float) -> float:
+        if self.is_poly:
+            y = 0.0
+            for c in self.coefficients:
+                y = y * x + c
+            return y
+        index = min(max(bisect_right(self.knots, x) - 1, 0), self._last_interval)
+        u = x - self.knots[index]
+        a, b, c, d = self.piecewise_coefficients[index]
+        return a + b * u + c * u**2 + d * u**3
+
+    def eval_derivative(self, x: float) -> float:
+        if self.is_poly:
+            dy = 0.0
+            for c in self.derivative:
+                dy = dy * x + c
+            return dy
+        index = min(max(bisect_right(self.knots, x) - 1, 0), self._last_interval)
+        u = x - self.knots[index]
+        _, b, c, d = self.piecewise_coefficients[index]
+        return b + 2.0 * c * u + 3.0 * d * u**2
+
+    def eval_many(
+        self, x: "npt.NDArray[np.float64]"
+    ) -> "tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]":
+        # values and derivatives at every x
+        import numpy as np
+
+        if self.is_poly:
+            return np.polyval(self.coefficients_array, x), np.polyval(self.derivative_array, x)
+        index = np.clip(np.searchsorted(self.knots_array, x, side="right") - 1, 0, self._last_interval)
+        u = x - self.knots_array[index]
+        coefficients = self.coefficients_array[index]
+        a, b, c, d = (coefficients[..., i] for i in range(4))
+        return a + b * u + c * u**2 + d * u**3, b + 2.0 * c * u + 3.0 * d * u**2
+
+    def critical_points(self, lower: float, upper: float) -> list[float]:
+        # where the derivative is zero in (lower, upper), and the knots there: the curve is monotone between them
+        import numpy as np
+
+        def real_roots(coefficients: "npt.NDArray[np.float64]") -> list[float]:
+            nonzero = np.flatnonzero(coefficients)
+            if nonzero.size == 0 or nonzero[0] == coefficients.size - 1:
+                return []
+            roots = np.roots(coefficients[nonzero[0] :])
+            return [float(r.real) for r in roots if abs(r.imag) <= 1e-10 * (abs(r.real) + 1.0)]
+
+        if self.is_poly:
+            points = real_roots(self.derivative_array)
+        else:
+            points = list(self.knots)
+            for index, (_, b, c, d) in enumerate(self.piecewise_coefficients):
+                # each cubic also covers x beyond the first and last knots
+                start = -np.inf if index == 0 else self.knots[index]
+                end = np.inf if index == self._last_interval else self.knots[index + 1]
+                for u in real_roots(np.asarray([3.0 * d, 2.0 * c, b])):
+                    if start <= self.knots[index] + u <= end:
+                        points.append(self.knots[index] + u)
+
+        return [x for x in points if lower < x < upper]
+
+
+class CalibrationInverse:
+    """
+    y_to_x, precomputed for one calibration.
+
+    y_to_x root-solves the calibration's curve for every y. If the curve is monotone over the calibration's recorded
+    x range (the domain), it has at most one solution there, so instead the curve is tabulated once over the domain,
+    with its turning points and knots included (which is how monotonicity is checked). A y is then located in the
+    table by bisection, and the bracketing interval is refined to the solution by safeguarded Newton iterations.
+    Results agree with y_to_x to within its rounding.
+
+    y's outside the curve's range over the domain, which have no solution in it, and all y's of a curve that isn't
+    monotone over its domain (or has no recorded data), are solved with y_to_x, so raise the same errors.
+
+    Example
+    --------
+
+    > inverse = CalibrationInverse(calibration)
+    > inverse.y_to_x(0.05, enforce_bounds=True)  # same as calibration.y_to_x(0.05, enforce_bounds=True)
+    > inverse.y_to_x_many(voltages)  # many at once, with nan where y_to_x would raise
+
+    """
+
+    def __init__(self, calibration: structs.CalibrationBase, *, table_points: int = 256) -> None:
+        self.calibration = calibration
+
+        recorded_x = calibration.recorded_data["x"]
+        self.min_x = min(recorded_x) if recorded_x else -float("inf")
+        self.max_x = max(recorded_x) if recorded_x else float("inf")
+
+        self.is_tabulated = False
+        self._xs: list[float] = []
+        self._sign = 1.0
+        # the table's y's times _sign, so always increasing
+        self._signed_ys: list[float] = []
+        try:
+            self._tabulate(table_points)
+        except (ValueError, TypeError):
+            # an empty or malformed curve: y_to_x raises the appropriate error for each y
+            pass
+
+    def _tabulate(self, table_points: int) -> None:
+        import numpy as np
+
+        if not (isfinite(self.min_x) and isfinite(self.max_x)) or self.max_x <= self.min_x:
+            return
+        if self.calibration.curve_data_.type not in ("poly", "spline", "akima"):
+            return
+
+        self._curve = _Curve(self.calibration.curve_data_)
+        xs = np.unique(
+            np.concatenate(
+                (
+                    np.linspace(self.min_x, self.max_x, max(2, table_points)),
+                    self._curve.critical_points(self.min_x, self.max_x),
+                )
+            )
+        )
+        ys, _ = self._curve.eval_many(xs)
+        differences = np.diff(ys)
+        if np.all(differences > 0):
+            self._sign = 1.0
+        elif np.all(differences < 0):
+            self._sign = -1.0
+        else:
+            # not monotone over the domain
+            return
+
+        self._xs_array = xs
+        self._signed_ys_array = self._sign * ys
+        self._xs = xs.tolist()
+        self._signed_ys = self._signed_ys_array.tolist()
+        self.is_tabulated = True
+
+    def _solve_in_domain(self, y: float) -> float | None:
+        # the solution in the domain, or None if y is outside the curve's range over it
+        signed_ys = self._signed_ys
+        signed_y = self._sign * y
+        if not (signed_ys[0] <= signed_y <= signed_ys[-1]):
+            return None
+
+        i = bisect_left(signed_ys, signed_y)
+        if signed_ys[i] == signed_y:
+            return self._xs[i]
+
+        # g(x) = sign * (curve(x) - y) is increasing, negative at a and positive at b
+        a, b = self._xs[i - 1], self._xs[i]
+        x = a + (b - a) * (signed_y - signed_ys[i - 1]) / (signed_ys[i] - signed_ys[i - 1])
+        for _ in range(MAX_REFINE_ITERATIONS):
+            g = self._sign * (self._curve.eval(x) - y)
+            if g == 0.0:
+                return x
+            elif g < 0.0:
+                a = x
+            else:
+                b = x
+
+            dg = self._sign * self._curve.eval_derivative(x)
+            next_x = x - g / dg if dg > 0.0 else 0.5 * (a + b)
+            if not (a < next_x < b):
+                # Newton would leave the bracket: bisect instead
+                next_x = 0.5 * (a + b)
+
+            if abs(next_x - x) <= REFINE_TOLERANCE * (1.0 + abs(x)):
+                return next_x
+            x = next_x
+        return x
+
+    def y_to_x(self, y: float, enforce_bounds: bool = False) -> float:
+        """Same as calibration.y_to_x(y, enforce_bounds)."""
+        if self.is_tabulated:
+            x = self._solve_in_domain(y)
+            if x is not None:
+                return round(x, 10)
+        return self.calibration.y_to_x(y, enforce_bounds=enforce_bounds)
+
+    def y_to_x_many(self, ys: Sequence[float], enforce_bounds: bool = False) -> "npt.NDArray[np.float64]":
+        """
+        calibration.y_to_x for many y's at once, with nan where it would raise (ex: no solution, or a nan y).
+        """
+        import numpy as np
+
+        ys_array = np.asarray(ys, dtype=float).reshape(-1)
+        xs = np.full(ys_array.size, np.nan)
+
+        in_domain = np.zeros(ys_array.size, dtype=bool)
+        if self.is_tabulated:
+            signed_ys = self._sign * ys_array
+            with np.errstate(invalid="ignore"):
+                in_domain = (signed_ys >= self._signed_ys_array[0]) & (signed_ys <= self._signed_ys_array[-1])
+            xs[in_domain] = np.round(self._solve_in_domain_many(ys_array[in_domain]), 10)
+
+        # the rest have no solution in the domain, or the curve isn't tabulated: one at a time, like y_to_x
+        for j in np.flatnonzero(~in_domain & np.isfinite(ys_array)):
+            try:
+                xs[j] = self.calibration.y_to_x(float(ys_array[j]), enforce_bounds=enforce_bounds)
+            except (
+                exc.NoSolutionsFoundError,
+                exc.SolutionBelowDomainError,
+                exc.SolutionAboveDomainError,
+            ):
+                pass
+        return xs
+
+    def _solve_in_domain_many(self, ys: "npt.NDArray[np.float64]") -> "npt.NDArray[np.float64]":
+        # _solve_in_domain for y's in the curve's range over the domain
+        import numpy as np
+
+        table_xs, table_ys = self._xs_array, self._signed_ys_array
+        signed_ys = self._sign * ys
+        i = np.clip(np.searchsorted(table_ys, signed_ys, side="left"), 1, table_xs.size - 1)
+        a, b = table_xs[i - 1], table_xs[i]
+        x = a + (b - a) * (signed_ys - table_ys[i - 1]) / (table_ys[i] - table_ys[i - 1])
+
+        for _ in range(MAX_REFINE_ITERATIONS):
+            values, derivatives = self._curve.eval_many(x)
+            g = self._sign * (values - ys)
+            a = np.where(g < 0.0, x, a)
+            b = np.where(g > 0.0, x, b)
+
+            dg = self._sign * derivatives
+            with np.errstate(divide="ignore", invalid="ignore"):
+                next_x = np.where(g == 0.0, x, x - g / dg)
+            # Newton steps that would leave the bracket bisect instead
+            next_x = np.where((g == 0.0) | ((a < next_x) & (next_x < b)), next_x, 0.5 * (a + b))
+
+            converged = np.abs(next_x - x) <= REFINE_TOLERANCE * (1.0 + np.abs(x))
+            x = next_x
+            if np.all(converged):
+                break
+        return x
@@ -1,11 +1,19 @@
 # -*- coding: utf-8 -*-
+import atexit
+import fcntl
+import mmap
+import os
 import sqlite3
+import struct
+import threading
+from collections.abc import Iterable
 from concurrent.futures import ThreadPoolExecutor
 from subprocess import run
 from time import sleep
 from typing import Any
 
 from msgspec import Struct
+from msgspec.json import decode as loads
 from msgspec.json import encode as dumps
 from pioreactor import types as pt
 from pioreactor import whoami
@@ -131,7 +139,9 @@ class JobManager:
             },
         )
         assert isinstance(self.cursor.lastrowid, int)
-        return self.cursor.lastrowid
+        job_id = self.cursor.lastrowid
+        running_jobs.update(self.cursor)
+        return job_id
 
     def does_pid_exist(self, pid: int) -> bool:
         # a proxy for: is this part of a larger job (ex: led intensity relationship to od_reading)
@@ -172,9 +182,27 @@ class JobManager:
         except sqlite3.IntegrityError:
             raise sqlite3.IntegrityError(f"Integrity error for {job_id=}, {setting=} and {value=}.")
 
+    def upsert_settings(self, settings: Iterable[tuple[JobMetadataKey, str, Any]]) -> None:
+        """
+        Upsert many (job_id, setting, value) in one transaction. Settings of jobs that are no longer in the database
+        are skipped.
+        """
+        self.cursor.execute("BEGIN")
+        try:
+            for job_id, setting, value in settings:
+                try:
+                    self.upsert_setting(job_id, setting, value)
+                except sqlite3.IntegrityError:
+                    pass
+        except BaseException:
+            self.cursor.execute("ROLLBACK")
+            raise
+        self.cursor.execute("COMMIT")
+
     def set_not_running(self, job_id: JobMetadataKey) -> None:
         update_query = "UPDATE pio_job_metadata SET is_running=0, ended_at=STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW') WHERE job_id=(?)"
         self.cursor.execute(update_query, (job_id,))
+        running_jobs.update(self.cursor)
         return
 
     def clear(self) -> None:
@@ -183,6 +211,7 @@ class JobManager:
         """
         self.cursor.execute("DELETE FROM pio_job_published_settings;")
         self.cursor.execute("DELETE FROM pio_job_metadata;")
+        running_jobs.update(self.cursor)
 
     def is_job_running(self, job_name: str) -> bool:
         return self.get_running_job_id(job_name) is not None
@@ -200,6 +229,9 @@ class JobManager:
         return int(result[0]) if result else None
 
     def get_setting_from_running_job(self, job_name: str, setting: str, timeout: float | None = None) -> Any:
+        # so a job's settings can be read back in the process that published them
+        settings_writer.flush()
+
         if timeout is not None and not self.is_job_running(job_name):
             raise JobRequiredError(f"Job {job_name} is not running.")
 
@@ -327,6 +359,7 @@ class JobManager:
         return self.cursor.fetchone()
 
     def list_job_settings(self, job_id: int) -> list[tuple[str, Any, str, str | None]]:
+        settings_writer.flush()
         select_query = """
             SELECT setting, value, created_at, updated_at
             FROM pio_job_published_settings
@@ -339,7 +372,9 @@ class JobManager:
     def remove_job(self, job_id: int) -> int:
         self.cursor.execute("DELETE FROM pio_job_published_settings WHERE job_id = ?", (job_id,))
         self.cursor.execute("DELETE FROM pio_job_metadata WHERE job_id = ?", (job_id,))
-        return self.cursor.rowcount
+        removed = self.cursor.rowcount
+        running_jobs.update(self.cursor)
+        return removed
 
     def kill_jobs(self, all_jobs: bool = False, **query: str | int | None) -> int:
         # ex: kill_jobs(experiment="testing_exp") should end all jobs with experiment='testing_exp'
@@ -371,6 +406,250 @@ class JobManager:
         return
 
 
+class SettingsWriter:
+    """
+    Write-behind for the settings that jobs publish, one per process. Upserts are coalesced in memory, by job and
+    setting, and a background thread writes them in one transaction, `flush_interval` seconds after the first
+    unwritten one, over a JobManager it keeps open.
+
+    > settings_writer.upsert_setting(job_id, "target_rpm", 500.0)  # returns immediately
+    > settings_writer.flush()  # blocks until it's in the database
+    """
+
+    def __init__(self, flush_interval: float = 0.1) -> None:
+        self.flush_interval = flush_interval
+        self._changed = threading.Condition()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._pending: dict[tuple[JobMetadataKey, str], Any] = {}
+        self._queued = 0  # upserts received
+        self._written = 0  # upserts written
+        self._flushes_waiting = 0
+        self._thread: threading.Thread | None = None
+
+    def upsert_setting(self, job_id: JobMetadataKey, setting: str, value: Any) -> None:
+        with self._changed:
+            if self._pid != os.getpid():
+                # forked: the pending upserts, and the thread writing them, belong to the parent
+                self._reset()
+
+            self._pending[(job_id, setting)] = value
+            self._queued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="job-settings-writer")
+                self._thread.start()
+            self._changed.notify_all()
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """
+        Wait for the upserts made so far to be written. Returns False if that took longer than `timeout` seconds.
+        """
+        with self._changed:
+            if self._pid != os.getpid():
+                return True
+
+            queued = self._queued
+            self._flushes_waiting += 1
+            self._changed.notify_all()
+            try:
+                return self._changed.wait_for(lambda: self._written >= queued, timeout=timeout)
+            finally:
+                self._flushes_waiting -= 1
+
+    def _run(self) -> None:
+        jm: JobManager | None = None
+        inode: int | None = None
+
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._pending)
+                # coalesce the upserts that arrive shortly after, unless someone is waiting on them.
+                self._changed.wait_for(lambda: self._flushes_waiting > 0, timeout=self.flush_interval)
+                pending, self._pending = self._pending, {}
+                queued = self._queued
+
+            try:
+                db_path = config.get("storage", "temporary_cache")
+                if jm is not None and inode != os.stat(db_path).st_ino:
+                    # the database file was removed or replaced
+                    jm.close()
+                    jm = None
+                if jm is None:
+                    jm = JobManager()
+                    inode = os.stat(db_path).st_ino
+
+                try:
+                    jm.upsert_settings(
+                        (job_id, setting, value) for (job_id, setting), value in pending.items()
+                    )
+                except (OSError, sqlite3.OperationalError):
+                    raise
+                except Exception:
+                    # one bad value (ex: one that can't be serialized) fails the whole transaction, so write them
+                    # one at a time, and drop the ones that fail.
+                    for (job_id, setting), value in pending.items():
+                        try:
+                            jm.upsert_settings([(job_id, setting, value)])
+                        except (OSError, sqlite3.OperationalError):
+                            raise
+                        except Exception as e:
+                            self._log_error(f"Dropping setting {setting} of job {job_id}: {e}")
+            except (OSError, sqlite3.OperationalError):
+                # the database is locked, or gone: try again later, without overwriting newer values.
+                if jm is not None:
+                    jm.close()
+                    jm = None
+                with self._changed:
+                    self._pending = pending | self._pending
+                sleep(1)
+                continue
+            except Exception as e:
+                # keep the thread alive, else flush() would wait on it forever.
+                self._log_error(f"Dropping {len(pending)} settings: {e}")
+
+            with self._changed:
+                self._written = queued
+                self._changed.notify_all()
+
+    @staticmethod
+    def _log_error(message: str) -> None:
+        from pioreactor.logging import create_logger
+
+        # not to MQTT: publishing settings is what got us here.
+        create_logger("job_manager", to_mqtt=False).error(message)
+
+
+settings_writer = SettingsWriter()
+atexit.register(settings_writer.flush)
+
+
+class RunningJobsSnapshot:
+    """
+    A memory-mapped copy of which jobs are running, {job_name: job_id}, in a file next to the temporary_cache
+    database. JobManager rewrites it whenever a job starts or stops, and readers map it once, so checking if a job is
+    running (ex: on every OD cycle while dodging) doesn't open the database, or any file.
+
+    > running_jobs.get_job_id("od_reading")  # int or None
+
+    The file starts with a sequence number and the payload's length. Writers hold an flock on the file, and make the
+    sequence number odd while they write, so readers retry instead of decoding a partial payload (a seqlock).
+    """
+
+    SIZE = 64 * 1024
+    OVERFLOW = 0xFFFFFFFF  # the payload didn't fit: readers use the database instead
+    _header = struct.Struct("<QI")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._map: mmap.mmap | None = None
+        self._file_id: tuple[int, int] | None = None
+        self._seq = 0
+        self._jobs: dict[str, int] | None = None
+
+    @staticmethod
+    def path() -> str:
+        return config.get("storage", "temporary_cache") + ".running_jobs"
+
+    def update(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Rewrite the snapshot from the pio_job_metadata table that `cursor` reads.
+        """
+        fd = os.open(self.path(), os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            # held while reading the table too, so a slower writer can't replace a newer snapshot with an older one.
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_size < self.SIZE:
+                os.ftruncate(fd, self.SIZE)
+
+            # a job_name started more than once maps to its latest job_id, like JobManager.get_running_job_id
+            cursor.execute(
+                "SELECT job_name, job_id FROM pio_job_metadata WHERE is_running = 1 ORDER BY started_at, job_id"
+            )
+            payload = dumps(dict(cursor.fetchall()))
+
+            with mmap.mmap(fd, self.SIZE) as m:
+                seq, _ = self._header.unpack_from(m)
+                # odd while writing. A writer that died mid-write left it odd already.
+                seq = (seq + 1) | 1
+                self._header.pack_into(m, 0, seq, 0)
+                if len(payload) <= self.SIZE - self._header.size:
+                    m[self._header.size : self._header.size + len(payload)] = payload
+                    length = len(payload)
+                else:
+                    length = self.OVERFLOW
+                self._header.pack_into(m, 0, seq + 1, length)
+        finally:
+            # releases the flock
+            os.close(fd)
+
+    def _read(self) -> dict[str, int] | None:
+        # None if there's no usable snapshot
+        path = self.path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if self._map is None or file_id != self._file_id:
+            # first read, or the file was removed and recreated (or temporary_cache moved)
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < self.SIZE:
+                    return None
+                self._map = mmap.mmap(f.fileno(), self.SIZE, access=mmap.ACCESS_READ)
+            self._file_id = file_id
+            self._seq = 0
+
+        m = self._map
+        for _ in range(1000):
+            seq, length = self._header.unpack_from(m)
+            if seq == self._seq and seq != 0:
+                return self._jobs
+            if seq == 0:
+                # never written
+                return None
+            if seq % 2 == 1:
+                # a write is in progress
+                sleep(0)
+                continue
+
+            payload = None if length == self.OVERFLOW else m[self._header.size : self._header.size + length]
+            if self._header.unpack_from(m)[0] != seq:
+                continue
+
+            self._jobs = None if payload is None else loads(payload, type=dict[str, int])
+            self._seq = seq
+            return self._jobs
+
+        # the writer is stuck, or died mid-write
+        return None
+
+    def get_job_id(self, job_name: str) -> int | None:
+        """
+        The running job_id for `job_name`, or None if it's not running.
+        """
+        with self._lock:
+            jobs = self._read()
+
+        if jobs is None:
+            # no snapshot yet (ex: after a reboot), or a writer died mid-write: answer from the database, and rewrite it.
+            with JobManager() as jm:
+                self.update(jm.cursor)
+                return jm.get_running_job_id(job_name)
+        return jobs.get(job_name)
+
+    def is_job_running(self, job_name: str) -> bool:
+        return self.get_job_id(job_name) is not None
+
+
+running_jobs = RunningJobsSnapshot()
+
+
 class ClusterJobManager:
     # this is a context manager to mimic the kill API for JobManager.
     def __init__(self) -> None:
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Full-text search of the logs table's message and task, through the logs_fts FTS5 index.
+
+logs_fts is an external-content index: it stores only the index, and reads the logs themselves from logs. Rows of
+logs up to logs_fts_progress.indexed_rowid are indexed. mqtt_to_db_streaming indexes the rows it inserts with each
+batch commit, at most LOGS_INDEX_BATCH_SIZE at a time, so logs from before the index existed are backfilled a batch
+at a time. A trigger removes deleted rows from the index.
+"""
+import sqlite3
+
+LOGS_INDEX_BATCH_SIZE = 5000
+
+# run once per batch, in the batch's transaction, after its rows are inserted.
+INDEX_NEW_LOGS = (
+    f"""
+    INSERT INTO logs_fts (rowid, message, task)
+    SELECT rowid, message, task
+    FROM logs
+    WHERE rowid > (SELECT indexed_rowid FROM logs_fts_progress)
+    ORDER BY rowid
+    LIMIT {LOGS_INDEX_BATCH_SIZE}
+    """,
+    f"""
+    UPDATE logs_fts_progress
+    SET indexed_rowid = COALESCE(
+        (
+            SELECT MAX(rowid)
+            FROM (SELECT rowid FROM logs WHERE rowid > indexed_rowid ORDER BY rowid LIMIT {LOGS_INDEX_BATCH_SIZE})
+        ),
+        indexed_rowid
+    )
+    """,
+)
+
+
+def has_logs_index(database: str) -> bool:
+    """Whether the database has logs_fts. Databases from before it was added get it when updating."""
+    try:
+        connection = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return False
+    try:
+        row = connection.execute(
+            "SELECT COUNT(1) FROM sqlite_master WHERE name IN ('logs_fts', 'logs_fts_progress')"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+    return row[0] == 2
+
+
+def to_fts_query(search: str) -> str | None:
+    """
+    An FTS5 query matching logs that contain every word of `search`, each as a prefix. Words are quoted, so the
+    user's text is never parsed as FTS5 syntax. None if `search` has no words.
+
+    > to_fts_query("od_reading stopp")  # '"od_reading"* "stopp"*'
+    """
+    terms = ['"' + word.replace('"', '""') + '"*' for word in search.split()]
+    return " ".join(terms) or None
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from bisect import bisect_right
 from math import exp
 from math import isfinite
 from math import log
@@ -8,6 +9,7 @@ from statistics import median
 from typing import Callable
 from typing import Iterable
 from typing import Mapping
+from typing import TYPE_CHECKING
 
 from msgspec import Struct
 from pioreactor import structs
@@ -15,6 +17,11 @@ from pioreactor import types as pt
 from pioreactor.utils.akimas import akima_eval
 from pioreactor.utils.akimas import akima_eval_derivative
 from pioreactor.utils.akimas import akima_fit
+from pioreactor.utils.piecewise_cubics import parse_piecewise_cubic_data
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
 
 # Model: we fuse three angle-dependent channels into one scalar concentration estimate.
 # Each channel is treated as a noisy sensor of concentration with:
@@ -35,6 +42,10 @@ from pioreactor.utils.akimas import akima_fit
 #   or where mu_i is flat (many logc explain the same logy, so the likelihood is broad).
 FUSION_ANGLES: tuple[pt.PdAngle, ...] = ("45", "90", "135")
 DEFAULT_LOW_CONC_SCALES: dict[pt.PdAngle, float] = {"135": 0.04, "90": 4.0, "45": 10.0}
+# Lower bound on |d mu / d logc|, so flat regions of a curve widen the likelihood instead of dividing by ~0.
+SLOPE_FLOOR = 0.05
+# FusionEvaluator.fuse_many scores readings in chunks whose (readings, angles, grid points) temporaries stay under this.
+FUSE_MANY_CHUNK_BYTES = 2**21
 
 
 class FusionFitResult(Struct, frozen=True):
@@ -119,6 +130,55 @@ def _golden_section_minimize(
     return (a + b) / 2
 
 
+def _golden_section_minimize_many(
+    fn: Callable[["npt.NDArray[np.float64]"], "npt.NDArray[np.float64]"],
+    lower: "npt.NDArray[np.float64]",
+    upper: "npt.NDArray[np.float64]",
+    *,
+    max_iter: int = 64,
+    tol: float = 1e-6,
+) -> "npt.NDArray[np.float64]":
+    # _golden_section_minimize, run elementwise over arrays of brackets. Each element takes the same steps
+    # as the scalar version would; fn is evaluated at every element's new point in one call per iteration.
+    import numpy as np
+
+    phi = (1 + 5**0.5) / 2
+    inv_phi = 1 / phi
+    inv_phi_sq = inv_phi**2
+
+    a = np.asarray(lower, dtype=float).copy()
+    b = np.asarray(upper, dtype=float).copy()
+    h = b - a
+
+    c = a + inv_phi_sq * h
+    d = a + inv_phi * h
+    fc = fn(c)
+    fd = fn(d)
+
+    active = (b > a) & (h > tol)
+    for _ in range(max_iter):
+        active &= np.abs(b - a) > tol
+        if not active.any():
+            break
+        go_left = active & (fc < fd)
+        go_right = active & ~(fc < fd)
+
+        # go_left: b=d, d=c, fd=fc, c = new point. go_right: a=c, c=d, fc=fd, d = new point.
+        b = np.where(go_left, d, b)
+        a = np.where(go_right, c, a)
+        d, c = np.where(go_left, c, d), np.where(go_right, d, c)
+        fd, fc = np.where(go_left, fc, fd), np.where(go_right, fd, fc)
+        h = b - a
+        c = np.where(go_left, a + inv_phi_sq * h, c)
+        d = np.where(go_right, a + inv_phi * h, d)
+
+        f_new = fn(np.where(go_left, c, d))
+        fc = np.where(go_left, f_new, fc)
+        fd = np.where(go_right, f_new, fd)
+
+    return np.where(b <= a, a, (a + b) / 2)
+
+
 def _global_minimize(
     fn: Callable[[float], float],
     lower: float,
@@ -154,9 +214,20 @@ def _global_minimize(
     candidates.sort(key=lambda pair: pair[0])
     best_candidates = candidates[: max(1, refine_points)]
 
-    best_x = best_candidates[0][1]
+    return _refine_candidates(fn, lower, upper, step, [x for _, x in best_candidates])
+
+
+def _refine_candidates(
+    fn: Callable[[float], float],
+    lower: float,
+    upper: float,
+    step: float,
+    centers: list[float],
+) -> float:
+    # Golden-section refine within one grid step of each candidate (best first), keep the best.
+    best_x = centers[0]
     best_val = fn(best_x)
-    for _, center in best_candidates:
+    for center in centers:
         left = max(lower, center - step)
         right = min(upper, center + step)
         refined = _golden_section_minimize(fn, left, right)
@@ -341,6 +412,23 @@ def _sigma_from_model(
     return max(sigma, estimator.sigma_floor)
 
 
+def _angle_noise_scale(low_conc_scale: float, logc: float, low_logc: float, high_logc: float) -> float:
+    # Blend from the angle's low-concentration noise multiplier at min_logc, to 1 at max_logc.
+    if logc <= low_logc:
+        t = 1.0
+    elif logc >= high_logc:
+        t = 0.0
+    elif high_logc <= low_logc:
+        t = 1.0
+    else:
+        t = (high_logc - logc) / (high_logc - low_logc)
+    return 1.0 * (1.0 - t) + low_conc_scale * t
+
+
+def _pseudo_huber(r: float, huber_delta: float = 1.0) -> float:
+    return huber_delta**2 * ((1.0 + (r / huber_delta) ** 2) ** 0.5 - 1.0)
+
+
 def compute_fused_od(
     estimator: structs.ODFusionEstimator,
     readings_by_angle: Mapping[pt.PdAngle, float],
@@ -358,28 +446,12 @@ def compute_fused_od(
         reading = readings_by_angle[angle]
         log_obs[angle] = log(max(float(reading), 1e-12))
 
-    slope_floor = 0.05
-
     low_conc_scales = estimator.low_conc_scales or _low_conc_scales_from_sigma_curves(
         estimator.sigma_splines_log,
         estimator.min_logc,
         estimator.sigma_floor,
     )
 
-    def _angle_noise_scale(angle: pt.PdAngle, logc: float) -> float:
-        low_logc = estimator.min_logc
-        high_logc = estimator.max_logc
-        if logc <= low_logc:
-            t = 1.0
-        elif logc >= high_logc:
-            t = 0.0
-        elif high_logc <= low_logc:
-            t = 1.0
-        else:
-            t = (high_logc - logc) / (high_logc - low_logc)
-        scale = low_conc_scales.get(angle, 1.0)
-        return 1.0 * (1.0 - t) + scale * t
-
     def nll(logc: float) -> float:
         # Negative log-likelihood assuming independent Gaussian residuals per angle:
         #   logy_obs = mu_angle(logc) + Normal(0, sigma_angle(logc)^2)
@@ -389,18 +461,18 @@ def compute_fused_od(
         #
         # We use a pseudo-Huber penalty on the normalized residual to reduce
         # the impact of occasional bubbles/artifacts without changing small-error behavior.
-        huber_delta = 1.0
         total = 0.0
         for angle in estimator.angles:
             mu = _curve_eval(estimator.mu_splines[angle], logc)
             sigma = _sigma_from_model(estimator, angle, logc)
             slope = abs(_curve_eval_derivative(estimator.mu_splines[angle], logc))
-            sigma_eff = sigma / max(slope, slope_floor)
-            sigma_eff *= _angle_noise_scale(angle, logc)
+            sigma_eff = sigma / max(slope, SLOPE_FLOOR)
+            sigma_eff *= _angle_noise_scale(
+                low_conc_scales.get(angle, 1.0), logc, estimator.min_logc, estimator.max_logc
+            )
             residual = log_obs[angle] - mu
             r = residual / sigma_eff
-            huber_term = huber_delta**2 * ((1.0 + (r / huber_delta) ** 2) ** 0.5 - 1.0)
-            total += huber_term + log(sigma_eff)
+            total += _pseudo_huber(r) + log(sigma_eff)
         return total
 
     # MAP / ML estimate:
@@ -414,3 +486,265 @@ def compute_fused_od(
         raise ValueError("Fusion model produced non-finite OD estimate.")
 
     return float(c_hat)
+
+
+class _TabulatedCubic:
+    # A piecewise cubic (ex: an Akima fit) parsed once: Python lists for fast scalar evaluation,
+    # and NumPy arrays for evaluating many points at once. Same formulas as akima_eval(_derivative).
+    def __init__(self, curve: structs.AkimaFitData) -> None:
+        knots, coefficients = parse_piecewise_cubic_data(curve, structs.AkimaFitData, "akima_data")
+        self.knots_array = knots
+        self.coefficients_array = coefficients
+        self.knots: list[float] = knots.tolist()
+        self.coefficients: list[tuple[float, float, float, float]] = [
+            (a, b, c, d) for a, b, c, d in coefficients.tolist()
+        ]
+        self._last_interval = len(self.knots) - 2
+
+    def _index(self, x: float) -> int:
+        return min(max(bisect_right(self.knots, x) - 1, 0), self._last_interval)
+
+    def eval(self, x: float) -> float:
+        index = self._index(x)
+        u = x - self.knots[index]
+        a, b, c, d = self.coefficients[index]
+        return a + b * u + c * u**2 + d * u**3
+
+    def eval_derivative(self, x: float) -> float:
+        index = self._index(x)
+        u = x - self.knots[index]
+        _, b, c, d = self.coefficients[index]
+        return b + 2.0 * c * u + 3.0 * d * u**2
+
+    def eval_many(
+        self, x: "npt.NDArray[np.float64]"
+    ) -> "tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]":
+        # values and derivatives at every x
+        import numpy as np
+
+        index = np.clip(np.searchsorted(self.knots_array, x, side="right") - 1, 0, self._last_interval)
+        u = x - self.knots_array[index]
+        coefficients = self.coefficients_array[index]
+        a, b, c, d = (coefficients[..., i] for i in range(4))
+        return a + b * u + c * u**2 + d * u**3, b + 2.0 * c * u + 3.0 * d * u**2
+
+
+class FusionEvaluator:
+    """
+    compute_fused_od, precompiled for one estimator.
+
+    The spline curves are parsed once, and the parts of the NLL that don't depend on the observations (mu, and the
+    effective sigma from sigma, slope and the low-concentration scales) are tabulated on the search grid of
+    _global_minimize. Each reading then evaluates the NLL at every grid point in one vectorized pass, and refines
+    the best local minima with golden-section search, as compute_fused_od does. Results agree with compute_fused_od
+    to within the golden-section tolerance.
+
+    Example
+    --------
+
+    > fuse = FusionEvaluator(estimator)
+    > fuse({"45": 0.05, "90": 0.11, "135": 0.02})  # same as compute_fused_od(estimator, {...})
+
+    """
+
+    def __init__(
+        self,
+        estimator: structs.ODFusionEstimator,
+        *,
+        grid_points: int = 256,
+        refine_points: int = 4,
+    ) -> None:
+        import numpy as np
+
+        self.estimator = estimator
+        self.angles: list[pt.PdAngle] = list(estimator.angles)
+        self.lower = estimator.min_logc
+        self.upper = estimator.max_logc
+        self.refine_points = refine_points
+
+        self._mu_curves = {angle: _TabulatedCubic(estimator.mu_splines[angle]) for angle in self.angles}
+        self._sigma_log_curves = {
+            angle: _TabulatedCubic(estimator.sigma_splines_log[angle]) for angle in self.angles
+        }
+        low_conc_scales = estimator.low_conc_scales or _low_conc_scales_from_sigma_curves(
+            estimator.sigma_splines_log,
+            estimator.min_logc,
+            estimator.sigma_floor,
+        )
+        self._low_conc_scales = {angle: low_conc_scales.get(angle, 1.0) for angle in self.angles}
+
+        if self.upper <= self.lower:
+            self.step = 0.0
+            self.grid = np.asarray([self.lower])
+        else:
+            grid_points = max(8, int(grid_points))
+            self.step = (self.upper - self.lower) / (grid_points - 1)
+            self.grid = self.lower + np.arange(grid_points) * self.step
+
+        # t blends each angle's noise scale from its low-concentration value (t=1) to 1 (t=0), see _angle_noise_scale
+        if self.upper <= self.lower:
+            t = np.ones_like(self.grid)
+        else:
+            t = np.clip((self.upper - self.grid) / (self.upper - self.lower), 0.0, 1.0)
+
+        mu_rows = []
+        sigma_eff_rows = []
+        for angle in self.angles:
+            mu, mu_derivative = self._mu_curves[angle].eval_many(self.grid)
+            sigma_log, _ = self._sigma_log_curves[angle].eval_many(self.grid)
+            sigma = np.maximum(np.exp(sigma_log), estimator.sigma_floor)
+            sigma_eff = sigma / np.maximum(np.abs(mu_derivative), SLOPE_FLOOR)
+            sigma_eff *= 1.0 * (1.0 - t) + self._low_conc_scales[angle] * t
+            mu_rows.append(mu)
+            sigma_eff_rows.append(sigma_eff)
+
+        # (angles, grid_points) tables
+        self._mu_grid = np.stack(mu_rows) if mu_rows else np.zeros((0, self.grid.size))
+        self._sigma_eff_grid = np.stack(sigma_eff_rows) if sigma_eff_rows else np.ones((0, self.grid.size))
+        self._log_sigma_eff_grid = np.log(self._sigma_eff_grid).sum(axis=0)
+
+    def _nll(self, logc: float, log_obs: Mapping[pt.PdAngle, float]) -> float:
+        # same NLL as compute_fused_od, on the pre-parsed curves
+        total = 0.0
+        for angle in self.angles:
+            mu_curve = self._mu_curves[angle]
+            mu = mu_curve.eval(logc)
+            sigma = max(exp(self._sigma_log_curves[angle].eval(logc)), self.estimator.sigma_floor)
+            slope = abs(mu_curve.eval_derivative(logc))
+            sigma_eff = sigma / max(slope, SLOPE_FLOOR)
+            sigma_eff *= _angle_noise_scale(self._low_conc_scales[angle], logc, self.lower, self.upper)
+            r = (log_obs[angle] - mu) / sigma_eff
+            total += _pseudo_huber(r) + log(sigma_eff)
+        return total
+
+    def _nll_on_grid(self, log_obs: Mapping[pt.PdAngle, float]) -> "npt.NDArray[np.float64]":
+        import numpy as np
+
+        observed = np.asarray([log_obs[angle] for angle in self.angles]).reshape(-1, 1)
+        r = (observed - self._mu_grid) / self._sigma_eff_grid
+        return (np.sqrt(1.0 + r * r) - 1.0).sum(axis=0) + self._log_sigma_eff_grid
+
+    def _best_grid_candidates(self, values: "npt.NDArray[np.float64]") -> list[float]:
+        # local minima of the grid (edges included), best first - same selection as _global_minimize
+        import numpy as np
+
+        left = np.concatenate(([np.inf], values[:-1]))
+        right = np.concatenate((values[1:], [np.inf]))
+        minima = np.flatnonzero((values <= left) & (values <= right))
+        order = np.argsort(values[minima], kind="stable")[: max(1, self.refine_points)]
+        return self.grid[minima[order]].tolist()
+
+    def fuse_logc(self, readings_by_angle: Mapping[pt.PdAngle, float]) -> float:
+        """The MAP log10(concentration) for one set of readings."""
+        import numpy as np
+
+        for angle in self.angles:
+            if angle not in readings_by_angle:
+                raise ValueError(f"Missing fusion reading for angle {angle}.")
+
+        log_obs = {angle: log(max(float(readings_by_angle[angle]), 1e-12)) for angle in self.angles}
+
+        if self.upper <= self.lower:
+            return float(self.lower)
+
+        values = self._nll_on_grid(log_obs)
+        centers = self._best_grid_candidates(values)
+        if not centers:
+            return float(self.grid[int(np.argmin(values))])
+
+        return _refine_candidates(
+            lambda logc: self._nll(logc, log_obs), self.lower, self.upper, self.step, centers
+        )
+
+    def _nll_many(
+        self, logc: "npt.NDArray[np.float64]", log_obs: "npt.NDArray[np.float64]"
+    ) -> "npt.NDArray[np.float64]":
+        # _nll at logc of shape (n, k), for n readings with log observations log_obs of shape (n, angles)
+        import numpy as np
+
+        if self.upper > self.lower:
+            t = np.clip((self.upper - logc) / (self.upper - self.lower), 0.0, 1.0)
+        else:
+            t = np.ones_like(logc)
+
+        total = np.zeros_like(logc)
+        for i, angle in enumerate(self.angles):
+            mu, mu_derivative = self._mu_curves[angle].eval_many(logc)
+            sigma_log, _ = self._sigma_log_curves[angle].eval_many(logc)
+            sigma = np.maximum(np.exp(sigma_log), self.estimator.sigma_floor)
+            sigma_eff = sigma / np.maximum(np.abs(mu_derivative), SLOPE_FLOOR)
+            sigma_eff *= 1.0 * (1.0 - t) + self._low_conc_scales[angle] * t
+            r = (log_obs[:, i : i + 1] - mu) / sigma_eff
+            total = total + ((np.sqrt(1.0 + r * r) - 1.0) + np.log(sigma_eff))
+        return total
+
+    def fuse_many(self, readings: "npt.NDArray[np.float64]") -> "npt.NDArray[np.float64]":
+        """
+        Fuse many readings at once. `readings` is (n, angles), columns in the order of `self.angles`. Returns the n
+        fused ODs, with nan where a reading couldn't be fused (ex: a nan reading). Agrees with calling this
+        evaluator once per reading, to within the golden-section tolerance.
+        """
+        import numpy as np
+
+        readings = np.asarray(readings, dtype=float).reshape(-1, len(self.angles))
+        n = readings.shape[0]
+        if self.upper <= self.lower:
+            return np.full(n, 10**self.lower)
+
+        rows_per_chunk = max(1, FUSE_MANY_CHUNK_BYTES // (8 * len(self.angles) * self.grid.size))
+        if n <= rows_per_chunk:
+            return self._fuse_chunk(readings)
+        return np.concatenate(
+            [self._fuse_chunk(readings[i : i + rows_per_chunk]) for i in range(0, n, rows_per_chunk)]
+        )
+
+    def _fuse_chunk(self, readings: "npt.NDArray[np.float64]") -> "npt.NDArray[np.float64]":
+        import numpy as np
+
+        n = readings.shape[0]
+        log_obs = np.log(np.maximum(readings, 1e-12))  # nan readings stay nan
+
+        # score every grid point: (n, grid_points)
+        r = (log_obs[:, :, None] - self._mu_grid[None, :, :]) / self._sigma_eff_grid[None, :, :]
+        values = (np.sqrt(1.0 + r * r) - 1.0).sum(axis=1) + self._log_sigma_eff_grid
+
+        # the best local minima of each row, like _global_minimize
+        padding = np.full((n, 1), np.inf)
+        left = np.concatenate((padding, values[:, :-1]), axis=1)
+        right = np.concatenate((values[:, 1:], padding), axis=1)
+        is_minimum = (values <= left) & (values <= right)
+        k = max(1, self.refine_points)
+        order = np.argsort(np.where(is_minimum, values, np.inf), axis=1, kind="stable")[:, :k]
+        has_candidate = np.take_along_axis(is_minimum, order, axis=1)
+        centers = self.grid[order]
+        # rows with fewer than k minima refine their best one again, which changes nothing
+        centers = np.where(has_candidate, centers, centers[:, :1])
+
+        def nll(logc: "npt.NDArray[np.float64]") -> "npt.NDArray[np.float64]":
+            return self._nll_many(logc, log_obs)
+
+        refined = _golden_section_minimize_many(
+            nll,
+            np.maximum(self.lower, centers - self.step),
+            np.minimum(self.upper, centers + self.step),
+        )
+        refined_values = nll(refined)
+
+        best_x = centers[:, 0]
+        best_value = nll(centers[:, :1])[:, 0]
+        for j in range(k):
+            improved = refined_values[:, j] < best_value
+            best_x = np.where(improved, refined[:, j], best_x)
+            best_value = np.where(improved, refined_values[:, j], best_value)
+
+        fused = 10**best_x
+        fused[~has_candidate[:, 0] | ~np.isfinite(fused)] = np.nan
+        return fused
+
+    def __call__(self, readings_by_angle: Mapping[pt.PdAngle, float]) -> float:
+        c_hat = 10 ** self.fuse_logc(readings_by_angle)
+
+        if not isfinite(c_hat):
+            raise ValueError("Fusion model produced non-finite OD estimate.")
+
+        return float(c_hat)
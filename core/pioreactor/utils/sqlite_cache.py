@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+import os
 import sqlite3
+import threading
 from contextlib import contextmanager
+from functools import cache as memoize
 from typing import Generator
+from typing import NamedTuple
 from typing import Self
 
 from msgspec import DecodeError
@@ -55,6 +59,105 @@ def _decode_json(value: object) -> object:
     raise TypeError(f"Cannot interpret {value!r} as JSON.")
 
 
+class _Statements(NamedTuple):
+    create_table: str
+    upsert: str
+    insert_if_absent: str
+    select_value: str
+    select_exists: str
+    select_keys: str
+    delete: str
+    pop: str
+    empty: str
+
+
+@memoize
+def _statements(table_name: str) -> _Statements:
+    # the same SQL text each time, so the connection's statement cache prepares each one once
+    return _Statements(
+        create_table=f"CREATE TABLE IF NOT EXISTS {table_name} (key _key_BLOB PRIMARY KEY, value BLOB)",
+        upsert=f"INSERT INTO {table_name} (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        insert_if_absent=f"INSERT OR IGNORE INTO {table_name} (key, value) VALUES (?, ?)",
+        select_value=f"SELECT value FROM {table_name} WHERE key = ?",
+        select_exists=f"SELECT 1 FROM {table_name} WHERE key = ?",
+        select_keys=f"SELECT key FROM {table_name}",
+        delete=f"DELETE FROM {table_name} WHERE key = ?",
+        pop=f"DELETE FROM {table_name} WHERE key = ? RETURNING value",
+        empty=f"DELETE FROM {table_name}",
+    )
+
+
+def _inode(db_path: str) -> int | None:
+    try:
+        return os.stat(db_path).st_ino
+    except OSError:
+        return None
+
+
+class _ConnectionPool(threading.local):
+    """
+    One open connection per database path, per thread, per process, so entering a cache doesn't pay for a
+    connect, the PRAGMAs and a CREATE TABLE each time. A connection is reopened if its file was deleted or replaced
+    (ex: the temporary cache after a clean up), and only the most recently used MAX_CONNECTIONS are kept open.
+    """
+
+    MAX_CONNECTIONS = 8
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        # db_path -> (connection, inode of the file it opened)
+        self.connections: dict[str, tuple[sqlite3.Connection, int | None]] = {}
+        self.initialized_tables: set[tuple[str, str]] = set()
+
+    def connection(self, db_path: str) -> sqlite3.Connection:
+        if self.pid != os.getpid():
+            # forked from another process: its connections must not be used here
+            self.__init__()  # type: ignore[misc]
+
+        pooled = self.connections.pop(db_path, None)
+        if pooled is not None:
+            conn, inode = pooled
+            if inode == _inode(db_path):
+                self.connections[db_path] = pooled  # most recently used last
+                return conn
+            self.close(db_path, conn)
+
+        conn = sqlite3.connect(
+            db_path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None, timeout=15
+        )
+        conn.executescript(
+            """
+            PRAGMA busy_timeout = 15000;
+            PRAGMA temp_store = 2;
+            PRAGMA cache_size = -4000;
+        """
+        )
+        self.connections[db_path] = (conn, _inode(db_path))
+
+        while len(self.connections) > self.MAX_CONNECTIONS:
+            oldest_path = next(iter(self.connections))
+            self.close(oldest_path, self.connections.pop(oldest_path)[0])
+
+        return conn
+
+    def initialize_table(self, db_path: str, table_name: str, cursor: sqlite3.Cursor) -> None:
+        if (db_path, table_name) not in self.initialized_tables:
+            cursor.execute(_statements(table_name).create_table)
+            self.initialized_tables.add((db_path, table_name))
+
+    def close(self, db_path: str, conn: sqlite3.Connection) -> None:
+        conn.close()
+        self.initialized_tables = {entry for entry in self.initialized_tables if entry[0] != db_path}
+
+    def close_all(self) -> None:
+        for db_path, (conn, _) in list(self.connections.items()):
+            self.close(db_path, conn)
+        self.connections.clear()
+
+
+_pool = _ConnectionPool()
+
+
 class cache:
     @staticmethod
     def adapt_key(key: object) -> bytes:
@@ -73,63 +176,33 @@ class cache:
     def __init__(self, table_name: str, db_path: str) -> None:
         self.table_name = f"cache_{table_name}"
         self.db_path = db_path
+        self._sql = _statements(self.table_name)
 
     def __enter__(self) -> Self:
-        sqlite3.register_adapter(tuple, self.adapt_key)
-        # sqlite3.register_converter("_key_BLOB", self.convert_key)
-
-        self.conn = sqlite3.connect(
-            self.db_path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None, timeout=15
-        )
+        self.conn = _pool.connection(self.db_path)
         self.cursor = self.conn.cursor()
-        self.cursor.executescript(
-            """
-            PRAGMA busy_timeout = 15000;
-            PRAGMA temp_store = 2;
-            PRAGMA cache_size = -4000;
-        """
-        )
         self._initialize_table()
         return self
 
     def __exit__(self, _exc_type: object, _exc_val: object, _tb: object) -> None:
-        self.conn.close()
+        # the connection stays open in the pool for the next cache of this db_path
+        self.cursor.close()
 
     def _initialize_table(self) -> None:
-        self.cursor.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {self.table_name} (
-                key _key_BLOB PRIMARY KEY,
-                value BLOB
-            )
-        """
-        )
+        _pool.initialize_table(self.db_path, self.table_name, self.cursor)
 
     def __setitem__(self, key: object, value: object) -> None:
-        self.cursor.execute(
-            f"""
-            INSERT INTO {self.table_name} (key, value)
-            VALUES (?, ?)
-            ON CONFLICT(key) DO UPDATE SET value=excluded.value
-        """,
-            (key, value),
-        )
+        self.cursor.execute(self._sql.upsert, (key, value))
 
     def set(self, key: object, value: object) -> None:
         return self.__setitem__(key, value)
 
     def set_if_absent(self, key: object, value: object) -> bool:
-        self.cursor.execute(
-            f"""
-            INSERT OR IGNORE INTO {self.table_name} (key, value)
-            VALUES (?, ?)
-        """,
-            (key, value),
-        )
+        self.cursor.execute(self._sql.insert_if_absent, (key, value))
         return self.cursor.rowcount == 1
 
     def get(self, key: object, default: object = None) -> object:
-        self.cursor.execute(f"SELECT value FROM {self.table_name} WHERE key = ?", (key,))
+        self.cursor.execute(self._sql.select_value, (key,))
         result = self.cursor.fetchone()
         return result[0] if result else default
 
@@ -164,11 +237,11 @@ class cache:
         return _decode_json(value)
 
     def iterkeys(self) -> Generator[object, None, None]:
-        self.cursor.execute(f"SELECT key FROM {self.table_name}")
+        self.cursor.execute(self._sql.select_keys)
         return (self.convert_key(row[0]) for row in self.cursor.fetchall())
 
     def pop(self, key: object, default: object = None) -> object:
-        self.cursor.execute(f"DELETE FROM {self.table_name} WHERE key = ? RETURNING value", (key,))
+        self.cursor.execute(self._sql.pop, (key,))
         result = self.cursor.fetchone()
 
         if result is None:
@@ -177,26 +250,30 @@ class cache:
             return result[0]
 
     def empty(self) -> None:
-        self.cursor.execute(f"DELETE FROM {self.table_name}")
+        self.cursor.execute(self._sql.empty)
 
     def __contains__(self, key: object) -> bool:
-        self.cursor.execute(f"SELECT 1 FROM {self.table_name} WHERE key = ?", (key,))
+        self.cursor.execute(self._sql.select_exists, (key,))
         return self.cursor.fetchone() is not None
 
     def __iter__(self) -> Generator[object, None, None]:
         return self.iterkeys()
 
     def __delitem__(self, key: object) -> None:
-        self.cursor.execute(f"DELETE FROM {self.table_name} WHERE key = ?", (key,))
+        self.cursor.execute(self._sql.delete, (key,))
 
     def __getitem__(self, key: object) -> object:
-        self.cursor.execute(f"SELECT value FROM {self.table_name} WHERE key = ?", (key,))
+        self.cursor.execute(self._sql.select_value, (key,))
         result = self.cursor.fetchone()
         if result is None:
             raise KeyError(f"Key '{key}' not found in cache.")
         return result[0]
 
 
+# tuple keys are stored as their JSON, see cache.convert_key. Registered once for the process.
+sqlite3.register_adapter(tuple, cache.adapt_key)
+
+
 @contextmanager
 def local_intermittent_storage(
     cache_name: str,
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental backups of a SQLite database, a page at a time.
+
+A backup is a copy of the database file, plus a manifest holding a digest of each of its pages. An incremental backup
+reads a snapshot of the database's pages and writes the pages whose digests changed into a delta, which is then
+applied to the copy. Replaying deltas in order onto an older copy brings it up to date, so replicas need only the
+deltas.
+
+Snapshots are read from the database file and its WAL directly, inside a read transaction. Writers aren't blocked,
+and checkpoints can't change any page the snapshot reads from the database file: see read_snapshot.
+"""
+import os
+import shutil
+import sqlite3
+import struct
+import typing as t
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+from uuid import uuid4
+
+DIGEST_SIZE = 16
+# pages read from the database file at a time
+READ_PAGES = 256
+
+WAL_MAGIC = 0x377F0682
+WAL_HEADER = struct.Struct(">8I")
+WAL_FRAME_HEADER = struct.Struct(">6I")
+
+MANIFEST_MAGIC = b"PIOPAGES"
+# magic, chain id, sequence, page size, page count
+MANIFEST_HEADER = struct.Struct(">8s16sQII")
+DELTA_MAGIC = b"PIODELTA"
+# magic, chain id, sequence, page size, page count, number of pages in the delta
+DELTA_HEADER = struct.Struct(">8s16sQIII")
+DELTA_PAGE_NUMBER = struct.Struct(">I")
+
+
+class PageManifest(t.NamedTuple):
+    # backups in the same chain were made from each other by deltas. A new chain starts from a full copy.
+    chain_id: bytes
+    sequence: int
+    page_size: int
+    page_count: int
+    digests: bytes
+
+
+class DeltaHeader(t.NamedTuple):
+    chain_id: bytes
+    sequence: int
+    page_size: int
+    page_count: int
+    n_pages: int
+
+
+def manifest_path(backup_file: str | Path) -> Path:
+    return Path(f"{backup_file}.pages")
+
+
+def deltas_directory(backup_file: str | Path) -> Path:
+    return Path(f"{backup_file}.deltas")
+
+
+class _WalChecksum:
+    """
+    SQLite's WAL checksum of n_words 32 bit words, continued from (s1, s2). Each pair of words (a, b) takes (s1, s2)
+    to M (s1, s2) + (a, a + b) with M = [[1, 1], [1, 2]], so the checksum is M^n (s1, s2) plus a sum of the pairs
+    weighted by powers of M, all mod 2**32. That's a few NumPy operations, rather than a Python loop over the words.
+    """
+
+    def __init__(self, n_words: int, big_endian: bool) -> None:
+        import numpy as np
+
+        self.dtype = ">u4" if big_endian else "<u4"
+        n = n_words // 2
+        powers = np.empty((n + 1, 2, 2), dtype=np.uint64)
+        powers[0] = np.eye(2, dtype=np.uint64)
+        step = np.array([[1, 1], [1, 2]], dtype=np.uint64)
+        for j in range(1, n + 1):
+            powers[j] = (step @ powers[j - 1]) & 0xFFFFFFFF
+        self.power = powers[n]
+        # the pair at step k is weighted by M^(n - 1 - k)
+        weights = powers[n - 1 :: -1] if n else powers[:0]
+        self.weights = [[weights[:, i, j].copy() for j in range(2)] for i in range(2)]
+
+    def __call__(self, data: bytes, s1: int, s2: int) -> tuple[int, int]:
+        import numpy as np
+
+        words = np.frombuffer(data, dtype=self.dtype).astype(np.uint64)
+        a = words[0::2]
+        a_plus_b = a + words[1::2]
+        (w00, w01), (w10, w11) = self.weights
+        (p00, p01), (p10, p11) = self.power.tolist()
+        return (
+            (p00 * s1 + p01 * s2 + int(np.sum(w00 * a + w01 * a_plus_b))) & 0xFFFFFFFF,
+            (p10 * s1 + p11 * s2 + int(np.sum(w10 * a + w11 * a_plus_b))) & 0xFFFFFFFF,
+        )
+
+
+def _wal_salts(wal_file: t.BinaryIO) -> tuple[int, int] | None:
+    """The salts in the WAL's header, which change whenever the WAL is restarted. None if there's no header."""
+    wal_file.seek(0)
+    header = wal_file.read(WAL_HEADER.size)
+    if len(header) < WAL_HEADER.size:
+        return None
+    _, _, _, _, salt1, salt2, _, _ = WAL_HEADER.unpack(header)
+    return salt1, salt2
+
+
+def _committed_wal_frames(wal_file: t.BinaryIO, page_size: int) -> tuple[dict[int, int], int | None]:
+    """
+    The offset of the newest committed frame of each page in the WAL, and the database's size in pages as of the
+    last commit (None if the WAL has no committed frames). Like SQLite's recovery, frames are read up to the first
+    one that doesn't belong (a frame of an earlier WAL, or one being written).
+    """
+    wal_file.seek(0)
+    header = wal_file.read(WAL_HEADER.size)
+    if len(header) < WAL_HEADER.size:
+        return {}, None
+
+    magic, _, wal_page_size, _, salt1, salt2, checksum1, checksum2 = WAL_HEADER.unpack(header)
+    big_endian = bool(magic & 1)
+    if magic & ~1 != WAL_MAGIC or wal_page_size != page_size:
+        return {}, None
+    s1, s2 = _WalChecksum(6, big_endian)(header[:24], 0, 0)
+    if (s1, s2) != (checksum1, checksum2):
+        return {}, None
+    # a frame's checksum covers its page number and commit page count, then its page
+    frame_checksum = _WalChecksum(2 + page_size // 4, big_endian)
+
+    committed: dict[int, int] = {}
+    uncommitted: dict[int, int] = {}
+    page_count = None
+    frame_size = WAL_FRAME_HEADER.size + page_size
+    offset = WAL_HEADER.size
+    # frames appended after this are from commits after the snapshot's, and would keep this reading while writers
+    # are busy
+    end = os.fstat(wal_file.fileno()).st_size
+    while offset + frame_size <= end and len(frame := wal_file.read(frame_size)) == frame_size:
+        page_number, commit_page_count, frame_salt1, frame_salt2, checksum1, checksum2 = (
+            WAL_FRAME_HEADER.unpack_from(frame)
+        )
+        if page_number == 0 or (frame_salt1, frame_salt2) != (salt1, salt2):
+            break
+        s1, s2 = frame_checksum(frame[:8] + frame[WAL_FRAME_HEADER.size :], s1, s2)
+        if (s1, s2) != (checksum1, checksum2):
+            break
+
+        uncommitted[page_number] = offset + WAL_FRAME_HEADER.size
+        if commit_page_count:
+            committed.update(uncommitted)
+            uncommitted.clear()
+            page_count = commit_page_count
+        offset += frame_size
+
+    return committed, page_count
+
+
+class Snapshot:
+    """The pages of a database as of one commit. See read_snapshot."""
+
+    def __init__(self, database: str, database_file: t.BinaryIO, wal_file: t.BinaryIO | None) -> None:
+        self.database = database
+        self._database_file = database_file
+        self._wal_file = wal_file
+
+        header = database_file.read(100)
+        if len(header) < 100 or not header.startswith(b"SQLite format 3\x00"):
+            raise ValueError(f"{database} isn't a SQLite database.")
+        (page_size,) = struct.unpack_from(">H", header, 16)
+        self.page_size = 65536 if page_size == 1 else page_size
+
+        self._wal_offsets: dict[int, int] = {}
+        self._wal_salts: tuple[int, int] | None = None
+        wal_page_count = None
+        if wal_file is not None:
+            self._wal_salts = _wal_salts(wal_file)
+            self._wal_offsets, wal_page_count = _committed_wal_frames(wal_file, self.page_size)
+            if self._wal_offsets and _wal_salts(wal_file) != self._wal_salts:
+                # the WAL was restarted while it was read, so the database file alone is the snapshot: see
+                # read_snapshot
+                self._wal_offsets, wal_page_count = {}, None
+
+        if wal_page_count is not None:
+            self.page_count = wal_page_count
+        elif header[24:28] == header[92:96]:
+            # the header's page count is valid
+            (self.page_count,) = struct.unpack_from(">I", header, 28)
+        else:
+            self.page_count = os.fstat(database_file.fileno()).st_size // self.page_size
+
+    def pages(self) -> t.Iterator[tuple[int, bytes]]:
+        """(page number, page) of every page, in order. Page numbers start at 1."""
+        page_size = self.page_size
+        self._database_file.seek(0)
+        for first in range(1, self.page_count + 1, READ_PAGES):
+            chunk = self._database_file.read(min(READ_PAGES, self.page_count + 1 - first) * page_size)
+            for page_number in range(first, min(first + READ_PAGES, self.page_count + 1)):
+                wal_offset = self._wal_offsets.get(page_number)
+                page = None
+                if wal_offset is not None:
+                    page = self._read_wal_page(page_number, wal_offset)
+                if page is None:
+                    start = (page_number - first) * page_size
+                    page = chunk[start : start + page_size]
+                if len(page) < page_size:
+                    raise ValueError(f"{self.database} is missing page {page_number}.")
+                yield page_number, page
+
+    def _read_wal_page(self, page_number: int, wal_offset: int) -> bytes | None:
+        """
+        The page in the frame at wal_offset, or None if the frame was overwritten since the WAL was read, in which
+        case the database file holds the page: see read_snapshot.
+        """
+        assert self._wal_file is not None
+        self._wal_file.seek(wal_offset)
+        page = self._wal_file.read(self.page_size)
+        # a frame's header is written before its page, so a header checked after reading the page covers the page
+        self._wal_file.seek(wal_offset - WAL_FRAME_HEADER.size)
+        frame_header = self._wal_file.read(WAL_FRAME_HEADER.size)
+        if len(page) < self.page_size or len(frame_header) < WAL_FRAME_HEADER.size:
+            return None
+        frame_page_number, _, salt1, salt2, _, _ = WAL_FRAME_HEADER.unpack(frame_header)
+        if frame_page_number != page_number or (salt1, salt2) != self._wal_salts:
+            return None
+        return page
+
+
+@contextmanager
+def read_snapshot(database: str) -> t.Iterator[Snapshot]:
+    """
+    A consistent snapshot of the database's pages, read without blocking writers.
+
+    The snapshot is the database file overlaid with the WAL's committed frames. While this holds a read transaction,
+    a checkpoint only copies into the database file frames the transaction can see, which are in the overlay, and
+    the WAL is only restarted once fully checkpointed, after which checkpoints wait for the transaction to end. So
+    any committed prefix of the WAL overlaid on the database file is a state the database was in.
+
+    The exception is a transaction that starts on a fully checkpointed WAL. It reads only the database file, which
+    no checkpoint can change until it ends, and writers can restart the WAL under it, overwriting the frames of the
+    overlay. Those frames hold the same pages as the database file, so a WAL restarted while it's parsed is
+    dropped, and a frame overwritten later is read from the database file instead.
+
+    The database should be in WAL mode, else the read transaction blocks writers until the snapshot is closed.
+    """
+    connection = sqlite3.connect(f"file:{database}?mode=ro", uri=True, isolation_level=None)
+    try:
+        connection.execute("BEGIN")
+        # the read transaction starts at the first read
+        connection.execute("SELECT COUNT(1) FROM sqlite_master").fetchone()
+
+        with open(database, "rb") as database_file:
+            try:
+                wal_file: t.BinaryIO | None = open(f"{database}-wal", "rb")
+            except FileNotFoundError:
+                wal_file = None
+            try:
+                yield Snapshot(database, database_file, wal_file)
+            finally:
+                if wal_file is not None:
+                    wal_file.close()
+    finally:
+        connection.close()
+
+
+def page_digest(page: bytes) -> bytes:
+    return blake2b(page, digest_size=DIGEST_SIZE).digest()
+
+
+def load_manifest(path: str | Path) -> PageManifest | None:
+    """The manifest at path, or None if it's missing or malformed."""
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+    if len(data) < MANIFEST_HEADER.size:
+        return None
+    magic, chain_id, sequence, page_size, page_count = MANIFEST_HEADER.unpack_from(data)
+    digests = data[MANIFEST_HEADER.size :]
+    if magic != MANIFEST_MAGIC or len(digests) != page_count * DIGEST_SIZE:
+        return None
+    return PageManifest(chain_id, sequence, page_size, page_count, digests)
+
+
+def write_manifest(path: str | Path, manifest: PageManifest) -> None:
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(
+            MANIFEST_HEADER.pack(
+                MANIFEST_MAGIC, manifest.chain_id, manifest.sequence, manifest.page_size, manifest.page_count
+            )
+        )
+        f.write(manifest.digests)
+    os.replace(tmp_path, path)
+
+
+def read_delta_header(delta: t.BinaryIO) -> DeltaHeader:
+    data = delta.read(DELTA_HEADER.size)
+    if len(data) < DELTA_HEADER.size:
+        raise ValueError(f"{delta.name} is truncated.")
+    magic, *fields = DELTA_HEADER.unpack(data)
+    if magic != DELTA_MAGIC:
+        raise ValueError(f"{delta.name} isn't a database delta.")
+    header = DeltaHeader(*fields)
+    expected_size = DELTA_HEADER.size + header.n_pages * (DELTA_PAGE_NUMBER.size + header.page_size)
+    if os.fstat(delta.fileno()).st_size != expected_size:
+        raise ValueError(f"{delta.name} is truncated.")
+    return header
+
+
+def apply_delta(backup_file: str | Path, delta_file: str | Path) -> DeltaHeader:
+    """Write the delta's pages into the backup, and truncate it to the delta's page count."""
+    with open(delta_file, "rb") as delta, open(backup_file, "r+b") as backup:
+        header = read_delta_header(delta)
+        for _ in range(header.n_pages):
+            (page_number,) = DELTA_PAGE_NUMBER.unpack(delta.read(DELTA_PAGE_NUMBER.size))
+            backup.seek((page_number - 1) * header.page_size)
+            backup.write(delta.read(header.page_size))
+        backup.truncate(header.page_count * header.page_size)
+    return header
+
+
+def replay_deltas(backup_file: str | Path, deltas: t.Iterable[str | Path]) -> int:
+    """
+    Apply deltas of one chain to the backup, in sequence order, and return how many were applied. The backup must be
+    a copy from the same chain, from at most the first delta's previous sequence.
+
+    Replaying is idempotent: replaying the deltas onto a copy that already has some of them gives the same file.
+    """
+    headers = []
+    for delta_file in deltas:
+        with open(delta_file, "rb") as delta:
+            headers.append((read_delta_header(delta), delta_file))
+    headers.sort(key=lambda header_and_file: header_and_file[0].sequence)
+
+    for (previous, _), (header, delta_file) in zip(headers, headers[1:]):
+        if header.chain_id != previous.chain_id or header.sequence != previous.sequence + 1:
+            raise ValueError(f"{delta_file} doesn't follow delta {previous.sequence} of the same backup.")
+
+    for _, delta_file in headers:
+        apply_delta(backup_file, delta_file)
+    return len(headers)
+
+
+def backup_incrementally(database: str, backup_file: str) -> tuple[PageManifest, Path | None]:
+    """
+    Bring backup_file up to date with the database. The pages that changed since the last backup are written into a
+    delta in deltas_directory(backup_file), which is then applied to backup_file.
+
+    Returns the new manifest, and the delta. If backup_file has no valid manifest, it's copied in full instead,
+    starting a new chain, and there's no delta.
+    """
+    backup_path = Path(backup_file)
+    previous = load_manifest(manifest_path(backup_path))
+    if previous is not None and (
+        not backup_path.exists() or backup_path.stat().st_size != previous.page_count * previous.page_size
+    ):
+        previous = None
+    # until backup_file matches the new manifest, so an interrupted backup starts a new chain next time
+    manifest_path(backup_path).unlink(missing_ok=True)
+
+    digests = bytearray()
+    with read_snapshot(database) as snapshot:
+        if previous is None or previous.page_size != snapshot.page_size:
+            chain_id, sequence, delta_path = uuid4().bytes, 0, None
+            # deltas of the previous chain don't apply to the new copy
+            shutil.rmtree(deltas_directory(backup_path), ignore_errors=True)
+            with open(backup_path, "wb") as backup:
+                for _, page in snapshot.pages():
+                    backup.write(page)
+                    digests += page_digest(page)
+        else:
+            chain_id, sequence = previous.chain_id, previous.sequence + 1
+            deltas_directory(backup_path).mkdir(parents=True, exist_ok=True)
+            delta_path = deltas_directory(backup_path) / f"{sequence:010d}.delta"
+            tmp_path = Path(f"{delta_path}.tmp")
+
+            n_pages = 0
+            with open(tmp_path, "wb") as delta:
+                delta.write(b"\x00" * DELTA_HEADER.size)
+                for page_number, page in snapshot.pages():
+                    digest = page_digest(page)
+                    start = (page_number - 1) * DIGEST_SIZE
+                    if previous.digests[start : start + DIGEST_SIZE] != digest:
+                        delta.write(DELTA_PAGE_NUMBER.pack(page_number))
+                        delta.write(page)
+                        n_pages += 1
+                    digests += digest
+                delta.seek(0)
+                delta.write(
+                    DELTA_HEADER.pack(
+                        DELTA_MAGIC, chain_id, sequence, snapshot.page_size, snapshot.page_count, n_pages
+                    )
+                )
+            os.replace(tmp_path, delta_path)
+            apply_delta(backup_path, delta_path)
+
+        manifest = PageManifest(chain_id, sequence, snapshot.page_size, snapshot.page_count, bytes(digests))
+
+    write_manifest(manifest_path(backup_path), manifest)
+    return manifest, delta_path
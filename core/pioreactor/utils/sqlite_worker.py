@@ -24,11 +24,14 @@ import threading
 from queue import Empty
 from queue import Queue
 from time import monotonic
+from time import perf_counter
 from typing import Any
 from typing import Callable
+from typing import Sequence
 
 type SqliteValues = tuple[Any, ...] | dict[str, Any]
 type SqliteErrorCallback = Callable[[Exception, str, SqliteValues], None]
+type SqliteCommitCallback = Callable[[int, float], None]
 
 
 class Sqlite3Worker(threading.Thread):
@@ -46,6 +49,13 @@ class Sqlite3Worker(threading.Thread):
         sql_worker.close()
 
     Accepted write/DDL statements are committed no later than max_batch_delay_s, max_queue_size, or close()
+
+    Rows queued with `execute_grouped` are held until the batch is committed, and then written with a single
+    `executemany` per distinct query. Any plain `execute` flushes the held rows first, so statement order is preserved.
+    A grouped row's `dependents` (ex: UPSERTs into tables derived from the row) run with the row's values only if the
+    row itself was written, after all the batch's grouped rows.
+
+    `batch_statements` run once per committed batch, after its writes (ex: to index the rows just inserted).
     """
 
     def __init__(
@@ -55,6 +65,8 @@ class Sqlite3Worker(threading.Thread):
         max_batch_delay_s: float | None = None,
         raise_on_error: bool = True,
         on_error: SqliteErrorCallback | None = None,
+        on_commit: SqliteCommitCallback | None = None,
+        batch_statements: Sequence[str] = (),
     ) -> None:
         """Automatically starts the thread.
 
@@ -64,6 +76,9 @@ class Sqlite3Worker(threading.Thread):
             max_batch_delay_s: The max time to wait before committing queued writes.
             raise_on_error: raise the exception on commit error
             on_error: Called when a queued write or commit fails.
+            on_commit: Called after each commit with the number of statements/rows committed and the seconds spent
+              writing grouped rows and committing.
+            batch_statements: Statements run in each batch's transaction, after its writes, before committing.
         """
         threading.Thread.__init__(self, name=__name__)
         self.daemon = True
@@ -83,11 +98,17 @@ class Sqlite3Worker(threading.Thread):
             PRAGMA mmap_size = 268435456;
         """
         )
-        self._sql_queue: Queue[tuple[str, SqliteValues]] = Queue(maxsize=max_queue_size)
+        self._sql_queue: Queue[tuple[str, SqliteValues, bool, tuple[str, ...]]] = Queue(
+            maxsize=max_queue_size
+        )
         self._max_queue_size = max_queue_size
         self._max_batch_delay_s = max_batch_delay_s
         self._raise_on_error = raise_on_error
         self._on_error = on_error
+        self._on_commit = on_commit
+        self._batch_statements = tuple(batch_statements)
+        # (query, dependents) -> rows, in arrival order. Only touched by the worker thread.
+        self._grouped_rows: dict[tuple[str, tuple[str, ...]], list[SqliteValues]] = {}
         # Event to start the close process.
         self._close_event = threading.Event()
         # Event that closes out the threads.
@@ -116,36 +137,40 @@ class Sqlite3Worker(threading.Thread):
                 timeout = None
 
             try:
-                query, values = self._sql_queue.get(timeout=timeout)
+                query, values, grouped, dependents = self._sql_queue.get(timeout=timeout)
             except Empty:
                 if execute_count:
-                    self.commit_pending_writes()
+                    self.commit_pending_writes(execute_count)
                     execute_count = 0
                 batch_deadline = None
                 continue
 
             if query:
-                self.run_query(query, values)
+                if grouped:
+                    self._grouped_rows.setdefault((query, dependents), []).append(values)
+                else:
+                    self.run_grouped_queries()
+                    self.run_query(query, values)
                 execute_count += 1
                 if batch_deadline is None and self._max_batch_delay_s is not None:
                     batch_deadline = monotonic() + self._max_batch_delay_s
 
                 if self._max_batch_delay_s is None and self._sql_queue.empty():
-                    self.commit_pending_writes()
+                    self.commit_pending_writes(execute_count)
                     execute_count = 0
                     batch_deadline = None
                 elif execute_count == self._max_queue_size:
-                    self.commit_pending_writes()
+                    self.commit_pending_writes(execute_count)
                     execute_count = 0
                     batch_deadline = None
                 elif batch_deadline is not None and monotonic() >= batch_deadline:
-                    self.commit_pending_writes()
+                    self.commit_pending_writes(execute_count)
                     execute_count = 0
                     batch_deadline = None
 
             if self._close_event.is_set() and self._sql_queue.empty():
                 if execute_count:
-                    self.commit_pending_writes()
+                    self.commit_pending_writes(execute_count)
                 self._sqlite3_conn.close()
                 return
 
@@ -153,20 +178,64 @@ class Sqlite3Worker(threading.Thread):
         if self._on_error is not None:
             self._on_error(error, query, values)
 
-    def commit_pending_writes(self) -> None:
+    def commit_pending_writes(self, execute_count: int = 0) -> None:
+        start = perf_counter()
+        self.run_grouped_queries()
+        for statement in self._batch_statements:
+            self.run_query(statement, tuple())
         try:
             self._sqlite3_conn.commit()
         except Exception as e:
             self.report_error(e, "COMMIT", tuple())
             if self._raise_on_error:
                 raise e
+            return
+
+        if self._on_commit is not None:
+            self._on_commit(execute_count, perf_counter() - start)
+
+    def run_grouped_queries(self) -> None:
+        """Write all rows held by `execute_grouped`, one executemany per query, then their dependents."""
+        if not self._grouped_rows:
+            return
+
+        grouped_rows, self._grouped_rows = self._grouped_rows, {}
+        if not self._sqlite3_conn.in_transaction:
+            # otherwise releasing the outermost savepoint below would commit each group on its own.
+            self._sqlite3_cursor.execute("BEGIN")
+
+        dependent_rows: dict[str, list[SqliteValues]] = {}
+        for (query, dependents), rows in grouped_rows.items():
+            written_rows = self.run_grouped_query(query, rows)
+            for dependent in dependents:
+                dependent_rows.setdefault(dependent, []).extend(written_rows)
+
+        for dependent, rows in dependent_rows.items():
+            self.run_grouped_query(dependent, rows)
+
+    def run_grouped_query(self, query: str, rows: list[SqliteValues]) -> list[SqliteValues]:
+        """Write `rows` with one executemany, and return the rows written."""
+        try:
+            self._sqlite3_cursor.execute("SAVEPOINT grouped_rows")
+            self._sqlite3_cursor.executemany(query, rows)
+            self._sqlite3_cursor.execute("RELEASE grouped_rows")
+            return rows
+        except sqlite3.Error:
+            # roll back only this group, then replay it row by row so a single bad row
+            # is reported on its own and doesn't drop its neighbours.
+            self._sqlite3_cursor.execute("ROLLBACK TO grouped_rows")
+            self._sqlite3_cursor.execute("RELEASE grouped_rows")
+            return [values for values in rows if self.run_query(query, values)]
 
-    def run_query(self, query: str, values: SqliteValues) -> None:
+    def run_query(self, query: str, values: SqliteValues) -> bool:
         """Run a query.
 
         Args:
             query: A sql query with ? placeholders for values.
             values: A tuple of values to replace "?" in query.
+
+        Returns:
+            True if the query succeeded.
         """
         try:
             self._sqlite3_cursor.execute(query, values)
@@ -174,6 +243,8 @@ class Sqlite3Worker(threading.Thread):
             self.report_error(e, query, values)
             if self._raise_on_error:
                 raise e
+            return False
+        return True
 
     def close(self) -> None:
         """Close down the thread."""
@@ -183,7 +254,7 @@ class Sqlite3Worker(threading.Thread):
             self._close_event.set()
             # Put a value in the queue to push through the block waiting for
             # items in the queue.
-            self._sql_queue.put(("", ("",)), timeout=5)
+            self._sql_queue.put(("", ("",), False, ()), timeout=5)
             # Check that the thread is done before returning.
             self.join()
 
@@ -203,5 +274,24 @@ class Sqlite3Worker(threading.Thread):
             )
 
         values = values or tuple()
-        self._sql_queue.put((query, values), timeout=5)
+        self._sql_queue.put((query, values, False, ()), timeout=5)
+        return None
+
+    def execute_grouped(
+        self, query: str, values: SqliteValues, dependents: tuple[str, ...] = ()
+    ) -> str | None:
+        """Queue a single row of a write that is repeated often, like an INSERT.
+
+        Rows with the same query are written together with one `executemany` when the batch is committed.
+
+        Args:
+            query: The sql string using ? (or :name) for placeholders of dynamic values.
+            values: The values for a single row.
+            dependents: Queries also run with `values`, only if `query` succeeded for this row. They're grouped
+              the same way, after the batch's grouped rows.
+        """
+        if self._close_event.is_set():
+            return "Close Called"
+
+        self._sql_queue.put((query, values, True, dependents), timeout=5)
         return None
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Pre-aggregated, downsampled copies of the chart time series, stored in the time_series_rollups table.
+
+Every source row is folded into one bucket per tier (count, sum, min, max per unit and channel), so a long chart
+can be answered from a few hundred buckets instead of scanning and sampling the source table. mqtt_to_db_streaming
+keeps the buckets current as rows arrive, and `pio run rebuild_time_series_rollups` recomputes them.
+"""
+from math import ceil
+
+# bucket widths, finest first.
+ROLLUP_BUCKETS_S = (60, 600, 3600)
+
+# source table -> (value column, is partitioned by channel)
+ROLLUP_SOURCES: dict[str, tuple[str, bool]] = {
+    "growth_rates": ("rate", False),
+    "temperature_readings": ("temperature_c", False),
+    "od_readings_filtered": ("normalized_od_reading", False),
+    "od_readings": ("od_reading", True),
+    "od_readings_fused": ("od_reading", False),
+    "raw_od_readings": ("od_reading", True),
+}
+
+_TIERS = "(VALUES " + ", ".join(f"({bucket_s})" for bucket_s in ROLLUP_BUCKETS_S) + ") AS tiers"
+
+_UPSERT = """
+ON CONFLICT(data_source, bucket_seconds, experiment, pioreactor_unit, channel, bucket_start) DO UPDATE SET
+    n=n + excluded.n,
+    y_sum=y_sum + excluded.y_sum,
+    y_min=MIN(y_min, excluded.y_min),
+    y_max=MAX(y_max, excluded.y_max)
+"""
+
+
+def bucket_start(timestamp: str, bucket_seconds: str) -> str:
+    """SQL expression that floors an ISO8601 timestamp to the start of its bucket, in the same ISO8601 format."""
+    return (
+        f"strftime('%Y-%m-%dT%H:%M:%fZ', "
+        f"CAST(strftime('%s', {timestamp}) AS INTEGER) / {bucket_seconds} * {bucket_seconds}, 'unixepoch')"
+    )
+
+
+def rollup_upsert_for_rows(data_source: str) -> str:
+    """
+    UPSERT that folds one row of `data_source` (bound as named parameters) into its bucket of every tier.
+    """
+    value_column, partition_by_channel = ROLLUP_SOURCES[data_source]
+    channel = ":channel" if partition_by_channel else "0"
+    return f"""
+        INSERT INTO time_series_rollups
+            (data_source, bucket_seconds, experiment, pioreactor_unit, channel, bucket_start, n, y_sum, y_min, y_max)
+        SELECT '{data_source}', tiers.column1, :experiment, :pioreactor_unit, {channel},
+               {bucket_start(":timestamp", "tiers.column1")},
+               1, :{value_column}, :{value_column}, :{value_column}
+        FROM {_TIERS}
+        WHERE true
+        {_UPSERT}
+    """
+
+
+def rollup_upsert_from_table(data_source: str, bucket_seconds: int, where: str = "true") -> str:
+    """
+    UPSERT that folds all rows of `data_source` matching `where` into their buckets of one tier.
+    """
+    value_column, partition_by_channel = ROLLUP_SOURCES[data_source]
+    channel = "channel" if partition_by_channel else "0"
+    return f"""
+        INSERT INTO time_series_rollups
+            (data_source, bucket_seconds, experiment, pioreactor_unit, channel, bucket_start, n, y_sum, y_min, y_max)
+        SELECT '{data_source}', {bucket_seconds}, experiment, pioreactor_unit, {channel},
+               {bucket_start("timestamp", str(bucket_seconds))} AS bucket,
+               COUNT(1), SUM({value_column}), MIN({value_column}), MAX({value_column})
+        FROM {data_source}
+        WHERE {where}
+        GROUP BY experiment, pioreactor_unit, {"channel, " if partition_by_channel else ""}bucket
+        {_UPSERT}
+    """
+
+
+def choose_rollup_bucket(span_seconds: float, target_points: int) -> tuple[int, int] | None:
+    """
+    Pick the coarsest tier that still has at least `target_points` buckets over `span_seconds`, and how many seconds
+    of that tier to merge into each returned point. Returns None if even the finest tier is too coarse, and the
+    source table should be sampled directly.
+    """
+    seconds_per_point = span_seconds / target_points
+    candidates = [bucket_s for bucket_s in ROLLUP_BUCKETS_S if bucket_s <= seconds_per_point]
+    if not candidates:
+        return None
+    bucket_s = max(candidates)
+    return bucket_s, ceil(seconds_per_point / bucket_s) * bucket_s
@@ -13,6 +13,7 @@ from datetime import timedelta
 from datetime import timezone
 from io import BytesIO
 from pathlib import Path
+from zlib import crc32
 
 from flask import Blueprint
 from flask import jsonify
@@ -23,6 +24,7 @@ from flask.typing import ResponseReturnValue
 from huey.exceptions import HueyException
 from huey.exceptions import TaskException
 from msgspec import DecodeError
+from msgspec import Struct
 from msgspec import to_builtins
 from msgspec import UNSET
 from msgspec import ValidationError
@@ -39,21 +41,23 @@ from pioreactor.models import get_registered_models
 from pioreactor.mureq import HTTPErrorStatus
 from pioreactor.mureq import HTTPException
 from pioreactor.mureq import Response as MureqResponse
-from pioreactor.pubsub import create_client
 from pioreactor.pubsub import get_from
+from pioreactor.pubsub import get_shared_client
 from pioreactor.pubsub import post_into
-from pioreactor.pubsub import publish
 from pioreactor.pubsub import QOS
 from pioreactor.release_archive import ReleaseArchiveVerificationError
 from pioreactor.release_archive import verify_release_archive
 from pioreactor.states import JobState
 from pioreactor.structs import CalibrationBase
 from pioreactor.structs import Dataset
+from pioreactor.utils.logs_search import to_fts_query
 from pioreactor.utils.networking import is_using_local_access_point
 from pioreactor.utils.networking import resolve_to_address
+from pioreactor.utils.time_series_rollups import choose_rollup_bucket
 from pioreactor.utils.timing import current_utc_datetime
 from pioreactor.utils.timing import current_utc_timestamp
 from pioreactor.utils.timing import to_iso_format
+from pioreactor.web import assignments
 from pioreactor.web import cache
 from pioreactor.web import fanout
 from pioreactor.web import tasks
@@ -68,6 +72,8 @@ from pioreactor.web.app import publish_to_error_log
 from pioreactor.web.app import publish_to_experiment_log
 from pioreactor.web.app import publish_to_log
 from pioreactor.web.app import query_app_db
+from pioreactor.web.app import query_app_db_json
+from pioreactor.web.app import query_app_db_rows
 from pioreactor.web.app import query_temp_local_metadata_db
 from pioreactor.web.plugin_registry import registered_api_routes
 from pioreactor.web.utils import abort_with
@@ -121,6 +127,13 @@ TIME_SERIES_SOURCE_CONFIG: dict[TimeSeriesDataSource, tuple[str, int, bool]] = {
     "raw_od_readings": ("od_reading", 7, True),
 }
 
+
+class TimeSeriesPoint(Struct):
+    # cheaper to make and encode than a dict per point
+    x: str
+    y: float | None
+
+
 for rule, options, view_func in registered_api_routes():
     api_bp.add_url_rule(rule, view_func=view_func, **options)
 
@@ -129,6 +142,74 @@ def as_json_response(json: str | bytes) -> Response:
     return Response(json, mimetype="application/json")
 
 
+def query_time_series_rollups(
+    experiment: str,
+    data_source: TimeSeriesDataSource,
+    lookback_hours: float,
+    target_points: int,
+    pioreactor_unit: str | None,
+) -> bytes | None:
+    """
+    Return chart data from the coarsest time_series_rollups tier that still has target_points buckets over the
+    lookback, merging neighbouring buckets into at most ~target_points means per series. This is a single scan of
+    the rollup index, regardless of the number of units and channels.
+
+    Returns None if no tier is fine enough, or the experiment's rollups don't cover its rows yet: it has none
+    (ex: rows inserted outside of mqtt_to_db_streaming), or it's in time_series_rollups_pending, until
+    `pio run rebuild_time_series_rollups` backfills it.
+    """
+    _, rounding_digits, partition_by_channel = TIME_SERIES_SOURCE_CONFIG[data_source]
+    chosen = choose_rollup_bucket(lookback_hours * 60 * 60, target_points)
+    if chosen is None:
+        return None
+    bucket_seconds, seconds_per_point = chosen
+
+    end = current_utc_datetime()
+    # include the bucket that straddles the cutoff
+    cutoff_timestamp = to_iso_format(end - timedelta(hours=lookback_hours, seconds=bucket_seconds))
+    unit_filter = "AND pioreactor_unit=?" if pioreactor_unit is not None else ""
+    unit_args: tuple[str, ...] = (pioreactor_unit,) if pioreactor_unit is not None else ()
+
+    rows = query_app_db_rows(
+        f"""
+        SELECT pioreactor_unit,
+               channel,
+               MIN(bucket_start) AS x,
+               round(SUM(y_sum) / SUM(n), ?) AS y
+        FROM time_series_rollups INDEXED BY time_series_rollups_ix
+        WHERE data_source=?
+          AND bucket_seconds=?
+          AND experiment=?
+          {unit_filter}
+          AND bucket_start > ?
+          AND bucket_start <= ?
+          AND NOT EXISTS (SELECT 1 FROM time_series_rollups_pending WHERE experiment=?)
+        GROUP BY pioreactor_unit, channel, CAST(strftime('%s', bucket_start) AS INTEGER) / ?
+        ORDER BY pioreactor_unit, channel, x
+        """,
+        (
+            rounding_digits,
+            data_source,
+            bucket_seconds,
+            experiment,
+            *unit_args,
+            cutoff_timestamp,
+            to_iso_format(end),
+            experiment,
+            seconds_per_point,
+        ),
+    )
+    if not rows:
+        return None
+
+    response: dict[str, list[TimeSeriesPoint]] = {}
+    for unit, channel, x, y in rows:
+        series = f"{unit}-{channel}" if partition_by_channel else unit
+        response.setdefault(series, []).append(TimeSeriesPoint(x, y))
+
+    return encode({"series": list(response), "data": list(response.values())})
+
+
 def query_time_series_from_database(
     experiment: str,
     data_source: TimeSeriesDataSource,
@@ -137,6 +218,12 @@ def query_time_series_from_database(
     pioreactor_unit: str | None,
 ) -> bytes:
     """Return temporally even chart data using each source's composite time-series index."""
+    rollups = query_time_series_rollups(
+        experiment, data_source, lookback_hours, target_points, pioreactor_unit
+    )
+    if rollups is not None:
+        return rollups
+
     value_column, rounding_digits, partition_by_channel = TIME_SERIES_SOURCE_CONFIG[data_source]
     index = f"{data_source}_ix"
     end = current_utc_datetime()
@@ -178,7 +265,7 @@ def query_time_series_from_database(
         series = [(unit, None) for unit in units]
 
     response_series: list[str] = []
-    response_data: list[list[dict[str, t.Any]]] = []
+    response_data: list[list[TimeSeriesPoint]] = []
 
     # Table, column, and index names above come only from TIME_SERIES_SOURCE_CONFIG.
     for unit, channel in series:
@@ -211,7 +298,7 @@ def query_time_series_from_database(
             continue
 
         if len(timestamps) <= target_points:
-            rows = query_app_db(
+            rows = query_app_db_rows(
                 f"""
                 SELECT timestamp,
                        round({value_column}, ?) AS y
@@ -234,7 +321,6 @@ def query_time_series_from_database(
                     target_points,
                 ),
             )
-            assert isinstance(rows, list)
         else:
             last_row = query_app_db(
                 f"""
@@ -262,9 +348,9 @@ def query_time_series_from_database(
             assert isinstance(last_row, dict)
 
             if target_points == 1:
-                rows = [last_row]
+                rows = [(last_row["timestamp"], last_row["y"])]
             else:
-                rows = query_app_db(
+                rows = query_app_db_rows(
                     f"""
                     WITH RECURSIVE targets(i, target_timestamp) AS (
                         SELECT 0, ?
@@ -323,14 +409,235 @@ def query_time_series_from_database(
                         rounding_digits,
                     ),
                 )
-                assert isinstance(rows, list)
 
         response_series.append(f"{unit}-{channel}" if partition_by_channel else unit)
-        response_data.append([{"x": row["timestamp"], "y": row["y"]} for row in rows])
+        response_data.append([TimeSeriesPoint(x, y) for x, y in rows])
 
     return encode({"series": response_series, "data": response_data})
 
 
+def query_fallback_time_series_from_database(
+    experiment: str,
+    data_source: str,
+    column: str,
+    lookback_hours: float,
+    target_points: int,
+    pioreactor_unit: str | None,
+) -> str:
+    """Return every nth row of any table or view with experiment, pioreactor_unit and timestamp columns."""
+    unit_filter = "AND pioreactor_unit=?" if pioreactor_unit is not None else ""
+    unit_args: tuple[str, ...] = (pioreactor_unit,) if pioreactor_unit is not None else ()
+    r = query_app_db(
+        f"""
+            WITH numbered AS (
+                SELECT unit,
+                       timestamp,
+                       y,
+                       ROW_NUMBER() OVER (PARTITION BY unit ORDER BY timestamp) AS rn
+                FROM (
+                    SELECT pioreactor_unit AS unit,
+                           timestamp,
+                           {column} AS y
+                    FROM {data_source}
+                    WHERE experiment=? AND timestamp > STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW',?) {unit_filter} AND {column} IS NOT NULL
+                )
+            ), steps AS (
+                SELECT unit,
+                       CASE WHEN ? > 0 THEN MAX(1, CAST((MAX(rn) + ? - 1) / ? AS INT)) ELSE 1 END AS step
+                FROM numbered
+                GROUP BY unit
+            )
+            SELECT json_object('series', json_group_array(unit), 'data', json_group_array(json(series_data))) AS json
+            FROM (
+                SELECT numbered.unit,
+                       json_group_array(json_object('x', timestamp, 'y', round(y, 7))) AS series_data
+                FROM numbered
+                JOIN steps USING (unit)
+                WHERE (rn % step) = 0
+                GROUP BY numbered.unit
+            );
+            """,
+        (experiment, f"-{lookback_hours} hours", *unit_args, target_points, target_points, target_points),
+        one=True,
+    )
+    assert isinstance(r, dict)
+    return r["json"]
+
+
+def time_series_version(data_source: str) -> tuple[int, int] | None:
+    """
+    (deletions, newest rowid) of data_source, a seek to the end of the table and a row of time_series_deletions.
+    Appending rows grows the rowid. Deleting rows (ex: with their experiment, or by `pio run refuse_od --replace`) lets
+    SQLite reuse rowids, so the triggers in create_triggers.sql count them. Together, they change whenever the data
+    does. Tables without triggers (ex: ones read by the generic route) count 0 deletions. None if data_source has no
+    rowid (ex: a view).
+    """
+    try:
+        row = query_app_db(
+            f"""
+            SELECT MAX(rowid) AS rowid,
+                   (SELECT deletions FROM time_series_deletions WHERE data_source=?) AS deletions
+            FROM {data_source}
+            """,
+            (data_source,),
+            one=True,
+        )
+    except sqlite3.OperationalError:
+        return None
+    assert isinstance(row, dict)
+    return row["deletions"] or 0, row["rowid"] or 0
+
+
+def parse_time_series_cursor(cursor: str) -> tuple[int, int]:
+    """
+    (deletions, rowid) from a cursor made by time_series_response, ex: "0.1234".
+    """
+    deletions, _, rowid = cursor.partition(".")
+    return int(deletions), int(rowid)
+
+
+def query_time_series_since(
+    experiment: str,
+    data_source: str,
+    value_column: str,
+    rounding_digits: int,
+    partition_by_channel: bool,
+    since: int,
+    latest: int,
+    deletions: int,
+    max_points: int,
+    pioreactor_unit: str | None,
+) -> bytes:
+    """
+    Return the rows added to data_source after rowid `since`, and the cursor to pass as `since` next time.
+
+    This is a range scan of the rowid, so its cost is proportional to the number of new rows, not the lookback.
+    At most max_points rows are returned. If more are pending, the cursor is the last returned row, so the next
+    call continues from there.
+    """
+    unit_filter = "AND pioreactor_unit=?" if pioreactor_unit is not None else ""
+    unit_args: tuple[str, ...] = (pioreactor_unit,) if pioreactor_unit is not None else ()
+    channel_column = "channel" if partition_by_channel else "NULL AS channel"
+
+    rows = query_app_db_rows(
+        f"""
+        SELECT rowid,
+               pioreactor_unit,
+               {channel_column},
+               timestamp,
+               round({value_column}, ?) AS y
+        FROM {data_source}
+        WHERE rowid > ?
+          AND rowid <= ?
+          AND experiment=?
+          {unit_filter}
+          AND {value_column} IS NOT NULL
+        ORDER BY rowid
+        LIMIT ?
+        """,
+        (rounding_digits, since, latest, experiment, *unit_args, max_points + 1),
+    )
+    cursor = latest
+    if len(rows) > max_points:
+        rows = rows[:max_points]
+        cursor = rows[-1][0]
+
+    response: dict[tuple[str, int | None], list[TimeSeriesPoint]] = {}
+    for _, unit, channel, x, y in rows:
+        response.setdefault((unit, channel), []).append(TimeSeriesPoint(x, y))
+    series = sorted(response)
+
+    return encode(
+        {
+            "series": [f"{unit}-{channel}" if partition_by_channel else unit for unit, channel in series],
+            "data": [response[key] for key in series],
+            "cursor": f"{deletions}.{cursor}",
+        }
+    )
+
+
+def time_series_response(
+    experiment: str,
+    data_source: str,
+    lookback_hours: float,
+    target_points: int,
+    since: str | None,
+    pioreactor_unit: str | None,
+    column: str | None = None,
+) -> ResponseReturnValue:
+    """
+    Chart data for the time_series routes. `column` is set for the generic /<data_source>/<column> routes.
+
+    Responses carry an ETag of data_source's version (see time_series_version) and of the request's parameters, so a
+    poll with an unchanged If-None-Match is a 304 without querying any data. Their X-Next-Cursor header is a cursor:
+    pass it as `since` to get only the newer points, and the next cursor, in the body's "cursor". If rows were deleted
+    since the cursor was made, it can't be trusted, and the response is the full lookback, as without `since`.
+    """
+    version = time_series_version(data_source)
+    etag = cursor = None
+    if version is not None:
+        deletions, latest = version
+        cursor = f"{deletions}.{latest}"
+        etag = f"{cursor}-{crc32(request.full_path.encode()):08x}"
+
+        if request.if_none_match.contains(etag):
+            not_modified = Response(status=304)
+            not_modified.set_etag(etag)
+            not_modified.headers["X-Next-Cursor"] = cursor
+            return attach_cache_control(not_modified)
+
+    if since is not None:
+        if version is None:
+            abort_with(400, f"since is not supported for {data_source}")
+        try:
+            since_deletions, since_rowid = parse_time_series_cursor(since)
+        except ValueError:
+            abort_with(400, "since must be a cursor from X-Next-Cursor")
+
+        if since_deletions != deletions or since_rowid > latest:
+            # rows were deleted, and their rowids may be reused
+            since = None
+
+    if since is not None:
+        if column is None:
+            value_column, rounding_digits, partition_by_channel = TIME_SERIES_SOURCE_CONFIG[
+                t.cast(TimeSeriesDataSource, data_source)
+            ]
+        else:
+            value_column, rounding_digits, partition_by_channel = column, 7, False
+
+        body: str | bytes = query_time_series_since(
+            experiment,
+            data_source,
+            value_column,
+            rounding_digits,
+            partition_by_channel,
+            since_rowid,
+            latest,
+            deletions,
+            target_points,
+            pioreactor_unit,
+        )
+    elif column is None:
+        body = query_time_series_from_database(
+            experiment,
+            data_source=t.cast(TimeSeriesDataSource, data_source),
+            lookback_hours=lookback_hours,
+            target_points=target_points,
+            pioreactor_unit=pioreactor_unit,
+        )
+    else:
+        body = query_fallback_time_series_from_database(
+            experiment, data_source, column, lookback_hours, target_points, pioreactor_unit
+        )
+
+    response = as_json_response(body)
+    if etag is not None and cursor is not None:
+        response.set_etag(etag)
+        response.headers["X-Next-Cursor"] = cursor
+    return attach_cache_control(response)
+
+
 def _parse_experiment_tags(raw_tags: str | None) -> list[str]:
     if not raw_tags:
         return []
@@ -748,13 +1055,13 @@ def stop_specific_job_on_unit(
     """
 
     try:
-        with create_client() as client:
-            msg = client.publish(
-                f"pioreactor/{pioreactor_unit}/{experiment}/{job_name}/$state/set",
-                JobState.DISCONNECTED.to_bytes(),
-                qos=QOS.AT_LEAST_ONCE,
-            )
-            msg.wait_for_publish(timeout=2.0)
+        client = get_shared_client()
+        msg = client.publish(
+            f"pioreactor/{pioreactor_unit}/{experiment}/{job_name}/$state/set",
+            JobState.DISCONNECTED.to_bytes(),
+            qos=QOS.AT_LEAST_ONCE,
+        )
+        msg.wait_for_publish(timeout=2.0)
     except Exception as e:
         publish_to_error_log(str(e), "stop_specific_job_on_unit")
         # Fall back to the unit API stop endpoint instead of surfacing a false failure.
@@ -914,14 +1221,14 @@ def blink_worker(pioreactor_unit: str) -> ResponseReturnValue:
 
     No request body is required.
     """
-    with create_client() as client:
-        # Blink requests are transient commands; use QoS 1 so the monitor side is not capped at QoS 0.
-        msg = client.publish(
-            f"pioreactor/{pioreactor_unit}/{UNIVERSAL_EXPERIMENT}/monitor/flicker_led_response_okay",
-            1,
-            qos=QOS.AT_LEAST_ONCE,
-        )
-        msg.wait_for_publish(timeout=2.0)
+    client = get_shared_client()
+    # Blink requests are transient commands; use QoS 1 so the monitor side is not capped at QoS 0.
+    msg = client.publish(
+        f"pioreactor/{pioreactor_unit}/{UNIVERSAL_EXPERIMENT}/monitor/flicker_led_response_okay",
+        1,
+        qos=QOS.AT_LEAST_ONCE,
+    )
+    msg.wait_for_publish(timeout=2.0)
     return {"status": "accepted"}, 202
 
 
@@ -961,15 +1268,15 @@ def update_job_on_unit(pioreactor_unit: str, job_name: str, experiment: str) ->
     """
     body = decode_request_body(structs.UpdateJobSettingsRequest)
     try:
-        with create_client() as client:
-            for setting, value in body.settings.items():
-                # This request returns immediately after publishing, so wait for broker handoff per setting.
-                msg = client.publish(
-                    f"pioreactor/{pioreactor_unit}/{experiment}/{job_name}/{setting}/set",
-                    value,
-                    qos=QOS.AT_LEAST_ONCE,
-                )
-                msg.wait_for_publish(timeout=2.0)
+        client = get_shared_client()
+        for setting, value in body.settings.items():
+            # This request returns immediately after publishing, so wait for broker handoff per setting.
+            msg = client.publish(
+                f"pioreactor/{pioreactor_unit}/{experiment}/{job_name}/{setting}/set",
+                value,
+                qos=QOS.AT_LEAST_ONCE,
+            )
+            msg.wait_for_publish(timeout=2.0)
     except Exception as e:
         publish_to_error_log(str(e), "update_job_on_unit")
         abort_with(400, str(e))
@@ -1089,30 +1396,124 @@ def get_level_filter(min_level: str) -> tuple[str, tuple[str, ...]]:
     return f"level IN ({placeholders})", selected_levels
 
 
-def build_experiment_logs_query(levels: tuple[str, ...]) -> str:
-    log_columns = "l.timestamp, l.level, l.pioreactor_unit, l.message, l.task, l.experiment"
+LOGS_PAGE_SIZE = 100
+# log_id (the rowid) is only for the page's cursor, see logs_page_response
+LOG_COLUMNS = "l.timestamp, l.level, l.pioreactor_unit, l.message, l.task, l.experiment, l.rowid AS log_id"
+LOGS_ORDER = "ORDER BY l.timestamp DESC, l.rowid"
 
-    if len(levels) == 1:
-        return f"""
-            SELECT {log_columns}
-            FROM logs AS l
-            WHERE l.experiment=?
-                AND l.level=?
-            ORDER BY l.timestamp DESC LIMIT 100 OFFSET ?;"""
 
-    level_queries = "\nUNION ALL\n".join(
-        f"""SELECT {log_columns}
-            FROM logs AS l
-            WHERE l.experiment=?
-                AND l.level=?"""
-        for _ in levels
-    )
-    return f"""
-        SELECT timestamp, level, pioreactor_unit, message, task, experiment
-        FROM (
-            {level_queries}
+class LogRow(Struct):
+    # a row of LOG_COLUMNS, without log_id
+    timestamp: str
+    level: str | None
+    pioreactor_unit: str
+    message: str
+    task: str | None
+    experiment: str
+
+
+class LogsPage(t.NamedTuple):
+    filter: str  # conditions on `logs AS l`, each starting with AND
+    args: tuple[t.Any, ...]
+    offset: int
+    search: bool = False
+
+    @property
+    def source(self) -> str:
+        # a search starts from its matches in logs_fts, which CROSS JOIN keeps as the outer loop
+        return "logs_fts CROSS JOIN logs AS l ON l.rowid = logs_fts.rowid" if self.search else "logs AS l"
+
+
+def get_logs_page() -> LogsPage:
+    """
+    The page a paginated log route returns, from the request's args:
+
+      - before: the previous page's X-Next-Cursor header. The page starts after that log, in (timestamp DESC, rowid)
+        order, which is an index seek however deep the page is.
+      - skip: the number of logs to skip instead, the older way to page. Ignored if before is given.
+      - q: only logs whose message or task contain every word of q, as prefixes. This is a lookup in the logs_fts
+        index, so only covers the logs mqtt_to_db_streaming has indexed.
+    """
+    conditions: list[str] = []
+    args: list[t.Any] = []
+    offset = 0
+
+    before = request.args.get("before")
+    if before:
+        timestamp, _, rowid = before.rpartition(",")
+        if not timestamp or not rowid.isdigit():
+            abort_with(400, "before must be the X-Next-Cursor of a previous page")
+        conditions.append("AND l.timestamp <= ? AND (l.timestamp < ? OR l.rowid > ?)")
+        args.extend((timestamp, timestamp, int(rowid)))
+    else:
+        offset = int(request.args.get("skip", 0))
+
+    search = to_fts_query(request.args.get("q", ""))
+    if search is not None:
+        conditions.append("AND logs_fts MATCH ?")
+        args.append(search)
+
+    return LogsPage(" ".join(conditions), tuple(args), offset, search is not None)
+
+
+def build_logs_query(
+    levels: tuple[str, ...], where: str, where_args: tuple[t.Any, ...], page: LogsPage
+) -> tuple[str, tuple[t.Any, ...]]:
+    """
+    A page of the logs matching `where` (conditions on `logs AS l`) at any of levels, newest first. Each level is
+    its own indexed scan that stops after a page's worth of rows, and the scans are merged. A search instead sorts
+    all of its matches.
+    """
+    if page.search:
+        query = f"""
+            SELECT {LOG_COLUMNS}
+            FROM {page.source}
+            WHERE {where}
+                AND l.level IN ({", ".join("?" for _ in levels)})
+                {page.filter}
+            {LOGS_ORDER} LIMIT ? OFFSET ?;"""
+        return query, (*where_args, *levels, *page.args, LOGS_PAGE_SIZE, page.offset)
+
+    level_query = f"""
+            SELECT *
+            FROM (
+                SELECT {LOG_COLUMNS}
+                FROM {page.source}
+                WHERE {where}
+                    AND l.level=?
+                    {page.filter}
+                {LOGS_ORDER} LIMIT ?
+            )"""
+    level_queries = "\n            UNION ALL".join(level_query for _ in levels)
+    query = f"""
+        SELECT timestamp, level, pioreactor_unit, message, task, experiment, log_id
+        FROM ({level_queries}
         )
-        ORDER BY timestamp DESC LIMIT 100 OFFSET ?;"""
+        ORDER BY timestamp DESC, log_id LIMIT ? OFFSET ?;"""
+
+    args: list[t.Any] = []
+    for level in levels:
+        args.extend((*where_args, level, *page.args, LOGS_PAGE_SIZE + page.offset))
+    args.extend((LOGS_PAGE_SIZE, page.offset))
+    return query, tuple(args)
+
+
+def build_experiment_logs_query(
+    experiment: str, levels: tuple[str, ...], page: LogsPage = LogsPage("", (), 0)
+) -> tuple[str, tuple[t.Any, ...]]:
+    return build_logs_query(levels, "l.experiment=?", (experiment,), page)
+
+
+def logs_page_response(query: str, args: tuple[t.Any, ...]) -> Response:
+    """
+    Run a paginated log route's query, which selects LOG_COLUMNS, LIMIT LOGS_PAGE_SIZE, in LOGS_ORDER. If the page
+    is full, its X-Next-Cursor header is the `before` of the next page.
+    """
+    rows = query_app_db_rows(query, args)
+    response = as_json_response(encode([LogRow(*row[:-1]) for row in rows]))
+    if len(rows) == LOGS_PAGE_SIZE:
+        response.headers["X-Next-Cursor"] = f"{rows[-1][0]},{rows[-1][-1]}"
+    return response
 
 
 @api_bp.route("/experiments/<experiment>/recent_logs", methods=["GET"])
@@ -1122,7 +1523,7 @@ def get_recent_logs(experiment: str) -> ResponseReturnValue:
     min_level = request.args.get("min_level", "INFO")
     level_filter, level_params = get_level_filter(min_level)
 
-    recent_logs = query_app_db(
+    recent_logs = query_app_db_json(
         f"""SELECT l.timestamp, level, l.pioreactor_unit, message, task, l.experiment
             FROM logs AS l
             WHERE (l.experiment=?)
@@ -1135,44 +1536,28 @@ def get_recent_logs(experiment: str) -> ResponseReturnValue:
         (experiment, *level_params, experiment),
     )
 
-    return jsonify(recent_logs)
+    return as_json_response(recent_logs)
 
 
 @api_bp.route("/logs", methods=["GET"])
 def get_logs() -> ResponseReturnValue:
-    """Shows event logs from all units, uses pagination."""
+    """Shows event logs from all units, uses pagination (skip or before) and search (q)."""
 
-    skip = int(request.args.get("skip", 0))
     min_level = request.args.get("min_level", "INFO")
-    level_filter, level_params = get_level_filter(min_level)
-
-    recent_logs = query_app_db(
-        f"""SELECT l.timestamp, level, l.pioreactor_unit, message, task, l.experiment
-            FROM logs AS l
-            WHERE {level_filter}
-            ORDER BY l.timestamp DESC LIMIT 100 OFFSET ?;""",
-        (*level_params, skip),
+    return logs_page_response(
+        *build_logs_query(get_levels_for_min_level(min_level), "true", (), get_logs_page())
     )
 
-    return jsonify(recent_logs)
-
 
 @api_bp.route("/experiments/<experiment>/logs", methods=["GET"])
 def get_exp_logs(experiment: str) -> ResponseReturnValue:
-    """Shows event logs from all units, uses pagination."""
+    """Shows event logs from all units, uses pagination (skip or before) and search (q)."""
 
-    skip = int(request.args.get("skip", 0))
     min_level = request.args.get("min_level", "INFO")
-    levels = get_levels_for_min_level(min_level)
-    query_args = tuple(arg for level in levels for arg in (experiment, level)) + (skip,)
-
-    recent_logs = query_app_db(
-        build_experiment_logs_query(levels),
-        query_args,
+    return logs_page_response(
+        *build_experiment_logs_query(experiment, get_levels_for_min_level(min_level), get_logs_page())
     )
 
-    return jsonify(recent_logs)
-
 
 @api_bp.route("/workers/<pioreactor_unit>/experiments/<experiment>/recent_logs", methods=["GET"])
 def get_recent_logs_for_unit_and_experiment(pioreactor_unit: str, experiment: str) -> ResponseReturnValue:
@@ -1181,7 +1566,7 @@ def get_recent_logs_for_unit_and_experiment(pioreactor_unit: str, experiment: st
     min_level = request.args.get("min_level", "INFO")
     level_filter, level_params = get_level_filter(min_level)
 
-    recent_logs = query_app_db(
+    recent_logs = query_app_db_json(
         f"""SELECT l.timestamp, level, l.pioreactor_unit, message, task, l.experiment
             FROM logs AS l
             WHERE (l.experiment=? OR l.experiment=?)
@@ -1202,20 +1587,20 @@ def get_recent_logs_for_unit_and_experiment(pioreactor_unit: str, experiment: st
         ),
     )
 
-    return jsonify(recent_logs)
+    return as_json_response(recent_logs)
 
 
 @api_bp.route("/workers/<pioreactor_unit>/experiments/<experiment>/logs", methods=["GET"])
 def get_logs_for_unit_and_experiment(pioreactor_unit: str, experiment: str) -> ResponseReturnValue:
-    """Shows event logs from specific unit and experiment, uses pagination."""
+    """Shows event logs from specific unit and experiment, uses pagination (skip or before) and search (q)."""
 
-    skip = int(request.args.get("skip", 0))
+    page = get_logs_page()
     min_level = request.args.get("min_level", "INFO")
     level_filter, level_params = get_level_filter(min_level)
 
-    recent_logs = query_app_db(
-        f"""SELECT l.timestamp, level, l.pioreactor_unit, message, task, l.experiment
-            FROM logs AS l
+    return logs_page_response(
+        f"""SELECT {LOG_COLUMNS}
+            FROM {page.source}
             JOIN experiment_worker_assignments_history h
                -- Current invariant: assignment identity includes experiment;
                -- unit and timestamp alone are not unique near reassignment.
@@ -1226,53 +1611,66 @@ def get_logs_for_unit_and_experiment(pioreactor_unit: str, experiment: str) -> R
             WHERE (l.experiment=?)
                 AND (l.pioreactor_unit=? or l.pioreactor_unit=?)
                 AND {level_filter}
-            ORDER BY l.timestamp DESC LIMIT 100 OFFSET ?;""",
-        (experiment, pioreactor_unit, UNIVERSAL_IDENTIFIER, *level_params, skip),
+                {page.filter}
+            {LOGS_ORDER} LIMIT ? OFFSET ?;""",
+        (
+            experiment,
+            pioreactor_unit,
+            UNIVERSAL_IDENTIFIER,
+            *level_params,
+            *page.args,
+            LOGS_PAGE_SIZE,
+            page.offset,
+        ),
     )
 
-    return jsonify(recent_logs)
-
 
 @api_bp.route("/units/<pioreactor_unit>/system_logs", methods=["GET"])
 def get_system_logs_for_unit(pioreactor_unit: str) -> ResponseReturnValue:
-    """Shows system logs from specific unit uses pagination."""
+    """Shows system logs from specific unit, uses pagination (skip or before) and search (q)."""
 
-    skip = int(request.args.get("skip", 0))
+    page = get_logs_page()
     min_level = request.args.get("min_level", "INFO")
     level_filter, level_params = get_level_filter(min_level)
 
-    recent_logs = query_app_db(
-        f"""SELECT l.timestamp, l.level, l.pioreactor_unit, l.message, l.task, l.experiment
-            FROM logs AS l
+    return logs_page_response(
+        f"""SELECT {LOG_COLUMNS}
+            FROM {page.source}
             WHERE (l.experiment=?)
                 AND (l.pioreactor_unit=? or l.pioreactor_unit=?)
                 AND {level_filter}
-            ORDER BY l.timestamp DESC LIMIT 100 OFFSET ?;""",
-        (UNIVERSAL_EXPERIMENT, pioreactor_unit, UNIVERSAL_IDENTIFIER, *level_params, skip),
+                {page.filter}
+            {LOGS_ORDER} LIMIT ? OFFSET ?;""",
+        (
+            UNIVERSAL_EXPERIMENT,
+            pioreactor_unit,
+            UNIVERSAL_IDENTIFIER,
+            *level_params,
+            *page.args,
+            LOGS_PAGE_SIZE,
+            page.offset,
+        ),
     )
 
-    return jsonify(recent_logs)
-
 
 @api_bp.route("/units/<pioreactor_unit>/logs", methods=["GET"])
 def get_logs_for_unit(pioreactor_unit: str) -> ResponseReturnValue:
-    """Shows event logs from all units, uses pagination."""
+    """Shows event logs from all units, uses pagination (skip or before) and search (q)."""
 
-    skip = int(request.args.get("skip", 0))
+    page = get_logs_page()
     min_level = request.args.get("min_level", "INFO")
     level_filter, level_params = get_level_filter(min_level)
 
-    recent_logs = query_app_db(
-        f"""SELECT l.timestamp, level, l.pioreactor_unit, message, task, l.experiment
-            FROM logs AS l
+    return logs_page_response(
+        f"""SELECT {LOG_COLUMNS}
+            FROM {page.source}
             WHERE (l.pioreactor_unit=? or l.pioreactor_unit=?)
             AND {level_filter}
-            ORDER BY l.timestamp DESC LIMIT 100 OFFSET ?;""",
-        (pioreactor_unit, UNIVERSAL_IDENTIFIER, *level_params, skip),
+            {page.filter}
+            {LOGS_ORDER} LIMIT ? OFFSET ?;""",
+        (pioreactor_unit, UNIVERSAL_IDENTIFIER, *level_params, *page.args, LOGS_PAGE_SIZE, page.offset),
     )
 
-    return jsonify(recent_logs)
-
 
 @api_bp.route("/workers/<pioreactor_unit>/experiments/<experiment>/logs", methods=["POST"])
 @api_bp.route("/units/<pioreactor_unit>/experiments/<experiment>/logs", methods=["POST"])
@@ -1292,26 +1690,13 @@ def publish_new_log(pioreactor_unit: str, experiment: str) -> ResponseReturnValu
     """
     body = decode_request_body(structs.PublishExperimentLogRequest)
 
-    with create_client() as client:
-        if pioreactor_unit == UNIVERSAL_IDENTIFIER:
-            assigned_units = get_all_workers_in_experiment(experiment)
-            for assigned_pioreactor_unit in assigned_units:
-                topic = f"pioreactor/{assigned_pioreactor_unit}/{experiment}/logs/{body.source_}/{body.level.lower()}"
-                # This endpoint is a short-lived bridge into the audit log stream, so use QoS 2 and wait.
-                msg = client.publish(
-                    topic,
-                    msg_to_JSON(
-                        msg=body.message,
-                        source=body.source,
-                        level=body.level.upper(),
-                        timestamp=body.timestamp,
-                        task=body.task or "",
-                    ),
-                    qos=QOS.EXACTLY_ONCE,
-                )
-                msg.wait_for_publish(timeout=2.0)
-        else:
-            topic = f"pioreactor/{pioreactor_unit}/{experiment}/logs/{body.source_}/{body.level.lower()}"
+    client = get_shared_client()
+    if pioreactor_unit == UNIVERSAL_IDENTIFIER:
+        assigned_units = get_all_workers_in_experiment(experiment)
+        for assigned_pioreactor_unit in assigned_units:
+            topic = (
+                f"pioreactor/{assigned_pioreactor_unit}/{experiment}/logs/{body.source_}/{body.level.lower()}"
+            )
             # This endpoint is a short-lived bridge into the audit log stream, so use QoS 2 and wait.
             msg = client.publish(
                 topic,
@@ -1325,6 +1710,21 @@ def publish_new_log(pioreactor_unit: str, experiment: str) -> ResponseReturnValu
                 qos=QOS.EXACTLY_ONCE,
             )
             msg.wait_for_publish(timeout=2.0)
+    else:
+        topic = f"pioreactor/{pioreactor_unit}/{experiment}/logs/{body.source_}/{body.level.lower()}"
+        # This endpoint is a short-lived bridge into the audit log stream, so use QoS 2 and wait.
+        msg = client.publish(
+            topic,
+            msg_to_JSON(
+                msg=body.message,
+                source=body.source,
+                level=body.level.upper(),
+                timestamp=body.timestamp,
+                task=body.task or "",
+            ),
+            qos=QOS.EXACTLY_ONCE,
+        )
+        msg.wait_for_publish(timeout=2.0)
     return {"status": "accepted"}, 202
 
 
@@ -1340,14 +1740,14 @@ def get_growth_rates(experiment: str) -> ResponseReturnValue:
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    growth_rates = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="growth_rates",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=None,
     )
-    return attach_cache_control(as_json_response(growth_rates))
 
 
 @api_bp.route("/experiments/<experiment>/time_series/temperature_readings", methods=["GET"])
@@ -1359,14 +1759,14 @@ def get_temperature_readings(experiment: str) -> ResponseReturnValue:
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    temperature_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="temperature_readings",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=None,
     )
-    return attach_cache_control(as_json_response(temperature_readings))
 
 
 @api_bp.route("/experiments/<experiment>/time_series/od_readings_filtered", methods=["GET"])
@@ -1378,14 +1778,14 @@ def get_od_readings_filtered(experiment: str) -> ResponseReturnValue:
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    filtered_od_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="od_readings_filtered",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=None,
     )
-    return attach_cache_control(as_json_response(filtered_od_readings))
 
 
 @api_bp.route("/experiments/<experiment>/time_series/od_readings", methods=["GET"])
@@ -1397,14 +1797,14 @@ def get_od_readings(experiment: str) -> ResponseReturnValue:
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    raw_od_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="od_readings",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=None,
     )
-    return attach_cache_control(as_json_response(raw_od_readings))
 
 
 @api_bp.route("/experiments/<experiment>/time_series/od_readings_fused", methods=["GET"])
@@ -1415,14 +1815,14 @@ def get_od_readings_fused(experiment: str) -> ResponseReturnValue:
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    fused_od_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="od_readings_fused",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=None,
     )
-    return attach_cache_control(as_json_response(fused_od_readings))
 
 
 @api_bp.route("/experiments/<experiment>/time_series/raw_od_readings", methods=["GET"])
@@ -1434,14 +1834,14 @@ def get_od_raw_readings(experiment: str) -> ResponseReturnValue:
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    raw_od_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="raw_od_readings",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=None,
     )
-    return attach_cache_control(as_json_response(raw_od_readings))
 
 
 @api_bp.route("/experiments/<experiment>/time_series/<data_source>/<column>", methods=["GET"])
@@ -1453,49 +1853,19 @@ def get_fallback_time_series(experiment: str, data_source: str, column: str) ->
         abort_with(400, "target_points must be > 0")
 
     try:
-        data_source = scrub_to_valid(data_source)
-        column = scrub_to_valid(column)
-        r = query_app_db(
-            f"""
-                WITH numbered AS (
-                    SELECT unit,
-                           timestamp,
-                           y,
-                           ROW_NUMBER() OVER (PARTITION BY unit ORDER BY timestamp) AS rn
-                    FROM (
-                        SELECT pioreactor_unit AS unit,
-                               timestamp,
-                               {column} AS y
-                        FROM {data_source}
-                        WHERE experiment=? AND timestamp > STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW',?) AND {column} IS NOT NULL
-                    )
-                ), steps AS (
-                    SELECT unit,
-                           CASE WHEN ? > 0 THEN MAX(1, CAST((MAX(rn) + ? - 1) / ? AS INT)) ELSE 1 END AS step
-                    FROM numbered
-                    GROUP BY unit
-                )
-                SELECT json_object('series', json_group_array(unit), 'data', json_group_array(json(series_data))) AS json
-                FROM (
-                    SELECT numbered.unit,
-                           json_group_array(json_object('x', timestamp, 'y', round(y, 7))) AS series_data
-                    FROM numbered
-                    JOIN steps USING (unit)
-                    WHERE (rn % step) = 0
-                    GROUP BY numbered.unit
-                );
-                """,
-            (experiment, f"-{lookback} hours", target_points, target_points, target_points),
-            one=True,
+        return time_series_response(
+            experiment,
+            data_source=scrub_to_valid(data_source),
+            lookback_hours=lookback,
+            target_points=target_points,
+            since=args.get("since"),
+            pioreactor_unit=None,
+            column=scrub_to_valid(column),
         )
-
-    except Exception as e:
+    except (sqlite3.Error, ValueError) as e:
         publish_to_error_log(str(e), "get_fallback_time_series")
         abort_with(400, str(e))
 
-    assert isinstance(r, dict)
-    return attach_cache_control(as_json_response(r["json"]))
-
 
 @api_bp.route("/workers/<pioreactor_unit>/experiments/<experiment>/time_series/growth_rates", methods=["GET"])
 def get_growth_rates_per_unit(pioreactor_unit: str, experiment: str) -> ResponseReturnValue:
@@ -1505,14 +1875,14 @@ def get_growth_rates_per_unit(pioreactor_unit: str, experiment: str) -> Response
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    growth_rates = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="growth_rates",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=pioreactor_unit,
     )
-    return attach_cache_control(as_json_response(growth_rates))
 
 
 @api_bp.route(
@@ -1526,14 +1896,14 @@ def get_temperature_readings_per_unit(pioreactor_unit: str, experiment: str) ->
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    temperature_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="temperature_readings",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=pioreactor_unit,
     )
-    return attach_cache_control(as_json_response(temperature_readings))
 
 
 @api_bp.route(
@@ -1547,14 +1917,14 @@ def get_od_readings_filtered_per_unit(pioreactor_unit: str, experiment: str) ->
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    filtered_od_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="od_readings_filtered",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=pioreactor_unit,
     )
-    return attach_cache_control(as_json_response(filtered_od_readings))
 
 
 @api_bp.route("/workers/<pioreactor_unit>/experiments/<experiment>/time_series/od_readings", methods=["GET"])
@@ -1565,14 +1935,14 @@ def get_od_readings_per_unit(pioreactor_unit: str, experiment: str) -> ResponseR
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    raw_od_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="od_readings",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=pioreactor_unit,
     )
-    return attach_cache_control(as_json_response(raw_od_readings))
 
 
 @api_bp.route(
@@ -1586,14 +1956,14 @@ def get_od_readings_fused_per_unit(pioreactor_unit: str, experiment: str) -> Res
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    fused_od_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="od_readings_fused",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=pioreactor_unit,
     )
-    return attach_cache_control(as_json_response(fused_od_readings))
 
 
 @api_bp.route(
@@ -1607,14 +1977,14 @@ def get_od_raw_readings_per_unit(pioreactor_unit: str, experiment: str) -> Respo
     if not target_points or target_points <= 0:
         abort_with(400, "target_points must be > 0")
 
-    raw_od_readings = query_time_series_from_database(
+    return time_series_response(
         experiment,
         data_source="raw_od_readings",
         lookback_hours=lookback,
         target_points=target_points,
+        since=args.get("since"),
         pioreactor_unit=pioreactor_unit,
     )
-    return attach_cache_control(as_json_response(raw_od_readings))
 
 
 @api_bp.route(
@@ -1631,49 +2001,19 @@ def get_fallback_time_series_per_unit(
         abort_with(400, "target_points must be > 0")
 
     try:
-        data_source = scrub_to_valid(data_source)
-        column = scrub_to_valid(column)
-        r = query_app_db(
-            f"""
-                WITH numbered AS (
-                    SELECT unit,
-                           timestamp,
-                           y,
-                           ROW_NUMBER() OVER (PARTITION BY unit ORDER BY timestamp) AS rn
-                    FROM (
-                        SELECT pioreactor_unit AS unit,
-                               timestamp,
-                               {column} AS y
-                        FROM {data_source}
-                        WHERE experiment=? AND timestamp > STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW',?) AND pioreactor_unit=? AND {column} IS NOT NULL
-                    )
-                ), steps AS (
-                    SELECT unit,
-                           CASE WHEN ? > 0 THEN MAX(1, CAST((MAX(rn) + ? - 1) / ? AS INT)) ELSE 1 END AS step
-                    FROM numbered
-                    GROUP BY unit
-                )
-                SELECT json_object('series', json_group_array(unit), 'data', json_group_array(json(series_data))) AS json
-                FROM (
-                    SELECT numbered.unit,
-                           json_group_array(json_object('x', timestamp, 'y', round(y, 7))) AS series_data
-                    FROM numbered
-                    JOIN steps USING (unit)
-                    WHERE (rn % step) = 0
-                    GROUP BY numbered.unit
-                );
-                """,
-            (experiment, f"-{lookback} hours", pioreactor_unit, target_points, target_points, target_points),
-            one=True,
+        return time_series_response(
+            experiment,
+            data_source=scrub_to_valid(data_source),
+            lookback_hours=lookback,
+            target_points=target_points,
+            since=args.get("since"),
+            pioreactor_unit=pioreactor_unit,
+            column=scrub_to_valid(column),
         )
-
-    except Exception as e:
+    except (sqlite3.Error, ValueError) as e:
         publish_to_error_log(str(e), "get_fallback_time_series")
         abort_with(400, str(e))
 
-    assert isinstance(r, dict)
-    return attach_cache_control(as_json_response(r["json"]))
-
 
 @api_bp.route("/experiments/<experiment>/media_rates", methods=["GET"])
 def get_media_rates(experiment: str) -> ResponseReturnValue:
@@ -2925,11 +3265,13 @@ def export_exportable_datasets() -> ResponseReturnValue:
       "partition_by_unit": false,
       "partition_by_experiment": false,
       "start_time": "2025-01-31T00:00:00-05:00",
-      "end_time": "2025-02-01T00:00:00-05:00"
+      "end_time": "2025-02-01T00:00:00-05:00",
+      "output_format": "csv"
     }
 
     start_time and end_time must include Z or a numeric UTC offset. Bounds are
     inclusive and are normalized to UTC before querying stored UTC timestamps.
+    output_format is "csv" (default) or "npz", numpy's columnar format.
     """
     body = decode_request_body(structs.ExportDatasetsRequest)
 
@@ -2949,6 +3291,7 @@ def export_exportable_datasets() -> ResponseReturnValue:
         ),
         partition_by_unit=body.partition_by_unit,
         partition_by_experiment=body.partition_by_experiment,
+        output_format=body.output_format,
     )
     return create_task_response(task)
 
@@ -2965,11 +3308,13 @@ def export_exportable_datasets_to_usb() -> ResponseReturnValue:
       "partition_by_unit": false,
       "partition_by_experiment": false,
       "start_time": "2025-01-31T00:00:00-05:00",
-      "end_time": "2025-02-01T00:00:00-05:00"
+      "end_time": "2025-02-01T00:00:00-05:00",
+      "output_format": "csv"
     }
 
     start_time and end_time must include Z or a numeric UTC offset. Bounds are
     inclusive and are normalized to UTC before querying stored UTC timestamps.
+    output_format is "csv" (default) or "npz", numpy's columnar format.
     """
     body = decode_request_body(structs.ExportDatasetsRequest)
 
@@ -2988,6 +3333,7 @@ def export_exportable_datasets_to_usb() -> ResponseReturnValue:
         ),
         partition_by_unit=body.partition_by_unit,
         partition_by_experiment=body.partition_by_experiment,
+        output_format=body.output_format,
     )
     return create_task_response(task)
 
@@ -3940,6 +4286,7 @@ def delete_worker(pioreactor_unit: str) -> ResponseReturnValue:
             )
 
         cache.invalidate_merged_config_cache(pioreactor_unit)
+        clear_worker_experiment_assignment(pioreactor_unit)
         publish_to_log(
             f"Removed {pioreactor_unit} from inventory.",
             level="INFO",
@@ -3979,6 +4326,18 @@ def change_worker_status(pioreactor_unit: str) -> ResponseReturnValue:
     )
 
     if row_count > 0:
+        assignment = query_app_db(
+            "SELECT experiment, assigned_at FROM experiment_worker_assignments WHERE pioreactor_unit = ?",
+            (pioreactor_unit,),
+            one=True,
+        )
+        if isinstance(assignment, dict):
+            publish_worker_experiment_assignment(
+                pioreactor_unit, assignment["experiment"], assignment["assigned_at"]
+            )
+        else:
+            publish_worker_experiment_assignment(pioreactor_unit, None, None)
+
         publish_to_log(
             f"Set {pioreactor_unit} to {'Active' if new_status else 'Inactive'}.",
             task="worker_status",
@@ -4113,16 +4472,15 @@ def publish_worker_experiment_assignment(
     experiment: str | None,
     assigned_at: str | None,
 ) -> None:
-    topic = f"pioreactor/{pioreactor_unit}/$experiment/assignment"
-    payload = {
-        "pioreactor_unit": pioreactor_unit,
-        "experiment": experiment,
-        "assigned_at": assigned_at,
-        "updated_at": current_utc_timestamp(),
-    }
+    worker = query_app_db(
+        "SELECT is_active FROM workers WHERE pioreactor_unit = ?",
+        (pioreactor_unit,),
+        one=True,
+    )
+    is_active = bool(worker["is_active"]) if isinstance(worker, dict) else None
 
     try:
-        publish(topic, encode(payload), retain=True)
+        assignments.publish_experiment_assignment(pioreactor_unit, experiment, assigned_at, is_active)
     except Exception as error:
         logger.error(
             f"Unable to publish retained experiment assignment for {pioreactor_unit}: {error}",
@@ -4130,6 +4488,16 @@ def publish_worker_experiment_assignment(
         )
 
 
+def clear_worker_experiment_assignment(pioreactor_unit: str) -> None:
+    try:
+        assignments.clear_experiment_assignment(pioreactor_unit)
+    except Exception as error:
+        logger.error(
+            f"Unable to clear retained experiment assignment for {pioreactor_unit}: {error}",
+            exc_info=True,
+        )
+
+
 @api_bp.route("/workers/assignments", methods=["GET"])
 def get_workers_and_experiment_assignments() -> ResponseReturnValue:
     # Get the experiment that a worker is assigned to along with its status
@@ -2,14 +2,18 @@
 import sqlite3
 import typing as t
 from base64 import b64decode
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timezone
+from functools import lru_cache
 
 from flask import Flask
 from flask import g
 from flask import jsonify
 from flask import request
 from flask.json.provider import JSONProvider
+from msgspec import defstruct
+from msgspec import Struct
 from msgspec.json import decode as loads
 from msgspec.json import encode as dumps
 from pioreactor.config import config as pioreactor_config
@@ -17,7 +21,7 @@ from pioreactor.config import get_leader_hostname
 from pioreactor.logging import create_logger
 from pioreactor.plugin_management import get_plugins
 from pioreactor.version import __version__
-from pioreactor.web.db import open_app_database_connection
+from pioreactor.web.db import AppDatabasePool
 from pioreactor.web.utils import ensure_error_info
 from pioreactor.whoami import am_I_leader
 from pioreactor.whoami import get_unit_name
@@ -51,6 +55,16 @@ def decode_base64(string: str) -> str:
     return b64decode(string).decode("utf-8")
 
 
+def _configure_app_db_connection(db: sqlite3.Connection) -> None:
+    db.create_function(
+        "BASE64", 1, decode_base64
+    )  # SQLite bundles base64() with its CLI, but not with the library used by Python.
+
+
+# connections to the app database, shared by all requests in this process. Their rows are tuples.
+app_database_pool = AppDatabasePool(configure=_configure_app_db_connection)
+
+
 def create_app() -> Flask:
     # load plugins
     app = Flask(NAME)
@@ -73,6 +87,10 @@ def create_app() -> Flask:
         if db is not None:
             db.close()
 
+        db = g.pop("_app_read_database", None)
+        if db is not None:
+            app_database_pool.release_reader(db)
+
         db = getattr(g, "_local_metadata_database", None)
         if db is not None:
             db.close()
@@ -181,27 +199,48 @@ def _make_dicts(cursor: sqlite3.Cursor, row: tuple[t.Any, ...]) -> dict[str, t.A
     return dict((cursor.description[idx][0], value) for idx, value in enumerate(row))
 
 
+def _log_app_db_connection_error(e: sqlite3.OperationalError) -> None:
+    if "database is locked" in str(e):
+        logger.error("Database is locked, please close any other connections or restart.")
+    elif "unable to open database file" in str(e):
+        logger.error(
+            "Permissions on database are probably incorrect, ownership should be pioreactor:www-data on ALL sqlite files AND THE .pioreactor/storage DIR! ."
+        )
+
+
 def _get_app_db_connection() -> sqlite3.Connection:
+    """
+    The app database connection this request reads with: a connection bound to g._app_database (ex: in tests), or
+    else a read-only connection checked out of app_database_pool until the request ends.
+    """
     db = getattr(g, "_app_database", None)
+    if db is not None:
+        return db
+
+    db = getattr(g, "_app_read_database", None)
     if db is None:
         try:
-            db = g._app_database = open_app_database_connection()
+            db = g._app_read_database = app_database_pool.acquire_reader()
         except sqlite3.OperationalError as e:
-            if "database is locked" in str(e):
-                logger.error("Database is locked, please close any other connections or restart.")
-            elif "unable to open database file" in str(e):
-                logger.error(
-                    "Permissions on database are probably incorrect, ownership should be pioreactor:www-data on ALL sqlite files AND THE .pioreactor/storage DIR! ."
-                )
+            _log_app_db_connection_error(e)
             raise e
 
-        db.create_function(
-            "BASE64", 1, decode_base64
-        )  # SQLite bundles base64() with its CLI, but not with the library used by Python.
+    return db
 
-        db.row_factory = _make_dicts
 
-    return db
+@contextmanager
+def _app_db_writer() -> t.Iterator[sqlite3.Connection]:
+    db = getattr(g, "_app_database", None)
+    if db is not None:
+        yield db
+        return
+
+    try:
+        with app_database_pool.writer() as db:
+            yield db
+    except sqlite3.OperationalError as e:
+        _log_app_db_connection_error(e)
+        raise e
 
 
 def _get_temp_local_metadata_db_connection() -> sqlite3.Connection:
@@ -223,27 +262,71 @@ def _get_temp_local_metadata_db_connection() -> sqlite3.Connection:
     return db
 
 
-def query_app_db(
-    query: str, args: tuple[t.Any, ...] = (), one: bool = False
-) -> dict[str, t.Any] | list[dict[str, t.Any]] | None:
+def _query_app_db_rows(query: str, args: tuple[t.Any, ...]) -> tuple[list[str], list[tuple[t.Any, ...]]]:
     assert am_I_leader()
     con = _get_app_db_connection()
+    bound = con is getattr(g, "_app_database", None)
     try:
-        con.execute("PRAGMA query_only = 1")
-        cur = con.execute(query, args)
-        rv = cur.fetchall()
+        if bound:
+            # pooled readers are always query-only, a bound connection only for the query
+            con.execute("PRAGMA query_only = 1")
+        cur = con.cursor()
+        cur.row_factory = None
+        cur.execute(query, args)
+        rows = cur.fetchall()
+        columns = [column[0] for column in cur.description or ()]
         cur.close()
     finally:
-        # Restore to default to allow mutations via modify_app_db within same request
-        try:
-            con.execute("PRAGMA query_only = 0")
-        except Exception:
-            pass
+        if bound:
+            # Restore to default to allow mutations via modify_app_db within same request
+            try:
+                con.execute("PRAGMA query_only = 0")
+            except Exception:
+                pass
+    return columns, rows
+
+
+def query_app_db(
+    query: str, args: tuple[t.Any, ...] = (), one: bool = False
+) -> dict[str, t.Any] | list[dict[str, t.Any]] | None:
+    columns, rows = _query_app_db_rows(query, args)
+    rv = [dict(zip(columns, row)) for row in rows]
     if one:
         return rv[0] if rv else None
     return rv
 
 
+def query_app_db_rows(query: str, args: tuple[t.Any, ...] = ()) -> list[tuple[t.Any, ...]]:
+    """
+    Like query_app_db, but rows are tuples in the query's column order. Faster, for rows that are only iterated over.
+    """
+    return _query_app_db_rows(query, args)[1]
+
+
+@lru_cache(maxsize=256)
+def _row_struct(columns: tuple[str, ...]) -> type[Struct]:
+    # a Struct that encodes a row like the dict query_app_db makes of it. Fields are named f0, f1, ... so any
+    # column name works, and renamed to the column names in JSON.
+    fields = [f"f{i}" for i in range(len(columns))]
+    return defstruct("Row", fields, rename=dict(zip(fields, columns)))
+
+
+def query_app_db_json(query: str, args: tuple[t.Any, ...] = (), one: bool = False) -> bytes:
+    """
+    query_app_db's result, encoded as JSON, without making a dict of each row: use for rows that are returned as is.
+    """
+    columns, rows = _query_app_db_rows(query, args)
+    if len(set(columns)) < len(columns):
+        # a dict keeps the last of duplicate column names
+        rv: t.Any = [dict(zip(columns, row)) for row in rows]
+    else:
+        row_struct = _row_struct(tuple(columns))
+        rv = [row_struct(*row) for row in rows]
+    if one:
+        rv = rv[0] if rv else None
+    return dumps(rv)
+
+
 def query_temp_local_metadata_db(
     query: str, args: tuple[t.Any, ...] = (), one: bool = False
 ) -> dict[str, t.Any] | list[dict[str, t.Any]] | None:
@@ -255,22 +338,22 @@ def query_temp_local_metadata_db(
 
 def modify_app_db(statement: str, args: tuple[t.Any, ...] = ()) -> int:
     assert am_I_leader()
-    con = _get_app_db_connection()
-    cur = con.cursor()
-    try:
-        cur.execute(statement, args)
-        con.commit()
-    except sqlite3.IntegrityError as e:
-        con.rollback()
-        print(e)
-        return 0
-    except Exception as e:
-        con.rollback()
-        print(e)
-        raise
-    finally:
-        row_changes = cur.rowcount
-        cur.close()
+    with _app_db_writer() as con:
+        cur = con.cursor()
+        try:
+            cur.execute(statement, args)
+            con.commit()
+        except sqlite3.IntegrityError as e:
+            con.rollback()
+            print(e)
+            return 0
+        except Exception as e:
+            con.rollback()
+            print(e)
+            raise
+        finally:
+            row_changes = cur.rowcount
+            cur.close()
     return row_changes
 
 
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+The retained MQTT messages that workers cache their experiment assignment and active status off, see
+whoami._AssignmentCache. Published by the leader's API and its background tasks.
+"""
+from msgspec import Struct
+from msgspec.json import encode
+from pioreactor import types as pt
+from pioreactor.pubsub import publish
+from pioreactor.utils.timing import current_utc_timestamp
+
+
+class ExperimentAssignment(Struct):
+    pioreactor_unit: pt.Unit
+    experiment: pt.Experiment | None
+    assigned_at: str | None
+    is_active: bool | None  # None if the worker isn't in the inventory
+    updated_at: str
+
+
+def assignment_topic(pioreactor_unit: pt.Unit) -> str:
+    return f"pioreactor/{pioreactor_unit}/$experiment/assignment"
+
+
+def publish_experiment_assignment(
+    pioreactor_unit: pt.Unit,
+    experiment: pt.Experiment | None,
+    assigned_at: str | None,
+    is_active: bool | None,
+) -> None:
+    payload = ExperimentAssignment(
+        pioreactor_unit=pioreactor_unit,
+        experiment=experiment,
+        assigned_at=assigned_at,
+        is_active=is_active,
+        updated_at=current_utc_timestamp(),
+    )
+    publish(assignment_topic(pioreactor_unit), encode(payload), retain=True)
+
+
+def clear_experiment_assignment(pioreactor_unit: pt.Unit) -> None:
+    # an empty retained message removes the topic from the broker
+    publish(assignment_topic(pioreactor_unit), b"", retain=True)
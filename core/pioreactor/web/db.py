@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable
+from typing import Iterator
 
 from pioreactor.config import config as pioreactor_config
 
@@ -9,8 +14,8 @@ def get_app_database_path() -> Path:
     return Path(pioreactor_config.get("storage", "database"))
 
 
-def open_app_database_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_app_database_path())
+def open_app_database_connection(check_same_thread: bool = True) -> sqlite3.Connection:
+    conn = sqlite3.connect(get_app_database_path(), check_same_thread=check_same_thread)
     conn.executescript(
         """
         PRAGMA journal_mode = WAL;
@@ -28,6 +33,121 @@ def open_app_database_connection() -> sqlite3.Connection:
     return conn
 
 
+class AppDatabasePool:
+    """
+    Configured connections to the app database, shared by the threads of a web server process, so that a request
+    doesn't open and configure its own.
+
+    Readers are read-only (PRAGMA query_only), checked out for a request and returned to the pool after it.
+    Writes all go through one writer connection, one at a time: SQLite allows one writer at a time anyway, and in
+    WAL mode it doesn't block the readers. The pool starts over if the database file is replaced, or in a forked
+    process.
+
+    > reader = pool.acquire_reader()
+    > try:
+    >     reader.execute("SELECT ...").fetchall()  # rows are tuples
+    > finally:
+    >     pool.release_reader(reader)
+    >
+    > with pool.writer() as writer:
+    >     writer.execute("INSERT ...")
+    >     writer.commit()
+    """
+
+    def __init__(
+        self,
+        configure: Callable[[sqlite3.Connection], None] | None = None,
+        max_idle_readers: int = 8,
+    ) -> None:
+        self.configure = configure
+        self.max_idle_readers = max_idle_readers
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._idle_readers: list[sqlite3.Connection] = []
+        self._reader_databases: dict[int, tuple[int, int, int] | None] = {}  # id(reader) -> database it's on
+        self._writer: sqlite3.Connection | None = None
+        self._writer_database: tuple[int, int, int] | None = None
+        self._database: tuple[int, int, int] | None = None  # pid, st_dev, st_ino
+
+    def _current_database(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(get_app_database_path())
+        except OSError:
+            return None
+        return os.getpid(), stat.st_dev, stat.st_ino
+
+    def _check_database(self) -> tuple[int, int, int] | None:
+        # call with self._lock held
+        database = self._current_database()
+        if database != self._database:
+            if self._database is not None and self._database[0] == os.getpid():
+                for connection in self._idle_readers:
+                    self._reader_databases.pop(id(connection), None)
+                    connection.close()
+            else:
+                # the parent process's connections: they mustn't be used, or closed, here
+                self._reader_databases = {}
+            self._idle_readers = []
+            # the writer may be in use: writer() replaces it, under the write lock
+            self._database = database
+        return database
+
+    def _open(self) -> sqlite3.Connection:
+        connection = open_app_database_connection(check_same_thread=False)
+        if self.configure is not None:
+            self.configure(connection)
+        return connection
+
+    def acquire_reader(self) -> sqlite3.Connection:
+        with self._lock:
+            database = self._check_database()
+            if self._idle_readers:
+                return self._idle_readers.pop()
+
+        reader = self._open()
+        reader.execute("PRAGMA query_only = 1")  # forbid writes through this connection
+        with self._lock:
+            self._reader_databases[id(reader)] = database
+        return reader
+
+    def release_reader(self, reader: sqlite3.Connection) -> None:
+        if reader.in_transaction:
+            reader.rollback()
+
+        with self._lock:
+            database = self._check_database()
+            # readers opened on a database file that has since been replaced are closed
+            if (
+                database is not None
+                and self._reader_databases.get(id(reader)) == database
+                and len(self._idle_readers) < self.max_idle_readers
+            ):
+                self._idle_readers.append(reader)
+                return
+            self._reader_databases.pop(id(reader), None)
+        reader.close()
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        with self._write_lock:
+            with self._lock:
+                database = self._check_database()
+                writer, writer_database = self._writer, self._writer_database
+
+            if writer is not None and writer_database != database:
+                # opened on a database file that has since been replaced, or by the parent process, whose
+                # connections mustn't be used, or closed, here
+                if writer_database is not None and writer_database[0] == os.getpid():
+                    writer.close()
+                writer = None
+
+            if writer is None:
+                writer = self._open()
+                with self._lock:
+                    self._writer, self._writer_database = writer, database
+            yield writer
+
+
 def get_database_space_stats(conn: sqlite3.Connection) -> dict[str, int | float]:
     page_size = int(conn.execute("PRAGMA page_size").fetchone()[0])
     page_count = int(conn.execute("PRAGMA page_count").fetchone()[0])
@@ -390,12 +390,13 @@ def export_experiment_data(
     partition_by_experiment: bool = True,
     start_time: str | None = None,
     end_time: str | None = None,
+    output_format: str = "csv",
 ) -> dict[str, Any]:
     """
     Export datasets from the leader database and return a retrievable artifact handle.
 
     start_time and end_time must be ISO-8601 timestamps with Z or a numeric UTC offset.
-    Both bounds are inclusive.
+    Both bounds are inclusive. output_format is "csv", or "npz" for numpy's columnar format.
 
     The returned `download_path` can be fetched from this MCP server, and `leader_local_path`
     points to where the file was written on the leader.
@@ -409,6 +410,7 @@ def export_experiment_data(
             "partition_by_experiment": partition_by_experiment,
             "start_time": start_time,
             "end_time": end_time,
+            "output_format": output_format,
         },
     )
 
@@ -15,9 +15,14 @@ import os
 import pwd
 import shutil
 import stat
+import threading
 import zipfile
 from collections.abc import Callable
 from collections.abc import Mapping
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
 from pathlib import Path
 from shlex import join
 from subprocess import check_call
@@ -60,6 +65,7 @@ from pioreactor.utils import usb as usb_utils
 from pioreactor.utils.networking import cp_file_across_cluster
 from pioreactor.utils.networking import resolve_to_address
 from pioreactor.utils.timing import current_utc_timestamp
+from pioreactor.web import assignments
 from pioreactor.web.config import huey
 from pioreactor.web.db import get_database_space_stats
 from pioreactor.web.db import open_app_database_connection
@@ -75,6 +81,8 @@ FanoutResult = dict[str, Any]
 # Registry of calibration action -> handler that returns a Huey task, label, and normalizer.
 calibration_actions: dict[str, Callable[[dict[str, Any]], CalibrationActionHandler]] = {}
 MINIMUM_EXPORT_FREE_BYTES = 64 * 1024 * 1024
+# threads shared by all multicast GETs of this process, see _fanout_get
+MULTICAST_GET_MAX_THREADS = 32
 
 
 def _format_usb_partition_for_log(partition: usb_utils.UsbPartition) -> str:
@@ -944,6 +952,7 @@ def export_experiment_data_task(
     end_time: str | None = None,
     partition_by_unit: bool = False,
     partition_by_experiment: bool = True,
+    output_format: str = "csv",
 ) -> dict[str, bool | str]:
     from pioreactor.actions.leader.export_experiment_data import cleanup_stale_export_artifacts
     from pioreactor.actions.leader.export_experiment_data import export_experiment_data
@@ -959,6 +968,7 @@ def export_experiment_data_task(
                 "end_time": end_time,
                 "partition_by_unit": partition_by_unit,
                 "partition_by_experiment": partition_by_experiment,
+                "output_format": output_format,
             },
             separators=(",", ":"),
         ),
@@ -982,6 +992,7 @@ def export_experiment_data_task(
             end_time=end_time,
             partition_by_unit=partition_by_unit,
             partition_by_experiment=partition_by_experiment,
+            output_format=output_format,
         )
     except Exception as exc:
         error = str(exc) or exc.__class__.__name__
@@ -1034,6 +1045,7 @@ def export_experiment_data_to_usb_task(
     end_time: str | None = None,
     partition_by_unit: bool = False,
     partition_by_experiment: bool = True,
+    output_format: str = "csv",
 ) -> dict[str, bool | str]:
     from pioreactor.actions.leader.export_experiment_data import cleanup_stale_export_artifacts
     from pioreactor.actions.leader.export_experiment_data import export_experiment_data
@@ -1062,6 +1074,7 @@ def export_experiment_data_to_usb_task(
             end_time=end_time,
             partition_by_unit=partition_by_unit,
             partition_by_experiment=partition_by_experiment,
+            output_format=output_format,
         )
     except Exception as exc:
         error = str(exc) or exc.__class__.__name__
@@ -1076,12 +1089,32 @@ def export_experiment_data_to_usb_task(
     }
 
 
+def _publish_unassigned_worker(pioreactor_unit: str, is_active: bool) -> None:
+    try:
+        assignments.publish_experiment_assignment(pioreactor_unit, None, None, is_active)
+    except Exception as error:
+        logger.error(
+            f"Unable to publish retained experiment assignment for {pioreactor_unit}: {error}",
+            exc_info=True,
+        )
+
+
 @huey.task()
 @huey.lock_task("delete-experiment-lock")
 def delete_experiment_task(experiment: str) -> dict[str, Any]:
     logger.debug(f"Deleting experiment {experiment}.")
     conn = open_app_database_connection()
     try:
+        # the delete cascades to these workers' assignments
+        assigned_workers = conn.execute(
+            """
+            SELECT a.pioreactor_unit, w.is_active
+            FROM experiment_worker_assignments a
+            JOIN workers w ON w.pioreactor_unit = a.pioreactor_unit
+            WHERE a.experiment=?;
+            """,
+            (experiment,),
+        ).fetchall()
         cursor = conn.execute("DELETE FROM experiments WHERE experiment=?;", (experiment,))
         deleted = cursor.rowcount > 0
         conn.commit()
@@ -1093,6 +1126,9 @@ def delete_experiment_task(experiment: str) -> dict[str, Any]:
     finally:
         conn.close()
 
+    for pioreactor_unit, is_active in assigned_workers:
+        _publish_unassigned_worker(pioreactor_unit, bool(is_active))
+
     return {
         "result": True,
         "experiment": experiment,
@@ -1835,6 +1871,100 @@ def _get_from_unit(
         )
 
 
+_multicast_get_executor: ThreadPoolExecutor | None = None
+_multicast_get_executor_lock = threading.Lock()
+
+
+def _get_multicast_get_executor() -> ThreadPoolExecutor:
+    global _multicast_get_executor
+
+    with _multicast_get_executor_lock:
+        if _multicast_get_executor is None:
+            _multicast_get_executor = ThreadPoolExecutor(
+                max_workers=MULTICAST_GET_MAX_THREADS, thread_name_prefix="multicast_get"
+            )
+        return _multicast_get_executor
+
+
+def _fanout_get(
+    endpoint: str,
+    units: list[str],
+    json: list[dict[str, Any] | None],
+    timeout: float,
+    return_raw: bool,
+) -> dict[str, Any]:
+    """
+    GET endpoint from every unit concurrently, on threads of this process, and reduce to the sorted per-unit
+    fanout envelopes. Units that haven't answered by the deadline (the request timeout, with the same 1s of
+    headroom the Huey chord had) get a retryable task_timeout failure instead of holding up the others.
+    """
+    executor = _get_multicast_get_executor()
+    futures = [
+        executor.submit(
+            _get_from_unit, unit, endpoint, json=unit_json, timeout=timeout, return_raw=return_raw
+        )
+        for unit, unit_json in zip(units, json)
+    ]
+    done, _ = wait(futures, timeout=timeout + 1.0)
+
+    ordered_results: list[Any] = []
+    for unit, future in zip(units, futures):
+        if future not in done:
+            future.cancel()
+            ordered_results.append(
+                fanout_failure(
+                    unit,
+                    "task_timeout",
+                    f"Timed out waiting for {unit}'s {endpoint}.",
+                    retryable=True,
+                )
+            )
+        else:
+            ordered_results.append(future.exception() or future.result())
+
+    return _reduce_multicast_results(units, True, ordered_results)
+
+
+class MulticastGetResult:
+    """
+    A multicast GET running on threads in this process, in place of the Huey Result of a chord of per-unit tasks.
+
+    Like a Huey Result, it has an id for create_task_response, and get(blocking, timeout). When the fanout
+    finishes, its results are put in Huey's result store under that id, so /unit_api/task_results/<id> serves
+    them the same way.
+    """
+
+    def __init__(self, units: list[str], fanout: Callable[[], dict[str, Any]]) -> None:
+        self.id = str(uuid4())
+        self.units = units
+        self._future: Future[dict[str, Any]] = Future()
+        threading.Thread(target=self._run, args=(fanout,), name="multicast_get", daemon=True).start()
+
+    def _run(self, fanout: Callable[[], dict[str, Any]]) -> None:
+        try:
+            try:
+                results = fanout()
+            except Exception as e:
+                logger.debug(f"multicast GET to {self.units} failed: {e}", exc_info=True)
+                results = _reduce_multicast_results(self.units, True, [e] * len(self.units))
+
+            huey.put(self.id, results)
+        except BaseException as e:
+            # ex: the result store is unavailable. get() raises it, instead of waiting forever.
+            logger.error(f"multicast GET {self.id} to {self.units} failed: {e}", exc_info=True)
+            self._future.set_exception(e)
+        else:
+            self._future.set_result(results)
+
+    def get(self, blocking: bool = False, timeout: float | None = None, preserve: bool = False) -> Any:
+        if not blocking and not self._future.done():
+            return None
+        try:
+            return self._future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise ResultTimeout(f"multicast GET {self.id} timed out after {timeout}s.")
+
+
 def _multicast_get_uncached(
     endpoint: str,
     units: list[str],
@@ -1850,27 +1980,7 @@ def _multicast_get_uncached(
     if not units:
         return {}
 
-    result = _enqueue_multicast_chord(
-        [get_from_unit.s(units[i], endpoint, json[i], timeout, return_raw) for i in range(len(units))],
-        units,
-        True,
-    )
-    try:
-        # Give the aggregate Huey result a small amount of headroom beyond the per-unit
-        # request timeout so offline workers can resolve to `None` instead of turning
-        # the whole fanout into a ResultTimeout.
-        unsorted_responses = result.get(blocking=True, timeout=timeout + 1.0)
-    except ResultTimeout:
-        ordered_results: list[Any] = []
-        for child_result in result.results:
-            try:
-                ordered_results.append(child_result.get(blocking=False, preserve=True))
-            except Exception as exc:
-                ordered_results.append(exc)
-
-        return _reduce_multicast_results(units, True, ordered_results)
-
-    return dict(sorted(unsorted_responses.items()))  # always sort alphabetically for downstream uses.
+    return _fanout_get(endpoint, units, json, timeout, return_raw)
 
 
 def multicast_get(
@@ -1880,6 +1990,10 @@ def multicast_get(
     timeout: float = 5.0,
     return_raw: bool = False,
 ) -> Any:
+    """
+    GET endpoint from each unit. Reads don't go through the Huey queue: they fan out on threads of this process,
+    see _fanout_get. Returns a MulticastGetResult, which can be passed to create_task_response.
+    """
     assert endpoint.startswith("/unit_api")
 
     if not isinstance(json, list):
@@ -1888,11 +2002,8 @@ def multicast_get(
     if not units:
         return reduce_multicast_results(units, True, [], child_task_ids=[])
 
-    return _enqueue_multicast_chord(
-        [get_from_unit.s(units[i], endpoint, json[i], timeout, return_raw) for i in range(len(units))],
-        units,
-        True,
-    )
+    unit_json = json
+    return MulticastGetResult(units, lambda: _fanout_get(endpoint, units, unit_json, timeout, return_raw))
 
 
 @huey.task(priority=5)
@@ -45,7 +45,7 @@ from pioreactor.config import get_leader_hostname
 from pioreactor.estimators import ESTIMATOR_PATH
 from pioreactor.logging import create_logger
 from pioreactor.models import get_registered_models
-from pioreactor.pubsub import create_client
+from pioreactor.pubsub import get_shared_client
 from pioreactor.structs import CalibrationBase
 from pioreactor.structs import subclass_union
 from pioreactor.utils import local_persistent_storage
@@ -862,7 +862,9 @@ def list_system_path(req_path: str) -> ResponseReturnValue:
 
     # If it's a file, serve the file
     if requested_path.is_file():
-        if requested_path.name.endswith((".sqlite", ".sqlite.backup", ".sqlite-shm", ".sqlite-wal")):
+        if requested_path.name.endswith(
+            (".sqlite", ".sqlite.backup", ".sqlite-shm", ".sqlite-wal", ".sqlite.backup.pages", ".delta")
+        ):
             abort_with(
                 403,
                 "Access to downloading sqlite files is restricted.",
@@ -1164,33 +1166,33 @@ def update_bioreactor_values(experiment: str) -> ResponseReturnValue:
         )
 
     try:
-        with create_client() as mqtt_client:
-            logger = create_logger(
-                f"bioreactor.{experiment}",
-                unit=HOSTNAME,
-                experiment=experiment,
-                source="ui",
-                task="bioreactor",
-                pub_client=mqtt_client,
-            )
-            try:
-                for variable_name, value in values.items():
-                    previous_value = copy(get_bioreactor_value(experiment, variable_name))
-                    updated_value = set_and_publish_bioreactor_value(
-                        mqtt_client,
-                        HOSTNAME,
-                        experiment,
-                        variable_name,
-                        value,
-                    )
-                    units = BIOREACTOR_VARIABLE_UNITS.get(variable_name)
-                    logger.info(
-                        f"Updated {variable_name} from "
-                        f"{format_with_optional_units(previous_value, units)} to "
-                        f"{format_with_optional_units(updated_value, units)}."
-                    )
-            finally:
-                logger.clean_up()
+        mqtt_client = get_shared_client()
+        logger = create_logger(
+            f"bioreactor.{experiment}",
+            unit=HOSTNAME,
+            experiment=experiment,
+            source="ui",
+            task="bioreactor",
+            pub_client=mqtt_client,
+        )
+        try:
+            for variable_name, value in values.items():
+                previous_value = copy(get_bioreactor_value(experiment, variable_name))
+                updated_value = set_and_publish_bioreactor_value(
+                    mqtt_client,
+                    HOSTNAME,
+                    experiment,
+                    variable_name,
+                    value,
+                )
+                units = BIOREACTOR_VARIABLE_UNITS.get(variable_name)
+                logger.info(
+                    f"Updated {variable_name} from "
+                    f"{format_with_optional_units(previous_value, units)} to "
+                    f"{format_with_optional_units(updated_value, units)}."
+                )
+        finally:
+            logger.clean_up()
     except Exception as e:
         publish_to_error_log(str(e), "update_bioreactor_values")
         abort_with(400, str(e))
@@ -1774,6 +1776,8 @@ def get_zipped_dot_pioreactor() -> ResponseReturnValue:
     try:
         with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf:
             skip_backup = base_dir / "storage" / "pioreactor.sqlite.backup"
+            # and the incremental backup's manifest and deltas
+            skip_backups = (skip_backup, Path(f"{skip_backup}.pages"), Path(f"{skip_backup}.deltas"))
             for path in sorted(base_dir.rglob("*")):
                 if not path.exists():
                     continue
@@ -1781,7 +1785,7 @@ def get_zipped_dot_pioreactor() -> ResponseReturnValue:
                 # through a symlink that escapes DOT_PIOREACTOR.
                 if not path.resolve().is_relative_to(base_dir):
                     continue
-                if path == skip_backup:
+                if any(path.is_relative_to(skip) for skip in skip_backups):
                     continue
                 # Store paths inside the archive relative to DOT_PIOREACTOR
                 arcname = path.relative_to(base_dir)
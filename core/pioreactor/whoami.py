@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import os
 import sys
+import threading
 import time
 import warnings
 from functools import cache
@@ -23,6 +24,112 @@ UNIVERSAL_EXPERIMENT = "$experiment"
 NO_EXPERIMENT = "$no_experiment_present"
 
 
+ASSIGNMENT_CACHE_TTL = 10.0  # seconds an assignment or active status fetched over HTTP is reused
+ASSIGNMENT_PUSHED_TTL = 300.0  # seconds an assignment or active status pushed over MQTT is reused
+ASSIGNMENT_TOPIC = "pioreactor/+/$experiment/assignment"
+
+_MISSING = object()
+
+
+class _AssignmentCache:
+    """
+    Per-process cache of units' experiment assignments and active statuses.
+
+    The leader publishes a retained message to pioreactor/<unit>/$experiment/assignment whenever either changes (see
+    pioreactor/web/assignments.py), and, once a process looks up a value a second time, this cache subscribes to
+    those messages in the background.
+    Values pushed that way are served for `pushed_ttl` seconds, or until the MQTT connection drops, so a change the
+    leader doesn't publish is picked up eventually. Values fetched from the leader over HTTP (before the
+    subscription is up, for a leader that doesn't publish is_active, or once a pushed value expires) are served for
+    `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = ASSIGNMENT_CACHE_TTL, pushed_ttl: float = ASSIGNMENT_PUSHED_TTL) -> None:
+        self.ttl = ttl
+        self.pushed_ttl = pushed_ttl
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        # unit -> field -> (expires_at, value, pushed)
+        self._entries: dict[str, dict[str, tuple[float, object, bool]]] = {}
+        self._lookups = 0
+        self._watching = False
+        self._next_watch_attempt = 0.0
+
+    def get(self, unit: "pt.Unit", field: str) -> object:
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked: the MQTT client belongs to the parent
+                self._reset()
+
+            self._lookups += 1
+            if self._lookups > 1 and not self._watching and time.monotonic() >= self._next_watch_attempt:
+                self._watching = True
+                threading.Thread(target=self._watch, daemon=True, name="whoami-assignments").start()
+
+            expires_at, value, _ = self._entries.get(unit, {}).get(field, (0.0, _MISSING, False))
+            return value if time.monotonic() < expires_at else _MISSING
+
+    def put(self, unit: "pt.Unit", **fields: object) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.setdefault(unit, {})
+            for field, value in fields.items():
+                # an unexpired pushed value is at least as new as one fetched over HTTP
+                pushed_expires_at, _, pushed = entry.get(field, (0.0, None, False))
+                if not pushed or pushed_expires_at <= now:
+                    entry[field] = (now + self.ttl, value, False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _watch(self) -> None:
+        from pioreactor.pubsub import subscribe_and_callback
+
+        try:
+            subscribe_and_callback(
+                self._on_message,
+                ASSIGNMENT_TOPIC,
+                name="whoami",
+                on_disconnect=self._on_disconnect,
+            )
+        except Exception:
+            # no broker? Keep using HTTP, and try subscribing again later.
+            with self._lock:
+                self._watching = False
+                self._next_watch_attempt = time.monotonic() + self.ttl
+
+    def _on_message(self, message: "pt.MQTTMessage") -> None:
+        from json import loads
+
+        unit = message.topic.split("/")[1]
+        with self._lock:
+            if not message.payload:
+                # the retained message was cleared: the worker was removed from the inventory
+                self._entries.pop(unit, None)
+                return
+
+            payload = loads(message.payload)
+            expires_at = time.monotonic() + self.pushed_ttl
+            entry = self._entries.setdefault(unit, {})
+            entry["experiment"] = (expires_at, payload["experiment"], True)
+            if payload.get("is_active") is not None:
+                entry["is_active"] = (expires_at, bool(payload["is_active"]), True)
+
+    def _on_disconnect(self, *args: object) -> None:
+        # we may miss changes until we reconnect and the retained messages arrive again
+        with self._lock:
+            for entry in self._entries.values():
+                for field in [field for field, (_, _, pushed) in entry.items() if pushed]:
+                    del entry[field]
+
+
+_assignment_cache = _AssignmentCache()
+
+
 def get_latest_experiment_name() -> "pt.Experiment":
     warnings.warn("Use whoami.get_assigned_experiment_name(unit) instead", DeprecationWarning, stacklevel=2)
     return get_assigned_experiment_name(get_unit_name())
@@ -47,6 +154,12 @@ def _get_assigned_experiment_name(unit_name: "pt.Unit") -> "pt.Experiment":
     elif is_testing_env():
         return "_testing_experiment"
 
+    cached = _assignment_cache.get(unit_name, "experiment")
+    if cached is None:
+        raise NotAssignedAnExperimentError(f"Worker `{unit_name}` is not assigned to any experiment.")
+    elif cached is not _MISSING:
+        return cached  # type: ignore
+
     from pioreactor.pubsub import get_from_leader
     from pioreactor.config import leader_address
     from pioreactor.mureq import HTTPErrorStatus
@@ -59,6 +172,12 @@ def _get_assigned_experiment_name(unit_name: "pt.Unit") -> "pt.Experiment":
             result = get_from_leader(f"/api/workers/{unit_name}/experiment")
             result.raise_for_status()
             data = result.json()
+            if "is_active" in data:
+                _assignment_cache.put(
+                    unit_name, experiment=data["experiment"], is_active=bool(data["is_active"])
+                )
+            else:
+                _assignment_cache.put(unit_name, experiment=data["experiment"])
             return data["experiment"]
         except HTTPErrorStatus as e:
             if e.status_code == 401:
@@ -93,6 +212,10 @@ def _is_active(unit_name: "pt.Unit") -> bool:
     elif os.environ.get("ACTIVE") == "0":
         return False
 
+    cached = _assignment_cache.get(unit_name, "is_active")
+    if cached is not _MISSING:
+        return cached  # type: ignore
+
     from pioreactor.pubsub import get_from_leader
     from pioreactor.mureq import HTTPErrorStatus
     from pioreactor.mureq import HTTPException
@@ -101,6 +224,7 @@ def _is_active(unit_name: "pt.Unit") -> bool:
         result = get_from_leader(f"/api/workers/{unit_name}")
         result.raise_for_status()
         data = result.json()
+        _assignment_cache.put(unit_name, is_active=bool(data["is_active"]))
         return bool(data["is_active"])
     except HTTPErrorStatus as e:
         if e.status_code == 404:
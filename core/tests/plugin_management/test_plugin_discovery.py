@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
+import gc
+import os
 import sys
 from pathlib import Path
 
 import pytest
+from click import Context
 from pioreactor.plugin_management.utils import discover_plugins_in_local_folder
 
 
@@ -21,3 +24,125 @@ def test_discover_plugins_in_local_folder_does_not_duplicate_sys_path(
     discover_plugins_in_local_folder()
 
     assert sys.path.count(str(plugins_dev)) == 1
+
+
+def test_run_imports_only_the_plugin_it_needs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from pioreactor.background_jobs import dosing_automation
+    from pioreactor.cli.run import lazy_subcommands
+    from pioreactor.cli.run import RunLazyGroup
+    from pioreactor.plugin_management.plugin_index import get_plugin_index
+
+    (tmp_path / "index_plugin_a.py").write_text(
+        "import click\n"
+        "from pioreactor.background_jobs.dosing_automation import DosingAutomationJobContrib\n"
+        "class IndexPluginAutomation(DosingAutomationJobContrib):\n"
+        "    automation_name = 'index_plugin_automation'\n"
+        "@click.command(name='index_plugin_a_job', short_help='job from plugin a')\n"
+        "def click_index_plugin_a_job():\n"
+        "    pass\n"
+    )
+    (tmp_path / "index_plugin_b.py").write_text(
+        "import click\n"
+        "@click.command(name='index_plugin_b_job', short_help='job from plugin b')\n"
+        "def click_index_plugin_b_job():\n"
+        "    pass\n"
+    )
+    monkeypatch.setenv("PLUGINS_DEV", str(tmp_path))
+    monkeypatch.setattr(sys, "path", sys.path.copy())
+    monkeypatch.setattr(dosing_automation, "available_dosing_automations", {})
+
+    index = get_plugin_index()  # builds the index, which imports both
+    assert index.commands["index_plugin_b_job"].target == "index_plugin_b:click_index_plugin_b_job"
+    assert index.commands["index_plugin_b_job"].short_help == "job from plugin b"
+    assert index.registrations == {"dosing_automation": ["index_plugin_a"]}
+
+    # like a new `pio run` process
+    monkeypatch.delitem(sys.modules, "index_plugin_a")
+    monkeypatch.delitem(sys.modules, "index_plugin_b")
+    group = RunLazyGroup(name="run", lazy_subcommands=lazy_subcommands)
+    ctx = Context(group)
+
+    assert "index_plugin_a_job" in group.list_commands(ctx)
+    assert "job from plugin a" in group.get_help(ctx)
+    assert "index_plugin_a" not in sys.modules and "index_plugin_b" not in sys.modules
+
+    command = group.get_command(ctx, "index_plugin_b_job")
+    assert command is not None and command.name == "index_plugin_b_job"
+    assert "index_plugin_a" not in sys.modules
+
+    group.get_command(ctx, "dosing_automation")
+    assert "index_plugin_a" in sys.modules
+
+    # a changed plugin file is noticed
+    (tmp_path / "index_plugin_b.py").write_text((tmp_path / "index_plugin_b.py").read_text() + "# changed\n")
+    os.utime(tmp_path / "index_plugin_b.py", ns=(0, 0))
+    assert get_plugin_index().files[str(tmp_path / "index_plugin_b.py")] == 0
+
+
+def test_run_mqtt_to_db_streaming_imports_every_plugin(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from pioreactor.background_jobs.leader import mqtt_to_db_streaming
+    from pioreactor.cli.run import lazy_subcommands
+    from pioreactor.cli.run import RunLazyGroup
+    from pioreactor.plugin_management.plugin_index import get_plugin_index
+
+    (tmp_path / "index_plugin_sink.py").write_text(
+        "from pioreactor.background_jobs.leader.mqtt_to_db_streaming import register_source_to_sink\n"
+        "from pioreactor.background_jobs.leader.mqtt_to_db_streaming import TopicToParserToTable\n"
+        "register_source_to_sink(TopicToParserToTable('pioreactor/+/+/my_plugin/reading', None, 'my_table'))\n"
+    )
+    monkeypatch.setenv("PLUGINS_DEV", str(tmp_path))
+    monkeypatch.setattr(sys, "path", sys.path.copy())
+    monkeypatch.setattr(mqtt_to_db_streaming, "source_to_sinks", [])
+
+    index = get_plugin_index()
+    assert index.commands == {} and index.registrations == {}
+
+    # like a new `pio run` process
+    monkeypatch.delitem(sys.modules, "index_plugin_sink")
+    mqtt_to_db_streaming.source_to_sinks.clear()
+    group = RunLazyGroup(name="run", lazy_subcommands=lazy_subcommands)
+    group.get_command(Context(group), "mqtt_to_db_streaming")
+
+    assert [t2p2t.table for t2p2t in mqtt_to_db_streaming.source_to_sinks] == ["my_table"]
+
+
+def test_built_in_commands_import_plugins_that_define_calibrations(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from pioreactor import structs
+    from pioreactor.cli.run import lazy_subcommands
+    from pioreactor.cli.run import RunLazyGroup
+    from pioreactor.plugin_management.plugin_index import get_plugin_index
+
+    (tmp_path / "index_plugin_calibration.py").write_text(
+        "from pioreactor.structs import CalibrationBase\n"
+        "class IndexPluginCalibration(CalibrationBase, kw_only=True, tag='index_plugin_calibration'):\n"
+        "    x: str = 'x'\n"
+        "    y: str = 'y'\n"
+    )
+    monkeypatch.setenv("PLUGINS_DEV", str(tmp_path))
+    monkeypatch.setattr(sys, "path", sys.path.copy())
+
+    def calibration_types() -> set[str]:
+        return {
+            str(klass.__struct_config__.tag)
+            for klass in structs.subclass_union(structs.CalibrationBase).__args__
+        }
+
+    try:
+        index = get_plugin_index()
+        assert index.struct_modules == ["index_plugin_calibration"]
+
+        # like a new `pio run` process
+        sys.modules.pop("index_plugin_calibration")
+        gc.collect()
+        assert "index_plugin_calibration" not in calibration_types()
+
+        group = RunLazyGroup(name="run", lazy_subcommands=lazy_subcommands)
+        group.get_command(Context(group), "stirring")
+        assert "index_plugin_calibration" in calibration_types()
+    finally:
+        sys.modules.pop("index_plugin_calibration", None)
+        gc.collect()
@@ -131,7 +131,8 @@ def test_job_manager_cleanup_failure_does_not_prevent_mqtt_shutdown(
         monkeypatch.setattr(job.pub_client, "shutdown", pub_client_shutdown)
 
     sub_client_shutdown.assert_called_once_with()
-    pub_client_shutdown.assert_called_once_with()
+    # publishing goes over the process's shared connection, which outlives the job
+    pub_client_shutdown.assert_not_called()
     assert job._is_cleaned_up
 
 
@@ -231,6 +232,8 @@ def test_init_state_is_sent_to_mqtt() -> None:
         pause()
         pause()
 
+    # the broker has acknowledged "disconnected", but may not have delivered it to our subscriber yet
+    pause()
     assert len(states) == 3
     assert states == ["init", "ready", "disconnected"]
 
@@ -591,6 +594,35 @@ def test_clear_caches_doesnt_unpublish_settings_without_values(monkeypatch) -> N
     assert all(setting != "optional_setting" for setting, _ in recorded_upserts)
 
 
+def test_setting_publishes_dropped_by_a_full_mqtt_queue_are_retried(monkeypatch) -> None:
+    from paho.mqtt.client import MQTTMessageInfo
+    from paho.mqtt.enums import MQTTErrorCode
+
+    exp = "test_setting_publishes_dropped_by_a_full_mqtt_queue_are_retried"
+    unit = get_unit_name()
+    not_queued = MQTTMessageInfo(0)
+    not_queued.rc = MQTTErrorCode.MQTT_ERR_QUEUE_SIZE
+
+    with BackgroundJob(unit=unit, experiment=exp) as job:
+        publish_to_mqtt = job.publish
+        attempts: list[str] = []
+
+        def publish_to_a_full_queue_once(topic, payload, **kwargs):
+            attempts.append(topic)
+            return not_queued if len(attempts) == 1 else publish_to_mqtt(topic, payload, **kwargs)
+
+        monkeypatch.setattr(job, "publish", publish_to_a_full_queue_once)
+        job._publish_setting("state")
+
+        assert attempts == [f"pioreactor/{unit}/{exp}/background_job/$state"] * 2
+        job._wait_for_publishes()
+        assert not job._unacknowledged_publishes
+
+        monkeypatch.setattr(job, "publish", lambda topic, payload, **kwargs: not_queued)
+        job._publish_setting("state")
+        assert not job._unacknowledged_publishes
+
+
 def test_duplicate_job_cannot_start_while_existing_instance_is_running() -> None:
     class DuplicateJob(BackgroundJob):
         job_name = "duplicate_job_guard"
@@ -825,10 +857,17 @@ def test_disabling_dodging_while_sleeping_stays_disabled_when_ready() -> None:
 
 def test_dodging_post_init_timer_setup_failure_cleans_up_running_job(monkeypatch) -> None:
     class FakePublishResult:
+        rc = 0
+
         def wait_for_publish(self, timeout: float | None = None) -> None:
             pass
 
+        def is_published(self) -> bool:
+            return True
+
     class FakeClient:
+        _thread = None
+
         def publish(self, *args: object, **kwargs: object) -> FakePublishResult:
             return FakePublishResult()
 
@@ -81,3 +81,64 @@ def test_skip_backup_when_local_has_no_space(tmp_path) -> None:
         ):
             backup_database(str(output), force=True, backup_to_workers=0)
             mock_connect.assert_not_called()
+
+
+def test_incremental_backup_sends_workers_only_new_deltas(tmp_path) -> None:
+    from pioreactor.utils import local_persistent_storage
+
+    db_path = tmp_path / "db.sqlite"
+    output = tmp_path / "backup.sqlite"
+    with local_persistent_storage("database_backups") as cache:
+        cache.pop("latest_backup_in_worker_incremental_sequence")
+
+    with temporary_config_change(config, "storage", "database", str(db_path)):
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE t(id INTEGER)")
+        conn.commit()
+
+        with (
+            patch(
+                "pioreactor.actions.leader.backup_database.long_running_managed_lifecycle",
+                dummy_lifecycle,
+            ),
+            patch(
+                "pioreactor.actions.leader.backup_database.create_logger",
+                return_value=MagicMock(),
+            ),
+            patch(
+                "pioreactor.actions.leader.backup_database.get_active_workers_in_inventory",
+                return_value=["worker_incremental"],
+            ),
+            patch(
+                "pioreactor.actions.leader.backup_database._remote_available_space",
+                return_value=None,
+            ),
+            patch(
+                "pioreactor.actions.leader.backup_database.resolve_to_address",
+                return_value="worker_incremental.local",
+            ),
+            patch(
+                "pioreactor.actions.leader.backup_database.rsync",
+            ) as mock_rsync,
+        ):
+            # the first backup sends a full copy, to a worker whose old deltas are cleared
+            backup_database(str(output), backup_to_workers=1, incremental=True)
+            assert mock_rsync.call_args.args[-2:] == (str(output), f"worker_incremental.local:{output}")
+            assert "--delete" in mock_rsync.call_args_list[0].args
+
+            mock_rsync.reset_mock()
+            conn.execute("INSERT INTO t VALUES (1)")
+            conn.commit()
+            backup_database(str(output), backup_to_workers=1, incremental=True)
+
+            (call,) = mock_rsync.call_args_list
+            assert call.args[-2:] == (
+                str(output) + ".deltas/0000000001.delta",
+                f"worker_incremental.local:{output}.deltas/",
+            )
+
+        conn.close()
+        backup = sqlite3.connect(f"file:{output}?immutable=1", uri=True)
+        assert backup.execute("SELECT id FROM t").fetchall() == [(1,)]
+        backup.close()
@@ -173,3 +173,46 @@ def test_typed_cache_helpers_require_explicit_fallback(tmp_path: Path) -> None:
 
         with pytest.raises(KeyError):
             c.getboolean("missing_bool")
+
+
+def test_cache_reuses_one_connection_per_thread(tmp_path: Path) -> None:
+    import threading
+
+    db_path = str(tmp_path / "cache.sqlite")
+
+    with sqlite_cache("example", db_path=db_path) as c:
+        c["A"] = "1"
+        first_connection = c.conn
+
+    with sqlite_cache("other", db_path=db_path) as c:
+        assert c.conn is first_connection
+
+    connections = []
+
+    def open_cache() -> None:
+        with sqlite_cache("example", db_path=db_path) as c:
+            assert c["A"] == "1"
+            connections.append(c.conn)
+
+    thread = threading.Thread(target=open_cache)
+    thread.start()
+    thread.join()
+
+    assert connections and connections[0] is not first_connection
+
+
+def test_cache_reconnects_after_its_file_is_deleted(tmp_path: Path) -> None:
+    db_path = tmp_path / "cache.sqlite"
+
+    with sqlite_cache("example", db_path=str(db_path)) as c:
+        c["A"] = "1"
+
+    db_path.unlink()
+
+    with sqlite_cache("example", db_path=str(db_path)) as c:
+        assert "A" not in c
+        c["A"] = "2"
+
+    assert db_path.exists()
+    with sqlite_cache("example", db_path=str(db_path)) as c:
+        assert c["A"] == "2"
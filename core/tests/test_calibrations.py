@@ -18,6 +18,7 @@ from pioreactor.structs import OD600Calibration
 from pioreactor.structs import ODCalibration
 from pioreactor.structs import PolyFitCoefficients
 from pioreactor.utils import local_persistent_storage
+from pioreactor.utils.calibration_inverses import CalibrationInverse
 from pioreactor.utils.timing import current_utc_datetime
 
 
@@ -286,6 +287,70 @@ def test_spline_ipredict_linear() -> None:
     assert calibration.y_to_x(3.0) == pytest.approx(1.0)
 
 
+@pytest.mark.parametrize("curve_type", ["poly", "spline", "akima"])
+def test_calibration_inverse_agrees_with_y_to_x(curve_type: str) -> None:
+    from pioreactor.utils.akimas import akima_fit
+    from pioreactor.utils.polys import poly_fit
+    from pioreactor.utils.splines import spline_fit
+
+    od = np.linspace(0.0, 2.0, 12)
+    voltage = 0.02 + 0.8 * od - 0.15 * od**2 + 0.01 * np.sin(5 * od)
+    if curve_type == "poly":
+        curve_data = poly_fit(od, voltage, degree=3)
+    elif curve_type == "spline":
+        curve_data = spline_fit(od, voltage, knots=5)
+    else:
+        curve_data = akima_fit(od, voltage)
+
+    calibration = ODCalibration(
+        calibration_name="test_calibration_inverse",
+        calibrated_on_pioreactor_unit="unit1",
+        created_at=datetime.now(timezone.utc),
+        curve_data_=curve_data,
+        recorded_data={"x": od.tolist(), "y": voltage.tolist()},
+        ir_led_intensity=50.0,
+        angle="90",
+        pd_channel="2",
+    )
+    inverse = CalibrationInverse(calibration)
+    assert inverse.is_tabulated
+
+    # includes voltages outside the calibrated range, which y_to_x can't solve within bounds
+    voltages = np.linspace(-0.2, 1.3, 301)
+    many = calibration.y_to_x_many(voltages, enforce_bounds=True)
+    for y, x_from_many in zip(voltages, many):
+        try:
+            expected = calibration.y_to_x(y, enforce_bounds=True)
+        except (exc.NoSolutionsFoundError, exc.SolutionBelowDomainError, exc.SolutionAboveDomainError) as e:
+            with pytest.raises(type(e)):
+                inverse.y_to_x(y, enforce_bounds=True)
+            assert np.isnan(x_from_many)
+        else:
+            assert inverse.y_to_x(y, enforce_bounds=True) == pytest.approx(expected, abs=1e-9)
+            assert x_from_many == pytest.approx(expected, abs=1e-9)
+
+
+def test_calibration_inverse_does_not_root_solve_in_range(calibration, mocker) -> None:
+    calibration.curve_data_ = _poly_curve([5, 3, 2])  # 5x^2 + 3x + 2
+    calibration.recorded_data = {"x": [0, 2], "y": [2, 28]}
+    inverse = CalibrationInverse(calibration)
+
+    mocker.patch("pioreactor.utils.polys.poly_solve", side_effect=AssertionError("root-solved"))
+    assert inverse.y_to_x(12) == pytest.approx(1.145683229480096)
+    assert inverse.y_to_x_many([2, 12, float("nan")]).tolist()[:2] == pytest.approx([0.0, 1.145683229480096])
+
+
+def test_calibration_inverse_of_non_monotone_curve_solves_each(calibration) -> None:
+    calibration.curve_data_ = _poly_curve([1, 0, -6])  # x^2 - 6, solutions for y=0 are +- 2.45
+    calibration.recorded_data = {"x": [-3, 3], "y": [3, 3]}
+    inverse = CalibrationInverse(calibration)
+
+    assert not inverse.is_tabulated
+    assert inverse.y_to_x(0) == calibration.y_to_x(0)
+    assert inverse.y_to_x_many([0, -10]).tolist()[0] == calibration.y_to_x(0)
+    assert np.isnan(inverse.y_to_x_many([-10])[0])
+
+
 def test_linear_data_produces_linear_curve_in_range_even_if_high_degree() -> None:
     od = np.sort(
         np.r_[
@@ -1212,11 +1212,11 @@ def test_pios_jobs_set_confirms_resolved_targets_before_publishing(
         resolver_calls.append((units, experiments))
         return resolved_units
 
-    def create_client() -> None:
+    def get_shared_client() -> None:
         raise AssertionError("A rejected confirmation must not publish settings.")
 
     monkeypatch.setattr("pioreactor.cli.pios.resolve_active_job_units", resolve_active_job_units)
-    monkeypatch.setattr("pioreactor.pubsub.create_client", create_client)
+    monkeypatch.setattr("pioreactor.pubsub.get_shared_client", get_shared_client)
 
     runner = CliRunner()
     result = runner.invoke(
@@ -1253,7 +1253,7 @@ def test_pios_jobs_set_publishes_to_each_resolved_target(monkeypatch: pytest.Mon
         "pioreactor.cli.pios.resolve_active_job_units", lambda _units, _experiments: ("unit1", "unit2")
     )
     monkeypatch.setattr("pioreactor.cli.pios.get_assigned_experiment_name", lambda unit: f"experiment-{unit}")
-    monkeypatch.setattr("pioreactor.pubsub.create_client", FakeClient)
+    monkeypatch.setattr("pioreactor.pubsub.get_shared_client", FakeClient)
 
     runner = CliRunner()
     result = runner.invoke(pios, ["jobs", "set", "stirring", "target-rpm", "500", "-y"])
@@ -5,8 +5,11 @@ from unittest.mock import patch
 import pytest
 from msgspec.json import encode
 from msgspec.yaml import decode
+from pioreactor.actions.leader.experiment_profile import _recheck_on_change
 from pioreactor.actions.leader.experiment_profile import _verify_experiment_profile
 from pioreactor.actions.leader.experiment_profile import check_plugins
+from pioreactor.actions.leader.experiment_profile import evaluate_bool_expression
+from pioreactor.actions.leader.experiment_profile import evaluate_log_message
 from pioreactor.actions.leader.experiment_profile import execute_experiment_profile
 from pioreactor.actions.leader.experiment_profile import hours_to_seconds
 from pioreactor.actions.leader.experiment_profile import seconds_to_hours
@@ -69,6 +72,38 @@ def test_time_to_seconds_rejects_bad_literals() -> None:
         time_to_seconds("-5m")
 
 
+def test_recheck_on_change_handles_a_change_before_add_listener_returns() -> None:
+    from sched import scheduler
+
+    removed: list[bool] = []
+    rechecks: list[bool] = []
+
+    class EagerMirror:
+        def add_listener(self, topics, listener):
+            listener(topics[0])  # a change arrives on another thread mid-registration
+            return lambda: removed.append(True)
+
+    schedule = scheduler()
+    _recheck_on_change(EagerMirror(), ["a/b/c"], schedule, 1, lambda: rechecks.append(True))  # type: ignore
+
+    assert removed == [True]
+    assert len(schedule.queue) == 1  # the fallback was cancelled, only the recheck is left
+    schedule.run()
+    assert rechecks == [True]
+
+
+def test_evaluate_log_message_and_bool_expression() -> None:
+    env = {"unit": "unit1", "rpm": 100}
+    assert evaluate_log_message("${{ unit() }} is at ${{rpm + 1}} rpm.", env) == "unit1 is at 101.0 rpm."
+    assert evaluate_log_message("no expressions", env) == "no expressions"
+
+    assert evaluate_bool_expression("${{ rpm > 50 }}", env) is True
+    assert evaluate_bool_expression("rpm > 500", env) is False
+    assert evaluate_bool_expression(False, env) is False
+    with pytest.raises(SyntaxError):
+        evaluate_bool_expression("rpm >", env)
+
+
 @patch("pioreactor.actions.leader.experiment_profile._load_experiment_profile")
 def test_execute_experiment_profile_order(
     mock__load_experiment_profile,
@@ -811,3 +811,135 @@ def test_export_experiment_data_normalizes_dst_fall_back_bounds_to_utc(temp_zipf
         manifest = json.loads(zf.read("manifest.json"))
         assert manifest["filters"]["start_time"] == "2025-11-02T06:30:00.000Z"
         assert manifest["filters"]["end_time"] == "2025-11-02T06:30:00.000Z"
+
+
+@pytest.mark.usefixtures("mock_load_exportable_datasets")
+def test_export_experiment_data_as_npz(temp_zipfile) -> None:
+    import numpy as np
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE test_table (id INTEGER, name TEXT, timestamp DATETIME, reading FLOAT)")
+    conn.execute(
+        "INSERT INTO test_table (id, name, timestamp, reading) VALUES "
+        "(1, 'John', '2025-04-16T04:51:12.858Z', 0.04742762498678758),"
+        "(2, NULL, '2025-04-16T04:51:13.858Z', NULL)"
+    )
+    conn.commit()
+
+    with patch("sqlite3.connect") as mock_connect:
+        mock_connect.return_value = conn
+        export_experiment_data(
+            experiment="test_experiment",
+            output=temp_zipfile.strpath,
+            partition_by_unit=False,
+            dataset_names=["test_table"],
+            output_format="npz",
+        )
+
+    with zipfile.ZipFile(temp_zipfile.strpath, mode="r") as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+        dataset_manifest = manifest["datasets"][0]
+        (npz_path,) = dataset_manifest["npz_paths"]
+        assert re.match(r"test_table/test_table-all_experiments-all_units-\d{14}-part0\.npz", npz_path)
+        assert not any(name.endswith(".csv") for name in zf.namelist())
+
+        with zf.open(npz_path) as f, np.load(f) as npz:
+            assert npz.files == ["id", "name", "timestamp", "reading", "timestamp_localtime"]
+            assert npz["id"].tolist() == [1, 2]
+            assert npz["name"].tolist() == ["John", ""]
+            assert npz["timestamp"].dtype == np.dtype("datetime64[ms]")
+            assert npz["timestamp"][0] == np.datetime64("2025-04-16T04:51:12.858")
+            assert npz["reading"][0] == 0.04742762498678758  # not rounded
+            assert np.isnan(npz["reading"][1])
+
+    assert manifest["format"] == "npz"
+    assert dataset_manifest["row_count"] == 2
+    assert dataset_manifest["npz_files"][0]["row_count"] == 2
+
+
+@pytest.mark.parametrize("partition_by_unit", [False, True])
+@pytest.mark.usefixtures("mock_load_exportable_datasets")
+def test_export_experiment_data_in_a_process_pool_matches_export_in_process(
+    partition_by_unit: bool, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from pioreactor.config import config
+    from pioreactor.config import temporary_config_change
+
+    db_path = tmp_path / "pioreactor.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE od_readings (pioreactor_unit TEXT, experiment TEXT, od_reading REAL, timestamp TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO od_readings (pioreactor_unit, experiment, od_reading, timestamp) VALUES (?, ?, ?, ?)",
+        [
+            (
+                f"pio0{i % 3}",
+                "exp1",
+                i / 7,
+                f"2021-09-01T{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000Z",
+            )
+            for i in range(5000)
+        ]
+        + [("pio01", "exp1", None, None), ("pio01", "exp2", 1.0, "2021-09-01T00:00:00.000Z")],
+    )
+    conn.execute("CREATE TABLE experiments (experiment TEXT, created_at TEXT)")
+    conn.execute(
+        "INSERT INTO experiments (experiment, created_at) VALUES ('exp1', '2021-09-01T00:00:00.000Z')"
+    )
+    conn.commit()
+    conn.close()
+    # so the unpartitioned export is split into time ranges
+    monkeypatch.setattr(export_experiment_data_module, "MIN_EXPORT_CHUNK_ROWS", 1000)
+
+    def export(processes: int) -> dict[str, bytes]:
+        output = tmp_path / f"export-{processes}.zip"
+        with temporary_config_change(config, "storage", "database", str(db_path)):
+            export_experiment_data(
+                experiment="exp1",
+                output=output.as_posix(),
+                partition_by_unit=partition_by_unit,
+                dataset_names=["od_readings"],
+                processes=processes,
+            )
+        with zipfile.ZipFile(output, mode="r") as zf:
+            return {
+                re.sub(r"-\d{14}", "", name): zf.read(name) for name in zf.namelist() if name.endswith(".csv")
+            }
+
+    in_process = export(0)
+    assert len(in_process) == (3 if partition_by_unit else 1)
+    assert sum(content.count(b"\r\n") - 1 for content in in_process.values()) == 5001
+    assert export(2) == in_process
+
+
+@pytest.mark.usefixtures("mock_load_exportable_datasets")
+def test_export_experiment_data_in_a_process_pool_exports_a_small_table_in_one_chunk(tmp_path: Path) -> None:
+    from pioreactor.config import config
+    from pioreactor.config import temporary_config_change
+
+    db_path = tmp_path / "pioreactor.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE od_readings (pioreactor_unit TEXT, experiment TEXT, od_reading REAL, timestamp TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO od_readings (pioreactor_unit, experiment, od_reading, timestamp) VALUES (?, ?, ?, ?)",
+        [("pio01", "exp1", i / 7, f"2021-09-01T00:00:{i:02d}.000Z") for i in range(10)],
+    )
+    conn.execute("CREATE TABLE experiments (experiment TEXT, created_at TEXT)")
+    conn.execute(
+        "INSERT INTO experiments (experiment, created_at) VALUES ('exp1', '2021-09-01T00:00:00.000Z')"
+    )
+    conn.commit()
+    conn.close()
+
+    output = tmp_path / "export.zip"
+    with temporary_config_change(config, "storage", "database", str(db_path)):
+        export_experiment_data(
+            experiment="exp1", output=output.as_posix(), dataset_names=["od_readings"], processes=2
+        )
+
+    with zipfile.ZipFile(output, mode="r") as zf:
+        (csv_name,) = [name for name in zf.namelist() if name.endswith(".csv")]
+        assert zf.read(csv_name).count(b"\r\n") == 11
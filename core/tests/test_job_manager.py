@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import struct
 import time
 from datetime import datetime
 
@@ -7,6 +8,8 @@ from msgspec.json import encode as dumps
 from pioreactor.utils.job_manager import ClusterJobManager
 from pioreactor.utils.job_manager import JobManager
 from pioreactor.utils.job_manager import JobMetadataKey
+from pioreactor.utils.job_manager import RunningJobsSnapshot
+from pioreactor.utils.job_manager import SettingsWriter
 from tests.conftest import capture_requests
 
 
@@ -123,6 +126,46 @@ def test_is_job_running(job_manager: JobManager) -> None:
     assert job_manager.is_job_running("test_name") is False
 
 
+def test_running_jobs_snapshot_follows_the_database(job_manager: JobManager) -> None:
+    snapshot = RunningJobsSnapshot()
+    assert snapshot.get_job_id("test_name") is None
+
+    first_key = job_manager.register_and_set_running(
+        "test_unit", "test_experiment", "test_name", "test_source", 12345, "test_leader", False
+    )
+    assert snapshot.get_job_id("test_name") == first_key
+
+    second_key = job_manager.register_and_set_running(
+        "test_unit", "test_experiment", "test_name", "test_source", 12346, "test_leader", False
+    )
+    assert snapshot.get_job_id("test_name") == second_key == job_manager.get_running_job_id("test_name")
+
+    job_manager.set_not_running(second_key)
+    assert snapshot.get_job_id("test_name") == first_key
+
+    job_manager.remove_job(first_key)
+    assert snapshot.is_job_running("test_name") is False
+
+
+def test_running_jobs_snapshot_recovers_from_an_interrupted_write(job_manager: JobManager) -> None:
+    job_key = job_manager.register_and_set_running(
+        "test_unit", "test_experiment", "test_name", "test_source", 12345, "test_leader", False
+    )
+    snapshot = RunningJobsSnapshot()
+    assert snapshot.get_job_id("test_name") == job_key
+
+    # a writer that dies mid-write leaves the sequence number odd
+    with open(snapshot.path(), "r+b") as f:
+        seq, length = struct.unpack("<QI", f.read(12))
+        f.seek(0)
+        f.write(struct.pack("<QI", seq + 1, length))
+
+    # answered from the database, which also rewrites the snapshot
+    assert snapshot.get_job_id("test_name") == job_key
+    with open(snapshot.path(), "rb") as f:
+        assert struct.unpack("<QI", f.read(12))[0] % 2 == 0
+
+
 def test_does_pid_exist(job_manager: JobManager) -> None:
     job_key = job_manager.register_and_set_running(
         "test_unit", "test_experiment", "test_name", "test_source", 777, "test_leader", False
@@ -213,6 +256,52 @@ def test_upsert_setting_insert_complex_types(job_manager, job_id) -> None:
     assert result[0] == dumps(value).decode() == r'{"A":1,"B":{"C":2}}'
 
 
+def test_settings_writer_coalesces_upserts(job_manager, job_id, monkeypatch) -> None:
+    batches: list[list[tuple]] = []
+    original_upsert_settings = JobManager.upsert_settings
+
+    def tracking_upsert_settings(self, settings):
+        settings = list(settings)
+        batches.append(settings)
+        return original_upsert_settings(self, settings)
+
+    monkeypatch.setattr(JobManager, "upsert_settings", tracking_upsert_settings)
+    writer = SettingsWriter(flush_interval=60.0)
+
+    for i in range(100):
+        writer.upsert_setting(job_id, "setting1", i)
+    writer.upsert_setting(job_id, "setting2", "value")
+    writer.upsert_setting(job_id + 1000, "setting1", "job not in the database")
+
+    assert writer.flush()
+    assert batches == [
+        [
+            (job_id, "setting1", 99),
+            (job_id, "setting2", "value"),
+            (job_id + 1000, "setting1", "job not in the database"),
+        ]
+    ]
+    assert job_manager.list_job_settings(job_id)[0][:2] == ("setting1", 99)
+
+    writer.upsert_setting(job_id, "setting2", None)
+    assert writer.flush()
+    assert [setting for setting, *_ in job_manager.list_job_settings(job_id)] == ["setting1"]
+
+
+def test_settings_writer_drops_only_the_settings_it_cant_write(job_manager, job_id) -> None:
+    writer = SettingsWriter(flush_interval=60.0)
+
+    writer.upsert_setting(job_id, "setting1", "value")
+    writer.upsert_setting(job_id, "setting2", object())  # can't be serialized
+    assert writer.flush()
+    assert [setting for setting, *_ in job_manager.list_job_settings(job_id)] == ["setting1"]
+
+    # and the writer keeps writing
+    writer.upsert_setting(job_id, "setting3", "value")
+    assert writer.flush()
+    assert [setting for setting, *_ in job_manager.list_job_settings(job_id)] == ["setting1", "setting3"]
+
+
 def test_upsert_setting_update(job_manager, job_id) -> None:
     # First insert a setting-value pair
     setting = "setting1"
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+from pathlib import Path
+
+from pioreactor.utils import logs_search
+from pioreactor.utils.logs_search import has_logs_index
+from pioreactor.utils.logs_search import INDEX_NEW_LOGS
+from pioreactor.utils.logs_search import to_fts_query
+
+SHARED_SQL_DIR = Path(__file__).resolve().parents[2] / "packaging" / "shared-assets" / "sql"
+
+
+def create_db(path: Path) -> sqlite3.Connection:
+    con = sqlite3.connect(path)
+    con.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
+    con.executescript((SHARED_SQL_DIR / "create_triggers.sql").read_text())
+    con.execute("PRAGMA foreign_keys = ON")
+    con.execute(
+        "INSERT INTO experiments (experiment, created_at) VALUES (?, ?)", ("exp1", "2026-01-01T00:00:00.000Z")
+    )
+    con.commit()
+    return con
+
+
+def add_logs(con: sqlite3.Connection, messages: list[str], experiment: str = "exp1") -> None:
+    con.executemany(
+        "INSERT INTO logs (experiment, pioreactor_unit, timestamp, message, source, level, task) "
+        "VALUES (?, 'unit1', '2026-01-01T00:00:00.000Z', ?, 'app', 'INFO', 'od_reading')",
+        [(experiment, message) for message in messages],
+    )
+
+
+def index_new_logs(con: sqlite3.Connection) -> None:
+    for statement in INDEX_NEW_LOGS:
+        con.execute(statement)
+    con.commit()
+
+
+def search(con: sqlite3.Connection, q: str) -> list[str]:
+    return [
+        message
+        for (message,) in con.execute(
+            "SELECT l.message FROM logs_fts CROSS JOIN logs AS l ON l.rowid = logs_fts.rowid "
+            "WHERE logs_fts MATCH ? ORDER BY l.rowid",
+            (to_fts_query(q),),
+        )
+    ]
+
+
+def test_to_fts_query_quotes_every_word_as_a_prefix() -> None:
+    assert to_fts_query("od_reading stopp") == '"od_reading"* "stopp"*'
+    assert to_fts_query('say "hi" OR NOT') == '"say"* """hi"""* "OR"* "NOT"*'
+    assert to_fts_query("  ") is None
+
+
+def test_new_logs_are_indexed_a_batch_at_a_time(tmp_path: Path, monkeypatch) -> None:
+    con = create_db(tmp_path / "logs.sqlite")
+    assert has_logs_index(str(tmp_path / "logs.sqlite"))
+    add_logs(con, ["Stirring started", "OD reading stopped", "Stirring stopped"])
+
+    assert search(con, "stopped") == []
+    index_new_logs(con)
+    assert search(con, "stopped") == ["OD reading stopped", "Stirring stopped"]
+    assert search(con, "stir stop") == ["Stirring stopped"]
+    # the task is indexed too
+    assert len(search(con, "od_reading")) == 3
+
+    # a backlog is indexed LOGS_INDEX_BATCH_SIZE rows per batch
+    monkeypatch.setattr(logs_search, "LOGS_INDEX_BATCH_SIZE", 2)
+    add_logs(con, [f"Dosed {i} mL" for i in range(5)])
+    index_new_logs(con)
+    assert con.execute("SELECT indexed_rowid FROM logs_fts_progress").fetchone() == (8,)
+    assert len(search(con, "dosed")) == 5
+
+
+def test_deleted_logs_are_removed_from_the_index(tmp_path: Path) -> None:
+    con = create_db(tmp_path / "logs.sqlite")
+    con.execute(
+        "INSERT INTO experiments (experiment, created_at) VALUES (?, ?)", ("exp2", "2026-01-01T00:00:00.000Z")
+    )
+    add_logs(con, ["Pump started"])
+    add_logs(con, ["Pump started", "Pump stopped"], experiment="exp2")
+    index_new_logs(con)
+
+    # the newest logs are deleted, so their rowids are reused
+    con.execute("DELETE FROM experiments WHERE experiment = 'exp2'")
+    con.commit()
+    assert search(con, "pump") == ["Pump started"]
+    assert con.execute("SELECT indexed_rowid FROM logs_fts_progress").fetchone() == (1,)
+
+    add_logs(con, ["Heater stopped"])
+    index_new_logs(con)
+    assert search(con, "stopped") == ["Heater stopped"]
+    con.execute("INSERT INTO logs_fts (logs_fts) VALUES ('integrity-check')")
+
+
+def test_has_logs_index_is_false_for_older_databases(tmp_path: Path) -> None:
+    with sqlite3.connect(tmp_path / "old.sqlite") as con:
+        con.execute("CREATE TABLE logs (message TEXT)")
+    con.close()
+
+    assert not has_logs_index(str(tmp_path / "old.sqlite"))
+    assert not has_logs_index(str(tmp_path / "missing.sqlite"))
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import sqlite3
+import threading
 from pathlib import Path
 from time import sleep
 
@@ -123,7 +124,6 @@ def test_dosing_events_land_in_db() -> None:
     cursor = connection.cursor()
 
     cursor.executescript("DROP TABLE IF EXISTS dosing_events;")
-    cursor.executescript("DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_dosing_events;")
     cursor.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
     cursor.executescript((SHARED_SQL_DIR / "create_triggers.sql").read_text())
     seed_experiment(cursor, exp)
@@ -313,6 +313,7 @@ def test_database_write_error_stats_reset() -> None:
 
     job = m2db.MqttToDBStreamer.__new__(m2db.MqttToDBStreamer)
     job.logger = Logger()
+    job._stats_lock = threading.Lock()
     job._inserts_in_last_60s = 3
     job._database_write_errors_in_last_60s = 0
     job._latest_database_write_error = None
@@ -339,3 +340,97 @@ def test_database_write_error_stats_reset() -> None:
     with local_intermittent_storage("mqtt_to_db_streaming") as cache:
         assert cache.get("database_write_errors_in_last_60s") == 0
         assert cache.get("latest_database_write_error") is None
+
+
+def test_insert_statements_are_cached_per_table_and_columns() -> None:
+    job = m2db.MqttToDBStreamer.__new__(m2db.MqttToDBStreamer)
+    job._insert_statements = {}
+
+    sql = job.get_insert_statement("od_readings", ("experiment", "od_reading"))
+    assert sql == "INSERT INTO od_readings (experiment, od_reading) VALUES (:experiment, :od_reading)"
+    assert job.get_insert_statement("od_readings", ("experiment", "od_reading")) is sql
+    assert job.get_insert_statement("logs", ("experiment", "od_reading")) != sql
+    assert len(job._insert_statements) == 2
+
+
+def test_write_stats_reports_rows_per_second_and_commit_latency() -> None:
+    with local_intermittent_storage("mqtt_to_db_streaming") as cache:
+        cache.empty()
+
+    job = m2db.MqttToDBStreamer.__new__(m2db.MqttToDBStreamer)
+    job._stats_lock = threading.Lock()
+    job._inserts_in_last_60s = 0
+    job._database_write_errors_in_last_60s = 0
+    job._latest_database_write_error = None
+    job._reset_commit_stats()
+
+    job.on_database_commit(30, 0.002)
+    job.on_database_commit(10, 0.004)
+    job.write_stats()
+
+    with local_intermittent_storage("mqtt_to_db_streaming") as cache:
+        assert cache.get("rows_per_second") > 0
+        assert cache.get("commits_in_last_60s") == 2
+        assert cache.get("mean_commit_latency_ms") == 3.0
+        assert cache.get("max_commit_latency_ms") == 4.0
+
+    assert job._rows_committed_since_stats == 0
+    assert job._commits_since_stats == 0
+
+
+def test_growth_rates_land_in_db_when_parsed_in_a_process_pool() -> None:
+    unit = get_unit_name()
+    exp = "test_growth_rates_land_in_db_when_parsed_in_a_process_pool"
+    connection = sqlite3.connect(config["storage"]["database"])
+    cursor = connection.cursor()
+
+    cursor.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
+    cursor.execute("DELETE FROM growth_rates WHERE experiment=?", (exp,))
+    cursor.execute("DELETE FROM pioreactor_unit_activity_data WHERE experiment=?", (exp,))
+    cursor.execute("DELETE FROM time_series_rollups WHERE experiment=?", (exp,))
+    seed_experiment(cursor, exp)
+    connection.commit()
+
+    parsers = [
+        m2db.TopicToParserToTable(
+            "pioreactor/+/+/growth_rate_calculating/growth_rate",
+            m2db.parse_growth_rate,
+            "growth_rates",
+        ),
+    ]
+
+    with m2db.MqttToDBStreamer(unit, exp, parsers, parser_processes=1) as job:
+        assert len(job.parser_pools) == 1
+        sleep(1)
+        for rate in (0.1, 0.2, 0.3):
+            publish(
+                f"pioreactor/{unit}/{exp}/growth_rate_calculating/growth_rate",
+                str(structs.GrowthRate(growth_rate=rate, timestamp=current_utc_datetime())),
+            )
+        sleep(3)
+
+    cursor.execute("SELECT rate FROM growth_rates WHERE experiment=? ORDER BY rowid", (exp,))
+    assert cursor.fetchall() == [(0.1,), (0.2,), (0.3,)]
+
+    cursor.execute(
+        "SELECT bucket_seconds, SUM(n), round(SUM(y_sum), 6) FROM time_series_rollups WHERE experiment=? "
+        "GROUP BY bucket_seconds ORDER BY bucket_seconds",
+        (exp,),
+    )
+    assert cursor.fetchall() == [(60, 3, 0.6), (600, 3, 0.6), (3600, 3, 0.6)]
+
+    # rolled up into pioreactor_unit_activity_data by the job, not a trigger
+    cursor.execute(
+        "SELECT growth_rate FROM pioreactor_unit_activity_data WHERE experiment=? ORDER BY timestamp", (exp,)
+    )
+    assert cursor.fetchall() == [(0.1,), (0.2,), (0.3,)]
+
+
+def test_unpicklable_parsers_are_parsed_in_thread() -> None:
+    job = m2db.MqttToDBStreamer.__new__(m2db.MqttToDBStreamer)
+    job.logger = type("Logger", (), {"debug": lambda self, msg: None})()
+    job.parser_pools = ["pool_a", "pool_b"]  # type: ignore[list-item]
+
+    assert job.get_parser_pool(lambda topic, payload: None, shard=0) is None
+    assert job.get_parser_pool(m2db.parse_od, shard=0) == "pool_a"
+    assert job.get_parser_pool(m2db.parse_raw_od, shard=3) == "pool_b"
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+from pioreactor import mureq
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 64 * 1024
+    client_ports: set[int] = set()
+    dropped: list[str] = []
+
+    def do_GET(self) -> None:
+        self.client_ports.add(self.client_address[1])
+        if self.path == "/drop":
+            self.drop()
+            return
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.path == "/close":
+            # drop the connection without telling the client, like a server's idle timeout
+            self.close_connection = True
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.drop()
+
+    def drop(self) -> None:
+        # close the connection without responding, like a server that closed it as the request arrived
+        self.dropped.append(self.command)
+        self.close_connection = True
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Generator[str, None, None]:
+    _Handler.client_ports = set()
+    _Handler.dropped = []
+    mureq._pool.clear()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    mureq._pool.clear()
+
+
+def test_requests_to_the_same_host_reuse_one_connection(server: str) -> None:
+    for _ in range(10):
+        assert mureq.get(f"{server}/").json() == {"ok": True}
+
+    assert len(_Handler.client_ports) == 1
+
+
+def test_keep_alive_false_opens_a_connection_per_request(server: str) -> None:
+    for _ in range(3):
+        assert mureq.get(f"{server}/", keep_alive=False).ok
+
+    assert len(_Handler.client_ports) == 3
+
+
+def test_a_connection_closed_by_the_server_is_replaced(server: str) -> None:
+    assert mureq.get(f"{server}/close").ok
+    assert mureq.get(f"{server}/").json() == {"ok": True}
+
+    assert len(_Handler.client_ports) == 2
+
+
+def test_only_idempotent_requests_are_retried_when_a_pooled_connection_drops(server: str) -> None:
+    assert mureq.get(f"{server}/").ok
+    with pytest.raises(mureq.HTTPException):
+        mureq.post(f"{server}/", body=b"dose")
+    assert _Handler.dropped == ["POST"]
+
+    assert mureq.get(f"{server}/").ok
+    with pytest.raises(mureq.HTTPException):
+        mureq.get(f"{server}/drop")
+    assert _Handler.dropped == ["POST", "GET", "GET"]
+
+
+def test_idle_connections_are_evicted_and_capped(server: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(mureq._pool, "idle_timeout", -1.0)
+    assert mureq.get(f"{server}/").ok
+    assert mureq.get(f"{server}/").ok
+    assert len(_Handler.client_ports) == 2
+
+    monkeypatch.setattr(mureq._pool, "idle_timeout", 60.0)
+    monkeypatch.setattr(mureq._pool, "max_idle_per_host", 2)
+    barrier = threading.Barrier(4)
+
+    def concurrent_get() -> None:
+        barrier.wait()
+        mureq.get(f"{server}/")
+
+    threads = [threading.Thread(target=concurrent_get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(len(connections) for connections in mureq._pool._idle.values()) <= 2
@@ -13,6 +13,7 @@ from pioreactor import types as pt
 from pioreactor.utils.od_fusion import compute_fused_od
 from pioreactor.utils.od_fusion import fit_fusion_model
 from pioreactor.utils.od_fusion import FUSION_ANGLES
+from pioreactor.utils.od_fusion import FusionEvaluator
 from pioreactor.utils.timing import current_utc_datetime
 
 
@@ -121,6 +122,69 @@ def test_fusion_model_predicts_expected_concentration_range(instrument: str) ->
     assert running_max_error < 0.11
 
 
+@pytest.mark.parametrize("instrument", ["1", "2", "3", "4", "5"])
+def test_fusion_evaluator_matches_compute_fused_od(instrument: str) -> None:
+    estimator = _build_estimator_from_records(_records_for_instrument(instrument))  # type: ignore
+    fuse = FusionEvaluator(estimator)
+
+    obs_by_vial, _ = _aggregate_obs_for_instrument(instrument)
+    for data in obs_by_vial.values():
+        for trial in range(min(len(values) for values in data.values())):
+            readings_by_angle = {angle: data[angle][trial] for angle in FUSION_ANGLES}
+            assert fuse(readings_by_angle) == pytest.approx(
+                compute_fused_od(estimator, readings_by_angle), rel=1e-5
+            )
+
+    # readings far outside the calibrated range are clamped the same way
+    for scale in [1e-6, 1e3]:
+        readings_by_angle = {angle: scale for angle in FUSION_ANGLES}
+        assert fuse(readings_by_angle) == pytest.approx(
+            compute_fused_od(estimator, readings_by_angle), rel=1e-5
+        )
+
+
+def test_fusion_evaluator_requires_every_angle() -> None:
+    fuse = FusionEvaluator(_build_estimator_from_records(_records_for_instrument("1")))  # type: ignore
+
+    with pytest.raises(ValueError, match="Missing fusion reading for angle 90"):
+        fuse({"45": 0.1, "135": 0.1})
+
+
+def test_fusion_evaluator_fuse_many_matches_single_readings() -> None:
+    import numpy as np
+
+    fuse = FusionEvaluator(_build_estimator_from_records(_records_for_instrument("1")))  # type: ignore
+
+    obs_by_vial, _ = _aggregate_obs_for_instrument("1")
+    rows = []
+    for data in obs_by_vial.values():
+        for trial in range(min(len(values) for values in data.values())):
+            rows.append([data[angle][trial] for angle in fuse.angles])
+    rows.append([1e-6] * len(fuse.angles))
+    rows.append([float("nan")] * len(fuse.angles))
+
+    fused = fuse.fuse_many(np.asarray(rows))
+
+    assert fused.shape == (len(rows),)
+    for row, value in zip(rows[:-1], fused[:-1]):
+        assert value == pytest.approx(fuse(dict(zip(fuse.angles, row))), rel=1e-5)
+    assert np.isnan(fused[-1])
+
+
+def test_fusion_evaluator_fuse_many_in_chunks_matches_one_pass(monkeypatch) -> None:
+    import numpy as np
+    import pioreactor.utils.od_fusion as od_fusion_module
+
+    fuse = FusionEvaluator(_build_estimator_from_records(_records_for_instrument("1")))  # type: ignore
+    readings = np.exp(np.random.default_rng(0).uniform(-6, 0, size=(50, len(fuse.angles))))
+    expected = fuse.fuse_many(readings)
+
+    # 7 readings per chunk
+    monkeypatch.setattr(od_fusion_module, "FUSE_MANY_CHUNK_BYTES", 7 * 8 * len(fuse.angles) * fuse.grid.size)
+
+    assert np.array_equal(fuse.fuse_many(readings), expected, equal_nan=True)
+
+
 def test_estimator_roundtrip_save_and_load(tmp_path, monkeypatch) -> None:
     import pioreactor.estimators as estimators_module
 
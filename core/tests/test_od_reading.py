@@ -23,6 +23,7 @@ from pioreactor.background_jobs.od_reading import NullEstimatorTransformer
 from pioreactor.background_jobs.od_reading import ODReader
 from pioreactor.background_jobs.od_reading import PhotodiodeIrLedReferenceTrackerStaticInit
 from pioreactor.background_jobs.od_reading import PhotodiodeIrLedReferenceTrackerUnitInit
+from pioreactor.background_jobs.od_reading import RawSampleRingBuffer
 from pioreactor.background_jobs.od_reading import start_od_reading
 from pioreactor.calibrations import load_active_calibration
 from pioreactor.config import config
@@ -177,6 +178,51 @@ def test_sin_regression_preserves_phase_quadrant() -> None:
     assert phase_ == pytest.approx(phase)
 
 
+def test_batched_sin_regression_matches_per_channel_regression() -> None:
+    freq = 60
+    N = 40
+    rng = np.random.default_rng(0)
+
+    x = np.sort(rng.uniform(0, 0.85, size=(3, N)), axis=1)
+    y = 100 + 10 * np.sin(freq * 2 * np.pi * x + 0.3) + rng.normal(0, 1, size=(3, N))
+    prior_C = np.array([np.nan, 102.0, 0.0])
+
+    adc_reader = ADCReader(channels=[])
+    batched = adc_reader._sin_regression_with_known_freq_batched(
+        x, y, freq, prior_C=prior_C, penalizer_C=20.0
+    )
+
+    for i, ((C, A, phi), AIC) in enumerate(batched):
+        (C_, A_, phi_), AIC_ = adc_reader._sin_regression_with_known_freq(
+            x[i].tolist(),
+            y[i].tolist(),
+            freq,
+            prior_C=None if np.isnan(prior_C[i]) else float(prior_C[i]),
+            penalizer_C=20.0,
+        )
+        assert C == pytest.approx(C_)
+        assert A == pytest.approx(A_)
+        assert phi == pytest.approx(phi_)
+        assert AIC == pytest.approx(AIC_)
+
+    # the prior pulls the second channel towards 102 only
+    (C_no_prior, _, _), _ = adc_reader._sin_regression_with_known_freq(x[1].tolist(), y[1].tolist(), freq)
+    assert abs(batched[1][0][0] - 102.0) < abs(C_no_prior - 102.0)
+
+
+def test_batched_sin_regression_trims_extrema_per_row() -> None:
+    freq = 50
+    x = np.tile(np.linspace(0, 0.8, 25), (2, 1))
+    y = 10.0 + 2.0 * np.sin(freq * 2 * np.pi * x + 1.0)
+    y[0, 3] = 1_000.0  # an outlier on one channel only
+    y[1, 7] = -1_000.0
+
+    adc_reader = ADCReader(channels=[])
+    for (C, A, phi), _ in adc_reader._sin_regression_with_known_freq_batched(x, y, freq):
+        assert C == pytest.approx(10.0, abs=0.2)
+        assert A == pytest.approx(2.0, abs=0.2)
+
+
 def test_sin_regression_estimator_is_consistent() -> None:
     freq = 60
 
@@ -849,6 +895,84 @@ def test_ADC_picks_exact_frequency_for_perfect_signal() -> None:
     assert best_freq == actual_freq
 
 
+def test_ADC_picks_freq_from_buffered_reads() -> None:
+    actual_freq = 50.0
+    adc_reader = ADCReader(channels=["1"], raw_samples_buffer_size=3)
+
+    for _ in range(3):
+        x = np.sort(np.random.uniform(0, 0.85, size=25))
+        sample_times, samples = adc_reader.raw_samples.next_slot(25)
+        sample_times[0] = x
+        samples[0] = 10 + np.sin(actual_freq * 2 * np.pi * x) + 0.1 * np.random.randn(25)
+        adc_reader.raw_samples.commit()
+
+    assert adc_reader.determine_most_appropriate_AC_hz() == actual_freq
+
+
+def test_tune_adc_with_ir_on_picks_freq_from_its_own_read_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    adc_reader = ADCReader(channels=["1"], fake_data=True, dynamic_gain=False)
+    monkeypatch.setattr(adc_reader, "_check_if_over_max", lambda _: None)
+
+    # an earlier read, ex: the dark offset's with the IR LED off, with a clean 50Hz signal
+    n = adc_reader.TUNE_SAMPLES
+    x = np.sort(np.random.uniform(0, 0.25, size=n))
+    sample_times, samples = adc_reader.raw_samples.next_slot(n)
+    sample_times[0] = x
+    samples[0] = 10 + 100 * np.sin(50.0 * 2 * np.pi * x) + 0.1 * np.random.randn(n)
+    adc_reader.raw_samples.commit()
+
+    start = time.perf_counter()
+    monkeypatch.setattr(
+        adc_reader.adcs["1"],
+        "read_from_channel",
+        lambda: 1000 + 10 * np.sin(60.0 * 2 * np.pi * (time.perf_counter() - start)) + 3 * np.random.randn(),
+    )
+
+    adc_reader.tune_adc_with_ir_on()
+
+    assert adc_reader.most_appropriate_AC_hz == 60.0
+
+
+def test_raw_sample_ring_buffer_keeps_the_last_reads_in_order() -> None:
+    buffer = RawSampleRingBuffer(["1", "2"], capacity=3, max_samples_per_read=4)
+    assert buffer.last() == []
+
+    for k in range(5):
+        sample_times, samples = buffer.next_slot(4 if k % 2 == 0 else 2)
+        sample_times[:] = k
+        samples[0] = k
+        samples[1] = -k
+        buffer.commit()
+
+    assert len(buffer) == 3
+    reads = buffer.last()
+    assert [read.samples["1"] for read in reads] == [[2.0] * 4, [3.0] * 2, [4.0] * 4]
+    assert [read.samples["2"] for read in reads] == [[-2.0] * 4, [-3.0] * 2, [-4.0] * 4]
+    assert [read.sample_times["2"][0] for read in buffer.last(2)] == [3.0, 4.0]
+
+    ((sample_times, samples),) = buffer.last_for_channel("2", 1)
+    assert samples.tolist() == [-4.0] * 4
+
+    with pytest.raises(ValueError):
+        buffer.next_slot(5)
+
+
+def test_take_reading_writes_raw_samples_into_the_buffer(monkeypatch: pytest.MonkeyPatch) -> None:
+    adc_reader = ADCReader(channels=["1", "2"], fake_data=True, dynamic_gain=False, oversampling_count=6)
+    monkeypatch.setattr(od_reading_module, "sleep", lambda _: None)
+    monkeypatch.setattr(adc_reader.adcs["1"], "read_from_channel", lambda: 1.0)
+    monkeypatch.setattr(adc_reader.adcs["2"], "read_from_channel", lambda: 2.0)
+    monkeypatch.setattr(adc_reader, "_check_if_over_max", lambda _: None)
+
+    adc_reader.take_reading()
+    adc_reader.take_reading()
+
+    reads = adc_reader.raw_samples.last()
+    assert len(reads) == 2
+    assert reads[-1].samples == {"1": [1.0] * 6, "2": [2.0] * 6}
+    assert reads[-1].sample_times["1"] == sorted(reads[-1].sample_times["1"])
+
+
 def test_error_thrown_if_wrong_angle() -> None:
     with pytest.raises(ValueError):
         start_od_reading(make_channels("100", "135"), fake_data=True, experiment="test_error_thrown_if_wrong_angle")  # type: ignore
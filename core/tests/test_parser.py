@@ -2,14 +2,20 @@
 from datetime import datetime
 from datetime import UTC
 from math import sqrt
+from time import perf_counter
+from time import sleep
 
 import pytest
 from msgspec.json import encode
 from pioreactor import structs
 from pioreactor.experiment_profiles.parser import check_syntax
+from pioreactor.experiment_profiles.parser import compile_profile_expression
+from pioreactor.experiment_profiles.parser import job_setting_topic
 from pioreactor.experiment_profiles.parser import parse_profile_expression
 from pioreactor.experiment_profiles.parser import parse_profile_expression_to_bool
 from pioreactor.experiment_profiles.sly.lex import LexError
+from pioreactor.experiment_profiles.state_mirror import get_active_mirror
+from pioreactor.experiment_profiles.state_mirror import mirror_job_settings
 from pioreactor.pubsub import publish
 from pioreactor.whoami import get_assigned_experiment_name
 from pioreactor.whoami import get_unit_name
@@ -249,3 +255,87 @@ def test_mqtt_fetches_with_calculations() -> None:
         == 3 * 1.2
     )
     assert parse_profile_expression(f"({unit}:od_reading:od1.od + {unit}:od_reading:od1.od) > 2.0 ") is True
+
+
+def test_mqtt_fetches_from_a_job_settings_mirror() -> None:
+    topic = f"pioreactor/{unit}/{exp}/test_job/mirrored"
+    publish(topic, 100, retain=True)
+
+    with mirror_job_settings() as mirror:
+        assert parse_profile_expression(f"{unit}:test_job:mirrored") == 100.0
+        assert mirror.age(topic) is not None
+
+        # changes are pushed to the mirror
+        publish(topic, 200, retain=True)
+        sleep(0.5)
+        assert parse_profile_expression(f"{unit}:test_job:mirrored") == 200.0
+
+        # a missing setting only waits for the retained message once
+        with pytest.raises(ValueError):
+            parse_profile_expression(f"{unit}:test_job:does_not_exist")
+        start = perf_counter()
+        with pytest.raises(ValueError):
+            parse_profile_expression(f"{unit}:test_job:does_not_exist")
+        assert perf_counter() - start < 0.5
+
+    assert get_active_mirror() is None
+
+
+def test_compiled_expressions_are_reused_and_list_their_dependencies() -> None:
+    compiled = compile_profile_expression("::od_reading:od1.od > 1.0 and worker1:stirring:target_rpm > rpm")
+
+    assert (
+        compile_profile_expression("::od_reading:od1.od > 1.0 and worker1:stirring:target_rpm > rpm")
+        is compiled
+    )
+    assert compiled.dependencies == ("::od_reading:od1.od", "worker1:stirring:target_rpm")
+    assert not compiled.volatile
+
+    compiled = compile_profile_expression("rpm * 2 > 100")
+    assert compiled.dependencies == ()
+    assert compiled({"rpm": 60}) is True
+    assert compiled({"rpm": 40}) is False
+
+    assert compile_profile_expression("1 +")() is None
+    assert compile_profile_expression("::od_reading:od1.od > hours_elapsed()").volatile
+    assert compile_profile_expression("action_count > 3").volatile
+
+
+def test_job_settings_mirror_notifies_listeners_of_changes() -> None:
+    topic = f"pioreactor/{unit}/{exp}/test_job/listened"
+    publish(topic, 1, retain=True)
+    changes: list[str] = []
+
+    with mirror_job_settings() as mirror:
+        assert job_setting_topic("unit():test_job:listened.nested", {"unit": unit}) == topic
+        remove_listener = mirror.add_listener([topic], changes.append)
+        sleep(0.5)
+        assert changes == [topic]  # the retained value
+
+        publish(topic, 1, retain=True)
+        publish(topic, 2, retain=True)
+        sleep(0.5)
+        assert changes == [topic, topic]
+
+        remove_listener()
+        publish(topic, 3, retain=True)
+        sleep(0.5)
+        assert changes == [topic, topic]
+
+
+def test_job_settings_mirror_keeps_notifying_after_a_listener_raises() -> None:
+    topic = f"pioreactor/{unit}/{exp}/test_job/raising"
+    changes: list[str] = []
+
+    def raises(topic: str) -> None:
+        raise ValueError(topic)
+
+    with mirror_job_settings() as mirror:
+        mirror.add_listener([topic], raises)
+        mirror.add_listener([topic], changes.append)
+
+        publish(topic, 1, retain=True)
+        sleep(0.5)
+        publish(topic, 2, retain=True)
+        sleep(0.5)
+        assert changes == [topic, topic]
@@ -1,13 +1,19 @@
 # -*- coding: utf-8 -*-
 # test_pubsub.py
 import socket
+import threading
+from types import SimpleNamespace
 from typing import Callable
+from unittest.mock import call
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
+from paho.mqtt.client import MQTTMessageInfo
+from paho.mqtt.enums import MQTTErrorCode
 from pioreactor.pubsub import add_hash_suffix
 from pioreactor.pubsub import Client
+from pioreactor.pubsub import ConnectionMultiplexer
 from pioreactor.pubsub import create_client
 from pioreactor.pubsub import delete_from
 from pioreactor.pubsub import delete_from_leader
@@ -19,6 +25,7 @@ from pioreactor.pubsub import post_into
 from pioreactor.pubsub import post_into_leader
 from pioreactor.pubsub import put_into
 from pioreactor.pubsub import put_into_leader
+from pioreactor.pubsub import SHARED_CLIENT_MAX_QUEUED_MESSAGES
 from pioreactor.pubsub import subscribe_and_callback
 from tests.conftest import capture_requests
 
@@ -161,6 +168,75 @@ def test_get_from() -> None:
     assert req.url == "http://pio01.local:4999/api/my_endpoint"
 
 
+def test_connection_multiplexer_reference_counts_and_routes_subscriptions() -> None:
+    client = MagicMock(spec=Client)
+    client.socket.return_value = MagicMock()
+    dispatchers: dict[str, Callable] = {}
+    client.message_callback_add.side_effect = dispatchers.__setitem__
+    client.message_callback_remove.side_effect = dispatchers.pop
+    topic_filter = "pioreactor/+/exp/stirring/target_rpm"
+
+    def message(payload: bytes, retain: bool) -> SimpleNamespace:
+        return SimpleNamespace(
+            topic="pioreactor/unit1/exp/stirring/target_rpm", payload=payload, retain=retain
+        )
+
+    with patch("pioreactor.pubsub.create_client", return_value=client) as create_client_:
+        multiplexer = ConnectionMultiplexer()
+        first: list[bytes] = []
+        second: list[bytes] = []
+
+        unsubscribe_first = multiplexer.subscribe(topic_filter, lambda m: first.append(m.payload))
+        dispatchers[topic_filter](client, None, message(b"500", retain=True))
+        unsubscribe_second = multiplexer.subscribe(topic_filter, lambda m: second.append(m.payload))
+        # redelivered for the second subscriber only
+        dispatchers[topic_filter](client, None, message(b"500", retain=True))
+        dispatchers[topic_filter](client, None, message(b"600", retain=False))
+
+        assert first == [b"500", b"600"]
+        assert second == [b"500", b"600"]
+        assert client.subscribe.call_args_list == [call([(topic_filter, 2)]), call([(topic_filter, 2)])]
+
+        unsubscribe_first()
+        client.unsubscribe.assert_not_called()
+        unsubscribe_second()
+        client.unsubscribe.assert_called_once_with(topic_filter)
+        assert dispatchers == {}
+
+        multiplexer.publish("test/topic", 1)
+        assert create_client_.call_count == 1
+
+
+def test_connection_multiplexer_reports_dropped_publishes_and_flushes_on_shutdown() -> None:
+    client = MagicMock(spec=Client)
+    client.socket.return_value = MagicMock()
+    sent = MQTTMessageInfo(1)
+    sent.rc = MQTTErrorCode.MQTT_ERR_SUCCESS
+    dropped = MQTTMessageInfo(2)
+    dropped.rc = MQTTErrorCode.MQTT_ERR_QUEUE_SIZE
+    client.publish.side_effect = [sent, dropped]
+
+    with patch("pioreactor.pubsub.create_client", return_value=client) as create_client_:
+        multiplexer = ConnectionMultiplexer()
+        with patch("pioreactor.logging.create_logger") as create_logger:
+            multiplexer.publish("test/topic", 1, qos=1)
+            multiplexer.publish("test/topic", 2, qos=1)
+
+        create_logger.return_value.warning.assert_called_once()
+        assert "dropped a publish to test/topic" in create_logger.return_value.warning.call_args[0][0]
+        assert create_client_.call_args.kwargs["max_queued_messages"] == SHARED_CLIENT_MAX_QUEUED_MESSAGES
+
+        # acknowledged while shutting down
+        threading.Timer(0.2, sent._set_as_published).start()
+        multiplexer.shutdown(timeout=2)
+
+    assert sent.is_published()
+    client.shutdown.assert_called_once()
+    # nothing left to flush or shut down
+    multiplexer.shutdown(timeout=2)
+    client.shutdown.assert_called_once()
+
+
 def test_get_from_leader() -> None:
     with capture_requests() as bucket:
         get_from_leader("/api/my_endpoint")
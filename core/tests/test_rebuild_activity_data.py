@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+from pathlib import Path
+
+from pioreactor.actions.leader.rebuild_activity_data import rebuild_activity_data
+from pioreactor.background_jobs.leader.mqtt_to_db_streaming import activity_data_upsert_for_rows
+from pioreactor.config import config
+from pioreactor.config import temporary_config_change
+
+SHARED_SQL_DIR = Path(__file__).resolve().parents[2] / "packaging" / "shared-assets" / "sql"
+
+ROWS = [
+    ("od_readings", {"od_reading": 0.5, "channel": "2", "angle": "90"}),
+    ("growth_rates", {"rate": 0.1}),
+    ("temperature_readings", {"temperature_c": 30.0}),
+    ("led_change_events", {"channel": "A", "intensity": 10.0, "source_of_event": "test"}),
+    ("led_change_events", {"channel": "B", "intensity": 20.0, "source_of_event": "test"}),
+    ("dosing_events", {"event": "add_media", "volume_change_ml": 1.0, "source_of_event": "test"}),
+]
+
+
+def create_db(path: Path) -> sqlite3.Connection:
+    con = sqlite3.connect(path)
+    con.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
+    con.executescript((SHARED_SQL_DIR / "create_triggers.sql").read_text())
+    for experiment in ("exp1", "exp2"):
+        con.execute(
+            "INSERT INTO experiments (experiment, created_at) VALUES (?, ?)",
+            (experiment, "2026-01-01T00:00:00.000Z"),
+        )
+    con.commit()
+    return con
+
+
+def insert_source_rows(con: sqlite3.Connection, experiment: str, timestamp: str) -> None:
+    for table, row in ROWS:
+        row = row | {"experiment": experiment, "pioreactor_unit": "unit1", "timestamp": timestamp}
+        con.execute(
+            f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join(':' + c for c in row)})",
+            row,
+        )
+    con.commit()
+
+
+def activity_rows(con: sqlite3.Connection) -> list[tuple]:
+    return con.execute(
+        "SELECT experiment, timestamp, od_reading, growth_rate, temperature_c, led_A_intensity_update, "
+        "led_B_intensity_update, led_C_intensity_update, add_media_ml, remove_waste_ml "
+        "FROM pioreactor_unit_activity_data ORDER BY experiment, timestamp"
+    ).fetchall()
+
+
+def test_rebuild_activity_data_rolls_up_source_tables(tmp_path) -> None:
+    db = tmp_path / "db.sqlite"
+    con = create_db(db)
+    insert_source_rows(con, "exp1", "2026-01-01T00:00:05.000Z")
+    insert_source_rows(con, "exp2", "2026-01-01T00:00:05.000Z")
+
+    # inserting into source tables no longer updates pioreactor_unit_activity_data on its own
+    assert activity_rows(con) == []
+
+    with temporary_config_change(config, "storage", "database", str(db)):
+        assert rebuild_activity_data(experiment="exp1") == 1
+
+    assert activity_rows(con) == [
+        ("exp1", "2026-01-01T00:00:05.000Z", 0.5, 0.1, 30.0, 10.0, 20.0, None, 1.0, None),
+    ]
+
+    with temporary_config_change(config, "storage", "database", str(db)):
+        assert rebuild_activity_data() == 2
+        # idempotent
+        assert rebuild_activity_data() == 2
+
+    assert len(activity_rows(con)) == 2
+
+
+def test_rebuild_activity_data_since_leaves_older_rows_alone(tmp_path) -> None:
+    db = tmp_path / "db.sqlite"
+    con = create_db(db)
+    insert_source_rows(con, "exp1", "2026-01-01T00:00:05.000Z")
+    insert_source_rows(con, "exp1", "2026-01-02T00:00:05.000Z")
+
+    with temporary_config_change(config, "storage", "database", str(db)):
+        assert rebuild_activity_data(since="2026-01-02T00:00:00.000Z") == 1
+
+    assert [row[1] for row in activity_rows(con)] == ["2026-01-02T00:00:05.000Z"]
+
+
+def test_ingest_upserts_match_rebuild(tmp_path) -> None:
+    db = tmp_path / "db.sqlite"
+    con = create_db(db)
+    insert_source_rows(con, "exp1", "2026-01-01T00:00:05.000Z")
+
+    for table, row in ROWS:
+        row = row | {
+            "experiment": "exp1",
+            "pioreactor_unit": "unit1",
+            "timestamp": "2026-01-01T00:00:05.000Z",
+        }
+        con.executemany(activity_data_upsert_for_rows(table), [row])
+    con.commit()
+    ingested = activity_rows(con)
+
+    with temporary_config_change(config, "storage", "database", str(db)):
+        rebuild_activity_data()
+
+    assert activity_rows(con) == ingested
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+from pathlib import Path
+
+import pytest
+from pioreactor import types as pt
+from pioreactor.actions.leader.refuse_od import refuse_od
+from pioreactor.config import config
+from pioreactor.config import temporary_config_change
+from pioreactor.utils.od_fusion import compute_fused_od
+
+from .test_od_fusion import _build_estimator_from_records
+from .test_od_fusion import _records_for_instrument
+
+SHARED_SQL_DIR = Path(__file__).resolve().parents[2] / "packaging" / "shared-assets" / "sql"
+
+CHANNEL_BY_ANGLE = {"45": 1, "90": 2, "135": 3}
+
+
+def create_db(path: Path) -> sqlite3.Connection:
+    con = sqlite3.connect(path)
+    con.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
+    con.executescript((SHARED_SQL_DIR / "create_triggers.sql").read_text())
+    con.execute(
+        "INSERT INTO experiments (experiment, created_at) VALUES (?, ?)",
+        ("exp1", "2026-01-01T00:00:00.000Z"),
+    )
+    con.commit()
+    return con
+
+
+def insert_od_readings(con: sqlite3.Connection, timestamp: str, readings: dict[str, float]) -> None:
+    for angle, od in readings.items():
+        con.execute(
+            "INSERT INTO od_readings (experiment, pioreactor_unit, timestamp, od_reading, angle, channel) VALUES (?, ?, ?, ?, ?, ?)",
+            ("exp1", "unit1", timestamp, od, int(angle), CHANNEL_BY_ANGLE[angle]),
+        )
+    con.commit()
+
+
+@pytest.fixture
+def estimator(tmp_path, monkeypatch):
+    import pioreactor.estimators as estimators_module
+
+    monkeypatch.setattr(estimators_module, "ESTIMATOR_PATH", tmp_path / "estimators")
+    estimator = _build_estimator_from_records(_records_for_instrument("1"))  # type: ignore
+    estimator.save_to_disk_for_device(pt.OD_FUSED_DEVICE)
+    return estimator
+
+
+def test_refuse_od_writes_a_new_version_and_replaces_fused_readings(tmp_path, estimator) -> None:
+    db = tmp_path / "db.sqlite"
+    con = create_db(db)
+
+    uncalibrated = {"45": 0.05, "90": 0.11, "135": 0.02}
+    raw = {"45": 0.08, "90": 0.2, "135": 0.04}
+    insert_od_readings(con, "2026-01-01T00:00:05.000Z", uncalibrated)
+    # a calibrated timestamp: fusion used the raw readings, not the calibrated ones in od_readings
+    insert_od_readings(con, "2026-01-01T00:00:10.000Z", {"45": 1.0, "90": 2.0, "135": 3.0})
+    for angle, od in raw.items():
+        con.execute(
+            "INSERT INTO raw_od_readings (experiment, pioreactor_unit, timestamp, od_reading, channel) VALUES (?, ?, ?, ?, ?)",
+            ("exp1", "unit1", "2026-01-01T00:00:10.000Z", od, CHANNEL_BY_ANGLE[angle]),
+        )
+    # missing an angle, so skipped
+    insert_od_readings(con, "2026-01-01T00:00:15.000Z", {"45": 0.05, "90": 0.11})
+    con.execute(
+        "INSERT INTO od_readings_fused (experiment, pioreactor_unit, timestamp, od_reading) VALUES (?, ?, ?, ?)",
+        ("exp1", "unit1", "2026-01-01T00:00:05.000Z", 123.0),
+    )
+    con.commit()
+
+    with temporary_config_change(config, "storage", "database", str(db)):
+        version = refuse_od("exp1", estimator.estimator_name, replace=True, processes=0, batch_size=1)
+
+    assert version.startswith(f"{estimator.estimator_name}@")
+
+    expected = [
+        ("2026-01-01T00:00:05.000Z", pytest.approx(compute_fused_od(estimator, uncalibrated), rel=1e-5)),
+        ("2026-01-01T00:00:10.000Z", pytest.approx(compute_fused_od(estimator, raw), rel=1e-5)),
+    ]
+    assert (
+        con.execute(
+            "SELECT timestamp, od_reading FROM od_readings_fused_versions WHERE experiment = ? AND version = ? ORDER BY timestamp",
+            ("exp1", version),
+        ).fetchall()
+        == expected
+    )
+    assert (
+        con.execute(
+            "SELECT timestamp, od_reading FROM od_readings_fused WHERE experiment = ? ORDER BY timestamp",
+            ("exp1",),
+        ).fetchall()
+        == expected
+    )
+
+
+def test_refuse_od_without_replace_leaves_fused_readings_alone(tmp_path, estimator) -> None:
+    db = tmp_path / "db.sqlite"
+    con = create_db(db)
+    insert_od_readings(con, "2026-01-01T00:00:05.000Z", {"45": 0.05, "90": 0.11, "135": 0.02})
+    con.execute(
+        "INSERT INTO od_readings_fused (experiment, pioreactor_unit, timestamp, od_reading) VALUES (?, ?, ?, ?)",
+        ("exp1", "unit1", "2026-01-01T00:00:05.000Z", 123.0),
+    )
+    con.commit()
+
+    with temporary_config_change(config, "storage", "database", str(db)):
+        version = refuse_od("exp1", estimator.estimator_name, processes=0)
+
+    assert con.execute(
+        "SELECT COUNT(1) FROM od_readings_fused_versions WHERE version = ?", (version,)
+    ).fetchone() == (1,)
+    assert con.execute("SELECT od_reading FROM od_readings_fused").fetchall() == [(123.0,)]
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sqlite3
+import struct
+from pathlib import Path
+
+import pytest
+from pioreactor.utils.sqlite_snapshots import _WalChecksum
+from pioreactor.utils.sqlite_snapshots import backup_incrementally
+from pioreactor.utils.sqlite_snapshots import deltas_directory
+from pioreactor.utils.sqlite_snapshots import manifest_path
+from pioreactor.utils.sqlite_snapshots import read_delta_header
+from pioreactor.utils.sqlite_snapshots import read_snapshot
+from pioreactor.utils.sqlite_snapshots import replay_deltas
+
+
+def create_database(path: Path, n_rows: int = 2000) -> sqlite3.Connection:
+    # a database whose commits stay in the WAL while the returned connection is open
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode = WAL")
+    con.execute("PRAGMA wal_autocheckpoint = 0")
+    con.execute("CREATE TABLE readings (id INTEGER PRIMARY KEY, value TEXT)")
+    con.executemany(
+        "INSERT INTO readings (value) VALUES (?)", [(f"reading {i}" * 10,) for i in range(n_rows)]
+    )
+    con.commit()
+    return con
+
+
+def read_rows(path: Path) -> list[tuple[int, str]]:
+    con = sqlite3.connect(f"file:{path}?immutable=1", uri=True)
+    try:
+        assert con.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        return con.execute("SELECT id, value FROM readings ORDER BY id").fetchall()
+    finally:
+        con.close()
+
+
+def test_wal_checksum_matches_sqlites_loop() -> None:
+    def checksum(data: bytes, s1: int, s2: int, big_endian: bool) -> tuple[int, int]:
+        words = struct.unpack(f"{'>' if big_endian else '<'}{len(data) // 4}I", data)
+        for a, b in zip(words[0::2], words[1::2]):
+            s1 = (s1 + a + s2) & 0xFFFFFFFF
+            s2 = (s2 + b + s1) & 0xFFFFFFFF
+        return s1, s2
+
+    for big_endian in (True, False):
+        for n_words in (6, 2 + 1024):
+            data = os.urandom(4 * n_words)
+            assert _WalChecksum(n_words, big_endian)(data, 123, 0xFFFFFFF0) == checksum(
+                data, 123, 0xFFFFFFF0, big_endian
+            )
+
+
+def test_backup_includes_commits_still_in_the_wal(tmp_path: Path) -> None:
+    con = create_database(tmp_path / "db.sqlite")
+    assert os.path.getsize(tmp_path / "db.sqlite-wal") > 0
+
+    manifest, delta = backup_incrementally(str(tmp_path / "db.sqlite"), str(tmp_path / "backup.sqlite"))
+
+    assert delta is None
+    assert manifest.sequence == 0
+    assert read_rows(tmp_path / "backup.sqlite") == con.execute("SELECT id, value FROM readings").fetchall()
+    con.close()
+
+
+def test_snapshot_of_a_checkpointed_wal_survives_the_wal_restarting(tmp_path: Path) -> None:
+    database = tmp_path / "db.sqlite"
+    con = create_database(database)
+    expected = con.execute("SELECT id, value FROM readings ORDER BY id").fetchall()
+    # fully checkpointed, but the frames stay in the WAL
+    con.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    assert os.path.getsize(tmp_path / "db.sqlite-wal") > 0
+
+    with read_snapshot(str(database)) as snapshot:
+        # the next commit restarts the WAL, overwriting the frames the snapshot parsed
+        con.execute("UPDATE readings SET value = 'updated'")
+        con.commit()
+        with open(tmp_path / "snapshot.sqlite", "wb") as f:
+            for _, page in snapshot.pages():
+                f.write(page)
+
+    assert read_rows(tmp_path / "snapshot.sqlite") == expected
+    con.close()
+
+
+def test_deltas_hold_only_changed_pages_and_replay_onto_older_copies(tmp_path: Path) -> None:
+    database, backup = tmp_path / "db.sqlite", tmp_path / "backup.sqlite"
+    con = create_database(database)
+    first, _ = backup_incrementally(str(database), str(backup))
+    shutil.copy(backup, tmp_path / "copy.sqlite")
+
+    con.execute("UPDATE readings SET value = 'updated' WHERE id = 5")
+    con.commit()
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    second, delta = backup_incrementally(str(database), str(backup))
+
+    assert delta is not None
+    assert (second.chain_id, second.sequence) == (first.chain_id, 1)
+    with open(delta, "rb") as f:
+        assert 0 < read_delta_header(f).n_pages < second.page_count / 10
+
+    con.executemany("INSERT INTO readings (value) VALUES (?)", [("new",)] * 500)
+    con.execute("DELETE FROM readings WHERE id < 100")
+    con.commit()
+    backup_incrementally(str(database), str(backup))
+
+    expected = con.execute("SELECT id, value FROM readings ORDER BY id").fetchall()
+    assert read_rows(backup) == expected
+
+    deltas = sorted(deltas_directory(backup).glob("*.delta"))
+    assert replay_deltas(tmp_path / "copy.sqlite", deltas) == 2
+    assert (tmp_path / "copy.sqlite").read_bytes() == backup.read_bytes()
+    # again, as onto a copy that already has them
+    replay_deltas(tmp_path / "copy.sqlite", deltas)
+    assert (tmp_path / "copy.sqlite").read_bytes() == backup.read_bytes()
+    con.close()
+
+
+def test_backup_without_a_manifest_starts_a_new_chain(tmp_path: Path) -> None:
+    database, backup = tmp_path / "db.sqlite", tmp_path / "backup.sqlite"
+    con = create_database(database)
+    first, _ = backup_incrementally(str(database), str(backup))
+    con.execute("UPDATE readings SET value = 'updated' WHERE id = 5")
+    con.commit()
+    backup_incrementally(str(database), str(backup))
+    assert len(list(deltas_directory(backup).glob("*.delta"))) == 1
+
+    manifest_path(backup).unlink()
+    manifest, delta = backup_incrementally(str(database), str(backup))
+
+    assert delta is None
+    assert manifest.chain_id != first.chain_id
+    assert list(deltas_directory(backup).glob("*.delta")) == []
+    assert read_rows(backup) == con.execute("SELECT id, value FROM readings").fetchall()
+    con.close()
+
+
+def test_replay_rejects_deltas_that_dont_follow_each_other(tmp_path: Path) -> None:
+    database, backup = tmp_path / "db.sqlite", tmp_path / "backup.sqlite"
+    con = create_database(database)
+    backup_incrementally(str(database), str(backup))
+    con.execute("UPDATE readings SET value = 'updated' WHERE id = 5")
+    con.commit()
+    _, delta = backup_incrementally(str(database), str(backup))
+    assert delta is not None
+    shutil.copy(delta, tmp_path / "other_chain.delta")
+
+    manifest_path(backup).unlink()
+    backup_incrementally(str(database), str(backup))
+    con.execute("UPDATE readings SET value = 'updated again' WHERE id = 5")
+    con.commit()
+    _, new_chain_delta = backup_incrementally(str(database), str(backup))
+    assert new_chain_delta is not None
+
+    with pytest.raises(ValueError):
+        replay_deltas(backup, [tmp_path / "other_chain.delta", new_chain_delta])
+    con.close()
@@ -179,3 +179,131 @@ def test_sqlite_worker_close_flushes_pending_writes(tmp_path: Path, monkeypatch:
     assert connection.commit_count == 1
     with sqlite3.connect(db_path) as conn:
         assert conn.execute("SELECT id FROM test_table").fetchall() == [(1,)]
+
+
+def test_sqlite_worker_groups_rows_into_one_executemany_per_query(tmp_path: Path) -> None:
+    db_path = tmp_path / "worker.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE a (id INTEGER)")
+        conn.execute("CREATE TABLE b (id INTEGER)")
+
+    commits: list[tuple[int, float]] = []
+    worker = Sqlite3Worker(
+        db_path.as_posix(),
+        max_batch_delay_s=60,
+        on_commit=lambda rows, latency_s: commits.append((rows, latency_s)),
+    )
+    executemany_calls: list[str] = []
+    original_cursor = worker._sqlite3_cursor
+
+    class RecordingCursor:
+        def __getattr__(self, name: str) -> Any:
+            return getattr(original_cursor, name)
+
+        def executemany(self, query: str, rows: Any) -> sqlite3.Cursor:
+            executemany_calls.append(query)
+            return original_cursor.executemany(query, rows)
+
+    worker._sqlite3_cursor = RecordingCursor()  # type: ignore[assignment]
+    try:
+        for i in range(5):
+            worker.execute_grouped("INSERT INTO a (id) VALUES (:id)", {"id": i})
+            worker.execute_grouped("INSERT INTO b (id) VALUES (:id)", {"id": i})
+    finally:
+        worker.close()
+
+    assert sorted(executemany_calls) == ["INSERT INTO a (id) VALUES (:id)", "INSERT INTO b (id) VALUES (:id)"]
+    assert len(commits) == 1
+    assert commits[0][0] == 10
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM a").fetchone() == (5,)
+        assert conn.execute("SELECT COUNT(*) FROM b").fetchone() == (5,)
+
+
+def test_sqlite_worker_grouped_rows_isolate_a_bad_row(tmp_path: Path) -> None:
+    errors: list[SqliteValues] = []
+    db_path = tmp_path / "worker.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE test_table (id INTEGER NOT NULL)")
+
+    worker = Sqlite3Worker(
+        db_path.as_posix(),
+        max_batch_delay_s=60,
+        raise_on_error=False,
+        on_error=lambda error, query, values: errors.append(values),
+    )
+    try:
+        worker.execute_grouped("INSERT INTO test_table (id) VALUES (?)", (1,))
+        worker.execute_grouped("INSERT INTO test_table (id) VALUES (?)", (None,))
+        worker.execute_grouped("INSERT INTO test_table (id) VALUES (?)", (3,))
+    finally:
+        worker.close()
+
+    assert errors == [(None,)]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT id FROM test_table ORDER BY id").fetchall() == [(1,), (3,)]
+
+
+def test_sqlite_worker_runs_dependents_only_for_written_rows(tmp_path: Path) -> None:
+    db_path = tmp_path / "worker.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE source (id INTEGER NOT NULL, unit TEXT)")
+        conn.execute("CREATE TABLE counts (unit TEXT PRIMARY KEY, n INTEGER)")
+
+    worker = Sqlite3Worker(db_path.as_posix(), max_batch_delay_s=60, raise_on_error=False)
+    count = "INSERT INTO counts (unit, n) VALUES (:unit, 1) ON CONFLICT(unit) DO UPDATE SET n = n + 1"
+    try:
+        for id_, unit in [(1, "unit1"), (None, "unit1"), (3, "unit2"), (4, "unit1")]:
+            worker.execute_grouped(
+                "INSERT INTO source (id, unit) VALUES (:id, :unit)",
+                {"id": id_, "unit": unit},
+                dependents=(count,),
+            )
+    finally:
+        worker.close()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM source").fetchone() == (3,)
+        assert conn.execute("SELECT unit, n FROM counts ORDER BY unit").fetchall() == [
+            ("unit1", 2),
+            ("unit2", 1),
+        ]
+
+
+def test_sqlite_worker_flushes_grouped_rows_before_plain_statements(tmp_path: Path) -> None:
+    db_path = tmp_path / "worker.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE test_table (id INTEGER)")
+
+    worker = Sqlite3Worker(db_path.as_posix(), max_batch_delay_s=60)
+    try:
+        worker.execute_grouped("INSERT INTO test_table (id) VALUES (?)", (1,))
+        worker.execute_grouped("INSERT INTO test_table (id) VALUES (?)", (2,))
+        worker.execute("DELETE FROM test_table WHERE id = ?", (1,))
+    finally:
+        worker.close()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT id FROM test_table").fetchall() == [(2,)]
+
+
+def test_sqlite_worker_runs_batch_statements_once_per_commit(tmp_path: Path) -> None:
+    db_path = tmp_path / "worker.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE test_table (id INTEGER)")
+        conn.execute("CREATE TABLE batches (total INTEGER)")
+
+    worker = Sqlite3Worker(
+        db_path.as_posix(),
+        max_batch_delay_s=60,
+        batch_statements=["INSERT INTO batches (total) SELECT SUM(id) FROM test_table"],
+    )
+    try:
+        for i in range(1, 4):
+            worker.execute_grouped("INSERT INTO test_table (id) VALUES (?)", (i,))
+    finally:
+        worker.close()
+
+    with sqlite3.connect(db_path) as conn:
+        # after the batch's rows, in its transaction
+        assert conn.execute("SELECT total FROM batches").fetchall() == [(6,)]
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+from pathlib import Path
+
+from pioreactor.actions.leader.rebuild_time_series_rollups import rebuild_time_series_rollups
+from pioreactor.config import config
+from pioreactor.config import temporary_config_change
+from pioreactor.utils.time_series_rollups import choose_rollup_bucket
+from pioreactor.utils.time_series_rollups import rollup_upsert_for_rows
+
+SHARED_SQL_DIR = Path(__file__).resolve().parents[2] / "packaging" / "shared-assets" / "sql"
+
+OD_READINGS = [
+    ("2026-01-01T00:00:05.000Z", 1, 0.10),
+    ("2026-01-01T00:00:35.000Z", 1, 0.20),
+    ("2026-01-01T00:01:05.000Z", 1, 0.30),
+    ("2026-01-01T00:00:05.000Z", 2, 0.50),
+    ("2026-01-01T01:30:00.000Z", 1, 0.40),
+]
+
+
+def create_db(path: Path) -> sqlite3.Connection:
+    con = sqlite3.connect(path)
+    con.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
+    con.execute(
+        "INSERT INTO experiments (experiment, created_at) VALUES (?, ?)", ("exp1", "2026-01-01T00:00:00.000Z")
+    )
+    for timestamp, channel, od in OD_READINGS:
+        con.execute(
+            "INSERT INTO od_readings (experiment, pioreactor_unit, timestamp, od_reading, angle, channel) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ("exp1", "unit1", timestamp, od, 90, channel),
+        )
+    con.commit()
+    return con
+
+
+def rollups(con: sqlite3.Connection) -> list[tuple]:
+    return con.execute(
+        "SELECT bucket_seconds, channel, bucket_start, n, round(y_sum, 6), y_min, y_max FROM time_series_rollups "
+        "ORDER BY bucket_seconds, channel, bucket_start"
+    ).fetchall()
+
+
+def test_choose_rollup_bucket() -> None:
+    # 4h at 720 points is one point per 20s, finer than any tier
+    assert choose_rollup_bucket(4 * 60 * 60, 720) is None
+    # 7 days at 720 points is one point per 840s: 10 minute buckets, merged in pairs
+    assert choose_rollup_bucket(7 * 24 * 60 * 60, 720) == (600, 1200)
+    assert choose_rollup_bucket(20 * 60 * 60, 20) == (3600, 3600)
+
+
+def test_rebuild_time_series_rollups(tmp_path) -> None:
+    db = tmp_path / "db.sqlite"
+    con = create_db(db)
+    con.execute("INSERT INTO time_series_rollups_pending (experiment) VALUES ('exp1')")
+    con.commit()
+
+    with temporary_config_change(config, "storage", "database", str(db)):
+        rebuild_time_series_rollups(experiment="exp1")
+
+    assert con.execute("SELECT COUNT(1) FROM time_series_rollups_pending").fetchone() == (0,)
+
+    assert [row for row in rollups(con) if row[0] == 60] == [
+        (60, 1, "2026-01-01T00:00:00.000Z", 2, 0.3, 0.1, 0.2),
+        (60, 1, "2026-01-01T00:01:00.000Z", 1, 0.3, 0.3, 0.3),
+        (60, 1, "2026-01-01T01:30:00.000Z", 1, 0.4, 0.4, 0.4),
+        (60, 2, "2026-01-01T00:00:00.000Z", 1, 0.5, 0.5, 0.5),
+    ]
+    assert [row for row in rollups(con) if row[0] == 3600] == [
+        (3600, 1, "2026-01-01T00:00:00.000Z", 3, 0.6, 0.1, 0.3),
+        (3600, 1, "2026-01-01T01:00:00.000Z", 1, 0.4, 0.4, 0.4),
+        (3600, 2, "2026-01-01T00:00:00.000Z", 1, 0.5, 0.5, 0.5),
+    ]
+
+    # since is rounded down to each tier's bucket, so the 00:00 hour bucket is recomputed in full
+    before = rollups(con)
+    with temporary_config_change(config, "storage", "database", str(db)):
+        rebuild_time_series_rollups(since="2026-01-01T00:01:00.000Z")
+    assert rollups(con) == before
+
+
+def test_ingest_upserts_match_rebuild(tmp_path) -> None:
+    db = tmp_path / "db.sqlite"
+    con = create_db(db)
+
+    con.executemany(
+        rollup_upsert_for_rows("od_readings"),
+        [
+            {
+                "experiment": "exp1",
+                "pioreactor_unit": "unit1",
+                "timestamp": timestamp,
+                "channel": channel,
+                "od_reading": od,
+                "angle": 90,
+            }
+            for timestamp, channel, od in OD_READINGS
+        ],
+    )
+    con.commit()
+    ingested = rollups(con)
+    assert len(ingested) == 10
+
+    with temporary_config_change(config, "storage", "database", str(db)):
+        rebuild_time_series_rollups()
+
+    assert rollups(con) == ingested
@@ -202,3 +202,38 @@ def test_validate_profile_errors_when_both_t_and_hours_elapsed_are_set() -> None
     assert result.diagnostics[0].severity == "error"
     assert result.diagnostics[0].code == "action.time.conflict"
     assert result.diagnostics[0].path == "common.jobs.stirring.actions[0]"
+
+
+def test_validate_profile_reports_the_job_settings_each_expression_reads() -> None:
+    profile = yaml_decode(
+        """
+version: "1.0"
+experiment_profile_name: test_profile
+common:
+  jobs:
+    stirring:
+      actions:
+        - type: when
+          t: 0s
+          condition: "::od_reading:od1.od > 1.0 and ::od_reading:od1.od < 2.0"
+          actions:
+            - type: update
+              t: 0s
+              options:
+                target_rpm: "${{ worker1:stirring:target_rpm + 10 }}"
+        - type: log
+          t: 0s
+          options:
+            message: "rpm is ${{ unit():stirring:target_rpm }}, in ${{ experiment() }}"
+""",
+        type=Profile,
+    )
+
+    result = validate_profile(profile)
+
+    assert result.ok is True
+    assert result.dependencies == {
+        "common.jobs.stirring.actions[0].condition": ["::od_reading:od1.od"],
+        "common.jobs.stirring.actions[0].actions[0].options.target_rpm": ["worker1:stirring:target_rpm"],
+        "common.jobs.stirring.actions[1].options.message": ["unit():stirring:target_rpm"],
+    }
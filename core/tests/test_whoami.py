@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import json
+from types import SimpleNamespace
+
+import pytest
+from pioreactor import whoami
+
+
+def assignment_message(unit: str, payload: dict | None) -> SimpleNamespace:
+    return SimpleNamespace(
+        topic=f"pioreactor/{unit}/$experiment/assignment",
+        payload=json.dumps(payload).encode() if payload is not None else b"",
+    )
+
+
+@pytest.fixture
+def assignment_cache(monkeypatch: pytest.MonkeyPatch) -> whoami._AssignmentCache:
+    monkeypatch.setattr(whoami._AssignmentCache, "_watch", lambda self: None)
+    return whoami._AssignmentCache(ttl=60.0)
+
+
+def test_assignment_cache_serves_pushed_values(assignment_cache: whoami._AssignmentCache) -> None:
+    assert assignment_cache.get("unit1", "experiment") is whoami._MISSING
+
+    assignment_cache._on_message(
+        assignment_message("unit1", {"pioreactor_unit": "unit1", "experiment": "exp1", "is_active": True})
+    )
+    assert assignment_cache.get("unit1", "experiment") == "exp1"
+    assert assignment_cache.get("unit1", "is_active") is True
+
+    assignment_cache._on_message(
+        assignment_message("unit1", {"pioreactor_unit": "unit1", "experiment": None, "is_active": False})
+    )
+    assert assignment_cache.get("unit1", "experiment") is None
+    assert assignment_cache.get("unit1", "is_active") is False
+
+    # worker removed from the inventory
+    assignment_cache._on_message(assignment_message("unit1", None))
+    assert assignment_cache.get("unit1", "experiment") is whoami._MISSING
+
+
+def test_assignment_cache_drops_pushed_values_on_disconnect(
+    assignment_cache: whoami._AssignmentCache,
+) -> None:
+    assignment_cache.put("unit2", is_active=True)
+    assignment_cache._on_message(assignment_message("unit1", {"experiment": "exp1", "is_active": True}))
+
+    assignment_cache._on_disconnect()
+
+    assert assignment_cache.get("unit1", "experiment") is whoami._MISSING
+    assert assignment_cache.get("unit2", "is_active") is True
+
+
+def test_assignment_cache_expires_fetched_values_sooner_than_pushed_ones(
+    assignment_cache: whoami._AssignmentCache,
+) -> None:
+    assignment_cache._on_message(assignment_message("unit1", {"experiment": "exp1", "is_active": True}))
+    # a slower HTTP response doesn't overwrite a pushed value
+    assignment_cache.put("unit1", experiment="exp0", is_active=False)
+    assert assignment_cache.get("unit1", "experiment") == "exp1"
+
+    assignment_cache.ttl = -1.0
+    assignment_cache.put("unit2", experiment="exp2")
+    assert assignment_cache.get("unit2", "experiment") is whoami._MISSING
+    assert assignment_cache.get("unit1", "is_active") is True
+
+    assignment_cache.pushed_ttl = -1.0
+    assignment_cache._on_message(assignment_message("unit3", {"experiment": "exp3", "is_active": True}))
+    assert assignment_cache.get("unit3", "experiment") is whoami._MISSING
+    # an expired pushed value is replaced by a fetched one
+    assignment_cache.ttl = 60.0
+    assignment_cache.put("unit3", experiment="exp4")
+    assert assignment_cache.get("unit3", "experiment") == "exp4"
+
+
+def test_assignment_cache_subscribes_on_the_second_lookup(monkeypatch: pytest.MonkeyPatch) -> None:
+    watched: list[bool] = []
+    monkeypatch.setattr(whoami._AssignmentCache, "_watch", lambda self: watched.append(True))
+    assignment_cache = whoami._AssignmentCache()
+
+    assignment_cache.get("unit1", "experiment")
+    assert watched == []
+
+    assignment_cache.get("unit1", "experiment")
+    assignment_cache.get("unit1", "is_active")
+    for thread in whoami.threading.enumerate():
+        if thread.name == "whoami-assignments":
+            thread.join()
+    assert watched == [True]
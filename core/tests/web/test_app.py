@@ -27,7 +27,7 @@ huey.immediate = True
 
 @pytest.fixture(autouse=True)
 def noop_retained_assignment_publish(monkeypatch: MonkeyPatch) -> None:
-    monkeypatch.setattr("pioreactor.web.api.publish", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr("pioreactor.web.assignments.publish", lambda *_args, **_kwargs: None)
 
 
 def test_process_delayed_json_response_accepts_created_status() -> None:
@@ -354,7 +354,7 @@ def test_add_worker_to_experiment_publishes_retained_assignment(
     def capture_publish(topic: str, payload: bytes, **kwargs: object) -> None:
         published.append((topic, json.loads(payload), kwargs))
 
-    monkeypatch.setattr("pioreactor.web.api.publish", capture_publish)
+    monkeypatch.setattr("pioreactor.web.assignments.publish", capture_publish)
 
     response = client.put("/api/experiments/exp1/workers", json={"pioreactor_unit": "unit4"})
 
@@ -367,6 +367,7 @@ def test_add_worker_to_experiment_publishes_retained_assignment(
     assert payload["experiment"] == "exp1"
     assert isinstance(payload["assigned_at"], str)
     assert isinstance(payload["updated_at"], str)
+    assert isinstance(payload["is_active"], bool)
 
 
 def test_reassign_worker_to_experiment_stops_jobs_from_previous_experiment(
@@ -420,7 +421,7 @@ def test_remove_worker_from_experiment_publishes_retained_unassignment(
     def capture_publish(topic: str, payload: bytes, **kwargs: object) -> None:
         published.append((topic, json.loads(payload), kwargs))
 
-    monkeypatch.setattr("pioreactor.web.api.publish", capture_publish)
+    monkeypatch.setattr("pioreactor.web.assignments.publish", capture_publish)
 
     response = client.delete("/api/experiments/exp1/workers/unit2")
 
@@ -465,6 +466,27 @@ def test_change_worker_status(client) -> None:
     assert data["is_active"] == 0
 
 
+def test_change_worker_status_publishes_retained_assignment(
+    client: FlaskClient, monkeypatch: MonkeyPatch
+) -> None:
+    published: list[tuple[str, dict[str, object], dict[str, object]]] = []
+
+    def capture_publish(topic: str, payload: bytes, **kwargs: object) -> None:
+        published.append((topic, json.loads(payload), kwargs))
+
+    monkeypatch.setattr("pioreactor.web.assignments.publish", capture_publish)
+
+    response = client.put("/api/workers/unit1/is_active", json={"is_active": 0})
+
+    assert response.status_code == 200
+    assert len(published) == 1
+    topic, payload, kwargs = published[0]
+    assert topic == "pioreactor/unit1/$experiment/assignment"
+    assert kwargs == {"retain": True}
+    assert payload["experiment"] == "exp1"
+    assert payload["is_active"] is False
+
+
 def test_change_worker_model_triggers_hardware_check_for_v1_5(client, monkeypatch) -> None:
     captured: dict[str, object] = {}
 
@@ -639,21 +661,80 @@ def test_get_experiment_logs_filters_by_min_level_and_orders_by_timestamp(client
     assert "Info event" not in messages
 
 
+def test_experiment_logs_before_cursor_pages_like_skip(client) -> None:
+    from pioreactor.web.app import modify_app_db
+
+    for i in range(250):
+        modify_app_db(
+            "INSERT INTO logs (experiment, pioreactor_unit, timestamp, message, source, level, task) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            # pairs of logs share a timestamp
+            (
+                "exp1",
+                "unit1",
+                f"2023-10-05T12:{i // 2 // 60:02d}:{i // 2 % 60:02d}Z",
+                f"Event {i}",
+                "app",
+                "INFO",
+                "app",
+            ),
+        )
+
+    by_skip = []
+    for skip in (0, 100, 200):
+        by_skip += client.get(f"/api/experiments/exp1/logs?min_level=INFO&skip={skip}").get_json()
+
+    by_cursor = []
+    path = "/api/experiments/exp1/logs?min_level=INFO"
+    response = client.get(path)
+    while True:
+        by_cursor += response.get_json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get(f"{path}&before={cursor}")
+
+    assert [row["message"] for row in by_cursor] == [row["message"] for row in by_skip]
+    assert len({row["message"] for row in by_cursor}) == len(by_cursor)
+    assert by_cursor[0]["message"] == "Event 248"
+
+
+def test_logs_search_matches_indexed_messages(client) -> None:
+    from flask import g
+    from pioreactor.utils.logs_search import INDEX_NEW_LOGS
+    from pioreactor.web.app import modify_app_db
+
+    for message in ["Stirring started", "Stirring stopped", "Dosing stopped"]:
+        modify_app_db(
+            "INSERT INTO logs (experiment, pioreactor_unit, timestamp, message, source, level, task) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ("exp1", "unit1", "2023-10-06T12:00:00Z", message, "app", "INFO", "app"),
+        )
+    for statement in INDEX_NEW_LOGS:
+        g._app_database.execute(statement)
+
+    response = client.get("/api/experiments/exp1/logs?min_level=INFO&q=stirr stop")
+    assert [row["message"] for row in response.get_json()] == ["Stirring stopped"]
+
+    response = client.get("/api/logs?min_level=INFO&q=stopped")
+    assert sorted(row["message"] for row in response.get_json()) == ["Dosing stopped", "Stirring stopped"]
+
+
+def test_logs_reject_malformed_before_cursor(client) -> None:
+    assert client.get("/api/logs?before=2023-10-05T12:00:00Z").status_code == 400
+    assert client.get("/api/experiments/exp1/logs?before=2023-10-05T12:00:00Z,abc").status_code == 400
+
+
 def test_experiment_logs_query_uses_experiment_level_timestamp_index() -> None:
     from pioreactor.web.api import build_experiment_logs_query
     from pioreactor.web.api import get_levels_for_min_level
 
     levels = get_levels_for_min_level("NOTICE")
-    query_args = tuple(arg for level in levels for arg in ("exp1", level)) + (0,)
+    query, query_args = build_experiment_logs_query("exp1", levels)
     db = sqlite3.connect(":memory:")
     db.executescript(
         (Path(__file__).resolve().parents[3] / "packaging/shared-assets/sql/create_tables.sql").read_text()
     )
 
-    plan = db.execute(
-        "EXPLAIN QUERY PLAN " + build_experiment_logs_query(levels),
-        query_args,
-    ).fetchall()
+    plan = db.execute("EXPLAIN QUERY PLAN " + query, query_args).fetchall()
 
     details = "\n".join(row[3] for row in plan)
     assert "logs_exp_level_timestamp_ix" in details
@@ -863,6 +944,197 @@ def test_time_series_partitions_channel_sources(client: FlaskClient, monkeypatch
     }
 
 
+def test_time_series_uses_rollups_for_long_lookbacks(client: FlaskClient, monkeypatch: MonkeyPatch) -> None:
+    from pioreactor.utils.time_series_rollups import rollup_upsert_from_table
+    from pioreactor.web.app import modify_app_db
+
+    monkeypatch.setattr(
+        "pioreactor.web.api.current_utc_datetime",
+        lambda: datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    modify_app_db(
+        "INSERT INTO experiments (experiment, created_at, description) VALUES (?, ?, ?)",
+        ("time-series-rollup-test", "2025-12-31T12:00:00.000Z", ""),
+    )
+    for channel in (1, 2):
+        for hour in (20, 21, 22):
+            for minute, od in ((0, 0.1), (30, 0.3)):
+                modify_app_db(
+                    """
+                    INSERT INTO od_readings (
+                        experiment, pioreactor_unit, timestamp, od_reading, angle, channel
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        "time-series-rollup-test",
+                        "unit-a",
+                        f"2025-12-31T{hour:02}:{minute:02}:00.000Z",
+                        channel + od,
+                        90,
+                        channel,
+                    ),
+                )
+
+    # 20 hours at 20 points is a point per hour, so the hourly means are returned.
+    response = client.get(
+        "/api/experiments/time-series-rollup-test/time_series/od_readings?lookback=20&target_points=20"
+    )
+    assert response.status_code == 200
+    raw_points = response.get_json()["data"][0]
+    assert len(raw_points) == 6  # no rollups yet, so the raw rows are sampled
+
+    modify_app_db(rollup_upsert_from_table("od_readings", 3600))
+
+    # rollups that don't cover the experiment's rows yet aren't used
+    modify_app_db(
+        "INSERT INTO time_series_rollups_pending (experiment) VALUES (?)", ("time-series-rollup-test",)
+    )
+    response = client.get(
+        "/api/experiments/time-series-rollup-test/time_series/od_readings?lookback=20&target_points=20"
+    )
+    assert response.get_json()["data"][0] == raw_points
+    modify_app_db("DELETE FROM time_series_rollups_pending")
+
+    response = client.get(
+        "/api/experiments/time-series-rollup-test/time_series/od_readings?lookback=20&target_points=20"
+    )
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "series": ["unit-a-1", "unit-a-2"],
+        "data": [
+            [{"x": f"2025-12-31T{hour}:00:00.000Z", "y": channel + 0.2} for hour in (20, 21, 22)]
+            for channel in (1, 2)
+        ],
+    }
+
+    # short lookbacks still read the source table
+    response = client.get(
+        "/api/workers/unit-a/experiments/time-series-rollup-test/time_series/od_readings"
+        "?lookback=4&target_points=720"
+    )
+    assert len(response.get_json()["data"][0]) == 5
+
+
+def test_time_series_since_cursor_and_etag(client: FlaskClient, monkeypatch: MonkeyPatch) -> None:
+    from pioreactor.web.app import modify_app_db
+
+    monkeypatch.setattr(
+        "pioreactor.web.api.current_utc_datetime",
+        lambda: datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    modify_app_db(
+        "INSERT INTO experiments (experiment, created_at, description) VALUES (?, ?, ?)",
+        ("time-series-since-test", "2025-12-31T12:00:00.000Z", ""),
+    )
+
+    def insert_od(unit: str, channel: int, minute: int) -> None:
+        modify_app_db(
+            """
+            INSERT INTO od_readings (experiment, pioreactor_unit, timestamp, od_reading, angle, channel)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            ("time-series-since-test", unit, f"2025-12-31T23:{minute:02}:00.000Z", minute / 100, 90, channel),
+        )
+
+    insert_od("unit-a", 1, 0)
+    insert_od("unit-b", 2, 1)
+
+    path = "/api/experiments/time-series-since-test/time_series/od_readings"
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    # unchanged data is a 304, with no body
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    # the ETag is also keyed on the request's parameters
+    assert client.get(f"{path}?lookback=1", headers={"If-None-Match": etag}).status_code == 200
+
+    response = client.get(f"{path}?since={cursor}")
+    assert response.get_json() == {"series": [], "data": [], "cursor": cursor}
+
+    insert_od("unit-b", 2, 2)
+    insert_od("unit-a", 1, 3)
+    insert_od("unit-a", 1, 4)
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    response = client.get(f"{path}?since={cursor}")
+    data = response.get_json()
+    assert data["series"] == ["unit-a-1", "unit-b-2"]
+    assert data["data"] == [
+        [{"x": "2025-12-31T23:03:00.000Z", "y": 0.03}, {"x": "2025-12-31T23:04:00.000Z", "y": 0.04}],
+        [{"x": "2025-12-31T23:02:00.000Z", "y": 0.02}],
+    ]
+    deletions, rowid = cursor.split(".")
+    assert data["cursor"] == response.headers["X-Next-Cursor"] == f"{deletions}.{int(rowid) + 3}"
+
+    # at most target_points rows, and the cursor continues where the page stopped
+    response = client.get(f"/api/workers/unit-a{path.removeprefix('/api')}?since={cursor}&target_points=1")
+    data = response.get_json()
+    assert data["data"] == [[{"x": "2025-12-31T23:03:00.000Z", "y": 0.03}]]
+    response = client.get(f"/api/workers/unit-a{path.removeprefix('/api')}?since={data['cursor']}")
+    assert response.get_json()["data"] == [[{"x": "2025-12-31T23:04:00.000Z", "y": 0.04}]]
+
+    response = client.get(
+        f"/api/experiments/time-series-since-test/time_series/od_readings/od_reading?since={cursor}"
+    )
+    assert response.get_json()["series"] == ["unit-a", "unit-b"]
+
+    assert client.get(f"{path}?since=yesterday").status_code == 400
+
+
+def test_time_series_since_is_a_full_refresh_after_rows_are_deleted(
+    client: FlaskClient, monkeypatch: MonkeyPatch
+) -> None:
+    from flask import g
+    from pioreactor.web.app import modify_app_db
+
+    g._app_database.executescript(
+        (Path(__file__).resolve().parents[3] / "packaging/shared-assets/sql/create_triggers.sql").read_text()
+    )
+    monkeypatch.setattr(
+        "pioreactor.web.api.current_utc_datetime",
+        lambda: datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    modify_app_db(
+        "INSERT INTO experiments (experiment, created_at, description) VALUES (?, ?, ?)",
+        ("time-series-deletion-test", "2025-12-31T12:00:00.000Z", ""),
+    )
+
+    def insert_fused(minute: int, od: float) -> None:
+        modify_app_db(
+            """
+            INSERT INTO od_readings_fused (experiment, pioreactor_unit, timestamp, od_reading)
+            VALUES (?, ?, ?, ?)
+            """,
+            ("time-series-deletion-test", "unit-a", f"2025-12-31T23:{minute:02}:00.000Z", od),
+        )
+
+    insert_fused(0, 0.1)
+    insert_fused(1, 0.2)
+
+    path = "/api/experiments/time-series-deletion-test/time_series/od_readings_fused"
+    response = client.get(path)
+    etag, cursor = response.headers["ETag"], response.headers["X-Next-Cursor"]
+
+    # ex: refuse_od --replace. The newest rowids are reused, so the newest rowid is unchanged.
+    modify_app_db("DELETE FROM od_readings_fused WHERE experiment=?", ("time-series-deletion-test",))
+    insert_fused(0, 0.3)
+    insert_fused(1, 0.4)
+
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+    response = client.get(f"{path}?since={cursor}")
+    assert response.headers["X-Next-Cursor"] != cursor
+    data = response.get_json()
+    assert "cursor" not in data
+    assert [point["y"] for point in data["data"][0]] == [0.3, 0.4]
+
+
 @pytest.mark.parametrize(
     ("route", "insert_statement", "insert_args", "expected_series", "expected_y"),
     [
@@ -1889,7 +2161,7 @@ def test_stop_specific_job_returns_task_response_when_mqtt_publish_fails(client,
 
     monkeypatch.setattr(
         mod,
-        "create_client",
+        "get_shared_client",
         lambda *_args, **_kwargs: FakeMQTTClient(
             message_info_factory=lambda: FakeMQTTMessageInfo(wait_error=RuntimeError("mqtt down"))
         ),
@@ -1907,7 +2179,7 @@ def test_stop_specific_job_returns_task_response_when_mqtt_publish_fails(client,
 def test_stop_specific_job_returns_accepted_when_mqtt_publish_succeeds(client, monkeypatch) -> None:
     import pioreactor.web.api as mod
 
-    monkeypatch.setattr(mod, "create_client", lambda *_args, **_kwargs: FakeMQTTClient())
+    monkeypatch.setattr(mod, "get_shared_client", lambda *_args, **_kwargs: FakeMQTTClient())
 
     response = client.post("/api/workers/unit1/jobs/stop/job_name/stirring/experiments/exp1")
 
@@ -1931,6 +2203,7 @@ def test_export_datasets_returns_async_task_response(
         end_time: str | None = None,
         partition_by_unit: bool = False,
         partition_by_experiment: bool = True,
+        output_format: str = "csv",
     ) -> DummyTask:
         captured["experiment"] = experiment
         captured["dataset_names"] = dataset_names
@@ -1939,6 +2212,7 @@ def test_export_datasets_returns_async_task_response(
         captured["end_time"] = end_time
         captured["partition_by_unit"] = partition_by_unit
         captured["partition_by_experiment"] = partition_by_experiment
+        captured["output_format"] = output_format
         return DummyTask()
 
     monkeypatch.setenv("RUN_PIOREACTOR", tmp_path.as_posix())
@@ -1955,6 +2229,7 @@ def test_export_datasets_returns_async_task_response(
             "partition_by_experiment": False,
             "start_time": "2025-11-02T01:30:00-05:00",
             "end_time": None,
+            "output_format": "npz",
         },
     )
 
@@ -1972,6 +2247,7 @@ def test_export_datasets_returns_async_task_response(
     assert captured["end_time"] is None
     assert captured["partition_by_unit"] is True
     assert captured["partition_by_experiment"] is False
+    assert captured["output_format"] == "npz"
 
 
 def test_export_datasets_rejects_timezone_naive_bounds(client: FlaskClient) -> None:
@@ -2024,6 +2300,7 @@ def test_export_datasets_to_usb_returns_async_task_response(
         end_time: str | None = None,
         partition_by_unit: bool = False,
         partition_by_experiment: bool = True,
+        output_format: str = "csv",
     ) -> DummyTask:
         captured["experiment"] = experiment
         captured["dataset_names"] = dataset_names
@@ -2032,6 +2309,7 @@ def test_export_datasets_to_usb_returns_async_task_response(
         captured["end_time"] = end_time
         captured["partition_by_unit"] = partition_by_unit
         captured["partition_by_experiment"] = partition_by_experiment
+        captured["output_format"] = output_format
         return DummyTask()
 
     monkeypatch.setattr(
@@ -2062,6 +2340,7 @@ def test_export_datasets_to_usb_returns_async_task_response(
     assert captured["end_time"] is None
     assert captured["partition_by_unit"] is True
     assert captured["partition_by_experiment"] is False
+    assert captured["output_format"] == "csv"
 
 
 def test_install_plugin_from_leader_usb_targets_selected_unit(
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import os
 import sqlite3
 
 import pytest
@@ -261,3 +262,95 @@ def test_app_db_enables_recursive_triggers_for_assignment_history(app, monkeypat
             "unassigned_at": None,
         },
     ]
+
+
+def _use_app_database(monkeypatch, db_path) -> None:
+    from pioreactor.web import app as web_app
+
+    original_get = web_app.pioreactor_config.get
+
+    def fake_config_get(section: str, option: str, *args, **kwargs):
+        if section == "storage" and option == "database":
+            return str(db_path)
+        return original_get(section, option, *args, **kwargs)
+
+    monkeypatch.setattr(web_app.pioreactor_config, "get", fake_config_get)
+
+
+def test_pooled_readers_are_query_only_and_reused(app, monkeypatch, tmp_path) -> None:
+    from pioreactor.web import app as web_app
+
+    db_path = _prepare_db_file(tmp_path)
+    _use_app_database(monkeypatch, db_path)
+
+    with app.app_context():
+        assert web_app.query_app_db("SELECT x FROM demo") == [{"x": 1}]
+        reader = g._app_read_database
+        with pytest.raises(sqlite3.OperationalError):
+            web_app.query_app_db("DELETE FROM demo")
+
+    with app.app_context():
+        assert web_app.query_app_db_rows("SELECT x FROM demo") == [(1,)]
+        assert g._app_read_database is reader
+
+    assert _count_rows(db_path) == 1
+
+
+def test_modify_app_db_uses_the_pooled_writer(app, monkeypatch, tmp_path) -> None:
+    from pioreactor.web import app as web_app
+
+    db_path = _prepare_db_file(tmp_path)
+    _use_app_database(monkeypatch, db_path)
+
+    with app.app_context():
+        assert web_app.query_app_db("SELECT COUNT(*) AS n FROM demo", one=True) == {"n": 1}
+        assert web_app.modify_app_db("INSERT INTO demo(x) VALUES (?)", (2,)) == 1
+        # visible to this request's reader
+        assert web_app.query_app_db("SELECT COUNT(*) AS n FROM demo", one=True) == {"n": 2}
+
+    assert _count_rows(db_path) == 2
+
+
+def test_pool_starts_over_when_the_database_file_is_replaced(app, monkeypatch, tmp_path) -> None:
+    from pioreactor.web import app as web_app
+
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second").mkdir()
+    db_path = _prepare_db_file(tmp_path / "first")
+    _use_app_database(monkeypatch, db_path)
+
+    with app.app_context():
+        assert web_app.query_app_db("SELECT x FROM demo") == [{"x": 1}]
+    with web_app.app_database_pool.writer() as old_writer:
+        pass
+
+    replacement = _prepare_db_file(tmp_path / "second")
+    conn = sqlite3.connect(replacement)
+    conn.execute("UPDATE demo SET x = 5")
+    conn.commit()
+    conn.close()
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(replacement, db_path)
+
+    with app.app_context():
+        assert web_app.query_app_db("SELECT x FROM demo") == [{"x": 5}]
+        assert web_app.modify_app_db("INSERT INTO demo(x) VALUES (?)", (6,)) == 1
+
+    assert _count_rows(db_path) == 2
+    # the old file's writer is closed, not leaked
+    with pytest.raises(sqlite3.ProgrammingError):
+        old_writer.execute("SELECT 1")
+
+
+def test_query_app_db_json_matches_query_app_db(app) -> None:
+    from msgspec.json import decode
+    from pioreactor.web.app import query_app_db, query_app_db_json
+
+    query = "SELECT 1 AS a, 'two' AS \"b c\", NULL AS d UNION ALL SELECT 3, 'four', 4.5"
+    assert decode(query_app_db_json(query)) == query_app_db(query)
+    assert decode(query_app_db_json(query, one=True)) == query_app_db(query, one=True)
+    assert decode(query_app_db_json("SELECT 1 AS a WHERE 0", one=True)) is None
+    # a dict keeps the last of duplicate column names
+    assert decode(query_app_db_json("SELECT 1 AS a, 2 AS a")) == query_app_db("SELECT 1 AS a, 2 AS a")
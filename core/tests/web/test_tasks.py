@@ -13,6 +13,7 @@ import pytest
 from huey.exceptions import RateLimitExceeded
 from huey.storage import SqliteStorage
 from pioreactor.mureq import Response
+from pioreactor.web import assignments
 from pioreactor.web import db as web_db
 from pioreactor.web import tasks
 
@@ -59,7 +60,14 @@ def test_delete_experiment_task_deletes_and_reports_reclaimable_space(
                 created_at TEXT NOT NULL
             );
             CREATE TABLE workers (
-                pioreactor_unit TEXT NOT NULL UNIQUE
+                pioreactor_unit TEXT NOT NULL UNIQUE,
+                is_active INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE TABLE experiment_worker_assignments (
+                pioreactor_unit TEXT NOT NULL UNIQUE,
+                experiment TEXT NOT NULL,
+                assigned_at TEXT NOT NULL,
+                FOREIGN KEY (experiment) REFERENCES experiments (experiment) ON DELETE CASCADE
             );
             CREATE TABLE logs (
                 experiment TEXT NOT NULL,
@@ -69,6 +77,8 @@ def test_delete_experiment_task_deletes_and_reports_reclaimable_space(
             INSERT INTO experiments (experiment, created_at) VALUES ('exp1', '2026-01-01T00:00:00Z');
             INSERT INTO workers (pioreactor_unit) VALUES ('unit1'), ('unit2');
             INSERT INTO logs (experiment, message) VALUES ('exp1', 'hello');
+            INSERT INTO experiment_worker_assignments (pioreactor_unit, experiment, assigned_at)
+            VALUES ('unit1', 'exp1', '2026-01-01T00:00:00Z');
             """
         )
 
@@ -80,6 +90,12 @@ def test_delete_experiment_task_deletes_and_reports_reclaimable_space(
         return original_config_get(section, option, *args, **kwargs)
 
     monkeypatch.setattr(web_db.pioreactor_config, "get", fake_config_get)
+    published: list[tuple[str, dict[str, Any], bool]] = []
+    monkeypatch.setattr(
+        assignments,
+        "publish",
+        lambda topic, message, retain=False: published.append((topic, json.loads(message), retain)),
+    )
 
     result = tasks.delete_experiment_task.call_local("exp1")
 
@@ -91,6 +107,12 @@ def test_delete_experiment_task_deletes_and_reports_reclaimable_space(
     with sqlite3.connect(db_path) as conn:
         assert conn.execute("SELECT COUNT(*) FROM experiments WHERE experiment='exp1'").fetchone()[0] == 0
         assert conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM experiment_worker_assignments").fetchone()[0] == 0
+
+    # unit1's retained assignment is cleared, so its cached assignment is too
+    assert [(topic, message["experiment"], retain) for topic, message, retain in published] == [
+        ("pioreactor/unit1/$experiment/assignment", None, True)
+    ]
 
 
 def test_get_from_unit_retries_until_result(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -380,13 +402,13 @@ def test_multicast_chord_deletes_child_results_and_preserves_callback_result(
     monkeypatch.setattr(tasks, "resolve_to_address", lambda unit: f"http://{unit}.local")
     monkeypatch.setattr(
         tasks,
-        "get_from",
-        lambda address, endpoint, json=None, timeout=5.0: _response(
+        "post_into",
+        lambda address, endpoint, json=None, params=None, timeout=5.0: _response(
             200, {"address": address, "endpoint": endpoint}
         ),
     )
 
-    chord_result = tasks.multicast_get("/unit_api/test", ["unit1", "unit2"])
+    chord_result = tasks.multicast_post("/unit_api/test", ["unit1", "unit2"])
     child_task_ids = [child_result.id for child_result in chord_result.results]
 
     for _ in child_task_ids:
@@ -421,80 +443,96 @@ def test_multicast_chord_deletes_child_results_and_preserves_callback_result(
     assert chord_result.get(preserve=True) == expected
 
 
-def test_multicast_get_uncached_allows_headroom_for_aggregate_result(
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
-    captured: dict[str, Any] = {}
+def test_multicast_get_uncached_fans_out_in_process(monkeypatch: pytest.MonkeyPatch) -> None:
+    requested: list[tuple[str, str, float]] = []
 
-    class DummyResult:
-        def get(self, blocking: bool, timeout: float) -> dict[str, Any]:
-            captured["blocking"] = blocking
-            captured["timeout"] = timeout
-            return {
-                "unit1": {
-                    "ok": False,
-                    "unit": "unit1",
-                    "error": {"kind": "missing_result", "message": "No result returned for unit."},
-                    "status_code": None,
-                    "retryable": True,
-                }
-            }
-
-    monkeypatch.setattr(tasks, "_enqueue_multicast_chord", lambda *args, **kwargs: DummyResult())
-
-    output = tasks._multicast_get_uncached("/unit_api/calibration_protocols", ["unit1"], timeout=5.0)
+    def fake_get_from(address: str, endpoint: str, json: Any = None, timeout: float = 5.0) -> Response:
+        requested.append((address, endpoint, timeout))
+        return _response(200, {"address": address})
+
+    monkeypatch.setattr(tasks, "resolve_to_address", lambda unit: f"http://{unit}.local")
+    monkeypatch.setattr(tasks, "get_from", fake_get_from)
+
+    output = tasks._multicast_get_uncached("/unit_api/jobs/running", ["unit2", "unit1"], timeout=3.0)
 
     assert output == {
-        "unit1": {
-            "ok": False,
-            "unit": "unit1",
-            "error": {"kind": "missing_result", "message": "No result returned for unit."},
-            "status_code": None,
-            "retryable": True,
-        }
+        "unit1": {"ok": True, "unit": "unit1", "value": {"address": "http://unit1.local"}},
+        "unit2": {"ok": True, "unit": "unit2", "value": {"address": "http://unit2.local"}},
     }
-    assert captured == {"blocking": True, "timeout": 6.0}
+    assert sorted(requested) == [
+        ("http://unit1.local", "/unit_api/jobs/running", 3.0),
+        ("http://unit2.local", "/unit_api/jobs/running", 3.0),
+    ]
 
 
-def test_multicast_get_uncached_falls_back_to_child_results_when_callback_times_out(
+def test_multicast_get_uncached_does_not_wait_past_the_deadline_for_slow_units(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    class ReadyChildResult:
-        def __init__(self, value: Any) -> None:
-            self.value = value
+    import threading
 
-        def get(self, blocking: bool = False, preserve: bool = False) -> Any:
-            return self.value
+    release = threading.Event()
 
-    class PendingChildResult:
-        def get(self, blocking: bool = False, preserve: bool = False) -> Any:
-            return None
+    def fake_get_from(address: str, endpoint: str, json: Any = None, timeout: float = 5.0) -> Response:
+        if address == "http://slow.local":
+            release.wait(10)
+        return _response(200, {"address": address})
 
-    class DummyResult:
-        def __init__(self) -> None:
-            self.results = [
-                ReadyChildResult(("unit1", tasks.fanout_success("unit1", {"ok": True}))),
-                PendingChildResult(),
-            ]
+    monkeypatch.setattr(tasks, "resolve_to_address", lambda unit: f"http://{unit}.local")
+    monkeypatch.setattr(tasks, "get_from", fake_get_from)
 
-        def get(self, blocking: bool, timeout: float) -> dict[str, Any]:
-            raise tasks.ResultTimeout("timed out waiting for result.")
+    try:
+        output = tasks._multicast_get_uncached(
+            "/unit_api/calibration_protocols", ["fast", "slow"], timeout=0.05
+        )
+    finally:
+        release.set()
 
-    monkeypatch.setattr(tasks, "_enqueue_multicast_chord", lambda *args, **kwargs: DummyResult())
+    assert output["fast"] == {"ok": True, "unit": "fast", "value": {"address": "http://fast.local"}}
+    assert output["slow"]["ok"] is False
+    assert output["slow"]["error"]["kind"] == "task_timeout"
+    assert output["slow"]["retryable"] is True
 
-    output = tasks._multicast_get_uncached("/unit_api/calibration_protocols", ["unit1", "unit2"])
 
-    assert output == {
-        "unit1": {"ok": True, "unit": "unit1", "value": {"ok": True}},
-        "unit2": {
-            "ok": False,
-            "unit": "unit2",
-            "error": {"kind": "missing_result", "message": "No result returned for unit."},
-            "status_code": None,
-            "retryable": True,
-        },
+def test_multicast_get_result_is_served_from_the_huey_result_store(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(tasks.huey, "_immediate", False)
+    monkeypatch.setattr(
+        tasks.huey,
+        "storage",
+        SqliteStorage(tasks.huey.name, filename=tmp_path / "huey.db"),
+    )
+    monkeypatch.setattr(tasks, "resolve_to_address", lambda unit: f"http://{unit}.local")
+    monkeypatch.setattr(
+        tasks,
+        "get_from",
+        lambda address, endpoint, json=None, timeout=5.0: _response(200, {"endpoint": endpoint}),
+    )
+
+    result = tasks.multicast_get("/unit_api/test", ["unit1", "unit2"])
+    expected = {
+        "unit1": {"ok": True, "unit": "unit1", "value": {"endpoint": "/unit_api/test"}},
+        "unit2": {"ok": True, "unit": "unit2", "value": {"endpoint": "/unit_api/test"}},
     }
 
+    assert result.get(blocking=True, timeout=5) == expected
+    # nothing was queued, and pollers of /unit_api/task_results/<id> see the same results
+    assert tasks.huey.dequeue() is None
+    assert tasks.huey.result(result.id, preserve=True) == expected
+
+
+def test_multicast_get_result_raises_if_its_results_cant_be_stored(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail_to_put(key: str, value: Any) -> None:
+        raise OSError("result store is unavailable")
+
+    monkeypatch.setattr(tasks.huey, "put", fail_to_put)
+
+    result = tasks.MulticastGetResult(["unit1"], lambda: {"unit1": {"ok": True}})
+
+    with pytest.raises(OSError, match="result store is unavailable"):
+        result.get(blocking=True, timeout=5)
+
 
 def test_export_experiment_data_task_cleans_partial_artifacts_and_returns_filename(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
@@ -513,8 +551,10 @@ def test_export_experiment_data_task_cleans_partial_artifacts_and_returns_filena
         end_time: str | None = None,
         partition_by_unit: bool = False,
         partition_by_experiment: bool = True,
+        output_format: str = "csv",
     ) -> None:
         assert experiment == "exp1"
+        assert output_format == "csv"
         output_path.write_text("zip", encoding="utf-8")
 
     monkeypatch.setattr(
@@ -607,8 +647,10 @@ def test_export_experiment_data_to_usb_task_writes_final_output_path(
         end_time: str | None = None,
         partition_by_unit: bool = False,
         partition_by_experiment: bool = True,
+        output_format: str = "csv",
     ) -> None:
         assert experiment == "exp1"
+        assert output_format == "csv"
         assert output == (export_dir / "export.zip").as_posix()
         Path(output).write_text("zip", encoding="utf-8")
 
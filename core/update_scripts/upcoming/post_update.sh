@@ -0,0 +1,29 @@
+#!/bin/bash
+
+set -xeu
+
+export LC_ALL=C
+
+PIOREACTOR_CONFIG="/home/pioreactor/.pioreactor/config.ini"
+CRUDINI="/opt/pioreactor/venv/bin/crudini"
+HOSTNAME=$(hostname)
+LEADER_HOSTNAME=$("$CRUDINI" --get "$PIOREACTOR_CONFIG" cluster.topology leader_hostname)
+
+if [ "$HOSTNAME" = "$LEADER_HOSTNAME" ]; then
+    # the running mqtt_to_db_streaming still expects the (now dropped) activity triggers, and doesn't write time_series_rollups.
+    # After the restart, it also indexes logs for search, including existing ones, a batch at a time.
+    sudo systemctl restart pioreactor_startup_run@mqtt_to_db_streaming.service || :
+
+    # backfill any activity rows missed between dropping the triggers and the restart.
+    sudo -u pioreactor -i pio run rebuild_activity_data --since "$(date -u -d '-1 hour' +%Y-%m-%dT%H:%M:%S)" || :
+
+    # backfill the downsampled chart data for existing experiments. This can take a while on a large database,
+    # so don't hold up the update for it. Until it's done, charts of existing experiments read the source tables.
+    sudo -u pioreactor -i nohup pio run rebuild_time_series_rollups > /dev/null 2>&1 &
+
+    # the weekly database backups are now incremental.
+    if [ -f /etc/systemd/system/backup-database.service ]; then
+        sudo sed -i '/^ExecStart=/s#backup_database$#& --incremental#' /etc/systemd/system/backup-database.service
+        sudo systemctl daemon-reload
+    fi
+fi
@@ -0,0 +1,146 @@
+PRAGMA busy_timeout = 15000;
+
+-- pioreactor_unit_activity_data is now maintained by mqtt_to_db_streaming, in batches, instead of per-row triggers.
+DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_od_readings;
+DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_od_readings_fused;
+DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_od_readings_filtered;
+DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_growth_rates;
+DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_temperature_readings;
+DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_stirring_rates;
+DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_led_change_events;
+DROP TRIGGER IF EXISTS update_pioreactor_unit_activity_data_from_dosing_events;
+
+-- downsampled chart data, see create_tables.sql
+CREATE TABLE IF NOT EXISTS time_series_rollups (
+    data_source TEXT NOT NULL,
+    bucket_seconds INTEGER NOT NULL,
+    experiment TEXT NOT NULL,
+    pioreactor_unit TEXT NOT NULL,
+    channel INTEGER NOT NULL,
+    bucket_start TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    y_sum REAL NOT NULL,
+    y_min REAL NOT NULL,
+    y_max REAL NOT NULL,
+    FOREIGN KEY (experiment) REFERENCES experiments (
+        experiment
+    ) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS time_series_rollups_ix
+ON time_series_rollups (data_source, bucket_seconds, experiment, pioreactor_unit, channel, bucket_start);
+
+-- existing experiments' charts read the source tables until post_update.sh's rebuild_time_series_rollups is done
+CREATE TABLE IF NOT EXISTS time_series_rollups_pending (
+    experiment TEXT NOT NULL UNIQUE,
+    FOREIGN KEY (experiment) REFERENCES experiments (
+        experiment
+    ) ON DELETE CASCADE
+);
+
+INSERT OR IGNORE INTO time_series_rollups_pending (experiment) SELECT experiment FROM experiments;
+
+-- historical od_readings_fused recomputed by `pio run refuse_od`, see create_tables.sql
+CREATE TABLE IF NOT EXISTS od_readings_fused_versions (
+    experiment TEXT NOT NULL,
+    pioreactor_unit TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    od_reading REAL NOT NULL,
+    version TEXT NOT NULL,
+    FOREIGN KEY (experiment) REFERENCES experiments (
+        experiment
+    ) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS od_readings_fused_versions_ix
+ON od_readings_fused_versions (experiment, version, pioreactor_unit, timestamp);
+
+-- full-text index of the logs, see create_tables.sql and create_triggers.sql. mqtt_to_db_streaming backfills it.
+CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(message, task, content='logs', content_rowid='rowid');
+
+CREATE TABLE IF NOT EXISTS logs_fts_progress (
+    indexed_rowid INTEGER NOT NULL
+);
+
+INSERT INTO logs_fts_progress (indexed_rowid)
+SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM logs_fts_progress);
+
+-- remove deleted logs from logs_fts. If the newest logs are deleted, their rowids can be reused, so the indexed
+-- watermark is lowered to the newest remaining row for the new rows to be indexed.
+CREATE TRIGGER IF NOT EXISTS delete_logs_fts
+AFTER DELETE
+ON logs
+FOR EACH ROW
+WHEN OLD.rowid <= (SELECT indexed_rowid FROM logs_fts_progress)
+BEGIN
+    INSERT INTO logs_fts (logs_fts, rowid, message, task)
+    VALUES ('delete', OLD.rowid, OLD.message, OLD.task);
+
+    UPDATE logs_fts_progress
+       SET indexed_rowid = MIN(indexed_rowid, (SELECT COALESCE(MAX(rowid), 0) FROM logs));
+END;
+
+-- how many rows were deleted from each time-series table, counted by the count_*_deletions triggers. Deleting rows
+-- lets SQLite reuse their rowids, so the time-series routes' ETags and `since` cursors include this count.
+CREATE TABLE IF NOT EXISTS time_series_deletions (
+    data_source TEXT NOT NULL UNIQUE,
+    deletions INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO time_series_deletions (data_source, deletions)
+VALUES
+    ('growth_rates', 0),
+    ('temperature_readings', 0),
+    ('od_readings_filtered', 0),
+    ('od_readings', 0),
+    ('od_readings_fused', 0),
+    ('raw_od_readings', 0);
+
+-- see time_series_deletions in create_tables.sql. Cascading deletes, ex: of an experiment, fire these too.
+CREATE TRIGGER IF NOT EXISTS count_growth_rates_deletions
+AFTER DELETE
+ON growth_rates
+FOR EACH ROW
+BEGIN
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'growth_rates';
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_temperature_readings_deletions
+AFTER DELETE
+ON temperature_readings
+FOR EACH ROW
+BEGIN
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'temperature_readings';
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_od_readings_filtered_deletions
+AFTER DELETE
+ON od_readings_filtered
+FOR EACH ROW
+BEGIN
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'od_readings_filtered';
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_od_readings_deletions
+AFTER DELETE
+ON od_readings
+FOR EACH ROW
+BEGIN
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'od_readings';
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_od_readings_fused_deletions
+AFTER DELETE
+ON od_readings_fused
+FOR EACH ROW
+BEGIN
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'od_readings_fused';
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_raw_od_readings_deletions
+AFTER DELETE
+ON raw_od_readings
+FOR EACH ROW
+BEGIN
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'raw_od_readings';
+END;
@@ -56,6 +56,22 @@ CREATE TABLE IF NOT EXISTS od_readings_fused (
 CREATE INDEX IF NOT EXISTS od_readings_fused_ix
 ON od_readings_fused (experiment, pioreactor_unit, timestamp);
 
+-- od_readings_fused recomputed from historical readings with another estimator, by `pio run refuse_od`.
+-- version is "<estimator name>@<timestamp of the run>".
+CREATE TABLE IF NOT EXISTS od_readings_fused_versions (
+    experiment TEXT NOT NULL,
+    pioreactor_unit TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    od_reading REAL NOT NULL,
+    version TEXT NOT NULL,
+    FOREIGN KEY (experiment) REFERENCES experiments (
+        experiment
+    ) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS od_readings_fused_versions_ix
+ON od_readings_fused_versions (experiment, version, pioreactor_unit, timestamp);
+
 
 
 CREATE TABLE IF NOT EXISTS alt_media_fractions (
@@ -178,6 +194,18 @@ CREATE INDEX IF NOT EXISTS logs_unit_timestamp_ix
 CREATE INDEX IF NOT EXISTS idx_logs_level_timestamp_desc
     ON logs (level, timestamp DESC);
 
+-- full-text index of the logs' message and task, for the log routes' q= search. It reads the rows from logs.
+-- rows up to logs_fts_progress.indexed_rowid are indexed. Maintained by mqtt_to_db_streaming, see
+-- pioreactor/utils/logs_search.py, and the delete_logs_fts trigger.
+CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(message, task, content='logs', content_rowid='rowid');
+
+CREATE TABLE IF NOT EXISTS logs_fts_progress (
+    indexed_rowid INTEGER NOT NULL
+);
+
+INSERT INTO logs_fts_progress (indexed_rowid)
+SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM logs_fts_progress);
+
 CREATE TABLE IF NOT EXISTS experiments (
     experiment TEXT NOT NULL UNIQUE,
     created_at TEXT NOT NULL,
@@ -418,7 +446,7 @@ CREATE TABLE IF NOT EXISTS pioreactor_unit_activity_data (
 );
 
 
--- heads up: we need this specific index for to handle ON CONFLICT statements in the triggers. Don't change it.
+-- heads up: we need this specific index for to handle ON CONFLICT statements in mqtt_to_db_streaming and rebuild_activity_data. Don't change it.
 CREATE UNIQUE INDEX IF NOT EXISTS pioreactor_unit_activity_data_ix
 ON pioreactor_unit_activity_data (experiment, pioreactor_unit, timestamp);
 
@@ -441,6 +469,38 @@ FROM pioreactor_unit_activity_data
 GROUP BY experiment, pioreactor_unit, datetime(strftime('%Y-%m-%dT%H:%M:00', timestamp));
 
 
+-- downsampled chart data: one row per (source, tier, unit, channel, bucket). channel is 0 for unpartitioned sources.
+-- maintained by mqtt_to_db_streaming and rebuild_time_series_rollups, see pioreactor/utils/time_series_rollups.py
+CREATE TABLE IF NOT EXISTS time_series_rollups (
+    data_source TEXT NOT NULL,
+    bucket_seconds INTEGER NOT NULL,
+    experiment TEXT NOT NULL,
+    pioreactor_unit TEXT NOT NULL,
+    channel INTEGER NOT NULL,
+    bucket_start TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    y_sum REAL NOT NULL,
+    y_min REAL NOT NULL,
+    y_max REAL NOT NULL,
+    FOREIGN KEY (experiment) REFERENCES experiments (
+        experiment
+    ) ON DELETE CASCADE
+);
+
+-- heads up: this index is the ON CONFLICT target of the rollup upserts, and the chart query's scan. Don't change it.
+CREATE UNIQUE INDEX IF NOT EXISTS time_series_rollups_ix
+ON time_series_rollups (data_source, bucket_seconds, experiment, pioreactor_unit, channel, bucket_start);
+
+-- experiments whose rows time_series_rollups doesn't cover yet, ex: ones from before it existed. Their charts read the
+-- source tables until `pio run rebuild_time_series_rollups` backfills their rollups and removes them from here.
+CREATE TABLE IF NOT EXISTS time_series_rollups_pending (
+    experiment TEXT NOT NULL UNIQUE,
+    FOREIGN KEY (experiment) REFERENCES experiments (
+        experiment
+    ) ON DELETE CASCADE
+);
+
+
 CREATE TABLE IF NOT EXISTS calibrations (
     pioreactor_unit TEXT NOT NULL,
     created_at TEXT NOT NULL,
@@ -535,3 +595,19 @@ CREATE INDEX IF NOT EXISTS experiment_worker_assignments_history_ix
         assigned_at,
         unassigned_at
     );
+
+-- how many rows were deleted from each time-series table, counted by the count_*_deletions triggers. Deleting rows
+-- lets SQLite reuse their rowids, so the time-series routes' ETags and `since` cursors include this count.
+CREATE TABLE IF NOT EXISTS time_series_deletions (
+    data_source TEXT NOT NULL UNIQUE,
+    deletions INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO time_series_deletions (data_source, deletions)
+VALUES
+    ('growth_rates', 0),
+    ('temperature_readings', 0),
+    ('od_readings_filtered', 0),
+    ('od_readings', 0),
+    ('od_readings_fused', 0),
+    ('raw_od_readings', 0);
@@ -1,104 +1,93 @@
-CREATE TRIGGER IF NOT EXISTS update_pioreactor_unit_activity_data_from_od_readings AFTER INSERT ON od_readings
+CREATE TRIGGER IF NOT EXISTS insert_experiment_worker_assignments_history
+AFTER INSERT
+ON experiment_worker_assignments
+FOR EACH ROW
 BEGIN
-    INSERT INTO pioreactor_unit_activity_data(pioreactor_unit,experiment,timestamp,od_reading) VALUES (new.pioreactor_unit, new.experiment, new.timestamp, new.od_reading)
-    ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET od_reading=excluded.od_reading;
+    INSERT INTO experiment_worker_assignments_history (
+        pioreactor_unit,
+        experiment,
+        assigned_at
+    )
+    VALUES (
+        NEW.pioreactor_unit,
+        NEW.experiment,
+        NEW.assigned_at
+    );
 END;
 
-CREATE TRIGGER IF NOT EXISTS update_pioreactor_unit_activity_data_from_od_readings_fused AFTER INSERT ON od_readings_fused
+CREATE TRIGGER IF NOT EXISTS delete_experiment_worker_assignments_history
+AFTER DELETE
+ON experiment_worker_assignments
+FOR EACH ROW
 BEGIN
-    INSERT INTO pioreactor_unit_activity_data(pioreactor_unit,experiment,timestamp,od_fused) VALUES (new.pioreactor_unit, new.experiment, new.timestamp, new.od_reading)
-    ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET od_fused=excluded.od_fused;
+    UPDATE experiment_worker_assignments_history
+       SET unassigned_at = STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')
+     WHERE pioreactor_unit = OLD.pioreactor_unit
+       AND experiment = OLD.experiment
+       AND assigned_at = OLD.assigned_at
+       AND unassigned_at IS NULL;
 END;
 
-
-CREATE TRIGGER IF NOT EXISTS update_pioreactor_unit_activity_data_from_od_readings_filtered AFTER INSERT ON od_readings_filtered
+-- remove deleted logs from logs_fts. If the newest logs are deleted, their rowids can be reused, so the indexed
+-- watermark is lowered to the newest remaining row for the new rows to be indexed.
+CREATE TRIGGER IF NOT EXISTS delete_logs_fts
+AFTER DELETE
+ON logs
+FOR EACH ROW
+WHEN OLD.rowid <= (SELECT indexed_rowid FROM logs_fts_progress)
 BEGIN
-    INSERT INTO pioreactor_unit_activity_data(pioreactor_unit,experiment,timestamp,normalized_od_reading) VALUES (new.pioreactor_unit, new.experiment, new.timestamp, new.normalized_od_reading)
-    ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET normalized_od_reading=excluded.normalized_od_reading;
-END;
+    INSERT INTO logs_fts (logs_fts, rowid, message, task)
+    VALUES ('delete', OLD.rowid, OLD.message, OLD.task);
 
-
-CREATE TRIGGER IF NOT EXISTS update_pioreactor_unit_activity_data_from_growth_rates AFTER INSERT ON growth_rates
-BEGIN
-    INSERT INTO pioreactor_unit_activity_data(pioreactor_unit,experiment,timestamp,growth_rate) VALUES (new.pioreactor_unit, new.experiment, new.timestamp, new.rate)
-    ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET growth_rate=excluded.growth_rate;
+    UPDATE logs_fts_progress
+       SET indexed_rowid = MIN(indexed_rowid, (SELECT COALESCE(MAX(rowid), 0) FROM logs));
 END;
 
-
-CREATE TRIGGER IF NOT EXISTS update_pioreactor_unit_activity_data_from_temperature_readings AFTER INSERT ON temperature_readings
+-- see time_series_deletions in create_tables.sql. Cascading deletes, ex: of an experiment, fire these too.
+CREATE TRIGGER IF NOT EXISTS count_growth_rates_deletions
+AFTER DELETE
+ON growth_rates
+FOR EACH ROW
 BEGIN
-    INSERT INTO pioreactor_unit_activity_data(pioreactor_unit,experiment,timestamp,temperature_c) VALUES (new.pioreactor_unit, new.experiment, new.timestamp, new.temperature_c)
-    ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET temperature_c=excluded.temperature_c;
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'growth_rates';
 END;
 
-
-CREATE TRIGGER IF NOT EXISTS update_pioreactor_unit_activity_data_from_stirring_rates AFTER INSERT ON stirring_rates
+CREATE TRIGGER IF NOT EXISTS count_temperature_readings_deletions
+AFTER DELETE
+ON temperature_readings
+FOR EACH ROW
 BEGIN
-    INSERT INTO pioreactor_unit_activity_data(pioreactor_unit,experiment,timestamp,measured_rpm) VALUES (new.pioreactor_unit, new.experiment, new.timestamp, new.measured_rpm)
-    ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET measured_rpm=excluded.measured_rpm;
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'temperature_readings';
 END;
 
-
-CREATE TRIGGER IF NOT EXISTS update_pioreactor_unit_activity_data_from_led_change_events AFTER INSERT ON led_change_events
+CREATE TRIGGER IF NOT EXISTS count_od_readings_filtered_deletions
+AFTER DELETE
+ON od_readings_filtered
+FOR EACH ROW
 BEGIN
-    INSERT INTO pioreactor_unit_activity_data(pioreactor_unit, experiment, timestamp, led_A_intensity_update, led_B_intensity_update, led_C_intensity_update, led_D_intensity_update) VALUES (
-        new.pioreactor_unit, new.experiment, new.timestamp,
-        CASE WHEN new.channel = "A" THEN new.intensity END,
-        CASE WHEN new.channel = "B" THEN new.intensity END,
-        CASE WHEN new.channel = "C" THEN new.intensity END,
-        CASE WHEN new.channel = "D" THEN new.intensity END
-    )
-    ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET
-        led_A_intensity_update=COALESCE(excluded.led_A_intensity_update, pioreactor_unit_activity_data.led_A_intensity_update),
-        led_B_intensity_update=COALESCE(excluded.led_B_intensity_update, pioreactor_unit_activity_data.led_B_intensity_update),
-        led_C_intensity_update=COALESCE(excluded.led_C_intensity_update, pioreactor_unit_activity_data.led_C_intensity_update),
-        led_D_intensity_update=COALESCE(excluded.led_D_intensity_update, pioreactor_unit_activity_data.led_D_intensity_update)
-    ;
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'od_readings_filtered';
 END;
 
-
-CREATE TRIGGER IF NOT EXISTS update_pioreactor_unit_activity_data_from_dosing_events AFTER INSERT ON dosing_events
+CREATE TRIGGER IF NOT EXISTS count_od_readings_deletions
+AFTER DELETE
+ON od_readings
+FOR EACH ROW
 BEGIN
-    INSERT INTO pioreactor_unit_activity_data(pioreactor_unit, experiment, timestamp, add_media_ml, remove_waste_ml, add_alt_media_ml) VALUES (
-        new.pioreactor_unit, new.experiment, new.timestamp,
-        CASE WHEN new.event = "add_media" THEN new.volume_change_ml END,
-        CASE WHEN new.event = "remove_waste" THEN new.volume_change_ml END,
-        CASE WHEN new.event = "add_alt_media" THEN new.volume_change_ml END
-    )
-    ON CONFLICT(experiment, pioreactor_unit, timestamp) DO UPDATE SET
-        add_media_ml=COALESCE(excluded.add_media_ml, pioreactor_unit_activity_data.add_media_ml),
-        remove_waste_ml=COALESCE(excluded.remove_waste_ml, pioreactor_unit_activity_data.remove_waste_ml),
-        add_alt_media_ml=COALESCE(excluded.add_alt_media_ml, pioreactor_unit_activity_data.add_alt_media_ml)
-    ;
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'od_readings';
 END;
 
-
-CREATE TRIGGER IF NOT EXISTS insert_experiment_worker_assignments_history
-AFTER INSERT
-ON experiment_worker_assignments
+CREATE TRIGGER IF NOT EXISTS count_od_readings_fused_deletions
+AFTER DELETE
+ON od_readings_fused
 FOR EACH ROW
 BEGIN
-    INSERT INTO experiment_worker_assignments_history (
-        pioreactor_unit,
-        experiment,
-        assigned_at
-    )
-    VALUES (
-        NEW.pioreactor_unit,
-        NEW.experiment,
-        NEW.assigned_at
-    );
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'od_readings_fused';
 END;
 
-CREATE TRIGGER IF NOT EXISTS delete_experiment_worker_assignments_history
+CREATE TRIGGER IF NOT EXISTS count_raw_od_readings_deletions
 AFTER DELETE
-ON experiment_worker_assignments
+ON raw_od_readings
 FOR EACH ROW
 BEGIN
-    UPDATE experiment_worker_assignments_history
-       SET unassigned_at = STRFTIME('%Y-%m-%dT%H:%M:%fZ', 'NOW')
-     WHERE pioreactor_unit = OLD.pioreactor_unit
-       AND experiment = OLD.experiment
-       AND assigned_at = OLD.assigned_at
-       AND unassigned_at IS NULL;
+    UPDATE time_series_deletions SET deletions = deletions + 1 WHERE data_source = 'raw_od_readings';
 END;
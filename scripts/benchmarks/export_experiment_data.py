@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time experiment exports, CSV and npz, in one process and across a process pool, against a synthetic app database
+with millions of raw_od_readings rows.
+
+Examples:
+
+    # 2M rows from 4 units, exported as csv and npz with 0, 2 and 4 processes
+    python scripts/benchmarks/export_experiment_data.py
+
+    # more rows, one CSV per unit
+    python scripts/benchmarks/export_experiment_data.py --rows 5000000 --partition-by-unit --processes 0 4
+
+The database is a fresh temporary one (tables from packaging/shared-assets/sql), never the configured one, and the
+exported datasets are the built-in ones in packaging/shared-assets/pioreactor/exportable_datasets. On a leader,
+processes beyond its cores don't help.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+from pioreactor.config import config  # noqa: E402
+from pioreactor.utils.timing import current_utc_datetime  # noqa: E402
+from pioreactor.utils.timing import to_iso_format  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SHARED_SQL_DIR = REPO_ROOT / "packaging" / "shared-assets" / "sql"
+EXPORTABLE_DATASETS_DIR = REPO_ROOT / "packaging" / "shared-assets" / "pioreactor" / "exportable_datasets"
+EXPERIMENT = "benchmark_experiment"
+
+
+def create_database(path: Path, rows: int, units: int, seconds_per_reading: float) -> int:
+    # readings from channels 1 and 2 of each unit, every seconds_per_reading, ending now
+    rng = Random(0)
+    end = current_utc_datetime()
+    n_readings = rows // (2 * units)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
+    conn.execute(
+        "INSERT INTO experiments (experiment, created_at) VALUES (?, ?)",
+        (EXPERIMENT, to_iso_format(end - timedelta(seconds=seconds_per_reading * n_readings))),
+    )
+    for i in range(units):
+        for j in range(0, n_readings, 10_000):
+            timestamps = [
+                to_iso_format(end - timedelta(seconds=seconds_per_reading * (n_readings - k)))
+                for k in range(j, min(j + 10_000, n_readings))
+            ]
+            conn.executemany(
+                "INSERT INTO raw_od_readings (experiment, pioreactor_unit, timestamp, od_reading, channel) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (EXPERIMENT, f"unit{i}", timestamp, rng.uniform(0.001, 0.2), channel)
+                    for timestamp in timestamps
+                    for channel in (1, 2)
+                ),
+            )
+    conn.commit()
+    conn.close()
+    return 2 * units * n_readings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--units", type=int, default=4)
+    parser.add_argument("--seconds-per-reading", type=float, default=5.0)
+    parser.add_argument("--datasets", nargs="+", default=["raw_od_readings"])
+    parser.add_argument("--formats", nargs="+", choices=["csv", "npz"], default=["csv", "npz"])
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--partition-by-unit", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Path(tmp) / "benchmark.sqlite"
+        start = perf_counter()
+        rows = create_database(database, args.rows, args.units, args.seconds_per_reading)
+        print(f"  created {rows} rows in {perf_counter() - start:.1f} s")
+        config["storage"]["database"] = str(database)
+
+        # in a test environment, exportable datasets are read from ./.pioreactor
+        (Path(tmp) / ".pioreactor").mkdir()
+        (Path(tmp) / ".pioreactor" / "exportable_datasets").symlink_to(EXPORTABLE_DATASETS_DIR)
+        os.chdir(tmp)
+
+        from pioreactor.actions.leader.export_experiment_data import export_experiment_data
+
+        for output_format in args.formats:
+            for processes in args.processes:
+                output = Path(tmp) / f"export-{output_format}-{processes}.zip"
+                start = perf_counter()
+                export_experiment_data(
+                    EXPERIMENT,
+                    args.datasets,
+                    output.as_posix(),
+                    partition_by_unit=args.partition_by_unit,
+                    output_format=output_format,
+                    processes=processes,
+                )
+                duration = perf_counter() - start
+                with zipfile.ZipFile(output) as zf:
+                    n_files = sum(1 for name in zf.namelist() if name.endswith(f".{output_format}"))
+                print(
+                    f"  {output_format:>3}, {processes} processes: {duration:6.1f} s, "
+                    f"{rows / duration:9.0f} rows/s, {output.stat().st_size / 1e6:6.1f} MB in {n_files} files"
+                )
+                output.unlink()
+
+
+if __name__ == "__main__":
+    main()
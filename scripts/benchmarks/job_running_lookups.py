@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time `is_pio_job_running`-style lookups: a new JobManager per check (what is_pio_job_running did) against the
+memory-mapped running_jobs snapshot that JobManager keeps next to the temporary_cache.
+
+Examples:
+
+    # 10000 checks, against the temporary_cache in config.ini
+    python scripts/benchmarks/job_running_lookups.py
+
+    # more jobs registered as running
+    python scripts/benchmarks/job_running_lookups.py --jobs 50 --checks 50000
+
+The jobs registered for the run are removed at the end.
+"""
+import argparse
+import os
+from statistics import median
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+from pioreactor.utils.job_manager import JobManager  # noqa: E402
+from pioreactor.utils.job_manager import running_jobs  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--jobs", type=int, default=5, help="jobs registered as running")
+    parser.add_argument("--checks", type=int, default=10000)
+    args = parser.parse_args()
+
+    with JobManager() as jm:
+        job_ids = [
+            jm.register_and_set_running(
+                "benchmark_unit",
+                "benchmark_experiment",
+                f"benchmark_job{i}",
+                "benchmark",
+                os.getpid(),
+                "leader",
+                False,
+            )
+            for i in range(args.jobs)
+        ]
+
+    def new_job_manager_per_check(job_name: str) -> bool:
+        with JobManager() as jm:
+            return jm.is_job_running(job_name)
+
+    print(f"{args.checks} checks, {args.jobs} jobs running")
+    try:
+        for name, n, is_running in [
+            # opening the database is slow, so it gets fewer checks
+            ("new JobManager per check", max(1, args.checks // 20), new_job_manager_per_check),
+            ("running_jobs snapshot", args.checks, running_jobs.is_job_running),
+        ]:
+            latencies = []
+            for i in range(n):
+                start = perf_counter()
+                assert is_running(f"benchmark_job{i % args.jobs}")
+                latencies.append(perf_counter() - start)
+            print(f"  {name:>26}: median {1e6 * median(latencies):8.1f} us per check")
+    finally:
+        with JobManager() as jm:
+            for job_id in job_ids:
+                jm.remove_job(job_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time the database side of publishing job settings: a new JobManager per upsert (what _publish_setting did) against
+the per-process settings_writer, which coalesces upserts and writes them from a background thread.
+
+Examples:
+
+    # 2000 changes spread over 10 settings, against the temporary_cache in config.ini
+    python scripts/benchmarks/job_settings_writer.py
+
+    # more settings per job
+    python scripts/benchmarks/job_settings_writer.py --settings 50 --changes 5000
+
+A job row is registered for the run and removed at the end.
+"""
+import argparse
+import os
+from statistics import median
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+from pioreactor.utils.job_manager import JobManager  # noqa: E402
+from pioreactor.utils.job_manager import settings_writer  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--settings", type=int, default=10, help="distinct settings the job publishes")
+    parser.add_argument("--changes", type=int, default=2000)
+    args = parser.parse_args()
+
+    with JobManager() as jm:
+        job_id = jm.register_and_set_running(
+            "benchmark_unit",
+            "benchmark_experiment",
+            "benchmark_job",
+            "benchmark",
+            os.getpid(),
+            "leader",
+            False,
+        )
+
+    def new_job_manager_per_upsert(setting: str, value: float) -> None:
+        with JobManager() as jm:
+            jm.upsert_setting(job_id, setting, value)
+
+    def settings_writer_upsert(setting: str, value: float) -> None:
+        settings_writer.upsert_setting(job_id, setting, value)
+
+    print(f"{args.changes} changes to {args.settings} settings")
+    try:
+        for name, upsert in [
+            ("new JobManager per upsert", new_job_manager_per_upsert),
+            ("settings_writer", settings_writer_upsert),
+        ]:
+            latencies = []
+            start = perf_counter()
+            for i in range(args.changes):
+                call_start = perf_counter()
+                upsert(f"setting{i % args.settings}", float(i))
+                latencies.append(perf_counter() - call_start)
+            settings_writer.flush()
+            total = perf_counter() - start
+            print(
+                f"  {name:>26}: median {1e6 * median(latencies):8.1f} us per change, "
+                f"total {total:.2f} s including the final flush"
+            )
+    finally:
+        with JobManager() as jm:
+            jm.remove_job(job_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Count broker connections and time publishes for a busy process: a new client per call (what pubsub.publish and
+pubsub.subscribe did) against the process's shared connection, see pubsub.ConnectionMultiplexer.
+
+Examples:
+
+    # 500 publishes and 50 subscribe-and-waits, against the broker in config.ini
+    python scripts/benchmarks/mqtt_connections.py
+
+    # more load
+    python scripts/benchmarks/mqtt_connections.py --publishes 5000 --subscribes 200
+
+Needs a running MQTT broker. Messages are published, not retained, under the _testing_experiment experiment.
+"""
+import argparse
+import os
+import socket
+from statistics import median
+from statistics import quantiles
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+from pioreactor import pubsub  # noqa: E402
+from pioreactor.whoami import get_unit_name  # noqa: E402
+
+connections = 0
+_create_connection = socket.create_connection
+
+
+def counting_create_connection(*args, **kwargs):  # type: ignore
+    global connections
+    connections += 1
+    return _create_connection(*args, **kwargs)
+
+
+# paho opens its TCP connections through socket.create_connection
+socket.create_connection = counting_create_connection
+
+
+def publish_on_new_client(topic: str, message: str) -> None:
+    with pubsub.create_client() as client:
+        msg = client.publish(topic, message, qos=pubsub.QOS.EXACTLY_ONCE)
+        msg.wait_for_publish(timeout=10)
+
+
+def publish_on_shared_connection(topic: str, message: str) -> None:
+    pubsub.publish(topic, message, qos=pubsub.QOS.EXACTLY_ONCE)
+
+
+def subscribe_on_new_client(topic: str, message: str) -> None:
+    pubsub._subscribe_on_new_client(topic, 5, True, pubsub.QOS.EXACTLY_ONCE)
+
+
+def subscribe_on_shared_connection(topic: str, message: str) -> None:
+    pubsub.subscribe(topic, timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--publishes", type=int, default=500)
+    parser.add_argument("--subscribes", type=int, default=50)
+    args = parser.parse_args()
+
+    global connections
+    topic = f"pioreactor/{get_unit_name()}/_testing_experiment/benchmark_job"
+    # the subscribes wait on this retained message
+    pubsub.publish(f"{topic}/retained", "1", retain=True)
+
+    for name, n, call in [
+        ("publish, new client per call", args.publishes, publish_on_new_client),
+        ("publish, shared connection", args.publishes, publish_on_shared_connection),
+        ("subscribe, new client per call", args.subscribes, subscribe_on_new_client),
+        ("subscribe, shared connection", args.subscribes, subscribe_on_shared_connection),
+    ]:
+        connections = 0
+        latencies = []
+        for i in range(n):
+            start = perf_counter()
+            call(f"{topic}/retained" if "subscribe" in name else f"{topic}/value", str(i))
+            latencies.append(perf_counter() - start)
+        p99 = quantiles(latencies, n=100)[98] if n > 1 else latencies[0]
+        print(
+            f"  {name:>30}: {n:5d} calls, {connections:5d} connections, "
+            f"median {1e3 * median(latencies):7.2f} ms, p99 {1e3 * p99:7.2f} ms"
+        )
+
+    pubsub.publish(f"{topic}/retained", None, retain=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Record, synthesize, and replay MQTT streams against mqtt_to_db_streaming to find its max sustainable ingest rate.
+
+Examples:
+
+    # record 10 minutes of a real cluster (run on the leader)
+    python scripts/benchmarks/mqtt_to_db_streaming_replay.py record stream.jsonl --duration 600
+
+    # or make a synthetic stream: 30 units, od + raw od + fused + growth + temperature + pwm + logs
+    python scripts/benchmarks/mqtt_to_db_streaming_replay.py synthesize stream.jsonl --units 30
+
+    # replay at increasing rates, once parsing in-thread and once with 2 parser processes
+    python scripts/benchmarks/mqtt_to_db_streaming_replay.py replay stream.jsonl --parser-processes 0 2
+
+Replay writes into a fresh temporary database (tables and triggers from packaging/shared-assets/sql), never the
+configured one. A rate is sustainable if every row lands within --max-lag-s of the last publish.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+from itertools import cycle
+from itertools import islice
+from pathlib import Path
+from random import Random
+from time import monotonic
+from time import sleep
+from typing import Any
+from typing import NamedTuple
+
+from paho.mqtt.client import topic_matches_sub
+from paho.mqtt.enums import MQTTErrorCode
+from pioreactor import structs
+from pioreactor.background_jobs.leader import mqtt_to_db_streaming as m2db
+from pioreactor.config import config
+from pioreactor.pubsub import create_client
+from pioreactor.pubsub import QOS
+from pioreactor.utils.timing import current_utc_datetime
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SHARED_SQL_DIR = REPO_ROOT / "packaging" / "shared-assets" / "sql"
+
+
+class Message(NamedTuple):
+    t: float
+    topic: str
+    payload: bytes
+
+
+class ReplayResult(NamedTuple):
+    target_rate: float
+    published: int
+    expected_rows: int
+    landed_rows: int
+    publish_rate: float
+    ingest_rate: float
+    lag_s: float
+
+    @property
+    def sustainable(self) -> bool:
+        return self.landed_rows >= self.expected_rows
+
+
+class BenchmarkStreamer(m2db.MqttToDBStreamer):
+    # don't collide with (or show up as) the leader's real mqtt_to_db_streaming
+    job_name = "mqtt_to_db_streaming_benchmark"
+
+
+def read_stream(path: Path) -> list[Message]:
+    messages = []
+    with path.open() as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                messages.append(Message(record["t"], record["topic"], record["payload"].encode()))
+    return messages
+
+
+def write_stream(path: Path, messages: list[Message]) -> None:
+    with path.open("w") as f:
+        for message in messages:
+            f.write(
+                json.dumps(
+                    {"t": round(message.t, 4), "topic": message.topic, "payload": message.payload.decode()}
+                )
+                + "\n"
+            )
+
+
+def default_source_to_sinks() -> list[m2db.TopicToParserToTable]:
+    # add_default_source_to_sinks appends to a module-level registry, so reset it first.
+    m2db.source_to_sinks.clear()
+    return list(m2db.add_default_source_to_sinks())
+
+
+def subscribed_topics() -> list[str]:
+    topics: list[str] = []
+    for source_to_sink in default_source_to_sinks():
+        topics.extend(
+            [source_to_sink.topic] if isinstance(source_to_sink.topic, str) else source_to_sink.topic
+        )
+    return topics
+
+
+def record(args: argparse.Namespace) -> None:
+    messages: list[Message] = []
+    lock = threading.Lock()
+    start = monotonic()
+
+    def on_message(client: Any, userdata: Any, message: Any) -> None:
+        if message.retain or not message.payload:
+            return
+        with lock:
+            messages.append(Message(monotonic() - start, message.topic, bytes(message.payload)))
+
+    with create_client(client_id="mqtt_to_db_streaming_recorder", on_message=on_message) as client:
+        client.subscribe([(topic, QOS.EXACTLY_ONCE) for topic in subscribed_topics()])
+        sleep(args.duration)
+
+    write_stream(args.output, messages)
+    print(f"Recorded {len(messages)} messages ({len(messages) / args.duration:.1f}/s) to {args.output}")
+
+
+def synthesize(args: argparse.Namespace) -> None:
+    rng = Random(args.seed)
+    messages: list[Message] = []
+    experiment = "replay_benchmark"
+
+    for unit_index in range(args.units):
+        unit = f"pio{unit_index:02d}"
+        offset = rng.random() * args.od_interval_s
+        for i in range(int(args.duration / args.od_interval_s)):
+            t = offset + i * args.od_interval_s
+            ts = current_utc_datetime()
+            prefix = f"pioreactor/{unit}/{experiment}"
+            for channel in ("1", "2"):
+                od = 0.05 + rng.random() * 0.01
+                raw = structs.RawODReading(
+                    timestamp=ts, angle="90", od=od, channel=channel, ir_led_intensity=70.0  # type: ignore[arg-type]
+                )
+                messages.append(Message(t, f"{prefix}/od_reading/od{channel}", str(raw).encode()))
+                messages.append(Message(t, f"{prefix}/od_reading/raw_od{channel}", str(raw).encode()))
+            messages.append(
+                Message(
+                    t,
+                    f"{prefix}/od_reading/od_fused",
+                    str(structs.ODFused(od_fused=0.5, timestamp=ts)).encode(),
+                )
+            )
+            messages.append(
+                Message(
+                    t + 0.1,
+                    f"{prefix}/growth_rate_calculating/growth_rate",
+                    str(structs.GrowthRate(growth_rate=0.2, timestamp=ts)).encode(),
+                )
+            )
+            messages.append(
+                Message(
+                    t + 0.1,
+                    f"{prefix}/growth_rate_calculating/od_filtered",
+                    str(structs.ODFiltered(od_filtered=1.1, timestamp=ts)).encode(),
+                )
+            )
+            if i % 3 == 0:
+                messages.append(
+                    Message(
+                        t + 0.2,
+                        f"{prefix}/temperature_automation/temperature",
+                        str(structs.Temperature(timestamp=ts, temperature=30.0)).encode(),
+                    )
+                )
+                messages.append(Message(t + 0.2, f"{prefix}/pwms/dc", b'{"17": 35.0, "18": 12.5}'))
+            log = structs.Log(
+                message=f"Synthetic log line {i}",
+                level="DEBUG",
+                task="od_reading",
+                source="app",
+                timestamp=ts,
+            )
+            messages.append(Message(t + 0.3, f"{prefix}/logs/app", str(log).encode()))
+
+    messages.sort(key=lambda m: m.t)
+    write_stream(args.output, messages)
+    print(f"Synthesized {len(messages)} messages ({len(messages) / args.duration:.1f}/s) to {args.output}")
+
+
+def create_database(path: Path) -> None:
+    with sqlite3.connect(path) as connection:
+        connection.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
+        connection.executescript((SHARED_SQL_DIR / "create_triggers.sql").read_text())
+
+
+def count_rows(path: Path, tables: set[str]) -> int:
+    with sqlite3.connect(path) as connection:
+        return sum(connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables)
+
+
+def expected_rows_per_message(messages: list[Message]) -> list[int]:
+    parsers = [
+        (
+            source_to_sink,
+            [source_to_sink.topic] if isinstance(source_to_sink.topic, str) else source_to_sink.topic,
+        )
+        for source_to_sink in default_source_to_sinks()
+    ]
+    counts = []
+    for message in messages:
+        n = 0
+        for source_to_sink, topics in parsers:
+            if any(topic_matches_sub(topic, message.topic) for topic in topics):
+                rows = source_to_sink.parser(message.topic, message.payload)
+                n += 0 if rows is None else (len(rows) if isinstance(rows, list) else 1)
+        counts.append(n)
+    return counts
+
+
+def replay_at_rate(
+    messages: list[Message],
+    rows_per_message: list[int],
+    target_rate: float,
+    n_messages: int,
+    parser_processes: int,
+    qos: int,
+    max_lag_s: float,
+    workdir: Path,
+) -> ReplayResult:
+    db_path = workdir / f"replay_{parser_processes}_{int(target_rate)}.sqlite"
+    create_database(db_path)
+    config["storage"]["database"] = str(db_path)
+
+    source_to_sinks = default_source_to_sinks()
+    tables = {source_to_sink.table for source_to_sink in source_to_sinks}
+
+    indexes = list(islice(cycle(range(len(messages))), n_messages))
+    expected_rows = sum(rows_per_message[i] for i in indexes)
+
+    with BenchmarkStreamer(
+        "benchmark", m2db.UNIVERSAL_EXPERIMENT, source_to_sinks, parser_processes=parser_processes
+    ):
+        sleep(2)  # let subscriptions (and any parser processes) come up
+        with create_client(client_id="mqtt_to_db_streaming_replayer", max_connection_attempts=3) as client:
+            start = monotonic()
+            for k, i in enumerate(indexes):
+                # pace to the target rate, catching up in bursts if we fall behind
+                delay = start + k / target_rate - monotonic()
+                if delay > 0:
+                    sleep(delay)
+                while (
+                    client.publish(messages[i].topic, messages[i].payload, qos=qos).rc
+                    == MQTTErrorCode.MQTT_ERR_QUEUE_SIZE
+                ):
+                    # client's outgoing queue is full, that's backpressure from the broker/subscriber.
+                    sleep(0.001)
+            published_at = monotonic()
+            publish_rate = n_messages / max(published_at - start, 1e-6)
+
+            landed = 0
+            while monotonic() - published_at < max_lag_s:
+                landed = count_rows(db_path, tables)
+                if landed >= expected_rows:
+                    break
+                sleep(0.05)
+            finished_at = monotonic()
+
+    return ReplayResult(
+        target_rate,
+        n_messages,
+        expected_rows,
+        landed,
+        publish_rate,
+        n_messages / max(finished_at - start, 1e-6),
+        finished_at - published_at,
+    )
+
+
+def replay(args: argparse.Namespace) -> None:
+    messages = [m for m in read_stream(args.stream) if "/_testing_" not in m.topic]
+    if not messages:
+        sys.exit(f"No replayable messages in {args.stream}")
+
+    rows_per_message = expected_rows_per_message(messages)
+    print(f"Replaying {len(messages)} distinct messages from {args.stream}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for parser_processes in args.parser_processes:
+            print(f"\nparser_processes={parser_processes}")
+            print(f"{'target/s':>10} {'publish/s':>10} {'ingest/s':>10} {'rows':>14} {'lag s':>7}")
+            best = 0.0
+            rate = args.start_rate
+            while rate <= args.max_rate:
+                n_messages = max(int(rate * args.seconds_per_step), 1)
+                result = replay_at_rate(
+                    messages,
+                    rows_per_message,
+                    rate,
+                    n_messages,
+                    parser_processes,
+                    args.qos,
+                    args.max_lag_s,
+                    Path(tmp),
+                )
+                print(
+                    f"{result.target_rate:>10.0f} {result.publish_rate:>10.0f} {result.ingest_rate:>10.0f} "
+                    f"{result.landed_rows:>6}/{result.expected_rows:<7} {result.lag_s:>7.2f}"
+                )
+                if not result.sustainable or result.publish_rate < 0.9 * rate:
+                    # either ingest fell behind, or this host can't even publish this fast.
+                    break
+                best = rate
+                rate *= args.step_factor
+
+            print(f"max sustainable messages/sec (parser_processes={parser_processes}): {best:.0f}")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record the topics mqtt_to_db_streaming listens to.")
+    record_parser.add_argument("output", type=Path)
+    record_parser.add_argument("--duration", type=float, default=300.0, help="Seconds to record.")
+    record_parser.set_defaults(func=record)
+
+    synth_parser = subparsers.add_parser("synthesize", help="Generate a synthetic cluster stream.")
+    synth_parser.add_argument("output", type=Path)
+    synth_parser.add_argument("--units", type=int, default=30)
+    synth_parser.add_argument("--duration", type=float, default=60.0, help="Seconds of cluster activity.")
+    synth_parser.add_argument("--od-interval-s", type=float, default=5.0)
+    synth_parser.add_argument("--seed", type=int, default=0)
+    synth_parser.set_defaults(func=synthesize)
+
+    replay_parser = subparsers.add_parser("replay", help="Replay a stream at increasing rates.")
+    replay_parser.add_argument("stream", type=Path)
+    replay_parser.add_argument("--parser-processes", type=int, nargs="+", default=[0])
+    replay_parser.add_argument(
+        "--start-rate", type=float, default=100.0, help="Messages/sec of the first step."
+    )
+    replay_parser.add_argument("--max-rate", type=float, default=20_000.0)
+    replay_parser.add_argument("--step-factor", type=float, default=1.5)
+    replay_parser.add_argument("--seconds-per-step", type=float, default=5.0)
+    replay_parser.add_argument("--max-lag-s", type=float, default=2.0)
+    replay_parser.add_argument("--qos", type=int, default=QOS.EXACTLY_ONCE, choices=[0, 1, 2])
+    replay_parser.set_defaults(func=replay)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time a leader multicast GET against N stub workers: one request per worker in sequence (what a Huey consumer with
+a single worker thread ends up doing, without the queue round-trips) against the in-process fan-out that
+multicast_get now uses.
+
+Examples:
+
+    # 40 workers that each take 20ms to answer
+    python scripts/benchmarks/multicast_get.py
+
+    # a bigger cluster, with slower workers
+    python scripts/benchmarks/multicast_get.py --workers 100 --latency-ms 50 --rounds 10
+
+Each stub worker is an HTTP server on its own loopback address (127.0.0.2, 127.0.0.3, ...), all on the same port,
+answering /unit_api/jobs/running with a small JSON payload.
+"""
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from statistics import median
+from time import perf_counter
+from time import sleep
+
+os.environ.setdefault("TESTING", "1")
+
+from pioreactor.config import config  # noqa: E402
+from pioreactor.web import tasks  # noqa: E402
+
+ENDPOINT = "/unit_api/jobs/running"
+
+
+def start_stub_workers(n: int, port: int, latency_s: float) -> list[ThreadingHTTPServer]:
+    body = json.dumps([{"job_name": "od_reading", "pid": 123}]).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        wbufsize = 64 * 1024  # headers and body in one write, so Nagle doesn't hold back the body
+
+        def do_GET(self) -> None:
+            sleep(latency_s)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    servers = []
+    for i in range(n):
+        server = ThreadingHTTPServer((f"127.0.0.{i + 2}", port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workers", type=int, default=40)
+    parser.add_argument(
+        "--latency-ms", type=float, default=20.0, help="time each stub worker takes to answer"
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--port", type=int, default=18080)
+    args = parser.parse_args()
+
+    servers = start_stub_workers(args.workers, args.port, args.latency_ms / 1000)
+    units = [f"stub{i}" for i in range(args.workers)]
+
+    config.set("ui", "port", str(args.port))
+    if not config.has_section("cluster.addresses"):
+        config.add_section("cluster.addresses")
+    for i, unit in enumerate(units):
+        config.set("cluster.addresses", unit, f"127.0.0.{i + 2}")
+
+    def sequential() -> dict:
+        return dict(tasks._get_from_unit(unit, ENDPOINT) for unit in units)
+
+    def fanout() -> dict:
+        return tasks._multicast_get_uncached(ENDPOINT, units)
+
+    print(f"{args.workers} stub workers, {args.latency_ms:.0f} ms each, median of {args.rounds} rounds")
+    for name, run in [("sequential", sequential), ("in-process fan-out", fanout)]:
+        results = run()  # warm up
+        failed = [unit for unit, result in results.items() if not tasks.fanout_result_succeeded(result)]
+        if failed:
+            raise SystemExit(f"{name}: no answer from {failed}")
+
+        times = []
+        for _ in range(args.rounds):
+            start = perf_counter()
+            run()
+            times.append(perf_counter() - start)
+        print(f"  {name:>20}: {1e3 * median(times):8.1f} ms")
+
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time a loop of leader GETs through pubsub.get_from_leader, with and without mureq's keep-alive connection pool.
+
+Examples:
+
+    # 1000 GETs against a local stand-in for the leader's web server
+    python scripts/benchmarks/mureq_keep_alive.py
+
+    # against a real leader (only GET, so it's safe to point at a running cluster)
+    python scripts/benchmarks/mureq_keep_alive.py --leader pioreactor.local --port 80 --endpoint /unit_api/versions/app
+
+The local server answers every path with a small JSON payload, over HTTP/1.1.
+"""
+import argparse
+import os
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from statistics import median
+from statistics import quantiles
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+from pioreactor import mureq  # noqa: E402
+from pioreactor import pubsub  # noqa: E402
+from pioreactor.config import config  # noqa: E402
+
+
+def start_local_leader() -> ThreadingHTTPServer:
+    body = b'{"experiment": "exp1", "is_active": true}'
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 64 * 1024  # headers and body in one write, so Nagle doesn't hold back the body
+
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--leader", help="leader address; defaults to a local server")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--endpoint", default="/api/experiments/assigned")
+    args = parser.parse_args()
+
+    server = None
+    if args.leader is None:
+        server = start_local_leader()
+        leader, port = server.server_address[0], server.server_address[1]
+    else:
+        leader, port = args.leader, args.port or config.getint("ui", "port", fallback=80)
+    config.set("ui", "port", str(port))
+
+    print(f"{args.requests} GETs of {args.endpoint} from {leader}:{port}")
+    for name, keep_alive in [("new connection per request", False), ("keep-alive pool", True)]:
+        mureq._pool.clear()
+        latencies = []
+        for _ in range(args.requests):
+            start = perf_counter()
+            pubsub.get_from(str(leader), args.endpoint, keep_alive=keep_alive).raise_for_status()
+            latencies.append(perf_counter() - start)
+        p99 = quantiles(latencies, n=100)[98]
+        print(
+            f"  {name:>26}: median {1e6 * median(latencies):7.0f} us, p99 {1e6 * p99:7.0f} us, "
+            f"total {sum(latencies):.2f} s"
+        )
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
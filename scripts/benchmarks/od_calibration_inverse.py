@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time converting voltages to OD with a calibration: y_to_x (what od_reading did for every reading), against a
+CalibrationInverse built once (what od_reading does now), and y_to_x_many for a whole series at once.
+
+Examples:
+
+    # 10000 voltages, for a poly, a spline and an akima calibration fit to the same synthetic data
+    python scripts/benchmarks/od_calibration_inverse.py
+
+    # more voltages, for calibrations from fewer recorded points
+    python scripts/benchmarks/od_calibration_inverse.py --voltages 50000 --recorded-points 6
+
+Also checks that the three agree.
+"""
+import argparse
+import os
+from datetime import datetime
+from datetime import timezone
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+import numpy as np  # noqa: E402
+from pioreactor import structs  # noqa: E402
+from pioreactor.utils.akimas import akima_fit  # noqa: E402
+from pioreactor.utils.calibration_inverses import CalibrationInverse  # noqa: E402
+from pioreactor.utils.polys import poly_fit  # noqa: E402
+from pioreactor.utils.splines import spline_fit  # noqa: E402
+
+
+def make_calibration(
+    curve_data: structs.CalibrationCurveData, od: list[float], voltage: list[float]
+) -> structs.ODCalibration:
+    return structs.ODCalibration(
+        calibration_name="benchmark_calibration",
+        calibrated_on_pioreactor_unit="benchmark_unit",
+        created_at=datetime.now(timezone.utc),
+        curve_data_=curve_data,
+        recorded_data={"x": od, "y": voltage},
+        ir_led_intensity=80.0,
+        angle="90",
+        pd_channel="2",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--voltages", type=int, default=10000)
+    parser.add_argument("--recorded-points", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    od = np.linspace(0.0, 2.0, args.recorded_points)
+    voltage = 0.02 + 0.8 * od - 0.15 * od**2 + rng.normal(0, 0.005, od.size)
+    # readings the calibrations can convert: their voltages at ODs within the recorded range
+    ods = rng.uniform(0.01, 1.99, args.voltages).tolist()
+
+    for name, curve_data in [
+        ("poly", poly_fit(od, voltage, degree=3)),
+        ("spline", spline_fit(od, voltage, knots=4)),
+        ("akima", akima_fit(od, voltage)),
+    ]:
+        calibration = make_calibration(curve_data, od.tolist(), voltage.tolist())
+        voltages = [calibration.x_to_y(x) for x in ods]
+
+        start = perf_counter()
+        solved = [calibration.y_to_x(v, enforce_bounds=True) for v in voltages]
+        solve_duration = perf_counter() - start
+
+        start = perf_counter()
+        inverse = CalibrationInverse(calibration)
+        build_duration = perf_counter() - start
+        assert inverse.is_tabulated, f"{name} calibration isn't monotone"
+
+        start = perf_counter()
+        looked_up = [inverse.y_to_x(v, enforce_bounds=True) for v in voltages]
+        lookup_duration = perf_counter() - start
+
+        start = perf_counter()
+        many = inverse.y_to_x_many(voltages, enforce_bounds=True)
+        many_duration = perf_counter() - start
+
+        max_difference = max(np.max(np.abs(np.subtract(solved, looked_up))), np.max(np.abs(solved - many)))
+        n = len(voltages)
+        print(
+            f"  {name:>6}: y_to_x {1e6 * solve_duration / n:7.1f} us, "
+            f"inverse {1e6 * lookup_duration / n:5.1f} us (built in {1e3 * build_duration:.1f} ms), "
+            f"y_to_x_many {1e6 * many_duration / n:5.2f} us per voltage; max difference {max_difference:.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare the per-reading time of compute_fused_od against FusionEvaluator, which CachedEstimatorTransformer builds once
+at hydrate time.
+
+Examples:
+
+    # estimator fit to instrument 1 of the bundled angle dataset
+    python scripts/benchmarks/od_fusion_evaluator.py
+
+    # or an estimator saved on a Pioreactor
+    python scripts/benchmarks/od_fusion_evaluator.py --estimator ~/.pioreactor/storage/estimators/od_fused/my_estimator.yaml
+
+Readings are sampled around the estimator's own curves, with multiplicative noise. Both paths are checked to agree
+before timing.
+"""
+import argparse
+import csv
+import math
+import random
+from pathlib import Path
+from time import perf_counter
+
+from msgspec.yaml import decode as yaml_decode
+from pioreactor import structs
+from pioreactor.utils.akimas import akima_eval
+from pioreactor.utils.od_fusion import compute_fused_od
+from pioreactor.utils.od_fusion import fit_fusion_model
+from pioreactor.utils.od_fusion import FUSION_ANGLES
+from pioreactor.utils.od_fusion import FusionEvaluator
+from pioreactor.utils.timing import current_utc_datetime
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+ANGLE_DATASET = REPO_ROOT / "core" / "tests" / "data" / "od_angle_dataset_original.csv"
+
+
+def estimator_from_dataset(instrument: str) -> structs.ODFusionEstimator:
+    records = []
+    with ANGLE_DATASET.open(newline="") as handle:
+        for row in csv.DictReader(handle):
+            if row["instrument_number"] != instrument or row["angle"] not in FUSION_ANGLES:
+                continue
+            concentration, reading = float(row["concentration_mg_ml"]), float(row["od_reading"])
+            if concentration > 0 and reading > 0:
+                records.append((row["angle"], concentration, reading))
+
+    fit = fit_fusion_model(records)  # type: ignore
+    return structs.ODFusionEstimator(
+        created_at=current_utc_datetime(),
+        calibrated_on_pioreactor_unit="benchmark",
+        estimator_name=f"instrument_{instrument}",
+        recorded_data=fit.recorded_data,
+        ir_led_intensity=80.0,
+        angles=list(FUSION_ANGLES),
+        mu_splines=fit.mu_splines,
+        sigma_splines_log=fit.sigma_splines_log,
+        min_logc=fit.min_logc,
+        max_logc=fit.max_logc,
+        sigma_floor=fit.sigma_floor,
+        low_conc_scales=fit.low_conc_scales,
+    )
+
+
+def sample_readings(estimator: structs.ODFusionEstimator, n: int, noise: float, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    readings = []
+    for _ in range(n):
+        logc = rng.uniform(estimator.min_logc, estimator.max_logc)
+        readings.append(
+            {
+                angle: math.exp(akima_eval(estimator.mu_splines[angle], logc) + rng.gauss(0, noise))
+                for angle in estimator.angles
+            }
+        )
+    return readings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--estimator", type=Path, help="estimator YAML; defaults to a fit of the bundled dataset"
+    )
+    parser.add_argument("--instrument", default="1", help="instrument of the bundled dataset to fit")
+    parser.add_argument("--readings", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=0.05, help="sd of the log-reading noise")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.estimator:
+        estimator = yaml_decode(args.estimator.read_bytes(), type=structs.ODFusionEstimator)
+    else:
+        estimator = estimator_from_dataset(args.instrument)
+    readings = sample_readings(estimator, args.readings, args.noise, args.seed)
+
+    start = perf_counter()
+    fuse = FusionEvaluator(estimator)
+    hydrate_time = perf_counter() - start
+
+    max_relative_difference = max(
+        abs(fuse(r) - compute_fused_od(estimator, r)) / compute_fused_od(estimator, r) for r in readings[:100]
+    )
+
+    start = perf_counter()
+    for r in readings:
+        compute_fused_od(estimator, r)
+    legacy = perf_counter() - start
+
+    start = perf_counter()
+    for r in readings:
+        fuse(r)
+    evaluator = perf_counter() - start
+
+    print(f"{estimator.estimator_name}: {len(estimator.angles)} angles, {args.readings} readings")
+    print(f"  compute_fused_od: {1e3 * legacy / args.readings:8.3f} ms / reading")
+    print(
+        f"  FusionEvaluator:  {1e3 * evaluator / args.readings:8.3f} ms / reading   "
+        f"({legacy / evaluator:.1f}x, {1e3 * hydrate_time:.1f} ms to build)"
+    )
+    print(f"  max relative difference: {max_relative_difference:.2e}")
+
+
+if __name__ == "__main__":
+    main()
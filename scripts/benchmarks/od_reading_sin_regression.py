@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare the per-read CPU time of ADCReader's post-processing: the old per-channel sinusoid regression against the
+batched, vectorized one that take_reading now uses.
+
+Examples:
+
+    # 4 PD channels, 40 samples per read (the default od_reading settings)
+    python scripts/benchmarks/od_reading_sin_regression.py
+
+    # heavier oversampling, as on a fast ADC
+    python scripts/benchmarks/od_reading_sin_regression.py --channels 4 --oversampling-count 200 --reads 2000
+
+Samples come from Mock_ADC, so run this with TESTING=1 (no hardware is touched). Sampling is done once, up front,
+and only the regression is timed. Both paths are checked to agree before timing.
+"""
+import argparse
+import math
+import os
+import random
+from time import process_time
+from typing import NamedTuple
+
+os.environ.setdefault("TESTING", "1")
+
+import numpy as np  # noqa: E402
+from pioreactor.background_jobs.od_reading import ADCReader  # noqa: E402
+from pioreactor.utils.mock import Mock_ADC  # noqa: E402
+
+
+class Read(NamedTuple):
+    timestamps: list[list[float]]
+    signals: list[list[float]]
+    prior_C: list[float | None]
+
+
+def legacy_sin_regression_with_known_freq(
+    x: list[float],
+    y: list[float],
+    freq: float,
+    prior_C: float | None = None,
+    penalizer_C: float | None = 0,
+) -> tuple[tuple[float, float | None, float | None], float]:
+    """The per-channel regression take_reading used before batching, kept here as the baseline."""
+    y, removed_indices = ADCReader._trim_extrema(y)
+    x = [v for i, v in enumerate(x) if i not in removed_indices]
+
+    x_ = np.asarray(x)
+    y_ = np.asarray(y)
+    n = x_.shape[0]
+
+    tau = 2 * np.pi
+    sin_x = np.sin(freq * tau * x_)
+    cos_x = np.cos(freq * tau * x_)
+
+    rhs_penalty_term = 0.0
+    lhs_penalty_term = 0.0
+    if prior_C and penalizer_C:
+        rhs_penalty_term = penalizer_C * prior_C
+        lhs_penalty_term = penalizer_C
+
+    M = np.array(
+        [
+            [n + lhs_penalty_term, sin_x.sum(), cos_x.sum()],
+            [sin_x.sum(), (sin_x**2).sum(), (cos_x * sin_x).sum()],
+            [cos_x.sum(), (cos_x * sin_x).sum(), (cos_x**2).sum()],
+        ]
+    )
+    Y = np.array([y_.sum() + rhs_penalty_term, (y_ * sin_x).sum(), (y_ * cos_x).sum()])
+    C, b, c = np.linalg.solve(M, Y)
+
+    SSE = np.sum((y_ - (C + b * sin_x + c * cos_x)) ** 2)
+    AIC = n * np.log(SSE / n) + 2 * 3 if SSE > 1e-20 else -math.inf
+    return (float(C), float(np.sqrt(b**2 + c**2)), float(np.arctan2(c, b))), AIC
+
+
+def sample_reads(channels: int, oversampling_count: int, reads: int, seed: int) -> list[Read]:
+    rng = random.Random(seed)
+    adcs = [Mock_ADC(adc_channel=i + 1, i2c_addr=0x00) for i in range(channels)]
+
+    samples = []
+    for _ in range(reads):
+        timestamps: list[list[float]] = [[0.0] * oversampling_count for _ in adcs]
+        signals: list[list[float]] = [[0.0] * oversampling_count for _ in adcs]
+        t = 0.0
+        for counter in range(oversampling_count):
+            for i, adc in enumerate(adcs):
+                t += rng.uniform(0.001, 0.003)
+                timestamps[i][counter] = t
+                signals[i][counter] = adc.read_from_channel()
+            t += 0.85 / (oversampling_count - 1) * ((counter * 0.618034) % 1)
+        prior_C = [rng.choice([None, sum(s) / len(s)]) for s in signals]
+        samples.append(Read(timestamps, signals, prior_C))
+    return samples
+
+
+def time_legacy(samples: list[Read], freq: float, penalizer_C: float) -> float:
+    start = process_time()
+    for read in samples:
+        for x, y, prior_C in zip(read.timestamps, read.signals, read.prior_C):
+            legacy_sin_regression_with_known_freq(x, y, freq, prior_C=prior_C, penalizer_C=penalizer_C)
+    return process_time() - start
+
+
+def time_batched(reader: ADCReader, samples: list[Read], freq: float, penalizer_C: float) -> float:
+    start = process_time()
+    for read in samples:
+        reader._sin_regression_with_known_freq_batched(
+            np.asarray(read.timestamps, dtype=float),
+            np.asarray(read.signals, dtype=float),
+            freq,
+            prior_C=np.asarray([np.nan if p is None else p for p in read.prior_C], dtype=float),
+            penalizer_C=penalizer_C,
+        )
+    return process_time() - start
+
+
+def check_agreement(reader: ADCReader, samples: list[Read], freq: float, penalizer_C: float) -> None:
+    for read in samples[:50]:
+        batched = reader._sin_regression_with_known_freq_batched(
+            np.asarray(read.timestamps, dtype=float),
+            np.asarray(read.signals, dtype=float),
+            freq,
+            prior_C=np.asarray([np.nan if p is None else p for p in read.prior_C], dtype=float),
+            penalizer_C=penalizer_C,
+        )
+        for x, y, prior_C, ((C, _, _), _) in zip(read.timestamps, read.signals, read.prior_C, batched):
+            (C_legacy, _, _), _ = legacy_sin_regression_with_known_freq(
+                x, y, freq, prior_C=prior_C, penalizer_C=penalizer_C
+            )
+            assert math.isclose(C, C_legacy, rel_tol=1e-9, abs_tol=1e-12), (C, C_legacy)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--oversampling-count", type=int, default=40)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--freq", type=float, default=60.0)
+    parser.add_argument("--penalizer", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    samples = sample_reads(args.channels, args.oversampling_count, args.reads, args.seed)
+    reader = ADCReader(channels=[])
+    penalizer_C = args.penalizer * args.oversampling_count
+
+    check_agreement(reader, samples, args.freq, penalizer_C)
+
+    legacy = time_legacy(samples, args.freq, penalizer_C)
+    batched = time_batched(reader, samples, args.freq, penalizer_C)
+
+    print(f"{args.channels} channels x {args.oversampling_count} samples, {args.reads} reads")
+    print(f"  per-channel: {1e6 * legacy / args.reads:9.1f} µs CPU / read")
+    print(f"  batched:     {1e6 * batched / args.reads:9.1f} µs CPU / read   ({legacy / batched:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time the startup of the main `pio` entry points, each in a fresh interpreter, like a user (or the web server) runs
+them. `--help` is used so nothing actually starts.
+
+Examples:
+
+    # median of 10 runs of each entry point
+    python scripts/benchmarks/pio_startup.py
+
+    # also time a plugin's command, and show which modules are the slowest to import for each
+    python scripts/benchmarks/pio_startup.py --command "run example_plugin --help" --importtime
+
+Plugins are loaded from the plugins folder, or PLUGINS_DEV when TESTING is set, and from installed packages.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+ENTRY_POINTS = {
+    "pio": "from pioreactor.cli.pio import pio; pio()",
+    "pios": "from pioreactor.cli.pios import pios; pios()",
+}
+
+COMMANDS = [
+    "pio --help",
+    "pio version",
+    "pio run --help",
+    "pio run stirring --help",
+    "pio run dosing_automation --help",
+    "pios --help",
+]
+
+
+def run_command(command: str, importtime: bool = False) -> tuple[float, str]:
+    entry_point, *args = command.split()
+    argv = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", ENTRY_POINTS[entry_point]]
+    start = perf_counter()
+    result = subprocess.run(argv + args, capture_output=True, text=True)
+    duration = perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"`{command}` failed: {result.stderr}")
+    return duration, result.stderr
+
+
+def slowest_imports(importtime_output: str, n: int = 5) -> list[tuple[int, str]]:
+    # lines look like: "import time:       123 |       4567 | pioreactor.cli.run"
+    cumulative = []
+    for line in importtime_output.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s+)(\S+)", line)
+        # only top-level imports, so nested ones aren't counted twice
+        if match and len(match.group(2)) == 1:
+            cumulative.append((int(match.group(1)), match.group(3)))
+    return sorted(cumulative, reverse=True)[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--command", action="append", default=[], help='ex: "run example_plugin --help"')
+    parser.add_argument("--importtime", action="store_true", help="show the slowest top-level imports")
+    args = parser.parse_args()
+
+    commands = COMMANDS + [c if c.split()[0] in ENTRY_POINTS else f"pio {c}" for c in args.command]
+    for command in commands:
+        run_command(command)  # warm the filesystem cache, and any plugin index
+        durations = [run_command(command)[0] for _ in range(args.runs)]
+        print(
+            f"  {command:>40}: median {1e3 * median(durations):7.1f} ms, min {1e3 * min(durations):7.1f} ms"
+        )
+
+        if args.importtime:
+            for microseconds, module in slowest_imports(run_command(command, importtime=True)[1]):
+                print(f"  {'':>40}    {microseconds / 1e3:7.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
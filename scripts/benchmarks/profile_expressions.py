@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time experiment-profile expressions that read job settings from MQTT: a new subscription per lookup (what
+expressions did outside of a profile run) against the JobSettingsMirror that `pio run experiment_profile` now uses.
+
+Examples:
+
+    # 200 evaluations of an expression reading 4 settings, against the broker in config.ini
+    python scripts/benchmarks/profile_expressions.py
+
+    # more settings per expression
+    python scripts/benchmarks/profile_expressions.py --settings 16 --evaluations 50
+
+Needs a running MQTT broker. The settings are published, retained, under the _testing_experiment experiment.
+"""
+import argparse
+import os
+from statistics import median
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+from pioreactor.experiment_profiles.parser import parse_profile_expression  # noqa: E402
+from pioreactor.experiment_profiles.state_mirror import mirror_job_settings  # noqa: E402
+from pioreactor.pubsub import publish  # noqa: E402
+from pioreactor.whoami import get_assigned_experiment_name  # noqa: E402
+from pioreactor.whoami import get_unit_name  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--settings", type=int, default=4, help="job settings read by the expression")
+    parser.add_argument("--evaluations", type=int, default=200)
+    args = parser.parse_args()
+
+    unit = get_unit_name()
+    experiment = get_assigned_experiment_name(unit)
+    for i in range(args.settings):
+        publish(f"pioreactor/{unit}/{experiment}/benchmark_job/setting{i}", i, retain=True)
+    expression = " + ".join(f"{unit}:benchmark_job:setting{i}" for i in range(args.settings))
+
+    def time_evaluations(n: int) -> list[float]:
+        latencies = []
+        for _ in range(n):
+            start = perf_counter()
+            parse_profile_expression(expression)
+            latencies.append(perf_counter() - start)
+        return latencies
+
+    print(f"expression reading {args.settings} settings")
+    # subscribing per lookup is slow, so it gets fewer evaluations
+    per_lookup = time_evaluations(max(1, args.evaluations // 10))
+    print(f"  {'subscribe per lookup':>22}: median {1e3 * median(per_lookup):8.2f} ms")
+
+    with mirror_job_settings():
+        time_evaluations(1)  # subscribes and waits for the retained messages
+        mirrored = time_evaluations(args.evaluations)
+    print(f"  {'mirror':>22}: median {1e3 * median(mirrored):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare open/get/set/close cycles of the sqlite caches (local_intermittent_storage and friends): the old cycle, which
+connected, ran the PRAGMAs and a CREATE TABLE on every open, against the pooled connection the cache now uses.
+
+Examples:
+
+    # 5000 cycles against a file in a temporary directory
+    python scripts/benchmarks/sqlite_cache.py
+
+    # against a tmpfs, like the temporary cache on a Pioreactor
+    python scripts/benchmarks/sqlite_cache.py --db /run/pioreactor/cache/benchmark.sqlite --cycles 20000
+
+Each cycle opens the cache, reads a key, writes it back and closes the cache, as the hot paths (job settings, PWM
+state, mqtt_to_db_streaming stats) do.
+"""
+import argparse
+import sqlite3
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from pioreactor.utils.sqlite_cache import cache
+
+
+def legacy_cycle(db_path: str, table_name: str, i: int) -> None:
+    table_name = f"cache_{table_name}"
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None, timeout=15)
+    cursor = conn.cursor()
+    cursor.executescript(
+        """
+        PRAGMA busy_timeout = 15000;
+        PRAGMA temp_store = 2;
+        PRAGMA cache_size = -4000;
+    """
+    )
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} (key _key_BLOB PRIMARY KEY, value BLOB)")
+    cursor.execute(f"SELECT value FROM {table_name} WHERE key = ?", ("key",))
+    cursor.fetchone()
+    cursor.execute(
+        f"INSERT INTO {table_name} (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        ("key", str(i)),
+    )
+    conn.close()
+
+
+def pooled_cycle(db_path: str, table_name: str, i: int) -> None:
+    with cache(table_name, db_path=db_path) as c:
+        c.get("key")
+        c["key"] = str(i)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--db", type=Path, help="cache database to use; defaults to a temporary file")
+    parser.add_argument("--cycles", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(args.db or Path(tmp) / "cache.sqlite")
+
+        results = {}
+        for name, cycle in [("legacy", legacy_cycle), ("pooled", pooled_cycle)]:
+            cycle(db_path, "benchmark", 0)  # warm up, and create the table
+            start = perf_counter()
+            for i in range(args.cycles):
+                cycle(db_path, "benchmark", i)
+            results[name] = perf_counter() - start
+
+    print(f"{args.cycles} open/get/set/close cycles on {args.db or 'a temporary file'}")
+    for name, elapsed in results.items():
+        print(f"  {name}: {1e6 * elapsed / args.cycles:8.1f} us / cycle")
+    print(f"  speedup: {results['legacy'] / results['pooled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
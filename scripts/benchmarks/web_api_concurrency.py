@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time the web API's read-heavy routes under concurrent load: requests from several threads at once, like the UI's
+charts and log tables polling a leader, against a synthetic app database.
+
+Examples:
+
+    # 4 units of od_readings over the last 4 hours, and 20000 log lines; 1, 4 and 8 concurrent clients
+    python scripts/benchmarks/web_api_concurrency.py
+
+    # more data, more clients
+    python scripts/benchmarks/web_api_concurrency.py --units 16 --logs 100000 --threads 1 16 32
+
+The database is a fresh temporary one (tables from packaging/shared-assets/sql), never the configured one. Requests
+go through the Flask app in-process, so this measures the app and SQLite, not the web server in front of them.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import timedelta
+from pathlib import Path
+from random import Random
+from statistics import median
+from time import perf_counter
+
+os.environ.setdefault("TESTING", "1")
+
+from pioreactor.config import config  # noqa: E402
+from pioreactor.utils.timing import current_utc_datetime  # noqa: E402
+from pioreactor.utils.timing import to_iso_format  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SHARED_SQL_DIR = REPO_ROOT / "packaging" / "shared-assets" / "sql"
+EXPERIMENT = "benchmark_experiment"
+
+
+def create_database(path: Path, units: int, hours: float, seconds_per_reading: float, logs: int) -> None:
+    rng = Random(0)
+    end = current_utc_datetime()
+    n_readings = int(hours * 60 * 60 / seconds_per_reading)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript((SHARED_SQL_DIR / "create_tables.sql").read_text())
+    conn.execute(
+        "INSERT INTO experiments (experiment, created_at) VALUES (?, ?)",
+        (EXPERIMENT, to_iso_format(end - timedelta(hours=hours))),
+    )
+    for i in range(units):
+        conn.executemany(
+            "INSERT INTO od_readings (experiment, pioreactor_unit, timestamp, od_reading, angle, channel) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    EXPERIMENT,
+                    f"unit{i}",
+                    to_iso_format(end - timedelta(seconds=seconds_per_reading * (n_readings - j))),
+                    rng.uniform(0.01, 2.0),
+                    90,
+                    2,
+                )
+                for j in range(n_readings)
+            ),
+        )
+    conn.executemany(
+        "INSERT INTO logs (experiment, pioreactor_unit, timestamp, message, source, level, task) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                EXPERIMENT,
+                f"unit{j % units}",
+                to_iso_format(end - timedelta(seconds=j)),
+                f"Updated od_reading to {rng.uniform(0.01, 2.0)}.",
+                "app",
+                rng.choice(["DEBUG", "INFO", "NOTICE", "WARNING"]),
+                "od_reading",
+            )
+            for j in range(logs)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(app, path: str, threads: int, requests_per_thread: int) -> tuple[float, list[float]]:
+    durations: list[list[float]] = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def client(i: int) -> None:
+        test_client = app.test_client()
+        barrier.wait()
+        for _ in range(requests_per_thread):
+            start = perf_counter()
+            response = test_client.get(path)
+            durations[i].append(perf_counter() - start)
+            assert response.status_code == 200, response.status_code
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    start = perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    total = perf_counter() - start
+    return total, sorted(d for ds in durations for d in ds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--units", type=int, default=4)
+    parser.add_argument("--hours", type=float, default=4.0)
+    parser.add_argument("--seconds-per-reading", type=float, default=5.0)
+    parser.add_argument("--logs", type=int, default=20000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=50, help="per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Path(tmp) / "benchmark.sqlite"
+        create_database(database, args.units, args.hours, args.seconds_per_reading, args.logs)
+        config["storage"]["database"] = str(database)
+
+        from pioreactor.web.app import create_app
+
+        app = create_app()
+        paths = [
+            f"/api/experiments/{EXPERIMENT}/time_series/od_readings?lookback={args.hours}",
+            "/api/logs?min_level=DEBUG",
+            f"/api/experiments/{EXPERIMENT}/logs?min_level=DEBUG",
+        ]
+        for path in paths:
+            run(app, path, 1, 3)  # warm up
+            for threads in args.threads:
+                total, durations = run(app, path, threads, args.requests)
+                p99 = durations[min(len(durations) - 1, int(0.99 * len(durations)))]
+                route = path.split("?")[0]
+                print(
+                    f"  {route:>62} x{threads:<3}: {len(durations) / total:7.1f} req/s, "
+                    f"p50 {1e3 * median(durations):6.1f} ms, p99 {1e3 * p99:6.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()